@@ -3,6 +3,8 @@ from binance_data_processor.enums.data_sink_config import StorageConnectionParam
 from binance_data_processor.core.load_config import load_config_from_json
 from binance_data_processor.data_sink.data_sink_facade import launch_data_sink
 from binance_data_processor.data_sink.data_sink_facade import BinanceDataSink
+from binance_data_processor.data_sink.sharded_data_sink_facade import launch_sharded_data_sink
+from binance_data_processor.data_sink.sharded_data_sink_facade import ShardedBinanceDataSink
 from binance_data_processor.listener.listener_facade import launch_data_listener
 from binance_data_processor.listener.listener_facade import BinanceDataListener
 from binance_data_processor.scraper.scraper import download_csv_data
@@ -16,6 +18,8 @@ __all__ = [
     'load_config_from_json',
     'launch_data_sink',
     'BinanceDataSink',
+    'launch_sharded_data_sink',
+    'ShardedBinanceDataSink',
     'launch_data_listener',
     'BinanceDataListener',
     'download_csv_data',
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, Future
+from pathlib import Path
+
+from binance_data_processor.cloud_storage_clients.s3_client import S3Client
+from binance_data_processor.core.archive_compressor import ArchiveCompressor
+from binance_data_processor.core.archive_pipeline import compress_json_content
+from binance_data_processor.enums.compression_settings import CompressionSettings
+from binance_data_processor.enums.storage_connection_parameters import StorageConnectionParameters
+
+
+class AsyncS3Client(S3Client):
+    __slots__ = [
+        'max_connections',
+        'max_connections_per_host',
+        'compression_settings',
+        'compression_executor',
+        '_aiohttp',
+        '_yarl',
+        '_loop',
+        '_loop_thread',
+        '_http_session'
+    ]
+
+    def __init__(
+            self,
+            storage_connection_parameters: StorageConnectionParameters,
+            archive_compressor: ArchiveCompressor | None = None,
+            max_connections: int = 64,
+            max_connections_per_host: int = 16,
+            compression_settings: CompressionSettings | None = None,
+            compression_executor: Executor | None = None,
+            **kwargs
+    ) -> None:
+        try:
+            import aiohttp
+            import yarl
+        except ImportError:
+            raise ImportError(
+                "aiohttp upload backend requires an optional dependency, "
+                "install it with: pip install binance-data-processor[async]"
+            )
+
+        self._aiohttp = aiohttp
+        self._yarl = yarl
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        # with settings and an executor (the archive pipeline process pool) payloads are compressed there,
+        # otherwise on a loop worker thread, never on the event loop itself
+        self.compression_settings = compression_settings
+        self.compression_executor = compression_executor
+        super().__init__(storage_connection_parameters, archive_compressor, **kwargs)
+
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(
+            target=self._loop.run_forever,
+            name='async_s3_client_loop',
+            daemon=True
+        )
+        self._loop_thread.start()
+        self._http_session = self._run(self._create_http_session())
+
+    def _create_session(self) -> None:
+        return None
+
+    def _refresh_session_if_needed(self) -> None:
+        pass
+
+    async def _create_http_session(self):
+        connector = self._aiohttp.TCPConnector(
+            limit=self.max_connections,
+            limit_per_host=self.max_connections_per_host
+        )
+        return self._aiohttp.ClientSession(connector=connector, skip_auto_headers=['Content-Type'])
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def submit_existing_file(self, file_path: str) -> Future:
+        return asyncio.run_coroutine_threadsafe(self.upload_existing_file_async(file_path), self._loop)
+
+    def submit_zipped_jsoned_string(self, data: str, file_name: str) -> Future:
+        return asyncio.run_coroutine_threadsafe(self.upload_zipped_jsoned_string_async(data, file_name), self._loop)
+
+    def upload_existing_file(self, file_path: str) -> None:
+        self._run(self.upload_existing_file_async(file_path))
+
+    def upload_zipped_jsoned_string(
+            self,
+            data: str,
+            file_name: str,
+            content_type: str = "application/octet-stream"
+    ) -> None:
+        self._run(self.upload_zipped_jsoned_string_async(data, file_name, content_type))
+
+    async def upload_existing_file_async(self, file_path: str) -> None:
+        object_name = Path(file_path).name
+        file_size = os.path.getsize(file_path)
+
+        if file_size >= self.multipart_threshold_bytes:
+            await self._upload_multipart_async(
+                object_name=object_name,
+                total_size=file_size,
+                read_part=lambda offset, size: self._read_file_range(file_path, offset, size)
+            )
+            return
+
+        with open(file_path, 'rb') as f:
+            await self._send_signed_request_async(
+                'PUT',
+                object_name,
+                data=f,
+                headers={'Content-Type': 'application/octet-stream'}
+            )
+
+    async def upload_zipped_jsoned_string_async(
+            self,
+            data: str,
+            file_name: str,
+            content_type: str = "application/octet-stream"
+    ) -> None:
+        object_name = f"{file_name}.{self.archive_compressor.file_extension}"
+        payload = await self._schedule_compression(data, file_name)
+
+        if len(payload) >= self.multipart_threshold_bytes:
+            payload_view = memoryview(payload)
+            await self._upload_multipart_async(
+                object_name=object_name,
+                total_size=len(payload),
+                read_part=lambda offset, size: payload_view[offset:offset + size],
+                content_type=content_type
+            )
+            return
+
+        await self._send_signed_request_async('PUT', object_name, data=payload, headers={'Content-Type': content_type})
+
+    def _schedule_compression(self, data: str, file_name: str) -> asyncio.Future:
+        if self.compression_settings is not None and self.compression_executor is not None:
+            try:
+                return self._loop.run_in_executor(
+                    self.compression_executor,
+                    compress_json_content,
+                    data,
+                    file_name,
+                    self.compression_settings
+                )
+            except RuntimeError:
+                # the archive pipeline closes its pool on shutdown, later payloads fall back to a thread
+                pass
+        return self._loop.run_in_executor(None, self.archive_compressor.compress, data, file_name)
+
+    async def _upload_multipart_async(
+            self,
+            object_name: str,
+            total_size: int,
+            read_part,
+            content_type: str = "application/octet-stream"
+    ) -> None:
+        _, content = await self._send_signed_request_async(
+            'POST',
+            object_name,
+            query_parameters={'uploads': ''},
+            headers={'Content-Type': content_type}
+        )
+        upload_id = self._parse_upload_id(content, object_name)
+        parts_semaphore = asyncio.Semaphore(self.max_parallel_parts)
+
+        async def upload_part(part_number: int, offset: int, size: int) -> str:
+            async with parts_semaphore:
+                part_payload = await self._loop.run_in_executor(None, read_part, offset, size)
+                return await self._upload_part_with_retries_async(object_name, upload_id, part_number, part_payload)
+
+        try:
+            etags = await asyncio.gather(
+                *(upload_part(*part_range) for part_range in self._get_part_ranges(total_size))
+            )
+            _, content = await self._send_signed_request_async(
+                'POST',
+                object_name,
+                query_parameters={'uploadId': upload_id},
+                data=self._build_complete_multipart_upload_body(etags),
+                headers={'Content-Type': 'application/xml'}
+            )
+            # the complete request can fail with http 200 and an error body
+            if b'<Error>' in content:
+                raise Exception(f'CompleteMultipartUpload failed for {object_name}: {content.decode("utf-8", "replace")}')
+        except Exception:
+            try:
+                await self._send_signed_request_async('DELETE', object_name, query_parameters={'uploadId': upload_id})
+            except Exception:
+                pass
+            raise
+
+    async def _upload_part_with_retries_async(
+            self,
+            object_name: str,
+            upload_id: str,
+            part_number: int,
+            part_payload: bytes
+    ) -> str:
+        for attempt in range(1, self.part_max_retries + 1):
+            try:
+                response_headers, _ = await self._send_signed_request_async(
+                    'PUT',
+                    object_name,
+                    query_parameters={'partNumber': str(part_number), 'uploadId': upload_id},
+                    data=bytes(part_payload)
+                )
+                return response_headers['ETag']
+            except Exception:
+                if attempt == self.part_max_retries:
+                    raise
+                await asyncio.sleep(self.part_retry_delay_seconds)
+
+    async def _send_signed_request_async(
+            self,
+            method: str,
+            object_name: str,
+            query_parameters: dict[str, str] | None = None,
+            data: bytes | None = None,
+            headers: dict[str, str] | None = None
+    ):
+        url, request_headers = self._build_signed_request(method, object_name, query_parameters, headers)
+
+        async with self._http_session.request(
+                method,
+                self._yarl.URL(url, encoded=True),
+                data=data,
+                headers=request_headers
+        ) as response:
+            content = await response.read()
+            response.raise_for_status()
+            return response.headers, content
+
+    def shutdown(self) -> None:
+        if self._loop.is_closed():
+            return
+        self._run(self._http_session.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+        self._loop.close()
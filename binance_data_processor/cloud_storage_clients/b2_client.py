@@ -1,5 +1,3 @@
-import io
-import zipfile
 import requests
 import base64
 import hashlib
@@ -7,6 +5,7 @@ import os
 from typing import Tuple, Dict, Any, Optional
 import time
 
+from binance_data_processor.core.archive_compressor import ArchiveCompressor
 from binance_data_processor.enums.storage_connection_parameters import StorageConnectionParameters
 
 
@@ -15,6 +14,7 @@ class B2Client:
 
     __slots__ = [
         'storage_connection_parameters',
+        'archive_compressor',
         '_bucket_id',
         '_auth_token',
         '_api_url',
@@ -25,9 +25,11 @@ class B2Client:
 
     def __init__(
             self,
-            storage_connection_parameters: StorageConnectionParameters
+            storage_connection_parameters: StorageConnectionParameters,
+            archive_compressor: ArchiveCompressor | None = None
     ) -> None:
         self.storage_connection_parameters = storage_connection_parameters
+        self.archive_compressor = archive_compressor if archive_compressor is not None else ArchiveCompressor()
         self._bucket_id: str | None = None
         self._auth_token: str | None = None
         self._api_url: str | None = None
@@ -104,8 +106,8 @@ class B2Client:
             file_name: Optional[str] = None
     ) -> Dict[str, Any]:
         self._refresh_session_if_needed()
-        if not file_path.lower().endswith('.zip'):
-            raise ValueError("File has to be .zip")
+        if not file_path.lower().endswith(ArchiveCompressor.ARCHIVE_EXTENSIONS):
+            raise ValueError(f"File has to be one of {ArchiveCompressor.ARCHIVE_EXTENSIONS}")
 
         if file_name is None:
             file_name = os.path.basename(file_path)
@@ -136,18 +138,13 @@ class B2Client:
             file_name: str
     ) -> None:
         self._refresh_session_if_needed()
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED, compresslevel=9) as zipf:
-            zipf.writestr(f'{file_name}.json', data)
-        zip_buffer.seek(0)
-
-        bytes_to_be_sent = zip_buffer.getvalue()
+        bytes_to_be_sent = self.archive_compressor.compress(data, file_name)
 
         file_sha1: str = hashlib.sha1(bytes_to_be_sent).hexdigest()
         upload_url, upload_auth_token = self._get_upload_url()
         file_headers: Dict[str, str] = {
             'Authorization': upload_auth_token,
-            'X-Bz-File-Name': f'{file_name}.zip',
+            'X-Bz-File-Name': f'{file_name}.{self.archive_compressor.file_extension}',
             'Content-Type': 'b2/x-auto',
             'X-Bz-Content-Sha1': file_sha1,
         }
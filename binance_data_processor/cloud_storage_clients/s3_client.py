@@ -1,34 +1,63 @@
-import datetime
 import hashlib
 import hmac
-import io
+import os
 import re
-import zipfile
 import requests
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib.parse import quote
 import time
 
+from binance_data_processor.core.archive_compressor import ArchiveCompressor
 from binance_data_processor.enums.storage_connection_parameters import StorageConnectionParameters
 
 
 class S3Client:
     REFRESH_INTERVAL = 4 * 3600
+    UNSIGNED_PAYLOAD = 'UNSIGNED-PAYLOAD'
+    ALGORITHM = 'AWS4-HMAC-SHA256'
+    SIGNED_HEADERS = 'host;x-amz-content-sha256;x-amz-date'
 
     __slots__ = [
         'storage_connection_parameters',
         'region',
         'service',
         'host',
+        'archive_compressor',
+        'multipart_threshold_bytes',
+        'multipart_part_size_bytes',
+        'max_parallel_parts',
+        'part_max_retries',
+        'part_retry_delay_seconds',
         '_session',
-        '_last_refresh_time'
+        '_last_refresh_time',
+        '_signing_key_cache',
+        '_canonical_headers_prefix',
+        '_canonical_request_suffix',
+        '_credential_scope_suffix',
+        '_authorization_prefix'
     ]
 
     def __init__(
             self,
-            storage_connection_parameters: StorageConnectionParameters
+            storage_connection_parameters: StorageConnectionParameters,
+            archive_compressor: ArchiveCompressor | None = None,
+            multipart_threshold_bytes: int = 64 * 1024 * 1024,
+            multipart_part_size_bytes: int = 16 * 1024 * 1024,
+            max_parallel_parts: int = 4,
+            part_max_retries: int = 3,
+            part_retry_delay_seconds: float = 1
     ) -> None:
         self.storage_connection_parameters = storage_connection_parameters
-        self._session = requests.Session()
+        self.archive_compressor = archive_compressor if archive_compressor is not None else ArchiveCompressor()
+        self.multipart_threshold_bytes = multipart_threshold_bytes
+        self.multipart_part_size_bytes = multipart_part_size_bytes
+        self.max_parallel_parts = max_parallel_parts
+        self.part_max_retries = part_max_retries
+        self.part_retry_delay_seconds = part_retry_delay_seconds
+        self._session = self._create_session()
         self._last_refresh_time = time.time()
 
         region_match = re.search(
@@ -41,11 +70,31 @@ class S3Client:
         self.service = "s3"
         self.host = f"s3.{self.region}.backblazeb2.com"
 
+        self._signing_key_cache = None
+        self._canonical_headers_prefix = (
+            f'host:{self.host}\n'
+            f'x-amz-content-sha256:{self.UNSIGNED_PAYLOAD}\n'
+            f'x-amz-date:'
+        )
+        self._canonical_request_suffix = f'\n\n{self.SIGNED_HEADERS}\n{self.UNSIGNED_PAYLOAD}'
+        self._credential_scope_suffix = f'/{self.region}/{self.service}/aws4_request'
+        self._authorization_prefix = (
+            f'{self.ALGORITHM} '
+            f'Credential={self.storage_connection_parameters.backblaze_access_key_id}/'
+        )
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=max(self.max_parallel_parts, 10))
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
     def _refresh_session_if_needed(self) -> None:
         current_time = time.time()
         if current_time - self._last_refresh_time > self.REFRESH_INTERVAL:
             self._session.close()
-            self._session = requests.Session()
+            self._session = self._create_session()
             self._last_refresh_time = current_time
 
     @staticmethod
@@ -64,15 +113,37 @@ class S3Client:
         k_service = self.sign(k_region, service_name)
         return self.sign(k_service, 'aws4_request')
 
+    def _get_cached_signing_key(self, date_stamp: str) -> bytes:
+        signing_key_cache = self._signing_key_cache
+        if signing_key_cache is not None and signing_key_cache[0] == date_stamp:
+            return signing_key_cache[1]
+
+        signing_key = self.get_signature_key(
+            self.storage_connection_parameters.backblaze_secret_access_key,
+            date_stamp,
+            self.region,
+            self.service
+        )
+        self._signing_key_cache = (date_stamp, signing_key)
+        return signing_key
+
     def upload_existing_file(
             self,
             file_path: str
     ) -> None:
-        with open(file_path, "rb") as f:
-            file_data = f.read()
-
         object_name = Path(file_path).name
-        self._upload_payload(file_data, object_name)
+        file_size = os.path.getsize(file_path)
+
+        if file_size >= self.multipart_threshold_bytes:
+            self._upload_multipart(
+                object_name=object_name,
+                total_size=file_size,
+                read_part=lambda offset, size: self._read_file_range(file_path, offset, size)
+            )
+            return
+
+        with open(file_path, "rb") as f:
+            self._upload_payload(f, object_name, content_length=file_size)
 
     def upload_zipped_jsoned_string(
             self,
@@ -80,74 +151,234 @@ class S3Client:
             file_name: str,
             content_type: str = "application/octet-stream"
     ) -> None:
-        with io.BytesIO() as zip_buffer:
-            with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED, compresslevel=9) as zipf:
-                zipf.writestr(f"{file_name}.json", data)
-            zip_buffer.seek(0)
-            object_name = f"{file_name}.zip"
-            self._upload_payload(zip_buffer.getvalue(), object_name, content_type)
+        object_name = f"{file_name}.{self.archive_compressor.file_extension}"
+        payload = self.archive_compressor.compress(data, file_name)
+
+        if len(payload) >= self.multipart_threshold_bytes:
+            payload_view = memoryview(payload)
+            self._upload_multipart(
+                object_name=object_name,
+                total_size=len(payload),
+                read_part=lambda offset, size: payload_view[offset:offset + size],
+                content_type=content_type
+            )
+            return
+
+        self._upload_payload(payload, object_name, content_type)
+
+    @staticmethod
+    def _read_file_range(file_path: str, offset: int, size: int) -> bytes:
+        with open(file_path, 'rb') as f:
+            f.seek(offset)
+            return f.read(size)
 
     def _upload_payload(
             self,
-            payload: bytes,
+            payload,
+            object_name: str,
+            content_type: str = "application/octet-stream",
+            content_length: int | None = None
+    ) -> None:
+        headers = {'Content-Type': content_type}
+        if content_length is not None:
+            headers['Content-Length'] = str(content_length)
+
+        response = self._send_signed_request('PUT', object_name, data=payload, headers=headers)
+        response.close()
+
+    def _upload_multipart(
+            self,
             object_name: str,
+            total_size: int,
+            read_part,
             content_type: str = "application/octet-stream"
     ) -> None:
+        upload_id = self._create_multipart_upload(object_name, content_type)
+        part_ranges = self._get_part_ranges(total_size)
+
+        try:
+            with ThreadPoolExecutor(
+                    max_workers=self.max_parallel_parts,
+                    thread_name_prefix='s3_multipart_part'
+            ) as executor:
+                etags = list(
+                    executor.map(
+                        lambda part_range: self._upload_part_with_retries(
+                            object_name,
+                            upload_id,
+                            part_range[0],
+                            read_part(part_range[1], part_range[2])
+                        ),
+                        part_ranges
+                    )
+                )
+            self._complete_multipart_upload(object_name, upload_id, etags)
+        except Exception:
+            self._abort_multipart_upload(object_name, upload_id)
+            raise
+
+    def _get_part_ranges(self, total_size: int) -> list[tuple[int, int, int]]:
+        return [
+            (part_number, offset, min(self.multipart_part_size_bytes, total_size - offset))
+            for part_number, offset in enumerate(range(0, total_size, self.multipart_part_size_bytes), start=1)
+        ]
+
+    @staticmethod
+    def _parse_upload_id(content: bytes, object_name: str) -> str:
+        upload_id = ET.fromstring(content).find('{*}UploadId')
+        if upload_id is None or not upload_id.text:
+            raise Exception(f'UploadId not found in CreateMultipartUpload response for {object_name}')
+        return upload_id.text
+
+    @staticmethod
+    def _build_complete_multipart_upload_body(etags: list[str]) -> bytes:
+        parts = ''.join(
+            f'<Part><PartNumber>{part_number}</PartNumber><ETag>{etag}</ETag></Part>'
+            for part_number, etag in enumerate(etags, start=1)
+        )
+        return f'<CompleteMultipartUpload>{parts}</CompleteMultipartUpload>'.encode('utf-8')
+
+    def _create_multipart_upload(self, object_name: str, content_type: str) -> str:
+        response = self._send_signed_request(
+            'POST',
+            object_name,
+            query_parameters={'uploads': ''},
+            headers={'Content-Type': content_type}
+        )
+        try:
+            return self._parse_upload_id(response.content, object_name)
+        finally:
+            response.close()
+
+    def _upload_part_with_retries(
+            self,
+            object_name: str,
+            upload_id: str,
+            part_number: int,
+            part_payload: bytes
+    ) -> str:
+        for attempt in range(1, self.part_max_retries + 1):
+            try:
+                response = self._send_signed_request(
+                    'PUT',
+                    object_name,
+                    query_parameters={'partNumber': str(part_number), 'uploadId': upload_id},
+                    data=part_payload
+                )
+                response.close()
+                return response.headers['ETag']
+            except Exception:
+                if attempt == self.part_max_retries:
+                    raise
+                time.sleep(self.part_retry_delay_seconds)
+
+    def _complete_multipart_upload(self, object_name: str, upload_id: str, etags: list[str]) -> None:
+        response = self._send_signed_request(
+            'POST',
+            object_name,
+            query_parameters={'uploadId': upload_id},
+            data=self._build_complete_multipart_upload_body(etags),
+            headers={'Content-Type': 'application/xml'}
+        )
+        try:
+            if b'<Error>' in response.content:
+                raise Exception(f'CompleteMultipartUpload failed for {object_name}: {response.text}')
+        finally:
+            response.close()
+
+    def _abort_multipart_upload(self, object_name: str, upload_id: str) -> None:
+        try:
+            response = self._send_signed_request(
+                'DELETE',
+                object_name,
+                query_parameters={'uploadId': upload_id}
+            )
+            response.close()
+        except Exception:
+            pass
+
+    def _send_signed_request(
+            self,
+            method: str,
+            object_name: str,
+            query_parameters: dict[str, str] | None = None,
+            data=None,
+            headers: dict[str, str] | None = None
+    ) -> requests.Response:
         self._refresh_session_if_needed()
-        t = datetime.datetime.utcnow()
-        amz_date = t.strftime('%Y%m%dT%H%M%SZ')
-        date_stamp = t.strftime('%Y%m%d')
-        method = 'PUT'
-        canonical_uri = f'/{self.storage_connection_parameters.backblaze_bucket_name}/{object_name}'
-        canonical_querystring = ""
-        payload_hash = hashlib.sha256(payload).hexdigest()
+        url, request_headers = self._build_signed_request(method, object_name, query_parameters, headers)
 
-        canonical_headers = (
-            f'host:{self.host}\n'
-            f'x-amz-content-sha256:{payload_hash}\n'
-            f'x-amz-date:{amz_date}\n'
+        response = self._session.request(method, url, data=data, headers=request_headers)
+        try:
+            response.raise_for_status()
+        except Exception:
+            response.close()
+            raise
+        return response
+
+    def _build_signed_request(
+            self,
+            method: str,
+            object_name: str,
+            query_parameters: dict[str, str] | None = None,
+            headers: dict[str, str] | None = None
+    ) -> tuple[str, dict[str, str]]:
+        canonical_uri = f'/{self.storage_connection_parameters.backblaze_bucket_name}/{object_name}'
+        canonical_querystring = '&'.join(
+            f'{quote(key, safe="-_.~")}={quote(value, safe="-_.~")}'
+            for key, value in sorted((query_parameters or {}).items())
         )
-        signed_headers = 'host;x-amz-content-sha256;x-amz-date'
+
+        request_headers = self._get_signed_headers(method, canonical_uri, canonical_querystring)
+        if headers:
+            request_headers.update(headers)
+
+        url = self.storage_connection_parameters.backblaze_endpoint_url + canonical_uri
+        if canonical_querystring:
+            url = f'{url}?{canonical_querystring}'
+
+        return url, request_headers
+
+    def _get_signed_headers(
+            self,
+            method: str,
+            canonical_uri: str,
+            canonical_querystring: str,
+            amz_date: str | None = None
+    ) -> dict[str, str]:
+        if amz_date is None:
+            amz_date = time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())
+        date_stamp = amz_date[:8]
+
+        # body is never hashed up front, TLS protects its integrity
         canonical_request = (
             f'{method}\n'
             f'{canonical_uri}\n'
             f'{canonical_querystring}\n'
-            f'{canonical_headers}\n'
-            f'{signed_headers}\n'
-            f'{payload_hash}'
+            f'{self._canonical_headers_prefix}{amz_date}'
+            f'{self._canonical_request_suffix}'
         )
-        algorithm = 'AWS4-HMAC-SHA256'
-        credential_scope = f'{date_stamp}/{self.region}/{self.service}/aws4_request'
+        credential_scope = f'{date_stamp}{self._credential_scope_suffix}'
         string_to_sign = (
-            f'{algorithm}\n'
+            f'{self.ALGORITHM}\n'
             f'{amz_date}\n'
             f'{credential_scope}\n'
             f'{hashlib.sha256(canonical_request.encode("utf-8")).hexdigest()}'
         )
-        signing_key = self.get_signature_key(
-            self.storage_connection_parameters.backblaze_secret_access_key,
-            date_stamp,
-            self.region,
-            self.service
-        )
-        signature = hmac.new(signing_key, string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
-        authorization_header = (
-            f'{algorithm} Credential={self.storage_connection_parameters.backblaze_access_key_id}/{credential_scope}, '
-            f'SignedHeaders={signed_headers}, Signature={signature}'
-        )
-        headers = {
-            'x-amz-content-sha256': payload_hash,
+        signature = hmac.new(
+            self._get_cached_signing_key(date_stamp),
+            string_to_sign.encode('utf-8'),
+            hashlib.sha256
+        ).hexdigest()
+
+        return {
+            'x-amz-content-sha256': self.UNSIGNED_PAYLOAD,
             'x-amz-date': amz_date,
-            'Authorization': authorization_header,
-            'Content-Type': content_type,
+            'Authorization': (
+                f'{self._authorization_prefix}{credential_scope}, '
+                f'SignedHeaders={self.SIGNED_HEADERS}, Signature={signature}'
+            )
         }
-        url = self.storage_connection_parameters.backblaze_endpoint_url + canonical_uri
-
-        response = self._session.put(url, data=payload, headers=headers)
-        try:
-            response.raise_for_status()
-        finally:
-            response.close()
 
     def shutdown(self) -> None:
-        self._session.close()
\ No newline at end of file
+        self._session.close()
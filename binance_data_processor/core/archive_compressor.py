@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import gzip
+import io
+import zipfile
+from typing import BinaryIO
+
+from binance_data_processor.enums.compression_codec_enum import CompressionCodec
+from binance_data_processor.enums.compression_settings import CompressionSettings
+
+
+class _ZipEntryStream:
+    __slots__ = ['_zip_file', '_entry']
+
+    def __init__(self, file: BinaryIO, entry_name: str, level: int):
+        self._zip_file = zipfile.ZipFile(file, 'w', zipfile.ZIP_DEFLATED, compresslevel=level)
+        self._entry = self._zip_file.open(entry_name, 'w')
+
+    def write(self, data: bytes) -> int:
+        return self._entry.write(data)
+
+    def close(self) -> None:
+        self._entry.close()
+        self._zip_file.close()
+
+
+class _UncompressedStream:
+    __slots__ = ['_file']
+
+    def __init__(self, file: BinaryIO):
+        self._file = file
+
+    def write(self, data: bytes) -> int:
+        return self._file.write(data)
+
+    def close(self) -> None:
+        self._file.flush()
+
+
+class ArchiveCompressor:
+    __slots__ = [
+        'codec',
+        'level',
+        '_zstd_dictionary'
+    ]
+
+    _MAGIC_BYTES = {
+        b'PK\x03\x04': CompressionCodec.ZIP,
+        b'\x28\xb5\x2f\xfd': CompressionCodec.ZSTD,
+        b'\x04\x22\x4d\x18': CompressionCodec.LZ4,
+        b'\x1f\x8b': CompressionCodec.GZIP
+    }
+
+    ARCHIVE_EXTENSIONS = tuple(f'.{codec.file_extension}' for codec in CompressionCodec)
+
+    def __init__(self, compression_settings: CompressionSettings | None = None):
+        if compression_settings is None:
+            compression_settings = CompressionSettings()
+
+        self.codec = compression_settings.codec
+        self.level = compression_settings.level
+        self._zstd_dictionary = None
+
+        if compression_settings.zstd_dictionary_path is not None:
+            zstandard = self._import_codec_module(CompressionCodec.ZSTD)
+            with open(compression_settings.zstd_dictionary_path, 'rb') as f:
+                self._zstd_dictionary = zstandard.ZstdCompressionDict(f.read())
+
+        if self.codec in [CompressionCodec.ZSTD, CompressionCodec.LZ4]:
+            self._import_codec_module(self.codec)
+
+    @property
+    def file_extension(self) -> str:
+        return self.codec.file_extension
+
+    def open_stream(self, file: BinaryIO, file_name: str):
+        if self.codec is CompressionCodec.ZIP:
+            return _ZipEntryStream(file, f'{file_name}.json', self.level)
+        if self.codec is CompressionCodec.ZSTD:
+            zstandard = self._import_codec_module(CompressionCodec.ZSTD)
+            compressor = zstandard.ZstdCompressor(level=self.level, dict_data=self._zstd_dictionary)
+            return compressor.stream_writer(file, closefd=False)
+        if self.codec is CompressionCodec.LZ4:
+            lz4_frame = self._import_codec_module(CompressionCodec.LZ4)
+            return lz4_frame.LZ4FrameFile(file, mode='wb', compression_level=self.level)
+        if self.codec is CompressionCodec.GZIP:
+            return gzip.GzipFile(filename=f'{file_name}.json', mode='wb', compresslevel=self.level, fileobj=file)
+        return _UncompressedStream(file)
+
+    def compress(self, json_content: str | bytes, file_name: str) -> bytes:
+        data = json_content.encode('utf-8') if isinstance(json_content, str) else json_content
+
+        if self.codec is CompressionCodec.ZIP:
+            with io.BytesIO() as zip_buffer:
+                with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED, compresslevel=self.level) as zipf:
+                    zipf.writestr(f"{file_name}.json", data)
+                return zip_buffer.getvalue()
+        if self.codec is CompressionCodec.ZSTD:
+            zstandard = self._import_codec_module(CompressionCodec.ZSTD)
+            return zstandard.ZstdCompressor(level=self.level, dict_data=self._zstd_dictionary).compress(data)
+        if self.codec is CompressionCodec.LZ4:
+            lz4_frame = self._import_codec_module(CompressionCodec.LZ4)
+            return lz4_frame.compress(data, compression_level=self.level)
+        if self.codec is CompressionCodec.GZIP:
+            return gzip.compress(data, compresslevel=self.level)
+        return data
+
+    @staticmethod
+    def detect_codec(payload: bytes) -> CompressionCodec:
+        for magic_bytes, codec in ArchiveCompressor._MAGIC_BYTES.items():
+            if payload.startswith(magic_bytes):
+                return codec
+        return CompressionCodec.NONE
+
+    @staticmethod
+    def decompress(payload: bytes, zstd_dictionary: bytes | None = None) -> bytes:
+        codec = ArchiveCompressor.detect_codec(payload)
+
+        if codec is CompressionCodec.ZIP:
+            with zipfile.ZipFile(io.BytesIO(payload)) as z:
+                for file_name in z.namelist():
+                    if file_name.endswith('.json'):
+                        return z.read(file_name)
+            raise ValueError("file .json not found in archive")
+        if codec is CompressionCodec.ZSTD:
+            zstandard = ArchiveCompressor._import_codec_module(CompressionCodec.ZSTD)
+            dict_data = zstandard.ZstdCompressionDict(zstd_dictionary) if zstd_dictionary is not None else None
+            with zstandard.ZstdDecompressor(dict_data=dict_data).stream_reader(io.BytesIO(payload)) as reader:
+                return reader.read()
+        if codec is CompressionCodec.LZ4:
+            lz4_frame = ArchiveCompressor._import_codec_module(CompressionCodec.LZ4)
+            return lz4_frame.decompress(payload)
+        if codec is CompressionCodec.GZIP:
+            return gzip.decompress(payload)
+        return payload
+
+    @staticmethod
+    def train_zstd_dictionary(samples: list[bytes], dictionary_size_bytes: int = 112_640) -> bytes:
+        zstandard = ArchiveCompressor._import_codec_module(CompressionCodec.ZSTD)
+        return zstandard.train_dictionary(dictionary_size_bytes, samples).as_bytes()
+
+    @staticmethod
+    def _import_codec_module(codec: CompressionCodec):
+        try:
+            if codec is CompressionCodec.ZSTD:
+                import zstandard
+                return zstandard
+            if codec is CompressionCodec.LZ4:
+                import lz4.frame
+                return lz4.frame
+        except ImportError:
+            raise ImportError(
+                f"{codec.value} codec requires an optional dependency, "
+                f"install it with: pip install binance-data-processor[{codec.value}]"
+            )
+        raise ValueError(f"{codec} does not need an optional dependency")
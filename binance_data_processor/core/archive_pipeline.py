@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable
+
+from binance_data_processor.core.archive_compressor import ArchiveCompressor
+from binance_data_processor.core.pair_file_sink import PairFileSink
+from binance_data_processor.core.upload_spool import UploadSpool
+from binance_data_processor.enums.archive_pipeline_settings import ArchivePipelineSettings
+from binance_data_processor.enums.compression_settings import CompressionSettings
+
+
+def compress_staged_file(
+        staged_path: str,
+        archive_path: str,
+        file_name: str,
+        compression_settings: CompressionSettings
+) -> str:
+    archive_compressor = ArchiveCompressor(compression_settings)
+    part_path = f'{archive_path}.part'
+
+    with open(staged_path, 'rb') as source, open(part_path, 'wb') as target:
+        stream = archive_compressor.open_stream(target, file_name)
+        shutil.copyfileobj(source, stream, 1024 * 1024)
+        if stream is not target:
+            stream.close()
+
+    os.replace(part_path, archive_path)
+    os.remove(staged_path)
+    return archive_path
+
+
+def compress_json_content(
+        json_content: str | bytes,
+        file_name: str,
+        compression_settings: CompressionSettings
+) -> bytes:
+    return ArchiveCompressor(compression_settings).compress(json_content, file_name)
+
+
+class ArchivePipeline:
+    __slots__ = [
+        'logger',
+        'archive_pipeline_settings',
+        'compression_settings',
+        'upload_callback',
+        'upload_submitter',
+        'upload_spool',
+        '_compression_executor',
+        '_upload_executor',
+        '_lock',
+        '_uploads_finished',
+        '_in_flight_paths',
+        '_pending_compressions',
+        '_pending_uploads',
+        '_compressed_archives',
+        '_uploaded_archives',
+        '_failed_compressions',
+        '_failed_uploads',
+        '_deferred_uploads',
+        '_last_compression_seconds',
+        '_last_upload_seconds',
+        '_is_shut_down',
+        '_are_uploads_shut_down'
+    ]
+
+    def __init__(
+            self,
+            archive_pipeline_settings: ArchivePipelineSettings,
+            compression_settings: CompressionSettings,
+            upload_callback: Callable[[str], None] | None = None,
+            upload_spool: UploadSpool | None = None,
+            upload_submitter: Callable[[str], Future] | None = None
+    ):
+        self.logger = logging.getLogger('binance_data_sink')
+        self.archive_pipeline_settings = archive_pipeline_settings
+        self.compression_settings = compression_settings
+        self.upload_callback = upload_callback
+        # a submitter schedules the upload on the client's own event loop and returns its future,
+        # uploads in flight are then bounded by max_pending_uploads and the client connection pool
+        self.upload_submitter = upload_submitter
+        self.upload_spool = upload_spool
+        self._compression_executor = None
+        self._upload_executor = None
+        self._lock = threading.Lock()
+        self._uploads_finished = threading.Condition(self._lock)
+        self._in_flight_paths = set()
+        self._pending_compressions = 0
+        self._pending_uploads = 0
+        self._compressed_archives = 0
+        self._uploaded_archives = 0
+        self._failed_compressions = 0
+        self._failed_uploads = 0
+        self._deferred_uploads = 0
+        self._last_compression_seconds = None
+        self._last_upload_seconds = None
+        self._is_shut_down = False
+        self._are_uploads_shut_down = False
+
+    @property
+    def compresses_inline(self) -> bool:
+        return self.archive_pipeline_settings.compression_workers == 0
+
+    def get_archive_path_for_staged_file(self, staged_path: str) -> str:
+        return (
+            f'{staged_path[:-len(PairFileSink.STAGED_EXTENSION)]}'
+            f'{self.compression_settings.codec.file_extension}'
+        )
+
+    def is_in_flight(self, file_path: str) -> bool:
+        with self._lock:
+            return file_path in self._in_flight_paths
+
+    def get_in_flight_paths(self) -> set[str]:
+        with self._lock:
+            return set(self._in_flight_paths)
+
+    def get_compression_executor(self) -> ProcessPoolExecutor | None:
+        if self.compresses_inline:
+            return None
+        with self._lock:
+            return self._get_compression_executor()
+
+    def _get_compression_executor(self) -> ProcessPoolExecutor:
+        if self._compression_executor is None:
+            self._compression_executor = ProcessPoolExecutor(
+                max_workers=self.archive_pipeline_settings.compression_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._compression_executor
+
+    def submit_staged_file(self, staged_path: str, file_name: str) -> None:
+        archive_path = self.get_archive_path_for_staged_file(staged_path)
+
+        with self._lock:
+            if self._is_shut_down or staged_path in self._in_flight_paths:
+                return
+            self._in_flight_paths.add(staged_path)
+            self._pending_compressions += 1
+
+            # submitted under the lock, shutdown cannot close the executor in between
+            submitted_at = time.monotonic()
+            future = self._get_compression_executor().submit(
+                compress_staged_file,
+                staged_path,
+                archive_path,
+                file_name,
+                self.compression_settings
+            )
+
+        future.add_done_callback(
+            lambda f: self._on_compression_done(f, staged_path, submitted_at)
+        )
+
+    def _on_compression_done(self, future: Future, staged_path: str, submitted_at: float) -> None:
+        with self._lock:
+            self._in_flight_paths.discard(staged_path)
+            self._pending_compressions -= 1
+            self._last_compression_seconds = round(time.monotonic() - submitted_at, 3)
+
+            exception = future.exception()
+            if exception is not None:
+                self._failed_compressions += 1
+            else:
+                self._compressed_archives += 1
+
+        if exception is not None:
+            self.logger.error(f"Error whilst compressing {staged_path}: {exception}")
+            return
+
+        self.submit_upload(future.result())
+
+    def submit_upload(self, archive_path: str) -> bool:
+        if self.upload_callback is None and self.upload_submitter is None:
+            return False
+
+        if self.upload_spool is not None:
+            self.upload_spool.enqueue(archive_path)
+
+        with self._lock:
+            if self._are_uploads_shut_down or archive_path in self._in_flight_paths:
+                return False
+            if self._pending_uploads >= self.archive_pipeline_settings.max_pending_uploads:
+                # the archive stays on disk and in the spool, the spool drainer picks it up later
+                self._deferred_uploads += 1
+                return False
+            self._in_flight_paths.add(archive_path)
+            self._pending_uploads += 1
+
+            if self.upload_submitter is None:
+                if self._upload_executor is None:
+                    self._upload_executor = ThreadPoolExecutor(
+                        max_workers=self.archive_pipeline_settings.upload_workers,
+                        thread_name_prefix='archive_uploader'
+                    )
+                self._upload_executor.submit(self._upload, archive_path)
+                return True
+
+        # shutdown waits for pending uploads, so the submitter may run outside the lock
+        started_at = time.monotonic()
+        try:
+            future = self.upload_submitter(archive_path)
+        except Exception as e:
+            self._finish_upload(archive_path, started_at, e)
+            return True
+
+        future.add_done_callback(lambda f: self._on_upload_done(f, archive_path, started_at))
+        return True
+
+    def get_free_upload_slots(self) -> int:
+        with self._lock:
+            return max(self.archive_pipeline_settings.max_pending_uploads - self._pending_uploads, 0)
+
+    def _upload(self, archive_path: str) -> None:
+        started_at = time.monotonic()
+
+        try:
+            self.upload_callback(archive_path)
+        except Exception as e:
+            self._finish_upload(archive_path, started_at, e)
+        else:
+            self._finish_upload(archive_path, started_at, None)
+
+    def _on_upload_done(self, future: Future, archive_path: str, started_at: float) -> None:
+        try:
+            future.result()
+        except (Exception, CancelledError) as e:
+            self._finish_upload(archive_path, started_at, e)
+        else:
+            self._finish_upload(archive_path, started_at, None)
+
+    def _finish_upload(self, archive_path: str, started_at: float, exception: BaseException | None) -> None:
+        is_uploaded = False
+
+        try:
+            if exception is None:
+                os.remove(archive_path)
+                is_uploaded = True
+                if self.upload_spool is not None:
+                    self.upload_spool.mark_uploaded(archive_path)
+        except Exception as e:
+            exception = e
+
+        try:
+            if exception is not None:
+                if self.upload_spool is not None:
+                    next_retry_at = self.upload_spool.mark_failed(archive_path, str(exception))
+                    self.logger.debug(f'Error while sending to blob {archive_path}, retrying in {round(next_retry_at - time.time())}s, error: {exception}')
+                else:
+                    self.logger.debug(f'Error while sending to blob {archive_path}, leaving it locally, error: {exception}')
+        finally:
+            with self._lock:
+                self._in_flight_paths.discard(archive_path)
+                self._pending_uploads -= 1
+                self._last_upload_seconds = round(time.monotonic() - started_at, 3)
+                if is_uploaded:
+                    self._uploaded_archives += 1
+                else:
+                    self._failed_uploads += 1
+                self._uploads_finished.notify_all()
+
+    def get_status(self) -> dict[str, int | float | None]:
+        spooled_uploads = self.upload_spool.pending_count() if self.upload_spool is not None else 0
+
+        with self._lock:
+            return {
+                'spooled_uploads': spooled_uploads,
+                'compression_workers': self.archive_pipeline_settings.compression_workers,
+                'upload_workers': self.archive_pipeline_settings.upload_workers,
+                'pending_compressions': self._pending_compressions,
+                'pending_uploads': self._pending_uploads,
+                'compressed_archives': self._compressed_archives,
+                'uploaded_archives': self._uploaded_archives,
+                'failed_compressions': self._failed_compressions,
+                'failed_uploads': self._failed_uploads,
+                'deferred_uploads': self._deferred_uploads,
+                'last_compression_seconds': self._last_compression_seconds,
+                'last_upload_seconds': self._last_upload_seconds
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        # compressions still running hand their archives to the uploaders, so uploads close second
+        with self._lock:
+            self._is_shut_down = True
+        if self._compression_executor is not None:
+            self._compression_executor.shutdown(wait=wait)
+
+        with self._lock:
+            self._are_uploads_shut_down = True
+        if self._upload_executor is not None:
+            self._upload_executor.shutdown(wait=wait)
+        if wait:
+            with self._uploads_finished:
+                self._uploads_finished.wait_for(lambda: self._pending_uploads == 0)
+
+        self.logger.info("Archive pipeline shut down")
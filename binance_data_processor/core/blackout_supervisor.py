@@ -1,62 +1,162 @@
+from __future__ import annotations
+
 import logging
 import time
 import threading
-from datetime import datetime, timezone
+
 
 class BlackoutSupervisor:
 
     __slots__ = [
         'max_interval_without_messages_in_seconds',
         'on_error_callback',
-        'logger',
-        'thread',
+        'name',
+        'blackout_watchdog',
+        'messages_received',
+        'messages_per_second',
+        'average_messages_per_second',
         '_running',
-        '_lock',
-        '_last_message_time_epoch_seconds_utc'
+        '_last_seen_messages_received',
+        '_last_seen_at',
+        '_last_progress_at'
     ]
 
     def __init__(
             self,
             max_interval_without_messages_in_seconds: int,
             on_error_callback=None,
+            name: str = '',
+            blackout_watchdog: BlackoutWatchdog | None = None
     ) -> None:
         self.max_interval_without_messages_in_seconds = max_interval_without_messages_in_seconds
         self.on_error_callback = on_error_callback
-        self.logger = logging.getLogger('binance_data_sink')
-        self.thread = None
+        self.name = name
+        self.blackout_watchdog = (
+            blackout_watchdog if blackout_watchdog is not None else BlackoutWatchdog.get_default_watchdog()
+        )
 
+        self.messages_received = 0
+        self.messages_per_second = 0.0
+        self.average_messages_per_second = None
         self._running = False
-        self._lock = threading.Lock()
-        self._last_message_time_epoch_seconds_utc = ...
-
+        self._last_seen_messages_received = 0
+        self._last_seen_at = time.monotonic()
+        self._last_progress_at = self._last_seen_at
 
     def run(self) -> None:
-        self.thread = threading.Thread(
-            target=self._monitor_last_message_time,
-            name=f'blackout_supervisor'
-        )
-        self._last_message_time_epoch_seconds_utc = int(datetime.now(timezone.utc).timestamp())
+        self._last_seen_messages_received = self.messages_received
+        self._last_seen_at = time.monotonic()
+        self._last_progress_at = self._last_seen_at
         self._running = True
-        self.thread.start()
+        self.blackout_watchdog.register(self)
 
     def notify(self) -> None:
-        with self._lock:
-            self._last_message_time_epoch_seconds_utc = int(datetime.now(timezone.utc).timestamp())
+        # hot path, only the listener coroutine writes the counter and the watchdog only reads it
+        self.messages_received += 1
 
-    def _monitor_last_message_time(self) -> None:
-        while self._running:
-            with self._lock:
-                now_epoch = datetime.now(timezone.utc).timestamp()
-                time_since_last_message = now_epoch - self._last_message_time_epoch_seconds_utc
-            if time_since_last_message > self.max_interval_without_messages_in_seconds:
-                self.shutdown_supervisor()
-                self._send_shutdown_signal()
-                break
-            time.sleep(5)
-
-    def _send_shutdown_signal(self) -> None:
-        self.logger.info('Blackout Supervisor detected too long blackout. Callback invocation')
+    def check(self, now: float) -> bool:
+        messages_received = self.messages_received
+        new_messages = messages_received - self._last_seen_messages_received
+        elapsed_seconds = now - self._last_seen_at
+
+        if elapsed_seconds > 0:
+            self.messages_per_second = new_messages / elapsed_seconds
+            self.average_messages_per_second = (
+                self.messages_per_second
+                if self.average_messages_per_second is None
+                else 0.8 * self.average_messages_per_second + 0.2 * self.messages_per_second
+            )
+
+        self._last_seen_messages_received = messages_received
+        self._last_seen_at = now
+        if new_messages:
+            self._last_progress_at = now
+
+        return now - self._last_progress_at > self.max_interval_without_messages_in_seconds
+
+    def get_statistics(self, now: float | None = None) -> dict[str, int | float | None]:
+        now = time.monotonic() if now is None else now
+        return {
+            'messages_received': self.messages_received,
+            'messages_per_second': round(self.messages_per_second, 2),
+            'average_messages_per_second': (
+                round(self.average_messages_per_second, 2) if self.average_messages_per_second is not None else None
+            ),
+            'seconds_since_last_message': round(now - self._last_progress_at, 1)
+        }
+
+    def send_shutdown_signal(self) -> None:
+        self.blackout_watchdog.logger.info(f'Blackout Supervisor {self.name} detected too long blackout. Callback invocation')
         self.on_error_callback()
 
     def shutdown_supervisor(self) -> None:
         self._running = False
+        self.blackout_watchdog.unregister(self)
+
+
+class BlackoutWatchdog:
+
+    __slots__ = [
+        'check_interval_seconds',
+        'logger',
+        'thread',
+        '_supervisors',
+        '_lock'
+    ]
+
+    _default_watchdog = None
+    _default_watchdog_lock = threading.Lock()
+
+    @classmethod
+    def get_default_watchdog(cls) -> BlackoutWatchdog:
+        with cls._default_watchdog_lock:
+            if cls._default_watchdog is None:
+                cls._default_watchdog = cls()
+            return cls._default_watchdog
+
+    def __init__(self, check_interval_seconds: float = 1) -> None:
+        self.check_interval_seconds = check_interval_seconds
+        self.logger = logging.getLogger('binance_data_sink')
+        self.thread = None
+        self._supervisors: set[BlackoutSupervisor] = set()
+        self._lock = threading.Lock()
+
+    def register(self, blackout_supervisor: BlackoutSupervisor) -> None:
+        with self._lock:
+            self._supervisors.add(blackout_supervisor)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._check_supervisors, name='blackout_watchdog', daemon=True)
+                self.thread.start()
+
+    def unregister(self, blackout_supervisor: BlackoutSupervisor) -> None:
+        with self._lock:
+            self._supervisors.discard(blackout_supervisor)
+
+    def get_statistics(self) -> dict[str, dict[str, int | float | None]]:
+        now = time.monotonic()
+        with self._lock:
+            return {supervisor.name: supervisor.get_statistics(now) for supervisor in self._supervisors}
+
+    def _check_supervisors(self) -> None:
+        # one sweep per interval over every listener replaces a polling thread per listener
+        while True:
+            time.sleep(self.check_interval_seconds)
+            now = time.monotonic()
+
+            with self._lock:
+                if not self._supervisors:
+                    self.thread = None
+                    return
+                blacked_out_supervisors = [
+                    supervisor for supervisor in self._supervisors
+                    if supervisor._running and supervisor.check(now)
+                ]
+                self._supervisors.difference_update(blacked_out_supervisors)
+
+            for supervisor in blacked_out_supervisors:
+                supervisor._running = False
+                # the callback restarts the listener and waits for it, other listeners are still checked meanwhile
+                threading.Thread(
+                    target=supervisor.send_shutdown_signal,
+                    name='blackout_supervisor_callback'
+                ).start()
@@ -16,6 +16,7 @@ import threading
 
 import binance_data_processor.data_sink.data_sink_facade
 from binance_data_processor import DataSinkConfig
+from binance_data_processor.core.archive_pipeline import ArchivePipeline
 from binance_data_processor.enums.commands_registry_enum import CommandsRegistry
 from binance_data_processor.core.stream_service import StreamService
 from binance_data_processor.enums.market_enum import Market
@@ -26,19 +27,22 @@ class CommandLineInterface:
         'stream_service',
         'data_sink_config',
         'logger',
-        'shutdown_callback'
+        'shutdown_callback',
+        'archive_pipeline'
     ]
 
     def __init__(
             self,
             stream_service: StreamService,
             data_sink_config: DataSinkConfig,
-            shutdown_callback
+            shutdown_callback,
+            archive_pipeline: ArchivePipeline | None = None
     ):
         self.stream_service = stream_service
         self.data_sink_config = data_sink_config
         self.logger = logging.getLogger('binance_data_sink')
         self.shutdown_callback = shutdown_callback
+        self.archive_pipeline = archive_pipeline
 
     def handle_command(
             self,
@@ -170,8 +174,8 @@ class CommandLineInterface:
         output_lines.append("Queue Pool len:")
         output_lines.append("------------------------------------------")
 
-        for (market, stream_type), queue_instance in self.stream_service.queue_pool.queue_lookup.items():
-            output_lines.append(f"{market} {stream_type} : {queue_instance.queue.qsize()}")
+        for (market, stream_type, shard_index), queue_instance in self.stream_service.queue_pool.queue_lookup.items():
+            output_lines.append(f"{market} {stream_type} {shard_index} : {queue_instance.queue.qsize()}")
         output_lines.append("\n")
 
 
@@ -179,14 +183,20 @@ class CommandLineInterface:
         output_lines.append("Queue Pool newest message:")
         output_lines.append("------------------------------------------")
 
-        for (market, stream_type), queue_instance in self.stream_service.queue_pool.queue_lookup.items():
+        for (market, stream_type, shard_index), queue_instance in self.stream_service.queue_pool.queue_lookup.items():
             try:
-                last_message = queue_instance.queue.queue[-1] if queue_instance.queue.qsize() > 0 else "Empty queue"
+                last_message = convert_message_to_jsonable(queue_instance.queue.peek_newest()) if queue_instance.queue.qsize() > 0 else "Empty queue"
             except Exception as e:
                 last_message = f"Error: {e}"
-            output_lines.append(f"{market} {stream_type} : {last_message}")
+            output_lines.append(f"{market} {stream_type} {shard_index} : {last_message}")
             output_lines.append(f"\n")
 
+        if self.archive_pipeline is not None:
+            output_lines.append("------------------------------------------")
+            output_lines.append("Archive pipeline status:")
+            output_lines.append("------------------------------------------")
+            output_lines.append(pprint.pformat(self.archive_pipeline.get_status()))
+
         output_lines.append("------------------------------------------")
         output_lines.append("Stream service status:")
         output_lines.append("------------------------------------------")
@@ -194,6 +204,11 @@ class CommandLineInterface:
         dict_of_stream_listeners = self.stream_service.get_stream_listeners_status()
         output_lines.append(pprint.pformat(dict_of_stream_listeners))
 
+        output_lines.append("------------------------------------------")
+        output_lines.append("Stream listeners message rates:")
+        output_lines.append("------------------------------------------")
+        output_lines.append(pprint.pformat(self.stream_service.get_stream_listeners_message_rates()))
+
         output_lines.append("------------------------------------------")
         output_lines.append("Threads status:")
         output_lines.append("------------------------------------------")
@@ -254,19 +269,31 @@ class CommandLineInterface:
             else:
                 return obj
 
+        def convert_message_to_jsonable(message):
+            # compact records are (timestamp_of_receive, raw message), raw may be bytes
+            if isinstance(message, tuple):
+                return [convert_message_to_jsonable(item) for item in message]
+            elif isinstance(message, (bytes, bytearray, memoryview)):
+                return bytes(message).decode('utf-8', errors='replace')
+            elif message is None or isinstance(message, (str, int, float)):
+                return message
+            else:
+                return repr(message)
+
         status = {}
 
         status["title"] = "BINANCE ARCHIVER STATUS"
 
         queue_status = []
-        for (market, stream_type), queue_instance in self.stream_service.queue_pool.queue_lookup.items():
+        for (market, stream_type, shard_index), queue_instance in self.stream_service.queue_pool.queue_lookup.items():
             try:
-                last_message = queue_instance.queue.queue[-1] if queue_instance.queue.qsize() > 0 else "Empty queue"
+                last_message = convert_message_to_jsonable(queue_instance.queue.peek_newest()) if queue_instance.queue.qsize() > 0 else "Empty queue"
             except Exception as e:
                 last_message = f"Error: {e}"
             queue_status.append({
                 "market": str(market),
                 "stream_type": str(stream_type),
+                "shard_index": shard_index,
                 "queue_size": queue_instance.queue.qsize(),
                 "last_message": last_message
             })
@@ -7,7 +7,7 @@ import threading
 from abc import ABC, abstractmethod
 import orjson
 
-from binance_data_processor.core.exceptions import ClassInstancesAmountLimitException
+from binance_data_processor.core.message_channel import MessageChannel, PairMessageChannel
 from binance_data_processor.enums.market_enum import Market
 from binance_data_processor.core.stream_listener_id import StreamListenerId
 
@@ -36,10 +36,11 @@ class ContinuousListeningStrategy(PutDepthMessageStrategy):
         message: str,
         timestamp_of_receive: int
     ) -> None:
-        with self.context.lock:
-            if stream_listener_id.id_keys == self.context.currently_accepted_stream_id_keys:
-                message_with_timestamp_of_receive = message[:-1] + f',"_E":{timestamp_of_receive}}}'
-                self.context.queue.put(message_with_timestamp_of_receive)
+        if stream_listener_id.id_keys == self.context.currently_accepted_stream_id_keys:
+            if self.context.compact_records:
+                self.context.queue.put((timestamp_of_receive, message))
+            else:
+                self.context.queue.put(message[:-1] + f',"_E":{timestamp_of_receive}}}')
 
 
 class SwitchingWebsocketsStrategy(PutDepthMessageStrategy):
@@ -62,14 +63,20 @@ class SwitchingWebsocketsStrategy(PutDepthMessageStrategy):
                 return
 
             if stream_listener_id_keys == self.context.currently_accepted_stream_id_keys:
-                message_with_timestamp_of_receive = message[:-1] + f',"_E":{timestamp_of_receive}}}'
-                self.context.queue.put(message_with_timestamp_of_receive)
+                if self.context.compact_records:
+                    self.context.queue.put((timestamp_of_receive, message))
+                else:
+                    self.context.queue.put(message[:-1] + f',"_E":{timestamp_of_receive}}}')
 
             self.context.append_message_to_compare_structure(stream_listener_id, message)
 
-            do_throws_match = self.context.do_last_two_throws_match(
-                stream_listener_id.pairs_amount,
-                self.context.two_last_throws
+            # throws are compared only once both listeners delivered the same update
+            do_throws_match = (
+                self.context.do_last_fingerprints_match()
+                and self.context.do_last_two_throws_match(
+                    stream_listener_id.pairs_amount,
+                    self.context.two_last_throws
+                )
             )
 
             if do_throws_match:
@@ -78,6 +85,78 @@ class SwitchingWebsocketsStrategy(PutDepthMessageStrategy):
             del message
 
 
+class MergingContinuousListeningStrategy(PutDepthMessageStrategy):
+    def __init__(
+            self,
+            context: 'DifferenceDepthQueue'
+    ):
+        self.context = context
+
+    def put_difference_depth_message(
+        self,
+        stream_listener_id: StreamListenerId,
+        message: str,
+        timestamp_of_receive: int
+    ) -> None:
+        # the accepted listener and the watermarks are swapped under the lock while switching
+        with self.context.lock:
+            if stream_listener_id.id_keys == self.context.currently_accepted_stream_id_keys:
+                stream, _, last_update_id = self.context.get_message_update_ids(message)
+
+                if last_update_id > self.context.update_id_watermarks.get(stream, -1):
+                    self.context.update_id_watermarks[stream] = last_update_id
+                    if self.context.compact_records:
+                        self.context.queue.put((timestamp_of_receive, message))
+                    else:
+                        self.context.queue.put(message[:-1] + f',"_E":{timestamp_of_receive}}}')
+
+
+class MergingWebsocketsStrategy(PutDepthMessageStrategy):
+    def __init__(
+            self,
+            context: 'DifferenceDepthQueue'
+    ):
+        self.context = context
+
+    def put_difference_depth_message(
+        self,
+        stream_listener_id: StreamListenerId,
+        message: str,
+        timestamp_of_receive: int
+    ) -> None:
+        with self.context.lock:
+            stream_listener_id_keys = stream_listener_id.id_keys
+
+            if stream_listener_id_keys == self.context.no_longer_accepted_stream_id_keys:
+                return
+
+            stream, first_update_id, last_update_id = self.context.get_message_update_ids(message)
+            watermark = self.context.update_id_watermarks.get(stream)
+
+            if stream_listener_id_keys != self.context.currently_accepted_stream_id_keys:
+                self.context.new_stream_listener_id_keys = stream_listener_id_keys
+                # an update leaving a gap after the watermark is still delivered by the old listener
+                if watermark is not None and self.context.does_update_leave_gap_after_watermark(message, first_update_id, watermark):
+                    return
+                self.context.caught_up_streams.add(stream)
+
+            self.context.overlapping_streams.add(stream)
+
+            # the first copy of an update is accepted from whichever listener delivers it
+            if watermark is None or last_update_id > watermark:
+                self.context.update_id_watermarks[stream] = last_update_id
+                if self.context.compact_records:
+                    self.context.queue.put((timestamp_of_receive, message))
+                else:
+                    self.context.queue.put(message[:-1] + f',"_E":{timestamp_of_receive}}}')
+
+            if (
+                    self.context.new_stream_listener_id_keys is not None
+                    and len(self.context.caught_up_streams) == len(self.context.overlapping_streams)
+            ):
+                self.context.set_merged_stream_id_as_currently_accepted()
+
+
 class DifferenceDepthQueue:
     __slots__ = [
         '_market',
@@ -86,37 +165,29 @@ class DifferenceDepthQueue:
         'no_longer_accepted_stream_id_keys',
         'did_websockets_switch_successfully',
         'two_last_throws',
+        'merge_overlapping_streams',
+        'new_stream_listener_id_keys',
+        'update_id_watermarks',
+        'overlapping_streams',
+        'caught_up_streams',
         '_strategy',
+        'compact_records',
         'queue'
     ]
 
-    _instances = []
-    _lock = threading.Lock()
-    _INSTANCES_AMOUNT_LIMIT = 3
     _EVENT_TIMESTAMP_COMPILED_PATTERN = re.compile(r'"E":\d+,')
-
-    def __new__(cls, *args, **kwargs):
-        with cls._lock:
-            if len(cls._instances) >= cls._INSTANCES_AMOUNT_LIMIT:
-                raise ClassInstancesAmountLimitException(
-                    f"Cannot create more than {cls._INSTANCES_AMOUNT_LIMIT} instances of DifferenceDepthQueue")
-            instance = super(DifferenceDepthQueue, cls).__new__(cls)
-            cls._instances.append(instance)
-            return instance
-
-    @classmethod
-    def get_instance_count(cls):
-        return len(cls._instances)
-
-    @classmethod
-    def clear_instances(cls):
-        with cls._lock:
-            cls._instances.clear()
+    _UPDATE_IDS_COMPILED_PATTERN = re.compile(r'"U":(\d+),"u":(\d+)')
+    _UPDATE_IDS_BYTES_COMPILED_PATTERN = re.compile(rb'"U":(\d+),"u":(\d+)')
+    _PREVIOUS_UPDATE_ID_COMPILED_PATTERN = re.compile(r'"pu":(-?\d+)')
+    _PREVIOUS_UPDATE_ID_BYTES_COMPILED_PATTERN = re.compile(rb'"pu":(-?\d+)')
 
     def __init__(
         self,
         market: Market,
-        global_queue: Queue | None = None
+        global_queue: Queue | None = None,
+        compact_records: bool = False,
+        merge_overlapping_streams: bool = False,
+        group_messages_by_pair: bool = False
     ):
         self._market = market
         self.lock = threading.Lock()
@@ -125,10 +196,23 @@ class DifferenceDepthQueue:
         self.did_websockets_switch_successfully = False
         self.two_last_throws = {}
 
+        # merge mode keeps the last accepted "u" per stream instead of comparing throws
+        self.merge_overlapping_streams = merge_overlapping_streams
+        self.new_stream_listener_id_keys: Tuple[int, uuid.UUID] | None = None
+        self.update_id_watermarks: dict[str, int] = {}
+        self.overlapping_streams: set[str] = set()
+        self.caught_up_streams: set[str] = set()
+
         self._strategy: PutDepthMessageStrategy = ContinuousListeningStrategy(self)
         self.set_continuous_listening_mode()
 
-        self.queue = Queue() if global_queue is None else global_queue
+        # compact records keep (timestamp_of_receive, raw message), "_E" is written by the sink
+        self.compact_records = compact_records
+        if global_queue is not None:
+            self.queue = global_queue
+        else:
+            # grouped channels hand the writer messages already bucketed by pair
+            self.queue = PairMessageChannel() if group_messages_by_pair else MessageChannel()
 
     @property
     @final
@@ -136,10 +220,18 @@ class DifferenceDepthQueue:
         return self._market
 
     def set_continuous_listening_mode(self) -> None:
-        self._strategy = ContinuousListeningStrategy(self)
+        if self.merge_overlapping_streams:
+            self._strategy = MergingContinuousListeningStrategy(self)
+        else:
+            self._strategy = ContinuousListeningStrategy(self)
 
     def set_switching_websockets_mode(self) -> None:
-        self._strategy = SwitchingWebsocketsStrategy(self)
+        # a put holding the lock finishes under the strategy it started with
+        with self.lock:
+            if self.merge_overlapping_streams:
+                self._strategy = MergingWebsocketsStrategy(self)
+            else:
+                self._strategy = SwitchingWebsocketsStrategy(self)
 
     def put_difference_depth_message(
         self,
@@ -155,9 +247,54 @@ class DifferenceDepthQueue:
         message: str
     ) -> None:
         id_index = stream_listener_id.id_keys
-        message_str = self._remove_event_timestamp(message)
+        message_fingerprint = self.get_message_fingerprint(message)
         message_list = self.two_last_throws.setdefault(id_index, deque(maxlen=stream_listener_id.pairs_amount))
-        message_list.append(message_str)
+        message_list.append(message_fingerprint)
+
+    @staticmethod
+    def get_message_fingerprint(message: str | bytes) -> tuple[str, str, str] | str:
+        # fingerprints are taken only while listeners overlap, raw frames are decoded for them
+        if type(message) is bytes:
+            message = message.decode('utf-8')
+        # (stream, U, u) identifies a depth update, the rest of the message follows from it
+        stream_name_end = message.find('"', 11)
+        update_ids = DifferenceDepthQueue._UPDATE_IDS_COMPILED_PATTERN.search(message, stream_name_end)
+        if not message.startswith('{"stream":"') or update_ids is None:
+            return DifferenceDepthQueue._remove_event_timestamp(message)
+        return message[11:stream_name_end], update_ids.group(1), update_ids.group(2)
+
+    @staticmethod
+    def get_message_update_ids(message: str | bytes) -> tuple[str, int, int]:
+        if type(message) is bytes:
+            stream_name_end = message.find(b'"', 11)
+            update_ids = DifferenceDepthQueue._UPDATE_IDS_BYTES_COMPILED_PATTERN.search(message, stream_name_end)
+            stream = message[11:stream_name_end].decode('ascii')
+        else:
+            stream_name_end = message.find('"', 11)
+            update_ids = DifferenceDepthQueue._UPDATE_IDS_COMPILED_PATTERN.search(message, stream_name_end)
+            stream = message[11:stream_name_end]
+        return stream, int(update_ids.group(1)), int(update_ids.group(2))
+
+    @staticmethod
+    def get_message_previous_update_id(message: str | bytes) -> int:
+        if type(message) is bytes:
+            previous_update_id = DifferenceDepthQueue._PREVIOUS_UPDATE_ID_BYTES_COMPILED_PATTERN.search(message)
+        else:
+            previous_update_id = DifferenceDepthQueue._PREVIOUS_UPDATE_ID_COMPILED_PATTERN.search(message)
+        return int(previous_update_id.group(1))
+
+    def does_update_leave_gap_after_watermark(self, message: str | bytes, first_update_id: int, watermark: int) -> bool:
+        if self._market is Market.SPOT:
+            return first_update_id > watermark + 1
+        # futures updates chain on "pu" being the previous "u", their "U" is not contiguous
+        return self.get_message_previous_update_id(message) > watermark
+
+    def do_last_fingerprints_match(self) -> bool:
+        if len(self.two_last_throws) < 2:
+            return False
+
+        last_throw, second_last_throw = list(self.two_last_throws.values())[:2]
+        return bool(last_throw) and bool(second_last_throw) and last_throw[-1] == second_last_throw[-1]
 
     @staticmethod
     def do_last_two_throws_match(
@@ -174,8 +311,8 @@ class DifferenceDepthQueue:
         if len(last_throw) != amount_of_listened_pairs or len(second_last_throw) != amount_of_listened_pairs:
             return False
 
-        last_throw_streams_set = {orjson.loads(entry)['stream'] for entry in last_throw}
-        second_last_throw_streams_set = {orjson.loads(entry)['stream'] for entry in second_last_throw}
+        last_throw_streams_set = {DifferenceDepthQueue._get_fingerprint_stream(entry) for entry in last_throw}
+        second_last_throw_streams_set = {DifferenceDepthQueue._get_fingerprint_stream(entry) for entry in second_last_throw}
 
         if (len(last_throw_streams_set) != amount_of_listened_pairs
                 or len(second_last_throw_streams_set) != amount_of_listened_pairs):
@@ -192,6 +329,23 @@ class DifferenceDepthQueue:
 
         self.set_continuous_listening_mode()
 
+    def set_merged_stream_id_as_currently_accepted(self) -> None:
+        self.no_longer_accepted_stream_id_keys = self.currently_accepted_stream_id_keys
+        self.currently_accepted_stream_id_keys = self.new_stream_listener_id_keys
+        self.new_stream_listener_id_keys = None
+
+        self.overlapping_streams = set()
+        self.caught_up_streams = set()
+        self.did_websockets_switch_successfully = True
+
+        self.set_continuous_listening_mode()
+
+    @staticmethod
+    def _get_fingerprint_stream(message_fingerprint: tuple[str, str, str] | str) -> str:
+        if isinstance(message_fingerprint, tuple):
+            return message_fingerprint[0]
+        return orjson.loads(message_fingerprint)['stream']
+
     @staticmethod
     def _remove_event_timestamp(message: str) -> str:
         return DifferenceDepthQueue._EVENT_TIMESTAMP_COMPILED_PATTERN.sub('', message)
@@ -202,16 +356,25 @@ class DifferenceDepthQueue:
             updated_deque = deque(existing_deque, maxlen=new_max_len)
             self.two_last_throws[id_index] = updated_deque
 
-    def get(self) -> any:
-        entry = self.queue.get()
+    def get(self, timeout: float | None = None) -> any:
+        entry = self.queue.get(timeout=timeout)
         return entry
 
     def get_nowait(self) -> any:
         entry = self.queue.get_nowait()
         return entry
 
+    def drain_all(self, timeout: float | None = None) -> list[str]:
+        return self.queue.drain_all(timeout=timeout)
+
+    def drain_grouped(self, timeout: float | None = None) -> dict[str, list[str]]:
+        return self.queue.drain_grouped(timeout=timeout)
+
     def clear(self) -> None:
-        self.queue.queue.clear()
+        if isinstance(self.queue, Queue):
+            self.queue.queue.clear()
+        else:
+            self.queue.clear()
 
     def empty(self) -> bool:
         return self.queue.empty()
@@ -4,10 +4,6 @@ class BadStorageConnectionParameters(Exception):
     ...
 
 
-class ClassInstancesAmountLimitException(Exception):
-    ...
-
-
 class BadStreamIdParameter(Exception):
     ...
 
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import threading
+
+
+class ListenerRuntime:
+    __slots__ = [
+        'event_loops_amount',
+        'logger',
+        '_loops',
+        '_threads',
+        '_loop_indexes',
+        '_lock'
+    ]
+
+    def __init__(self, event_loops_amount: int = 1) -> None:
+        if event_loops_amount < 1:
+            raise ValueError("event_loops_amount must be greater than 0")
+
+        self.event_loops_amount = event_loops_amount
+        self.logger = logging.getLogger('binance_data_sink')
+        self._loops: list[asyncio.AbstractEventLoop] = []
+        self._threads: list[threading.Thread] = []
+        self._loop_indexes = itertools.count()
+        self._lock = threading.Lock()
+
+    def get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if not self._loops:
+                self._start_event_loops()
+            # listeners are spread round robin, every loop drives many websockets and their watchdogs
+            return self._loops[next(self._loop_indexes) % self.event_loops_amount]
+
+    def _start_event_loops(self) -> None:
+        for loop_index in range(self.event_loops_amount):
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=self._run_event_loop,
+                args=(loop,),
+                name=f'listener_runtime_{loop_index}',
+                daemon=True
+            )
+            thread.start()
+            self._loops.append(loop)
+            self._threads.append(thread)
+
+    @staticmethod
+    def _run_event_loop(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            pending_tasks = asyncio.all_tasks(loop)
+            for task in pending_tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending_tasks, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def get_tasks_amount(self) -> int:
+        with self._lock:
+            return sum(len(asyncio.all_tasks(loop)) for loop in self._loops if not loop.is_closed())
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for loop in self._loops:
+                if not loop.is_closed():
+                    loop.call_soon_threadsafe(loop.stop)
+            for thread in self._threads:
+                thread.join()
+            self._loops.clear()
+            self._threads.clear()
+
+        self.logger.info("Listener runtime shut down")
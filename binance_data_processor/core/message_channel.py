@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from queue import Empty
+
+
+def get_message_stream_pair(message: str | bytes | tuple[int, str | bytes]) -> str | bytes:
+    if type(message) is tuple:
+        message = message[1]
+    # every message starts with {"stream":"<pair>@, so the pair is a slice of the known header
+    # raw bytes frames give a bytes pair, the writer decodes it once per batch
+    return message[11:message.find(b'@' if type(message) is bytes else '@', 11)]
+
+
+class MessageChannel:
+    POLL_INTERVAL_SECONDS = 0.01
+
+    __slots__ = ['_buffer']
+
+    def __init__(self):
+        self._buffer = deque()
+
+    @property
+    def queue(self) -> deque:
+        return self._buffer
+
+    def put(self, message: str) -> None:
+        # deque.append is atomic under the GIL, producers never take a lock
+        self._buffer.append(message)
+
+    def put_many(self, messages: list[str]) -> None:
+        self._buffer.extend(messages)
+
+    def drain_all(self, timeout: float | None = None) -> list[str]:
+        buffer = self._buffer
+        if not buffer and timeout:
+            self._wait_for_messages(timeout)
+
+        # popping a length snapshot keeps messages appended meanwhile for the next drain
+        popleft = buffer.popleft
+        return [popleft() for _ in range(len(buffer))]
+
+    def drain_grouped(self, timeout: float | None = None) -> dict[str, list[str]]:
+        grouped_messages = {}
+        for message in self.drain_all(timeout=timeout):
+            grouped_messages.setdefault(get_message_stream_pair(message), []).append(message)
+        return grouped_messages
+
+    def peek_newest(self) -> str | None:
+        try:
+            return self._buffer[-1]
+        except IndexError:
+            return None
+
+    def get(self, block: bool = True, timeout: float | None = None) -> str:
+        if block and not self._buffer:
+            self._wait_for_messages(timeout)
+        try:
+            return self._buffer.popleft()
+        except IndexError:
+            raise Empty
+
+    def get_nowait(self) -> str:
+        return self.get(block=False)
+
+    def _wait_for_messages(self, timeout: float | None) -> None:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._buffer:
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            time.sleep(self.POLL_INTERVAL_SECONDS)
+
+    def clear(self) -> None:
+        self._buffer.clear()
+
+    def empty(self) -> bool:
+        return not self._buffer
+
+    def qsize(self) -> int:
+        return len(self._buffer)
+
+
+class PairMessageChannel:
+    POLL_INTERVAL_SECONDS = 0.01
+
+    __slots__ = ['_buffers', '_newest_message']
+
+    def __init__(self):
+        self._buffers: dict[str, deque] = {}
+        self._newest_message = None
+
+    def put(self, message: str | tuple[int, str | bytes]) -> None:
+        raw_message = message if type(message) is str else message[1]
+        pair = raw_message[11:raw_message.find(b'@' if type(raw_message) is bytes else '@', 11)]
+
+        buffer = self._buffers.get(pair)
+        if buffer is None:
+            # setdefault keeps the first deque if two producers meet a new pair at once
+            buffer = self._buffers.setdefault(pair, deque())
+        buffer.append(message)
+        self._newest_message = message
+
+    def put_many(self, messages: list[str]) -> None:
+        for message in messages:
+            self.put(message)
+
+    def drain_grouped(self, timeout: float | None = None) -> dict[str, list[str]]:
+        if timeout and self.empty():
+            self._wait_for_messages(timeout)
+
+        grouped_messages = {}
+        # list() snapshots the buffers in one step, producers may add new pairs meanwhile
+        for pair, buffer in list(self._buffers.items()):
+            if buffer:
+                popleft = buffer.popleft
+                grouped_messages[pair] = [popleft() for _ in range(len(buffer))]
+        return grouped_messages
+
+    def drain_all(self, timeout: float | None = None) -> list[str]:
+        return [
+            message
+            for messages in self.drain_grouped(timeout=timeout).values()
+            for message in messages
+        ]
+
+    def peek_newest(self) -> str | None:
+        return self._newest_message if not self.empty() else None
+
+    def get(self, block: bool = True, timeout: float | None = None) -> str:
+        if block and self.empty():
+            self._wait_for_messages(timeout)
+        for buffer in list(self._buffers.values()):
+            try:
+                return buffer.popleft()
+            except IndexError:
+                continue
+        raise Empty
+
+    def get_nowait(self) -> str:
+        return self.get(block=False)
+
+    def _wait_for_messages(self, timeout: float | None) -> None:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.empty():
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            time.sleep(self.POLL_INTERVAL_SECONDS)
+
+    def clear(self) -> None:
+        for buffer in list(self._buffers.values()):
+            buffer.clear()
+
+    def empty(self) -> bool:
+        return not any(self._buffers.values())
+
+    def qsize(self) -> int:
+        return sum(len(buffer) for buffer in list(self._buffers.values()))
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import os
+
+from binance_data_processor.core.archive_compressor import ArchiveCompressor
+
+
+class PairFileSink:
+    STAGED_EXTENSION = 'json.staged'
+
+    __slots__ = [
+        'file_name',
+        'archive_path',
+        '_part_path',
+        '_file',
+        '_stream',
+        '_messages_written'
+    ]
+
+    def __init__(
+            self,
+            file_save_catalog: str,
+            file_name: str,
+            archive_compressor: ArchiveCompressor | None,
+            staged: bool = False
+    ) -> None:
+        self.file_name = file_name
+        if staged:
+            # raw json waiting for the archive pipeline to compress it
+            extension = self.STAGED_EXTENSION
+        else:
+            extension = archive_compressor.file_extension if archive_compressor is not None else 'json'
+        self.archive_path = f'{file_save_catalog}/{file_name}.{extension}'
+        # until close() the file lives under '.part' so it is never picked up half-written
+        self._part_path = f'{self.archive_path}.part'
+        self._messages_written = 0
+
+        self._file = open(self._part_path, 'wb')
+        self._stream = (
+            archive_compressor.open_stream(self._file, file_name)
+            if archive_compressor is not None and not staged
+            else self._file
+        )
+
+    @property
+    def messages_written(self) -> int:
+        return self._messages_written
+
+    def write(self, message: str | bytes) -> None:
+        self._stream.write(b',' if self._messages_written else b'[')
+        self._stream.write(message.encode('utf-8') if isinstance(message, str) else message)
+        self._messages_written += 1
+
+    def write_record(self, message: str | bytes, timestamp_of_receive: int) -> None:
+        encoded_message = message.encode('utf-8') if isinstance(message, str) else message
+        self._stream.write(b',' if self._messages_written else b'[')
+        self._stream.write(memoryview(encoded_message)[:-1])
+        self._stream.write(b',"_E":%d}' % timestamp_of_receive)
+        self._messages_written += 1
+
+    def close(self) -> str:
+        self._stream.write(b']' if self._messages_written else b'[]')
+
+        if self._stream is not self._file:
+            self._stream.close()
+        self._file.close()
+
+        os.replace(self._part_path, self.archive_path)
+        return self.archive_path
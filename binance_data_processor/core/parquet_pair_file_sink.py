@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import os
+
+import orjson
+
+from binance_data_processor.enums.market_enum import Market
+from binance_data_processor.enums.stream_type_enum import StreamType
+
+
+_LEVELS = None
+
+# (column, key, read from "data") per stream type and market, _LEVELS expands into IsAsk, Price, Quantity rows
+_MESSAGE_LAYOUTS = {
+    (StreamType.DIFFERENCE_DEPTH_STREAM, Market.SPOT): [
+        ('TimestampOfReceive', None, False),
+        ('Stream', 'stream', False),
+        ('EventType', 'e', True),
+        ('EventTime', 'E', True),
+        ('Symbol', 's', True),
+        ('FirstUpdateId', 'U', True),
+        ('FinalUpdateId', 'u', True),
+        _LEVELS
+    ],
+    (StreamType.DIFFERENCE_DEPTH_STREAM, Market.USD_M_FUTURES): [
+        ('TimestampOfReceive', None, False),
+        ('Stream', 'stream', False),
+        ('EventType', 'e', True),
+        ('EventTime', 'E', True),
+        ('TransactionTime', 'T', True),
+        ('Symbol', 's', True),
+        ('FirstUpdateId', 'U', True),
+        ('FinalUpdateId', 'u', True),
+        ('FinalUpdateIdInLastStream', 'pu', True),
+        _LEVELS
+    ],
+    (StreamType.DIFFERENCE_DEPTH_STREAM, Market.COIN_M_FUTURES): [
+        ('TimestampOfReceive', None, False),
+        ('Stream', 'stream', False),
+        ('EventType', 'e', True),
+        ('EventTime', 'E', True),
+        ('TransactionTime', 'T', True),
+        ('Symbol', 's', True),
+        ('FirstUpdateId', 'U', True),
+        ('FinalUpdateId', 'u', True),
+        ('FinalUpdateIdInLastStream', 'pu', True),
+        _LEVELS,
+        ('PSUnknownField', 'ps', True)
+    ],
+    (StreamType.TRADE_STREAM, Market.SPOT): [
+        ('TimestampOfReceive', None, False),
+        ('Stream', 'stream', False),
+        ('EventType', 'e', True),
+        ('EventTime', 'E', True),
+        ('TransactionTime', 'T', True),
+        ('Symbol', 's', True),
+        ('TradeId', 't', True),
+        ('Price', 'p', True),
+        ('Quantity', 'q', True),
+        ('IsBuyerMarketMaker', 'm', True),
+        ('MUnknownParameter', 'M', True)
+    ],
+    (StreamType.TRADE_STREAM, Market.USD_M_FUTURES): [
+        ('TimestampOfReceive', None, False),
+        ('Stream', 'stream', False),
+        ('EventType', 'e', True),
+        ('EventTime', 'E', True),
+        ('TransactionTime', 'T', True),
+        ('Symbol', 's', True),
+        ('TradeId', 't', True),
+        ('Price', 'p', True),
+        ('Quantity', 'q', True),
+        ('IsBuyerMarketMaker', 'm', True),
+        ('XUnknownParameter', 'X', True)
+    ],
+    (StreamType.DEPTH_SNAPSHOT, Market.SPOT): [
+        ('TimestampOfReceive', '_rc', False),
+        ('TimestampOfRequest', '_rq', False),
+        ('LastUpdateId', 'lastUpdateId', False),
+        _LEVELS
+    ],
+    (StreamType.DEPTH_SNAPSHOT, Market.USD_M_FUTURES): [
+        ('TimestampOfReceive', '_rc', False),
+        ('TimestampOfRequest', '_rq', False),
+        ('MessageOutputTime', 'E', False),
+        ('TransactionTime', 'T', False),
+        ('LastUpdateId', 'lastUpdateId', False),
+        _LEVELS
+    ],
+    (StreamType.DEPTH_SNAPSHOT, Market.COIN_M_FUTURES): [
+        ('TimestampOfReceive', '_rc', False),
+        ('TimestampOfRequest', '_rq', False),
+        ('MessageOutputTime', 'E', False),
+        ('TransactionTime', 'T', False),
+        ('LastUpdateId', 'lastUpdateId', False),
+        ('Symbol', 'symbol', False),
+        ('Pair', 'pair', False),
+        _LEVELS
+    ]
+}
+_MESSAGE_LAYOUTS[(StreamType.TRADE_STREAM, Market.COIN_M_FUTURES)] = (
+    _MESSAGE_LAYOUTS[(StreamType.TRADE_STREAM, Market.USD_M_FUTURES)]
+)
+
+_LEVEL_KEYS = {
+    StreamType.DIFFERENCE_DEPTH_STREAM: ('b', 'a'),
+    StreamType.DEPTH_SNAPSHOT: ('bids', 'asks')
+}
+
+_DICTIONARY_COLUMNS = {'Stream', 'EventType', 'Symbol', 'Pair', 'PSUnknownField', 'XUnknownParameter'}
+_DECIMAL_STRING_COLUMNS = {'Price', 'Quantity'}
+_BOOLEAN_COLUMNS = {'IsBuyerMarketMaker', 'MUnknownParameter'}
+_INT8_COLUMNS = {'IsAsk'}
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError(
+            "parquet data save target requires an optional dependency, "
+            "install it with: pip install binance-data-processor[parquet]"
+        )
+    return pyarrow, pyarrow.parquet
+
+
+def get_arrow_table(pyarrow, columns: dict):
+    arrays = []
+
+    for column, values in columns.items():
+        if column in _DICTIONARY_COLUMNS:
+            array = pyarrow.array(values, pyarrow.string()).dictionary_encode()
+        elif column in _DECIMAL_STRING_COLUMNS:
+            # binance sends decimals as strings, arrow parses them in one vectorised cast
+            array = pyarrow.array(values, pyarrow.string()).cast(pyarrow.float64())
+        elif column in _BOOLEAN_COLUMNS:
+            array = pyarrow.array(values, pyarrow.bool_())
+        elif column in _INT8_COLUMNS:
+            array = pyarrow.array(values, pyarrow.int8())
+        else:
+            array = pyarrow.array(values, pyarrow.int64())
+        arrays.append(array)
+
+    return pyarrow.Table.from_arrays(arrays, names=list(columns))
+
+
+def get_depth_snapshot_market(snapshot: dict) -> Market:
+    # snapshot responses differ per market only by the fields they carry
+    if 'pair' in snapshot:
+        return Market.COIN_M_FUTURES
+    if 'T' in snapshot:
+        return Market.USD_M_FUTURES
+    return Market.SPOT
+
+
+class ParquetPairFileSink:
+    EXTENSION = 'parquet'
+    COMPRESSION = 'zstd'
+    ROW_GROUP_ROWS = 100_000
+
+    __slots__ = [
+        'file_name',
+        'archive_path',
+        '_part_path',
+        '_layout',
+        '_level_keys',
+        '_columns',
+        '_buffered_rows',
+        '_row_group_rows',
+        '_writer',
+        '_messages_written',
+        '_pyarrow',
+        '_parquet'
+    ]
+
+    def __init__(
+            self,
+            file_save_catalog: str,
+            file_name: str,
+            stream_type: StreamType,
+            market: Market,
+            row_group_rows: int | None = None
+    ) -> None:
+        self._pyarrow, self._parquet = import_pyarrow()
+
+        self.file_name = file_name
+        self.archive_path = f'{file_save_catalog}/{file_name}.{self.EXTENSION}'
+        # until close() the file lives under '.part' so it is never picked up half-written
+        self._part_path = f'{self.archive_path}.part'
+        self._messages_written = 0
+
+        self._layout = _MESSAGE_LAYOUTS[(stream_type, market)]
+        self._level_keys = _LEVEL_KEYS.get(stream_type)
+        self._columns: dict[str, list] = {name: [] for name in self.column_names}
+        # only the current row group is buffered, full ones go straight to the '.part' file
+        self._buffered_rows = 0
+        self._row_group_rows = row_group_rows or self.ROW_GROUP_ROWS
+        self._writer = None
+
+    @property
+    def messages_written(self) -> int:
+        return self._messages_written
+
+    @property
+    def column_names(self) -> list[str]:
+        column_names = []
+        for field in self._layout:
+            if field is _LEVELS:
+                column_names.extend(['IsAsk', 'Price', 'Quantity'])
+            else:
+                column_names.append(field[0])
+        return column_names
+
+    def write(self, message: str | bytes) -> None:
+        record = orjson.loads(message)
+        self._append_record(record, record.get('_E'))
+
+    def write_record(self, message: str | bytes, timestamp_of_receive: int) -> None:
+        self._append_record(orjson.loads(message), timestamp_of_receive)
+
+    def _append_record(self, record: dict, timestamp_of_receive: int | None) -> None:
+        data = record.get('data', record)
+        columns = self._columns
+
+        if self._level_keys is not None:
+            bids_key, asks_key = self._level_keys
+            bids, asks = data[bids_key], data[asks_key]
+            rows = len(bids) + len(asks)
+        else:
+            rows = 1
+
+        for field in self._layout:
+            if field is _LEVELS:
+                columns['IsAsk'].extend([0] * len(bids) + [1] * len(asks))
+                columns['Price'].extend([level[0] for level in bids] + [level[0] for level in asks])
+                columns['Quantity'].extend([level[1] for level in bids] + [level[1] for level in asks])
+                continue
+
+            column, key, is_data_field = field
+            if key is None:
+                value = timestamp_of_receive
+            else:
+                value = data[key] if is_data_field else record[key]
+            columns[column].extend([value] * rows)
+
+        self._messages_written += 1
+        self._buffered_rows += rows
+        if self._buffered_rows >= self._row_group_rows:
+            self._flush_row_group()
+
+    def _get_table(self):
+        return get_arrow_table(self._pyarrow, self._columns)
+
+    def _flush_row_group(self) -> None:
+        table = self._get_table()
+        self._columns = {name: [] for name in self._columns}
+        self._buffered_rows = 0
+
+        if self._writer is None:
+            self._writer = self._parquet.ParquetWriter(self._part_path, table.schema, compression=self.COMPRESSION)
+        self._writer.write_table(table, row_group_size=max(table.num_rows, 1))
+
+    def close(self) -> str:
+        try:
+            if self._buffered_rows > 0 or self._writer is None:
+                self._flush_row_group()
+        finally:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+        os.replace(self._part_path, self.archive_path)
+        return self.archive_path
@@ -1,36 +1,89 @@
 from __future__ import annotations
 
+import zlib
 from queue import Queue
 
 from binance_data_processor.core.difference_depth_queue import DifferenceDepthQueue
 from binance_data_processor.core.trade_queue import TradeQueue
 from binance_data_processor.enums.market_enum import Market
+from binance_data_processor.enums.queue_sharding_settings import QueueShardingSettings
 from binance_data_processor.enums.stream_type_enum import StreamType
 
 
 class QueuePool:
     __slots__ = [
         'global_queue',
+        'queue_sharding_settings',
         'queue_lookup'
     ]
 
-    def __init__(self, global_queue: Queue | None = None):
+    def __init__(
+            self,
+            global_queue: Queue | None = None,
+            compact_records: bool = False,
+            merge_overlapping_streams: bool = False,
+            queue_sharding_settings: QueueShardingSettings | None = None,
+            group_messages_by_pair: bool = False
+    ):
         self.global_queue = global_queue
+        self.queue_sharding_settings = (
+            queue_sharding_settings if queue_sharding_settings is not None else QueueShardingSettings()
+        )
 
-        self.queue_lookup: dict[tuple[Market, StreamType], DifferenceDepthQueue | TradeQueue] = {
-            (market, stream_type): (
+        self.queue_lookup: dict[tuple[Market, StreamType, int], DifferenceDepthQueue | TradeQueue] = {
+            (market, stream_type, shard_index): (
                 DifferenceDepthQueue if stream_type == StreamType.DIFFERENCE_DEPTH_STREAM
                 else TradeQueue
             )(
                 market=market,
+                compact_records=compact_records,
+                merge_overlapping_streams=merge_overlapping_streams,
+                group_messages_by_pair=group_messages_by_pair,
                 **({"global_queue": self.global_queue} if self.global_queue else {})
             )
             for market in Market
             for stream_type in [StreamType.DIFFERENCE_DEPTH_STREAM, StreamType.TRADE_STREAM]
+            for shard_index in range(self.get_shards_amount(market))
         }
 
-    def get_queue(self, market: Market, stream_type: StreamType) -> DifferenceDepthQueue | TradeQueue:
-        return self.queue_lookup.get((market, stream_type))
+    def get_shards_amount(self, market: Market) -> int:
+        pair_groups = self.queue_sharding_settings.pair_groups.get(market.value, [])
+        return len(pair_groups) + self.queue_sharding_settings.hashed_shards
+
+    def get_shard_index(self, market: Market, pair: str) -> int:
+        pair = pair.upper()
+        pair_groups = self.queue_sharding_settings.pair_groups.get(market.value, [])
+
+        for group_index, pair_group in enumerate(pair_groups):
+            if pair in pair_group:
+                return group_index
+
+        # crc32 is stable between runs, so a pair always lands in the same shard
+        return len(pair_groups) + zlib.crc32(pair.encode()) % self.queue_sharding_settings.hashed_shards
+
+    def get_pairs_by_shard(self, market: Market, pairs: list[str]) -> list[list[str]]:
+        shards_amount = self.get_shards_amount(market)
+        if shards_amount == 1:
+            return [pairs]
+
+        pairs_by_shard = [[] for _ in range(shards_amount)]
+        for pair in pairs:
+            pairs_by_shard[self.get_shard_index(market, pair)].append(pair)
+        return pairs_by_shard
+
+    def get_queue(
+            self,
+            market: Market,
+            stream_type: StreamType,
+            shard_index: int = 0
+    ) -> DifferenceDepthQueue | TradeQueue:
+        return self.queue_lookup.get((market, stream_type, shard_index))
+
+    def get_queues(self, market: Market, stream_type: StreamType) -> list[DifferenceDepthQueue | TradeQueue]:
+        return [
+            self.queue_lookup[(market, stream_type, shard_index)]
+            for shard_index in range(self.get_shards_amount(market))
+        ]
 
 
 class ListenerQueuePool(QueuePool):
@@ -39,5 +92,15 @@ class ListenerQueuePool(QueuePool):
 
 
 class DataSinkQueuePool(QueuePool):
-    def __init__(self):
-        super().__init__()
+    def __init__(
+            self,
+            compact_records: bool = False,
+            merge_overlapping_streams: bool = False,
+            queue_sharding_settings: QueueShardingSettings | None = None
+    ):
+        super().__init__(
+            compact_records=compact_records,
+            merge_overlapping_streams=merge_overlapping_streams,
+            queue_sharding_settings=queue_sharding_settings,
+            group_messages_by_pair=True
+        )
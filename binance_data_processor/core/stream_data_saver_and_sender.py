@@ -3,32 +3,48 @@ from __future__ import annotations
 import io
 import logging
 import os
+import re
 import threading
 import time
-import zipfile
-from collections import defaultdict
-import re
+from concurrent.futures import Future
+
+import orjson
 
 from binance_data_processor import DataSinkConfig
+from binance_data_processor.core.archive_compressor import ArchiveCompressor
+from binance_data_processor.core.archive_pipeline import ArchivePipeline
+from binance_data_processor.enums.archive_pipeline_settings import ArchivePipelineSettings
 from binance_data_processor.enums.asset_parameters import AssetParameters
+from binance_data_processor.enums.compression_codec_enum import CompressionCodec
+from binance_data_processor.enums.compression_settings import CompressionSettings
 from binance_data_processor.core.difference_depth_queue import DifferenceDepthQueue
 from binance_data_processor.enums.data_save_target_enum import DataSaveTarget
 from binance_data_processor.core.exceptions import BadStorageConnectionParameters
+from binance_data_processor.core.pair_file_sink import PairFileSink
+from binance_data_processor.core.parquet_pair_file_sink import ParquetPairFileSink, get_depth_snapshot_market
 from binance_data_processor.core.queue_pool import ListenerQueuePool, DataSinkQueuePool
 from binance_data_processor.enums.storage_connection_parameters import StorageConnectionParameters
 from binance_data_processor.core.timestamps_generator import TimestampsGenerator
 from binance_data_processor.core.trade_queue import TradeQueue
+from binance_data_processor.core.upload_spool import UploadSpool
+from binance_data_processor.enums.stream_type_enum import StreamType
+from binance_data_processor.enums.upload_backend_enum import UploadBackend
 
 
 class StreamDataSaverAndSender:
+    UPLOAD_SPOOL_FILE_NAME = '.upload_spool.sqlite3'
 
     __slots__ = [
         'logger',
         'queue_pool',
         'data_sink_config',
         'global_shutdown_flag',
-        '_stream_message_pair_pattern',
-        'cloud_storage_client'
+        'cloud_storage_client',
+        'archive_compressor',
+        'archive_pipeline',
+        'upload_spool',
+        '_stream_writer_threads',
+        '_upload_spool_drain_thread'
     ]
 
     def __init__(
@@ -41,16 +57,48 @@ class StreamDataSaverAndSender:
         self.queue_pool = queue_pool
         self.data_sink_config = data_sink_config
         self.global_shutdown_flag = global_shutdown_flag
-        self._stream_message_pair_pattern = re.compile(r'"stream":"(\w+)@')
         self.cloud_storage_client = None
+        self.archive_compressor = ArchiveCompressor(data_sink_config.compression_settings)
+        is_cloud_target = data_sink_config.data_save_target in [DataSaveTarget.BACKBLAZE, DataSaveTarget.AZURE_BLOB]
+        self.upload_spool = (
+            UploadSpool(
+                spool_path=f'{data_sink_config.file_save_catalog}/{self.UPLOAD_SPOOL_FILE_NAME}',
+                retry_base_delay_seconds=data_sink_config.archive_pipeline_settings.upload_retry_base_delay_seconds,
+                retry_max_delay_seconds=data_sink_config.archive_pipeline_settings.upload_retry_max_delay_seconds
+            )
+            if is_cloud_target
+            else None
+        )
+        self.archive_pipeline = ArchivePipeline(
+            archive_pipeline_settings=data_sink_config.archive_pipeline_settings,
+            compression_settings=data_sink_config.compression_settings,
+            upload_callback=self.send_existing_file_to_specified_cloud if is_cloud_target else None,
+            upload_spool=self.upload_spool,
+            upload_submitter=(
+                self.submit_existing_file_to_backblaze_bucket
+                if data_sink_config.data_save_target is DataSaveTarget.BACKBLAZE
+                and data_sink_config.archive_pipeline_settings.upload_backend is UploadBackend.AIOHTTP
+                else None
+            )
+        )
+        self._stream_writer_threads = []
+        self._upload_spool_drain_thread = None
 
     def run(self):
 
+        if self.data_sink_config.data_save_target not in [DataSaveTarget.JSON, DataSaveTarget.PARQUET]:
+            self._resubmit_staged_files()
+
         if self.data_sink_config.data_save_target in [DataSaveTarget.BACKBLAZE, DataSaveTarget.AZURE_BLOB]:
             self._setup_cloud_storage_client()
-            self._start_zip_reserve_sender_loop(retry_interval_seconds=60*60)
+            self.upload_spool.enqueue_existing_files(
+                catalog=self.data_sink_config.file_save_catalog,
+                file_name_pattern=self.get_produced_archive_file_name_pattern(self.data_sink_config.compression_settings.codec)
+            )
+            self._start_upload_spool_drain_loop()
 
-        for (market, stream_type), queue in self.queue_pool.queue_lookup.items():
+        # every queue shard has its own writer, hot pairs do not take writer time from the rest
+        for (market, stream_type, shard_index), queue in self.queue_pool.queue_lookup.items():
 
             asset_parameters = AssetParameters(
                 market=market,
@@ -60,33 +108,65 @@ class StreamDataSaverAndSender:
 
             self.start_stream_writer(
                 queue=queue,
-                asset_parameters=asset_parameters
+                asset_parameters=asset_parameters,
+                shard_index=shard_index
             )
 
-    def _start_zip_reserve_sender_loop(self, retry_interval_seconds) -> None:
-        thread = threading.Thread(
-            target=self._failed_zip_reserve_sender_loop,
-            args=[retry_interval_seconds],
-            name=f'failed_zip_reserve_sender_loop'
+    def _start_upload_spool_drain_loop(self) -> None:
+        self._upload_spool_drain_thread = threading.Thread(
+            target=self._upload_spool_drain_loop,
+            name='upload_spool_drain_loop'
         )
-        thread.start()
+        self._upload_spool_drain_thread.start()
 
-    def _failed_zip_reserve_sender_loop(self, retry_interval_seconds: int):
-        while not self.global_shutdown_flag.is_set():
-            for _ in range(retry_interval_seconds):
-                if self.global_shutdown_flag.is_set():
-                    break
-                time.sleep(1)
+    def _upload_spool_drain_loop(self) -> None:
+        poll_interval_seconds = self.data_sink_config.archive_pipeline_settings.spool_poll_interval_seconds
 
-            zip_files = [f for f in os.listdir(self.data_sink_config.file_save_catalog) if f.endswith(".zip")]
+        while not self.global_shutdown_flag.wait(timeout=poll_interval_seconds):
+            self._drain_upload_spool()
 
-            for zip_file_filename in zip_files:
-                try:
-                    zip_file_path = f'{self.data_sink_config.file_save_catalog}/{zip_file_filename}'
-                    self.send_existing_file_to_backblaze_bucket(file_path=zip_file_path)
-                    os.remove(zip_file_path)
-                except Exception as e:
-                    self.logger.debug(f"Error retrying file send: {zip_file_filename}:\n {e} trying again soon")
+    def _drain_upload_spool(self) -> None:
+        free_upload_slots = self.archive_pipeline.get_free_upload_slots()
+        if free_upload_slots == 0:
+            return
+
+        due_uploads = self.upload_spool.get_due_uploads(
+            limit=free_upload_slots,
+            excluded_file_paths=self.archive_pipeline.get_in_flight_paths()
+        )
+        for archive_path in due_uploads:
+            if not os.path.exists(archive_path):
+                self.upload_spool.mark_uploaded(archive_path)
+                continue
+            self.archive_pipeline.submit_upload(archive_path=archive_path)
+
+    @staticmethod
+    def get_produced_archive_file_name_pattern(codec: CompressionCodec) -> re.Pattern[str]:
+        # only archives named by get_file_name are adopted, a bare .json only when the sink itself writes uncompressed archives
+        extensions = [
+            f'.{compression_codec.file_extension}'
+            for compression_codec in CompressionCodec
+            if compression_codec is not CompressionCodec.NONE or codec is CompressionCodec.NONE
+        ]
+        return re.compile(
+            r'binance_[a-z0-9_]+_\d{2}-\d{2}-\d{4}T\d{2}-\d{2}-\d{2}Z'
+            rf'(?:{"|".join(re.escape(extension) for extension in extensions)})'
+        )
+
+    def _resubmit_staged_files(self) -> None:
+        if self.archive_pipeline.compresses_inline:
+            return
+
+        staged_files = [
+            f for f in os.listdir(self.data_sink_config.file_save_catalog)
+            if f.endswith(f'.{PairFileSink.STAGED_EXTENSION}')
+        ]
+
+        for staged_file_filename in staged_files:
+            self.archive_pipeline.submit_staged_file(
+                staged_path=f'{self.data_sink_config.file_save_catalog}/{staged_file_filename}',
+                file_name=staged_file_filename[:-len(f'.{PairFileSink.STAGED_EXTENSION}')]
+            )
 
     def _setup_cloud_storage_client(self):
 
@@ -112,7 +192,12 @@ class StreamDataSaverAndSender:
 
         target_initializers = {
             DataSaveTarget.BACKBLAZE: lambda: self._get_own_lightweight_s3_client(
-                self.data_sink_config.storage_connection_parameters),
+                self.data_sink_config.storage_connection_parameters,
+                self.archive_compressor,
+                self.data_sink_config.archive_pipeline_settings,
+                self.data_sink_config.compression_settings,
+                self.archive_pipeline
+            ),
             DataSaveTarget.AZURE_BLOB: lambda: self._get_azure_container_client(
                 self.data_sink_config.storage_connection_parameters)
         }
@@ -137,11 +222,35 @@ class StreamDataSaverAndSender:
             print(f"Could not connect to Azure: {e}")
 
     @staticmethod
-    def _get_own_lightweight_s3_client(storage_connection_parameters: StorageConnectionParameters):
+    def _get_own_lightweight_s3_client(
+            storage_connection_parameters: StorageConnectionParameters,
+            archive_compressor: ArchiveCompressor | None = None,
+            archive_pipeline_settings: ArchivePipelineSettings | None = None,
+            compression_settings: CompressionSettings | None = None,
+            archive_pipeline: ArchivePipeline | None = None
+    ):
         from binance_data_processor.cloud_storage_clients.s3_client import S3Client
 
         try:
-            return S3Client(storage_connection_parameters=storage_connection_parameters)
+            if (
+                    archive_pipeline_settings is not None
+                    and archive_pipeline_settings.upload_backend is UploadBackend.AIOHTTP
+            ):
+                from binance_data_processor.cloud_storage_clients.async_s3_client import AsyncS3Client
+
+                return AsyncS3Client(
+                    storage_connection_parameters=storage_connection_parameters,
+                    archive_compressor=archive_compressor,
+                    max_connections=max(archive_pipeline_settings.upload_workers, archive_pipeline_settings.max_connections_per_host),
+                    max_connections_per_host=archive_pipeline_settings.max_connections_per_host,
+                    compression_settings=compression_settings,
+                    compression_executor=archive_pipeline.get_compression_executor() if archive_pipeline is not None else None
+                )
+
+            return S3Client(
+                storage_connection_parameters=storage_connection_parameters,
+                archive_compressor=archive_compressor
+            )
         except Exception as e:
             print(f"Error whilst connecting to Backblaze S3: {e}")
 
@@ -149,13 +258,18 @@ class StreamDataSaverAndSender:
         self,
         queue: DifferenceDepthQueue | TradeQueue,
         asset_parameters: AssetParameters,
+        shard_index: int = 0
     ) -> None:
         thread = threading.Thread(
             target=self._write_stream_to_target,
             args=(queue, asset_parameters),
-            name=f'stream_writer: market: {asset_parameters.market}, stream_type: {asset_parameters.stream_type}'
+            name=(
+                f'stream_writer: market: {asset_parameters.market}, stream_type: {asset_parameters.stream_type}, '
+                f'shard: {shard_index}'
+            )
         )
         thread.start()
+        self._stream_writer_threads.append(thread)
 
     def _write_stream_to_target(
         self,
@@ -167,50 +281,99 @@ class StreamDataSaverAndSender:
                 queue,
                 asset_parameters
             )
-            self._sleep_with_flag_check(self.data_sink_config.time_settings.file_duration_seconds)
-
-        self._process_queue_data(
-            queue,
-            asset_parameters
-        )
 
         self.logger.info(f"{asset_parameters.market} {asset_parameters.stream_type}: ended _stream_writer")
 
-    def _sleep_with_flag_check(self, duration: int) -> None:
-        interval = 1
-        for _ in range(0, duration, interval):
-            if self.global_shutdown_flag.is_set():
-                break
-            time.sleep(interval)
-
     def _process_queue_data(
         self,
         queue: DifferenceDepthQueue | TradeQueue,
         asset_parameters: AssetParameters
     ) -> None:
-        if not queue.empty():
-            stream_data = defaultdict(list)
+        rotation_deadline = time.monotonic() + self.data_sink_config.time_settings.file_duration_seconds
+        pair_sinks: dict[str, PairFileSink | ParquetPairFileSink] = {}
 
-            while not queue.empty():
-                message = queue.get_nowait()
+        try:
+            while time.monotonic() < rotation_deadline and not self.global_shutdown_flag.is_set():
+                for pair, messages in queue.drain_grouped(timeout=1).items():
+                    self._write_messages_to_pair_sink(pair, messages, pair_sinks, asset_parameters)
 
-                match = self._stream_message_pair_pattern.search(message)
-                pair_found_in_message = match.group(1)
-                stream_data[pair_found_in_message].append(message)
+            if self.global_shutdown_flag.is_set():
+                for pair, messages in queue.drain_grouped().items():
+                    self._write_messages_to_pair_sink(pair, messages, pair_sinks, asset_parameters)
+        finally:
+            self._finalize_pair_sinks(pair_sinks)
 
-            for pair in list(stream_data.keys()):
-                data = stream_data[pair]
-                file_name = self.get_file_name(
-                    asset_parameters=asset_parameters.get_asset_parameter_with_specified_pair(pair=pair)
-                )
-                self.save_data(
-                    json_content='[' + ','.join(data) + ']',
-                    file_save_catalog=self.data_sink_config.file_save_catalog,
-                    file_name=file_name
-                )
-                del stream_data[pair]
-                del data
-            del stream_data
+    def _write_messages_to_pair_sink(
+        self,
+        pair: str | bytes,
+        messages: list[str] | list[tuple[int, str | bytes]],
+        pair_sinks: dict[str, PairFileSink | ParquetPairFileSink],
+        asset_parameters: AssetParameters
+    ) -> None:
+        if type(pair) is bytes:
+            pair = pair.decode('ascii')
+
+        pair_sink = pair_sinks.get(pair)
+        if pair_sink is None:
+            pair_sink = self._create_pair_sink(
+                asset_parameters=asset_parameters.get_asset_parameter_with_specified_pair(pair=pair)
+            )
+            pair_sinks[pair] = pair_sink
+
+        # a queue holds either compact records or finished messages, never both
+        if type(messages[0]) is tuple:
+            for timestamp_of_receive, message in messages:
+                pair_sink.write_record(message, timestamp_of_receive)
+        else:
+            for message in messages:
+                pair_sink.write(message)
+
+    def _create_pair_sink(self, asset_parameters: AssetParameters) -> PairFileSink | ParquetPairFileSink:
+        file_name = self.get_file_name(asset_parameters=asset_parameters)
+
+        if self.data_sink_config.data_save_target is DataSaveTarget.PARQUET:
+            return ParquetPairFileSink(
+                file_save_catalog=self.data_sink_config.file_save_catalog,
+                file_name=file_name,
+                stream_type=asset_parameters.stream_type,
+                market=asset_parameters.market
+            )
+
+        is_archived = self.data_sink_config.data_save_target is not DataSaveTarget.JSON
+        return PairFileSink(
+            file_save_catalog=self.data_sink_config.file_save_catalog,
+            file_name=file_name,
+            archive_compressor=self.archive_compressor if is_archived else None,
+            staged=is_archived and not self.archive_pipeline.compresses_inline
+        )
+
+    def _finalize_pair_sinks(self, pair_sinks: dict[str, PairFileSink | ParquetPairFileSink]) -> None:
+        for pair, pair_sink in pair_sinks.items():
+            try:
+                file_path = pair_sink.close()
+            except IOError as e:
+                self.logger.error(f"IO Error whilst finalizing file {pair_sink.file_name}: {e}")
+                continue
+
+            if file_path.endswith(f'.{PairFileSink.STAGED_EXTENSION}'):
+                self.archive_pipeline.submit_staged_file(staged_path=file_path, file_name=pair_sink.file_name)
+            else:
+                self.archive_pipeline.submit_upload(archive_path=file_path)
+
+        pair_sinks.clear()
+
+    def shutdown(self) -> None:
+        for thread in self._stream_writer_threads:
+            thread.join()
+        if self._upload_spool_drain_thread is not None:
+            self._upload_spool_drain_thread.join()
+        self.archive_pipeline.shutdown()
+
+        if self.data_sink_config.data_save_target is DataSaveTarget.BACKBLAZE and self.cloud_storage_client is not None:
+            self.cloud_storage_client.shutdown()
+
+        if self.upload_spool is not None:
+            self.upload_spool.close()
 
     def save_data(
             self,
@@ -224,6 +387,8 @@ class StreamDataSaverAndSender:
                 lambda: self.write_data_to_json_file(json_content=json_content, file_save_catalog=file_save_catalog, file_name=file_name),
             DataSaveTarget.ZIP:
                 lambda: self.write_data_to_zip_file(json_content=json_content, file_save_catalog=file_save_catalog, file_name=file_name),
+            DataSaveTarget.PARQUET:
+                lambda: self.write_data_to_parquet_file(json_content=json_content, file_save_catalog=file_save_catalog, file_name=file_name),
             DataSaveTarget.AZURE_BLOB:
                 lambda: self.send_zipped_json_to_specified_cloud(json_content=json_content, file_save_catalog=file_save_catalog, file_name=file_name),
             DataSaveTarget.BACKBLAZE:
@@ -243,14 +408,30 @@ class StreamDataSaverAndSender:
         except IOError as e:
             self.logger.error(f"IO Error whilst saving to file {file_save_path}: {e}")
 
-    def write_data_to_zip_file(self, json_content: str, file_save_catalog: str, file_name: str) -> None:
-        file_save_path = f'{file_save_catalog}/{file_name}.zip'
+    def write_data_to_zip_file(self, json_content: str, file_save_catalog: str, file_name: str) -> str | None:
+        file_save_path = f'{file_save_catalog}/{file_name}.{self.archive_compressor.file_extension}'
+
+        try:
+            with open(file_save_path, "wb") as f:
+                f.write(self.archive_compressor.compress(json_content, file_name))
+            return file_save_path
+        except IOError as e:
+            self.logger.error(f"IO Error whilst saving to archive: {file_save_path}: {e}")
+
+    def write_data_to_parquet_file(self, json_content: str, file_save_catalog: str, file_name: str) -> str | None:
+        snapshot = orjson.loads(json_content)
+        parquet_pair_file_sink = ParquetPairFileSink(
+            file_save_catalog=file_save_catalog,
+            file_name=file_name,
+            stream_type=StreamType.DEPTH_SNAPSHOT,
+            market=get_depth_snapshot_market(snapshot)
+        )
 
         try:
-            with zipfile.ZipFile(file_save_path, "w", zipfile.ZIP_DEFLATED, compresslevel=9) as zipf:
-                zipf.writestr(f"{file_name}.json", json_content)
+            parquet_pair_file_sink.write(json_content)
+            return parquet_pair_file_sink.close()
         except IOError as e:
-            self.logger.error(f"IO Error whilst saving to zip: {file_save_path}: {e}")
+            self.logger.error(f"IO Error whilst saving to parquet file: {parquet_pair_file_sink.archive_path}: {e}")
 
     def send_zipped_json_to_specified_cloud(self, json_content: str, file_save_catalog: str, file_name: str) -> None:
 
@@ -277,26 +458,44 @@ class StreamDataSaverAndSender:
                         time.sleep(retry_delay_seconds)
                     else:
                         self.logger.debug(f'Max retries reached for {file_name}. Saving locally.')
-                        self.write_data_to_zip_file(
+                        file_save_path = self.write_data_to_zip_file(
                             json_content=json_content,
                             file_save_catalog=file_save_catalog,
                             file_name=file_name
                         )
+                        if file_save_path is not None and self.upload_spool is not None:
+                            self.upload_spool.enqueue(file_save_path)
+
+    def send_existing_file_to_specified_cloud(self, file_path: str) -> None:
+
+        cloud_file_senders = {
+            DataSaveTarget.AZURE_BLOB:
+                lambda: self.send_existing_file_to_azure_container(file_path=file_path),
+            DataSaveTarget.BACKBLAZE:
+                lambda: self.send_existing_file_to_backblaze_bucket(file_path=file_path)
+        }
+
+        sender = cloud_file_senders.get(self.data_sink_config.data_save_target)
+
+        if sender:
+            sender()
 
     def send_zipped_json_to_azure_container(self, json_content: str, file_name: str) -> None:
 
         try:
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED, compresslevel=9) as zipf:
-                json_filename = f"{file_name}.json"
-                zipf.writestr(json_filename, json_content)
+            archive_buffer = io.BytesIO(self.archive_compressor.compress(json_content, file_name))
 
-            zip_buffer.seek(0)
-
-            blob_client = self.cloud_storage_client.get_blob_client(blob=f"{file_name}.zip")
-            blob_client.upload_blob(zip_buffer, overwrite=True)
+            blob_client = self.cloud_storage_client.get_blob_client(
+                blob=f"{file_name}.{self.archive_compressor.file_extension}"
+            )
+            blob_client.upload_blob(archive_buffer, overwrite=True)
         except Exception as e:
-            self.logger.error(f"Error during sending ZIP to Azure Blob: {file_name} {e}")
+            self.logger.error(f"Error during sending archive to Azure Blob: {file_name} {e}")
+
+    def send_existing_file_to_azure_container(self, file_path: str) -> None:
+        with open(file_path, 'rb') as f:
+            blob_client = self.cloud_storage_client.get_blob_client(blob=os.path.basename(file_path))
+            blob_client.upload_blob(f, overwrite=True)
 
     def send_zipped_json_to_backblaze_bucket(self, json_content: str, file_name: str) -> None:
 
@@ -309,6 +508,9 @@ class StreamDataSaverAndSender:
         self.cloud_storage_client.upload_existing_file(file_path=file_path)
         # self.logger.info(f'Successfully sent  missing file: {file_path} \n')
 
+    def submit_existing_file_to_backblaze_bucket(self, file_path: str) -> Future:
+        return self.cloud_storage_client.submit_existing_file(file_path=file_path)
+
     @staticmethod
     def get_file_name(asset_parameters: AssetParameters) -> str:
 
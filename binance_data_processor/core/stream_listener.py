@@ -1,4 +1,7 @@
+from __future__ import annotations
+
 import asyncio
+import concurrent.futures
 import json
 import logging
 import threading
@@ -6,7 +9,7 @@ import time
 import traceback
 import websockets
 
-from websockets.legacy.client import WebSocketClientProtocol
+from websockets.asyncio.client import ClientConnection, connect
 
 from binance_data_processor.enums.asset_parameters import AssetParameters
 from binance_data_processor.enums.market_enum import Market
@@ -14,7 +17,8 @@ from binance_data_processor.enums.stream_type_enum import StreamType
 from binance_data_processor.core.difference_depth_queue import DifferenceDepthQueue
 from binance_data_processor.core.trade_queue import TradeQueue
 from binance_data_processor.core.stream_listener_id import StreamListenerId
-from binance_data_processor.core.blackout_supervisor import BlackoutSupervisor
+from binance_data_processor.core.blackout_supervisor import BlackoutSupervisor, BlackoutWatchdog
+from binance_data_processor.core.listener_runtime import ListenerRuntime
 from binance_data_processor.core.url_factory import URLFactory
 
 
@@ -22,6 +26,7 @@ class StreamListener:
     __slots__ = [
         'logger',
         'queue',
+        '_queues',
         'asset_parameters',
         'id',
         'thread',
@@ -30,34 +35,64 @@ class StreamListener:
         '_ws',
         '_url',
         '_loop',
-        '_blackout_supervisor'
+        '_blackout_supervisor',
+        '_listener_runtime',
+        '_main_future',
+        '_recv_decode',
+        '_stream_header',
+        '_stream_separator',
+        '_trade_stream_marker'
     ]
 
+    CLOSE_TIMEOUT_SECONDS = 15
+    _FRAME_TOKENS = {
+        str: ('{"stream":"', '@', 't'),
+        bytes: (b'{"stream":"', b'@', b't')
+    }
+
     def __init__(
         self,
         queue: TradeQueue | DifferenceDepthQueue,
-        asset_parameters: AssetParameters
+        asset_parameters: AssetParameters,
+        listener_runtime: ListenerRuntime | None = None,
+        blackout_watchdog: BlackoutWatchdog | None = None,
+        receive_bytes: bool = False
     ):
 
         self.logger = logging.getLogger('binance_data_sink')
         self.queue: DifferenceDepthQueue | TradeQueue = queue
+        self._queues: dict[StreamType, DifferenceDepthQueue | TradeQueue] = {asset_parameters.stream_type: queue}
         self.asset_parameters = asset_parameters
         self.id: StreamListenerId = StreamListenerId(pairs=self.asset_parameters.pairs)
         self.thread: threading.Thread | None = None
         self._blackout_supervisor = BlackoutSupervisor(
             max_interval_without_messages_in_seconds=120 if asset_parameters.market is Market.COIN_M_FUTURES else 30,
-            on_error_callback=lambda: self.restart_websocket_app()
+            on_error_callback=lambda: self.restart_websocket_app(),
+            name=f'{asset_parameters.market.name} {asset_parameters.stream_type.name} {self.id.start_timestamp}',
+            blackout_watchdog=blackout_watchdog
         )
 
         self._stop_event = threading.Event()
         self._ws_lock = threading.Lock()
-        self._ws: WebSocketClientProtocol | None = None
-        self._url = URLFactory.get_stream_url(asset_parameters)
+        self._ws: ClientConnection | None = None
+        self._url = URLFactory.get_stream_url(asset_parameters, stream_types=list(self._queues))
+        self._listener_runtime = listener_runtime
+        self._main_future: concurrent.futures.Future | None = None
+        # raw frames skip utf-8 decoding in websockets, they stay bytes up to the file sink
+        self._recv_decode = False if receive_bytes else None
+        self._stream_header, self._stream_separator, self._trade_stream_marker = (
+            self._FRAME_TOKENS[bytes if receive_bytes else str]
+        )
 
     def start_websocket_app(self):
         self.logger.info(f"{self.asset_parameters.market} {self.asset_parameters.stream_type} {self.id.start_timestamp} Starting streamListener")
-        self.thread = threading.Thread(target=self._run_event_loop, daemon=True)
-        self.thread.start()
+        if self._listener_runtime is None:
+            self.thread = threading.Thread(target=self._run_event_loop, daemon=True)
+            self.thread.start()
+            return
+
+        self._loop = self._listener_runtime.get_loop()
+        self._main_future = asyncio.run_coroutine_threadsafe(self._main_coroutine(), self._loop)
 
     def restart_websocket_app(self):
         self.logger.info(f"{self.asset_parameters.market} {self.asset_parameters.stream_type} {self.id.start_timestamp} Restarting streamListener")
@@ -82,6 +117,15 @@ class StreamListener:
             self.thread.join()
         self.thread = None
 
+        if self._main_future is not None:
+            try:
+                self._main_future.result(timeout=self.CLOSE_TIMEOUT_SECONDS)
+            except concurrent.futures.TimeoutError:
+                self._main_future.cancel()
+            except Exception as e:
+                self.logger.debug(f"StreamListener coroutine ended with: {e!r}")
+            self._main_future = None
+
     def change_subscription(self, pair: str, action: str):
         pair = pair.lower()
         method = None
@@ -94,20 +138,13 @@ class StreamListener:
             self.logger.error(f"Unknown action: {action}, skipping subscription change.")
             return
 
-        message = {}
-        if self.asset_parameters.stream_type == StreamType.TRADE_STREAM:
-            message = {
-                "method": method,
-                "params": [f"{pair}@trade"],
-                "id": 1
-            }
-        elif self.asset_parameters.stream_type == StreamType.DIFFERENCE_DEPTH_STREAM:
-            message = {
-                "method": method,
-                "params": [f"{pair}@depth@100ms"],
-                "id": 1
-            }
-            self.queue.update_deque_max_len(len(self.asset_parameters.pairs))
+        message = {
+            "method": method,
+            "params": [URLFactory.get_stream_name(pair, stream_type) for stream_type in self._queues],
+            "id": 1
+        }
+        if StreamType.DIFFERENCE_DEPTH_STREAM in self._queues:
+            self._queues[StreamType.DIFFERENCE_DEPTH_STREAM].update_deque_max_len(len(self.asset_parameters.pairs))
 
         loop = getattr(self, '_loop', None)
         if loop is not None and loop.is_running():
@@ -131,7 +168,7 @@ class StreamListener:
     async def _main_coroutine(self):
         while not self._stop_event.is_set():
             try:
-                async with websockets.connect(self._url) as ws:
+                async with connect(self._url) as ws:
                     with self._ws_lock:
                         self._ws = ws
 
@@ -148,13 +185,13 @@ class StreamListener:
                 with self._ws_lock:
                     self._ws = None
 
-    async def _listen_messages(self, ws: WebSocketClientProtocol):
+    async def _listen_messages(self, ws: ClientConnection):
 
         self._blackout_supervisor.run()
 
         while not self._stop_event.is_set():
             try:
-                message = await ws.recv()
+                message = await ws.recv(decode=self._recv_decode)
 
                 raw_timestamp_of_receive_ns = time.time_ns()
                 timestamp_of_receive_rounded = (
@@ -180,10 +217,10 @@ class StreamListener:
                     )
                 break
 
-    def _handle_incoming_message(self, raw_message: str, timestamp_of_receive: int):
+    def _handle_incoming_message(self, raw_message: str | bytes, timestamp_of_receive: int):
         # self.logger.info(f"self.id.start_timestamp: {self.id.start_timestamp} {raw_message}")
 
-        if 'stream' in raw_message:
+        if raw_message.startswith(self._stream_header):
             if self.asset_parameters.stream_type == StreamType.DIFFERENCE_DEPTH_STREAM:
                 self.queue.put_difference_depth_message(
                     stream_listener_id=self.id,
@@ -208,3 +245,55 @@ class StreamListener:
             await ws.send(message)
         except Exception as e:
             self.logger.error(f"Error while sending message: {e}")
+
+
+class CombinedStreamListener(StreamListener):
+    __slots__ = [
+        '_difference_depth_queue',
+        '_trade_queue'
+    ]
+
+    _STREAM_NAME_OFFSET = len('{"stream":"')
+
+    def __init__(
+        self,
+        difference_depth_queue: DifferenceDepthQueue,
+        trade_queue: TradeQueue,
+        asset_parameters: AssetParameters,
+        listener_runtime: ListenerRuntime | None = None,
+        blackout_watchdog: BlackoutWatchdog | None = None,
+        receive_bytes: bool = False
+    ):
+        super().__init__(
+            queue=difference_depth_queue,
+            asset_parameters=asset_parameters,
+            listener_runtime=listener_runtime,
+            blackout_watchdog=blackout_watchdog,
+            receive_bytes=receive_bytes
+        )
+        self._difference_depth_queue = difference_depth_queue
+        self._trade_queue = trade_queue
+        self._queues = {
+            StreamType.DIFFERENCE_DEPTH_STREAM: difference_depth_queue,
+            StreamType.TRADE_STREAM: trade_queue
+        }
+        self._url = URLFactory.get_stream_url(asset_parameters, stream_types=list(self._queues))
+
+    def _handle_incoming_message(self, raw_message: str | bytes, timestamp_of_receive: int):
+        if not raw_message.startswith(self._stream_header):
+            return
+
+        # stream name is '<pair>@trade' or '<pair>@depth@100ms', the char after '@' tells them apart
+        separator_index = raw_message.index(self._stream_separator, self._STREAM_NAME_OFFSET)
+        if raw_message[separator_index + 1:separator_index + 2] == self._trade_stream_marker:
+            self._trade_queue.put_trade_message(
+                stream_listener_id=self.id,
+                message=raw_message,
+                timestamp_of_receive=timestamp_of_receive
+            )
+        else:
+            self._difference_depth_queue.put_difference_depth_message(
+                stream_listener_id=self.id,
+                message=raw_message,
+                timestamp_of_receive=timestamp_of_receive
+            )
@@ -8,10 +8,12 @@ import traceback
 from binance_data_processor import DataSinkConfig
 from binance_data_processor.enums.asset_parameters import AssetParameters
 from binance_data_processor.core.queue_pool import ListenerQueuePool, DataSinkQueuePool
+from binance_data_processor.core.blackout_supervisor import BlackoutWatchdog
 from binance_data_processor.core.difference_depth_queue import DifferenceDepthQueue
+from binance_data_processor.core.listener_runtime import ListenerRuntime
 from binance_data_processor.enums.market_enum import Market
 from binance_data_processor.enums.stream_type_enum import StreamType
-from binance_data_processor.core.stream_listener import StreamListener
+from binance_data_processor.core.stream_listener import StreamListener, CombinedStreamListener
 from binance_data_processor.core.trade_queue import TradeQueue
 
 
@@ -24,7 +26,12 @@ class StreamService:
         'data_sink_config',
         'is_someone_overlapping_right_now_flag',
         'stream_listeners',
-        'overlap_lock'
+        'shard_pairs',
+        '_started_shards',
+        'overlap_lock',
+        'listener_runtime',
+        'blackout_watchdog',
+        'receive_bytes'
     ]
 
     def __init__(
@@ -38,42 +45,135 @@ class StreamService:
         self.data_sink_config = data_sink_config
         self.global_shutdown_flag = global_shutdown_flag
         self.is_someone_overlapping_right_now_flag = threading.Event()
-        self.stream_listeners: dict[tuple[Market, StreamType, str], StreamListener | None] = {}
+        self.stream_listeners: dict[tuple[Market, StreamType, int, str], StreamListener | None] = {}
+        self.shard_pairs: dict[tuple[Market, int], list[str]] = {}
+        self._started_shards: set[tuple[Market, int]] = set()
         self.overlap_lock: threading.Lock = threading.Lock()
+        # without a runtime every listener runs own event loop thread
+        self.listener_runtime = (
+            ListenerRuntime(event_loops_amount=data_sink_config.listener_event_loops)
+            if data_sink_config.listener_event_loops > 0
+            else None
+        )
+        self.blackout_watchdog = BlackoutWatchdog()
+        # raw bytes are kept only in compact records, "_E" is spliced in by the file sink
+        self.receive_bytes = data_sink_config.bytes_messages and all(
+            queue.compact_records for queue in queue_pool.queue_lookup.values()
+        )
 
     def run(self):
-        for market, instruments in self.data_sink_config.instruments.dict.items():
-            for stream_type in [StreamType.DIFFERENCE_DEPTH_STREAM, StreamType.TRADE_STREAM]:
-                asset_parameters = AssetParameters(
-                    market=market,
-                    stream_type=stream_type,
-                    pairs=self.data_sink_config.instruments.get_pairs(market=market)
-                )
-                self.start_stream_service(
-                    queue=self.queue_pool.get_queue(market, stream_type),
-                    asset_parameters=asset_parameters
-                )
+        for market in self.data_sink_config.instruments.dict:
+            pairs_by_shard = self.queue_pool.get_pairs_by_shard(
+                market=market,
+                pairs=self.data_sink_config.instruments.get_pairs(market=market)
+            )
+
+            for shard_index, pairs in enumerate(pairs_by_shard):
+                self.shard_pairs[(market, shard_index)] = pairs
+                # a shard without pairs is started by the first subscription routed to it
+                if pairs:
+                    self.start_shard_stream_services(market=market, shard_index=shard_index)
+
+    def start_shard_stream_services(self, market: Market, shard_index: int = 0) -> None:
+        self._started_shards.add((market, shard_index))
+
+        if self.data_sink_config.combine_market_streams:
+            self.start_combined_stream_service(market=market, shard_index=shard_index)
+            return
+
+        for stream_type in [StreamType.DIFFERENCE_DEPTH_STREAM, StreamType.TRADE_STREAM]:
+            asset_parameters = AssetParameters(
+                market=market,
+                stream_type=stream_type,
+                pairs=self.shard_pairs[(market, shard_index)]
+            )
+            self.start_stream_service(
+                queue=self.queue_pool.get_queue(market, stream_type, shard_index),
+                asset_parameters=asset_parameters,
+                shard_index=shard_index
+            )
 
     def start_stream_service(
             self,
             queue: DifferenceDepthQueue | TradeQueue,
-            asset_parameters: AssetParameters
+            asset_parameters: AssetParameters,
+            shard_index: int = 0
     ) -> None:
 
         thread = threading.Thread(
             target=self._stream_service,
             args=(
-                queue,
-                asset_parameters
+                {asset_parameters.stream_type: queue},
+                asset_parameters,
+                shard_index
+            ),
+            name=(
+                f'stream_service: market: {asset_parameters.market}, stream_type: {asset_parameters.stream_type}, '
+                f'shard: {shard_index}'
+            )
+        )
+        thread.start()
+
+    def start_combined_stream_service(self, market: Market, shard_index: int = 0) -> None:
+        queues = {
+            stream_type: self.queue_pool.get_queue(market, stream_type, shard_index)
+            for stream_type in [StreamType.DIFFERENCE_DEPTH_STREAM, StreamType.TRADE_STREAM]
+        }
+        asset_parameters = AssetParameters(
+            market=market,
+            stream_type=StreamType.DIFFERENCE_DEPTH_STREAM,
+            pairs=self.shard_pairs.get((market, shard_index), self.data_sink_config.instruments.get_pairs(market=market))
+        )
+
+        thread = threading.Thread(
+            target=self._stream_service,
+            args=(
+                queues,
+                asset_parameters,
+                shard_index
             ),
-            name=f'stream_service: market: {asset_parameters.market}, stream_type: {asset_parameters.stream_type}'
+            name=f'stream_service: market: {market}, combined streams, shard: {shard_index}'
         )
         thread.start()
 
+    def _create_stream_listener(
+            self,
+            queues: dict[StreamType, DifferenceDepthQueue | TradeQueue],
+            asset_parameters: AssetParameters
+    ) -> StreamListener:
+        if len(queues) == 1:
+            return StreamListener(
+                queue=queues[asset_parameters.stream_type],
+                asset_parameters=asset_parameters,
+                listener_runtime=self.listener_runtime,
+                blackout_watchdog=self.blackout_watchdog,
+                receive_bytes=self.receive_bytes
+            )
+        return CombinedStreamListener(
+            difference_depth_queue=queues[StreamType.DIFFERENCE_DEPTH_STREAM],
+            trade_queue=queues[StreamType.TRADE_STREAM],
+            asset_parameters=asset_parameters,
+            listener_runtime=self.listener_runtime,
+            blackout_watchdog=self.blackout_watchdog,
+            receive_bytes=self.receive_bytes
+        )
+
+    def _register_stream_listener(
+            self,
+            market: Market,
+            queues: dict[StreamType, DifferenceDepthQueue | TradeQueue],
+            status: str,
+            stream_listener: StreamListener | None,
+            shard_index: int = 0
+    ) -> None:
+        for stream_type in queues:
+            self.stream_listeners[(market, stream_type, shard_index, status)] = stream_listener
+
     def _stream_service(
         self,
-        queue: DifferenceDepthQueue | TradeQueue,
-        asset_parameters: AssetParameters
+        queues: dict[StreamType, DifferenceDepthQueue | TradeQueue],
+        asset_parameters: AssetParameters,
+        shard_index: int = 0
     ) -> None:
 
         def sleep_with_flag_check(duration) -> None:
@@ -88,13 +188,11 @@ class StreamService:
             old_stream_listener = None
 
             try:
-                old_stream_listener = StreamListener(
-                    queue=queue,
-                    asset_parameters=asset_parameters
-                )
-                self.stream_listeners[(asset_parameters.market, asset_parameters.stream_type, 'old')] = old_stream_listener
+                old_stream_listener = self._create_stream_listener(queues, asset_parameters)
+                self._register_stream_listener(asset_parameters.market, queues, 'old', old_stream_listener, shard_index)
 
-                queue.currently_accepted_stream_id_keys = old_stream_listener.id.id_keys
+                for queue in queues.values():
+                    queue.currently_accepted_stream_id_keys = old_stream_listener.id.id_keys
 
                 old_stream_listener.start_websocket_app()
                 new_stream_listener = None
@@ -114,17 +212,19 @@ class StreamService:
                         self.logger.info(
                             f'{asset_parameters.market} {asset_parameters.stream_type} {old_stream_listener.id.start_timestamp} started changing ws')
 
-                        new_stream_listener = StreamListener(
-                            queue=queue,
-                            asset_parameters=asset_parameters
-                        )
+                        new_stream_listener = self._create_stream_listener(queues, asset_parameters)
 
                         new_stream_listener.start_websocket_app()
 
-                        queue.set_switching_websockets_mode()
-                        self.stream_listeners[(asset_parameters.market, asset_parameters.stream_type, 'new')] = new_stream_listener
+                        for queue in queues.values():
+                            queue.set_switching_websockets_mode()
+                        self._register_stream_listener(asset_parameters.market, queues, 'new', new_stream_listener, shard_index)
 
-                    while not queue.did_websockets_switch_successfully and not self.global_shutdown_flag.is_set():
+                    # a combined listener is closed only when every stream of it switched to the new one
+                    while (
+                            not all(queue.did_websockets_switch_successfully for queue in queues.values())
+                            and not self.global_shutdown_flag.is_set()
+                    ):
                         time.sleep(1)
 
                     with self.overlap_lock:
@@ -132,13 +232,14 @@ class StreamService:
                     self.logger.info(f"{asset_parameters.market} {asset_parameters.stream_type} {old_stream_listener.id.start_timestamp} overlapped")
 
                     if not self.global_shutdown_flag.is_set():
-                        queue.did_websockets_switch_successfully = False
+                        for queue in queues.values():
+                            queue.did_websockets_switch_successfully = False
 
                         old_stream_listener.close_websocket_app()
                         old_stream_listener = new_stream_listener
 
-                        self.stream_listeners[(asset_parameters.market, asset_parameters.stream_type, 'new')] = None
-                        self.stream_listeners[(asset_parameters.market, asset_parameters.stream_type, 'old')] = old_stream_listener
+                        self._register_stream_listener(asset_parameters.market, queues, 'new', None, shard_index)
+                        self._register_stream_listener(asset_parameters.market, queues, 'old', old_stream_listener, shard_index)
 
             except Exception as e:
                 self.logger.error(f'{e}, something bad happened')
@@ -156,15 +257,32 @@ class StreamService:
             asset_upper: str,
             action: str
     ) -> None:
+        shard_index = self.queue_pool.get_shard_index(market, asset_upper)
+        shard_pairs = self.shard_pairs.get((market, shard_index))
+
+        # with a single shard its pairs list is the instruments list, already updated by the caller
+        if shard_pairs is not None and shard_pairs is not self.data_sink_config.instruments.get_pairs(market=market):
+            if action == 'subscribe' and asset_upper not in shard_pairs:
+                shard_pairs.append(asset_upper)
+            elif action == 'unsubscribe' and asset_upper in shard_pairs:
+                shard_pairs.remove(asset_upper)
+
+        if shard_pairs and (market, shard_index) not in self._started_shards:
+            self.start_shard_stream_services(market=market, shard_index=shard_index)
+            return
+
+        updated_stream_listeners = set()
         for stream_type in [StreamType.DIFFERENCE_DEPTH_STREAM, StreamType.TRADE_STREAM]:
             for status in ['old', 'new']:
-                stream_listener: StreamListener = self.stream_listeners.get((market, stream_type, status))
-                if stream_listener:
+                stream_listener: StreamListener = self.stream_listeners.get((market, stream_type, shard_index, status))
+                # a combined listener is registered under both stream types
+                if stream_listener and id(stream_listener) not in updated_stream_listeners:
+                    updated_stream_listeners.add(id(stream_listener))
                     stream_listener.change_subscription(action=action, pair=asset_upper)
 
-    def get_stream_listeners_status(self) -> dict[tuple[Market, StreamType, str], str]:
+    def get_stream_listeners_status(self) -> dict[tuple[Market, StreamType, int, str], str]:
 
-        statuses: dict[tuple[Market, StreamType, str], str] = {}
+        statuses: dict[tuple[Market, StreamType, int, str], str] = {}
 
         for key, listener in self.stream_listeners.items():
             if listener is None:
@@ -185,3 +303,17 @@ class StreamService:
                     else:
                         statuses[key] = "Unknown state"
         return statuses
+
+    def get_stream_listeners_message_rates(self) -> dict[str, dict[str, int | float | None]]:
+        return self.blackout_watchdog.get_statistics()
+
+    def shutdown(self) -> None:
+        if self.listener_runtime is None:
+            return
+
+        # websockets are closed gracefully before the shared loops are stopped
+        stream_listeners = {id(listener): listener for listener in self.stream_listeners.values() if listener}
+        for stream_listener in stream_listeners.values():
+            stream_listener.close_websocket_app()
+
+        self.listener_runtime.shutdown()
@@ -5,7 +5,7 @@ import threading
 import re
 from abc import ABC, abstractmethod
 
-from binance_data_processor.core.exceptions import ClassInstancesAmountLimitException
+from binance_data_processor.core.message_channel import MessageChannel, PairMessageChannel
 from binance_data_processor.enums.market_enum import Market
 from binance_data_processor.core.stream_listener_id import StreamListenerId
 
@@ -34,17 +34,18 @@ class ContinuousListeningStrategy(PutTradeMessageStrategy):
         message: str,
         timestamp_of_receive: int
     ) -> None:
-        with self.context.lock:
-            stream_listener_id_keys = stream_listener_id.id_keys
+        stream_listener_id_keys = stream_listener_id.id_keys
 
-            if stream_listener_id_keys == self.context.no_longer_accepted_stream_id_keys:
-                return
+        if stream_listener_id_keys == self.context.no_longer_accepted_stream_id_keys:
+            return
 
-            if stream_listener_id_keys == self.context.currently_accepted_stream_id_keys:
-                message_with_timestamp_of_receive = message[:-1] + f',"_E":{timestamp_of_receive}}}'
-                self.context.queue.put(message_with_timestamp_of_receive)
+        if stream_listener_id_keys == self.context.currently_accepted_stream_id_keys:
+            if self.context.compact_records:
+                self.context.queue.put((timestamp_of_receive, message))
             else:
-                self.context.new_stream_listener_id_keys = stream_listener_id_keys
+                self.context.queue.put(message[:-1] + f',"_E":{timestamp_of_receive}}}')
+        else:
+            self.context.new_stream_listener_id_keys = stream_listener_id_keys
 
 
 class SwitchingWebsocketsStrategy(PutTradeMessageStrategy):
@@ -67,8 +68,10 @@ class SwitchingWebsocketsStrategy(PutTradeMessageStrategy):
                 return
 
             if stream_listener_id_keys == self.context.currently_accepted_stream_id_keys:
-                message_with_timestamp_of_receive = message[:-1] + f',"_E":{timestamp_of_receive}}}'
-                self.context.queue.put(message_with_timestamp_of_receive)
+                if self.context.compact_records:
+                    self.context.queue.put((timestamp_of_receive, message))
+                else:
+                    self.context.queue.put(message[:-1] + f',"_E":{timestamp_of_receive}}}')
             else:
                 self.context.new_stream_listener_id_keys = stream_listener_id_keys
 
@@ -86,6 +89,78 @@ class SwitchingWebsocketsStrategy(PutTradeMessageStrategy):
             del message
 
 
+class MergingContinuousListeningStrategy(PutTradeMessageStrategy):
+    def __init__(
+            self,
+            context: 'TradeQueue'
+    ):
+        self.context = context
+
+    def put_trade_message(
+        self,
+        stream_listener_id: StreamListenerId,
+        message: str,
+        timestamp_of_receive: int
+    ) -> None:
+        # the accepted listener and the watermarks are swapped under the lock while switching
+        with self.context.lock:
+            if stream_listener_id.id_keys == self.context.currently_accepted_stream_id_keys:
+                symbol, trade_id = self.context.get_message_trade_id(message)
+
+                if trade_id > self.context.trade_id_watermarks.get(symbol, -1):
+                    self.context.trade_id_watermarks[symbol] = trade_id
+                    if self.context.compact_records:
+                        self.context.queue.put((timestamp_of_receive, message))
+                    else:
+                        self.context.queue.put(message[:-1] + f',"_E":{timestamp_of_receive}}}')
+
+
+class MergingWebsocketsStrategy(PutTradeMessageStrategy):
+    def __init__(
+            self,
+            context: 'TradeQueue'
+    ):
+        self.context = context
+
+    def put_trade_message(
+        self,
+        stream_listener_id: StreamListenerId,
+        message: str,
+        timestamp_of_receive: int
+    ) -> None:
+        with self.context.lock:
+            stream_listener_id_keys = stream_listener_id.id_keys
+
+            if stream_listener_id_keys == self.context.no_longer_accepted_stream_id_keys:
+                return
+
+            symbol, trade_id = self.context.get_message_trade_id(message)
+            watermark = self.context.trade_id_watermarks.get(symbol)
+
+            if stream_listener_id_keys != self.context.currently_accepted_stream_id_keys:
+                self.context.new_stream_listener_id_keys = stream_listener_id_keys
+                # a trade leaving a gap after the watermark is still delivered by the old listener
+                if watermark is not None and trade_id > watermark + 1:
+                    return
+                self.context.caught_up_symbols.add(symbol)
+
+            self.context.overlapping_symbols.add(symbol)
+
+            # the first copy of a trade is accepted from whichever listener delivers it
+            if watermark is None or trade_id > watermark:
+                self.context.trade_id_watermarks[symbol] = trade_id
+                if self.context.compact_records:
+                    self.context.queue.put((timestamp_of_receive, message))
+                else:
+                    self.context.queue.put(message[:-1] + f',"_E":{timestamp_of_receive}}}')
+
+            if (
+                    self.context.new_stream_listener_id_keys is not None
+                    and len(self.context.caught_up_symbols) == len(self.context.overlapping_symbols)
+            ):
+                self.context.set_merged_stream_id_as_currently_accepted()
+
+
 class TradeQueue:
     __slots__ = [
         'lock',
@@ -95,37 +170,25 @@ class TradeQueue:
         'currently_accepted_stream_id_keys',
         'no_longer_accepted_stream_id_keys',
         'last_message_signs',
+        'merge_overlapping_streams',
+        'trade_id_watermarks',
+        'overlapping_symbols',
+        'caught_up_symbols',
         '_strategy',
+        'compact_records',
         'queue'
     ]
 
-    _instances = []
-    _lock = threading.Lock()
-    _INSTANCES_AMOUNT_LIMIT = 3
     _TRANSACTION_SIGNS_COMPILED_PATTERN = re.compile(r'"s":"([^"]+)","t":(\d+)')
-
-    def __new__(cls, *args, **kwargs):
-        with cls._lock:
-            if len(cls._instances) >= cls._INSTANCES_AMOUNT_LIMIT:
-                raise ClassInstancesAmountLimitException(
-                    f"Cannot create more than {cls._INSTANCES_AMOUNT_LIMIT} instances of TradeQueue")
-            instance = super(TradeQueue, cls).__new__(cls)
-            cls._instances.append(instance)
-            return instance
-
-    @classmethod
-    def get_instance_count(cls):
-        return len(cls._instances)
-
-    @classmethod
-    def clear_instances(cls):
-        with cls._lock:
-            cls._instances.clear()
+    _TRANSACTION_SIGNS_BYTES_COMPILED_PATTERN = re.compile(rb'"s":"([^"]+)","t":(\d+)')
 
     def __init__(
         self,
         market: Market,
-        global_queue: Queue | None = None
+        global_queue: Queue | None = None,
+        compact_records: bool = False,
+        merge_overlapping_streams: bool = False,
+        group_messages_by_pair: bool = False
     ):
         self.lock = threading.Lock()
         self._market = market
@@ -136,10 +199,22 @@ class TradeQueue:
         self.no_longer_accepted_stream_id_keys: Tuple[int, uuid.UUID] = StreamListenerId(pairs=[]).id_keys
         self.last_message_signs: str = ''
 
+        # merge mode keeps the last accepted "t" per symbol instead of comparing signs
+        self.merge_overlapping_streams = merge_overlapping_streams
+        self.trade_id_watermarks: dict[str, int] = {}
+        self.overlapping_symbols: set[str] = set()
+        self.caught_up_symbols: set[str] = set()
+
         self._strategy: PutTradeMessageStrategy = ContinuousListeningStrategy(self)
         self.set_continuous_listening_mode()
 
-        self.queue = Queue() if global_queue is None else global_queue
+        # compact records keep (timestamp_of_receive, raw message), "_E" is written by the sink
+        self.compact_records = compact_records
+        if global_queue is not None:
+            self.queue = global_queue
+        else:
+            # grouped channels hand the writer messages already bucketed by pair
+            self.queue = PairMessageChannel() if group_messages_by_pair else MessageChannel()
 
     @property
     @final
@@ -147,10 +222,18 @@ class TradeQueue:
         return self._market
 
     def set_continuous_listening_mode(self) -> None:
-        self._strategy = ContinuousListeningStrategy(self)
+        if self.merge_overlapping_streams:
+            self._strategy = MergingContinuousListeningStrategy(self)
+        else:
+            self._strategy = ContinuousListeningStrategy(self)
 
     def set_switching_websockets_mode(self) -> None:
-        self._strategy = SwitchingWebsocketsStrategy(self)
+        # a put holding the lock finishes under the strategy it started with
+        with self.lock:
+            if self.merge_overlapping_streams:
+                self._strategy = MergingWebsocketsStrategy(self)
+            else:
+                self._strategy = SwitchingWebsocketsStrategy(self)
 
     def put_trade_message(
         self,
@@ -161,20 +244,51 @@ class TradeQueue:
         self._strategy.put_trade_message(stream_listener_id, message, timestamp_of_receive)
 
     @staticmethod
-    def get_message_signs(message: str) -> str:
+    def get_message_signs(message: str | bytes) -> str:
+        # signs are taken only while listeners overlap, raw frames are decoded for them
+        if type(message) is bytes:
+            message = message.decode('utf-8')
         match = TradeQueue._TRANSACTION_SIGNS_COMPILED_PATTERN.search(message)
         return '"s":"' + match.group(1) + '","t":' + match.group(2)
 
-    def get(self) -> any:
-        entry = self.queue.get()
+    @staticmethod
+    def get_message_trade_id(message: str | bytes) -> tuple[str, int]:
+        if type(message) is bytes:
+            match = TradeQueue._TRANSACTION_SIGNS_BYTES_COMPILED_PATTERN.search(message)
+            return match.group(1).decode('ascii'), int(match.group(2))
+        match = TradeQueue._TRANSACTION_SIGNS_COMPILED_PATTERN.search(message)
+        return match.group(1), int(match.group(2))
+
+    def set_merged_stream_id_as_currently_accepted(self) -> None:
+        self.no_longer_accepted_stream_id_keys = self.currently_accepted_stream_id_keys
+        self.currently_accepted_stream_id_keys = self.new_stream_listener_id_keys
+        self.new_stream_listener_id_keys = None
+
+        self.overlapping_symbols = set()
+        self.caught_up_symbols = set()
+        self.did_websockets_switch_successfully = True
+
+        self.set_continuous_listening_mode()
+
+    def get(self, timeout: float | None = None) -> any:
+        entry = self.queue.get(timeout=timeout)
         return entry
 
     def get_nowait(self) -> any:
         entry = self.queue.get_nowait()
         return entry
 
+    def drain_all(self, timeout: float | None = None) -> list[str]:
+        return self.queue.drain_all(timeout=timeout)
+
+    def drain_grouped(self, timeout: float | None = None) -> dict[str, list[str]]:
+        return self.queue.drain_grouped(timeout=timeout)
+
     def clear(self) -> None:
-        self.queue.queue.clear()
+        if isinstance(self.queue, Queue):
+            self.queue.queue.clear()
+        else:
+            self.queue.clear()
 
     def empty(self) -> bool:
         return self.queue.empty()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+
+class UploadSpool:
+    __slots__ = [
+        'spool_path',
+        'retry_base_delay_seconds',
+        'retry_max_delay_seconds',
+        '_connection',
+        '_lock'
+    ]
+
+    def __init__(
+            self,
+            spool_path: str,
+            retry_base_delay_seconds: float = 3,
+            retry_max_delay_seconds: float = 3600
+    ) -> None:
+        self.spool_path = spool_path
+        self.retry_base_delay_seconds = retry_base_delay_seconds
+        self.retry_max_delay_seconds = retry_max_delay_seconds
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(spool_path, check_same_thread=False, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS pending_uploads ('
+            'file_path TEXT PRIMARY KEY, '
+            'attempts INTEGER NOT NULL DEFAULT 0, '
+            'next_retry_at REAL NOT NULL, '
+            'last_error TEXT)'
+        )
+        self._connection.execute(
+            'CREATE INDEX IF NOT EXISTS pending_uploads_next_retry_at ON pending_uploads (next_retry_at)'
+        )
+
+    def enqueue(self, file_path: str) -> None:
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR IGNORE INTO pending_uploads (file_path, next_retry_at) VALUES (?, ?)',
+                (file_path, time.time())
+            )
+
+    def enqueue_existing_files(self, catalog: str, file_name_pattern: re.Pattern[str]) -> int:
+        file_paths = [
+            (f'{catalog}/{file_name}', time.time())
+            for file_name in os.listdir(catalog)
+            if file_name_pattern.fullmatch(file_name)
+        ]
+        with self._lock:
+            self._connection.executemany(
+                'INSERT OR IGNORE INTO pending_uploads (file_path, next_retry_at) VALUES (?, ?)',
+                file_paths
+            )
+        return len(file_paths)
+
+    def mark_uploaded(self, file_path: str) -> None:
+        with self._lock:
+            self._connection.execute('DELETE FROM pending_uploads WHERE file_path = ?', (file_path,))
+
+    def mark_failed(self, file_path: str, error: str) -> float:
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT attempts FROM pending_uploads WHERE file_path = ?',
+                (file_path,)
+            ).fetchone()
+            attempts = (row[0] if row is not None else 0) + 1
+            next_retry_at = time.time() + self.get_retry_delay_seconds(attempts)
+            self._connection.execute(
+                'INSERT INTO pending_uploads (file_path, attempts, next_retry_at, last_error) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(file_path) DO UPDATE SET '
+                'attempts = excluded.attempts, next_retry_at = excluded.next_retry_at, last_error = excluded.last_error',
+                (file_path, attempts, next_retry_at, error)
+            )
+        return next_retry_at
+
+    def get_retry_delay_seconds(self, attempts: int) -> float:
+        return min(self.retry_base_delay_seconds * 2 ** (attempts - 1), self.retry_max_delay_seconds)
+
+    def get_due_uploads(self, limit: int, now: float | None = None, excluded_file_paths: set[str] | None = None) -> list[str]:
+        # excluded before LIMIT, uploads still in flight must not take the free slots
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT file_path FROM pending_uploads '
+                'WHERE next_retry_at <= ? AND file_path NOT IN (SELECT value FROM json_each(?)) '
+                'ORDER BY next_retry_at LIMIT ?',
+                (time.time() if now is None else now, json.dumps(list(excluded_file_paths or ())), limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_attempts(self, file_path: str) -> int | None:
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT attempts FROM pending_uploads WHERE file_path = ?',
+                (file_path,)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM pending_uploads').fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
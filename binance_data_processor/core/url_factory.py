@@ -37,7 +37,20 @@ class URLFactory:
         raise Exception(f'could not return depth snapshot url for: {asset_parameters}')
 
     @staticmethod
-    def get_stream_url(asset_parameters: AssetParameters) -> str:
+    def get_stream_name(pair: str, stream_type: StreamType) -> str:
+
+        stream_suffix_dict = {
+            StreamType.TRADE_STREAM: '@trade',
+            StreamType.DIFFERENCE_DEPTH_STREAM: '@depth@100ms'
+        }
+
+        return f'{pair.lower()}{stream_suffix_dict.get(stream_type)}'
+
+    @staticmethod
+    def get_stream_url(
+            asset_parameters: AssetParameters,
+            stream_types: list[StreamType] | None = None
+    ) -> str:
 
         base_urls = {
             Market.SPOT: 'wss://stream.binance.com:443/stream?streams={}&timeUnit=microsecond',
@@ -45,14 +58,17 @@ class URLFactory:
             Market.COIN_M_FUTURES: 'wss://dstream.binance.com/stream?streams={}'
         }
 
-        stream_suffix_dict = {
-            StreamType.TRADE_STREAM: '@trade',
-            StreamType.DIFFERENCE_DEPTH_STREAM: '@depth@100ms'
-        }
-
-        stream_suffix = stream_suffix_dict.get(asset_parameters.stream_type)
+        # several stream types are multiplexed over one combined stream connection
+        if stream_types is None:
+            stream_types = [asset_parameters.stream_type]
 
-        streams = '/'.join([f'{pair.lower()}{stream_suffix}' for pair in asset_parameters.pairs])
+        streams = '/'.join(
+            [
+                URLFactory.get_stream_name(pair, stream_type)
+                for stream_type in stream_types
+                for pair in asset_parameters.pairs
+            ]
+        )
         base_url = base_urls.get(asset_parameters.market)
         if base_url:
             return base_url.format(streams)
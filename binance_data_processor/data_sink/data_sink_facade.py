@@ -46,7 +46,8 @@ class BinanceDataSink:
 
     def __init__(
             self,
-            data_sink_config: DataSinkConfig
+            data_sink_config: DataSinkConfig,
+            serve_fast_api: bool = True
     ) -> None:
         self.data_sink_config = data_sink_config
         self.logger = setup_logger(should_dump_logs=True)
@@ -55,7 +56,11 @@ class BinanceDataSink:
 
         self.global_shutdown_flag = threading.Event()
 
-        self.queue_pool = DataSinkQueuePool()
+        self.queue_pool = DataSinkQueuePool(
+            compact_records=data_sink_config.compact_queue_records or data_sink_config.bytes_messages,
+            merge_overlapping_streams=data_sink_config.merge_overlapping_streams,
+            queue_sharding_settings=data_sink_config.queue_sharding_settings
+        )
 
         self.stream_service = StreamService(
             queue_pool=self.queue_pool,
@@ -72,10 +77,16 @@ class BinanceDataSink:
         self.command_line_interface = CommandLineInterface(
             stream_service=self.stream_service,
             data_sink_config=self.data_sink_config,
-            shutdown_callback=self.shutdown
+            shutdown_callback=self.shutdown,
+            archive_pipeline=self.stream_data_saver_and_sender.archive_pipeline
         )
 
-        self.fast_api_manager = FastAPIManager(callback=self.command_line_interface.handle_command)
+        # shards of ShardedBinanceDataSink are controlled by the supervisor, not by their own api
+        self.fast_api_manager = (
+            FastAPIManager(callback=self.command_line_interface.handle_command)
+            if serve_fast_api
+            else None
+        )
 
         self.depth_snapshot_service = DepthSnapshotService(
             snapshot_strategy=DataSinkDepthSnapshotStrategy(data_saver=self.stream_data_saver_and_sender),
@@ -87,7 +98,8 @@ class BinanceDataSink:
 
         self.stream_service.run()
 
-        self.fast_api_manager.run()
+        if self.fast_api_manager is not None:
+            self.fast_api_manager.run()
 
         self.stream_data_saver_and_sender.run()
 
@@ -99,7 +111,12 @@ class BinanceDataSink:
 
         self.global_shutdown_flag.set()
 
-        self.fast_api_manager.shutdown()
+        if self.fast_api_manager is not None:
+            self.fast_api_manager.shutdown()
+
+        self.stream_data_saver_and_sender.shutdown()
+
+        self.stream_service.shutdown()
 
         time.sleep(5)
 
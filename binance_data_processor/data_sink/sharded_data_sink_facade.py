@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import dataclasses
+import itertools
+import json
+import multiprocessing
+import os
+import pprint
+import threading
+from multiprocessing.connection import Connection
+
+from binance_data_processor.core.fastapi_manager import FastAPIManager
+from binance_data_processor.core.logo import binance_archiver_logo
+from binance_data_processor.core.setup_logger import setup_logger
+from binance_data_processor.data_sink.data_sink_facade import BinanceDataSink
+from binance_data_processor.enums.commands_registry_enum import CommandsRegistry
+from binance_data_processor.enums.data_sink_config import DataSinkConfig
+from binance_data_processor.enums.instruments_matrix import InstrumentsMatrix
+from binance_data_processor.enums.market_enum import Market
+
+__all__ = [
+    'launch_sharded_data_sink',
+    'ShardedBinanceDataSink',
+    'get_data_sink_shard_configs'
+]
+
+
+def launch_sharded_data_sink(
+        data_sink_config: DataSinkConfig = None,
+        pairs_per_shard: int | None = None
+) -> ShardedBinanceDataSink:
+
+    if data_sink_config is None:
+        data_sink_config = DataSinkConfig()
+
+    sharded_binance_data_sink = ShardedBinanceDataSink(
+        data_sink_config=data_sink_config,
+        pairs_per_shard=pairs_per_shard
+    )
+    sharded_binance_data_sink.run()
+
+    return sharded_binance_data_sink
+
+
+def get_data_sink_shard_configs(
+        data_sink_config: DataSinkConfig,
+        pairs_per_shard: int | None = None
+) -> dict[str, DataSinkConfig]:
+    if pairs_per_shard is not None and pairs_per_shard < 1:
+        raise ValueError("pairs_per_shard must be greater than 0")
+
+    shard_configs = {}
+
+    for market, pairs in data_sink_config.instruments.dict.items():
+        if pairs_per_shard is None:
+            pair_groups = [pairs]
+        else:
+            pair_groups = [pairs[i:i + pairs_per_shard] for i in range(0, len(pairs), pairs_per_shard)]
+
+        for group_index, pair_group in enumerate(pair_groups):
+            shard_name = market.value if len(pair_groups) == 1 else f'{market.value}_{group_index}'
+            # every shard keeps its own catalog, so its upload spool never races with other shards
+            shard_configs[shard_name] = dataclasses.replace(
+                data_sink_config,
+                instruments=InstrumentsMatrix(**{market.value: list(pair_group)}),
+                file_save_catalog=os.path.join(data_sink_config.file_save_catalog, shard_name),
+                show_logo=False
+            )
+
+    return shard_configs
+
+
+def run_data_sink_shard(data_sink_config: DataSinkConfig, command_connection: Connection) -> None:
+    binance_data_sink = BinanceDataSink(data_sink_config=data_sink_config, serve_fast_api=False)
+    binance_data_sink.run()
+
+    while not binance_data_sink.global_shutdown_flag.is_set():
+        try:
+            if not command_connection.poll(1):
+                continue
+            request_id, message = command_connection.recv()
+        except (EOFError, OSError):
+            binance_data_sink.logger.error("Lost connection to the shard supervisor, shutting down")
+            binance_data_sink.shutdown()
+            break
+
+        try:
+            response = binance_data_sink.command_line_interface.handle_command(message)
+        except Exception as e:
+            response = e
+
+        command_connection.send((request_id, f'{response}'))
+
+
+class ShardedBinanceDataSink:
+    SHARD_RESPONSE_TIMEOUT_SECONDS = 30
+    SHARD_SHUTDOWN_TIMEOUT_SECONDS = 60
+
+    __slots__ = [
+        'data_sink_config',
+        'logger',
+        'global_shutdown_flag',
+        'shard_configs',
+        'fast_api_manager',
+        '_shard_processes',
+        '_command_connections',
+        '_command_lock',
+        '_request_ids'
+    ]
+
+    def __init__(
+            self,
+            data_sink_config: DataSinkConfig,
+            pairs_per_shard: int | None = None,
+            serve_fast_api: bool = True
+    ) -> None:
+        self.data_sink_config = data_sink_config
+        self.logger = setup_logger(should_dump_logs=True)
+        self.logger.info("\n%s", binance_archiver_logo)
+        self.logger.info("Configuration:\n%s", pprint.pformat(data_sink_config, indent=1))
+
+        self.global_shutdown_flag = threading.Event()
+
+        self.shard_configs = get_data_sink_shard_configs(data_sink_config, pairs_per_shard)
+        self.logger.info(f"Data sink shards: {list(self.shard_configs)}")
+
+        self.fast_api_manager = FastAPIManager(callback=self.handle_command) if serve_fast_api else None
+
+        self._shard_processes: dict[str, multiprocessing.Process] = {}
+        self._command_connections: dict[str, Connection] = {}
+        self._command_lock = threading.Lock()
+        self._request_ids = itertools.count()
+
+    def run(self) -> None:
+        spawn_context = multiprocessing.get_context('spawn')
+
+        for shard_name, shard_config in self.shard_configs.items():
+            supervisor_connection, shard_connection = spawn_context.Pipe()
+            shard_process = spawn_context.Process(
+                target=run_data_sink_shard,
+                args=(shard_config, shard_connection),
+                name=f'data_sink_shard: {shard_name}'
+            )
+            shard_process.start()
+            shard_connection.close()
+
+            self._shard_processes[shard_name] = shard_process
+            self._command_connections[shard_name] = supervisor_connection
+
+        if self.fast_api_manager is not None:
+            self.fast_api_manager.run()
+
+    def handle_command(self, message: dict) -> str:
+        command, arguments = next(iter(message.items()))
+        command = CommandsRegistry(command)
+
+        if command == CommandsRegistry.SHUTDOWN:
+            self.shutdown()
+            return 'shut down'
+        if command == CommandsRegistry.SHOW_STATUS:
+            return self.show_status()
+        if command == CommandsRegistry.SHOW_CONFIG:
+            return json.dumps(f'{self.data_sink_config}')
+        if command == CommandsRegistry.MODIFY_SUBSCRIPTION:
+            return self.modify_subscription(
+                type_=arguments['type'],
+                market=Market(arguments['market'].lower()),
+                instrument=arguments['asset'].upper()
+            )
+
+        return json.dumps(
+            {
+                shard_name: self.send_command_to_shard(shard_name, message)
+                for shard_name in self.shard_configs
+            }
+        )
+
+    def modify_subscription(self, type_: str, market: Market, instrument: str) -> str:
+        shard_name = self.get_shard_name_for_subscription(type_=type_, market=market, instrument=instrument)
+        response = self.send_command_to_shard(
+            shard_name,
+            {
+                CommandsRegistry.MODIFY_SUBSCRIPTION.value: {
+                    'type': type_,
+                    'market': market.value,
+                    'asset': instrument
+                }
+            }
+        )
+
+        instruments_matrices = [self.shard_configs[shard_name].instruments, self.data_sink_config.instruments]
+        for instruments_matrix in instruments_matrices:
+            if type_ == 'subscribe' and not instruments_matrix.is_pair(market, instrument):
+                instruments_matrix.add_pair(market=market, pair=instrument)
+            elif type_ == 'unsubscribe' and instruments_matrix.is_pair(market, instrument):
+                instruments_matrix.remove_pair(market=market, instrument=instrument)
+
+        return json.dumps({shard_name: response})
+
+    def get_shard_name_for_subscription(self, type_: str, market: Market, instrument: str) -> str:
+        market_shard_names = [
+            shard_name for shard_name, shard_config in self.shard_configs.items()
+            if market in shard_config.instruments.dict
+        ]
+        if not market_shard_names:
+            raise Exception(f'There is no data sink shard for market {market}')
+
+        if type_ == 'unsubscribe':
+            for shard_name in market_shard_names:
+                if self.shard_configs[shard_name].instruments.is_pair(market, instrument):
+                    return shard_name
+            raise Exception(f'There is no instrument {instrument} subscribed in market {market}')
+
+        return min(
+            market_shard_names,
+            key=lambda shard_name: len(self.shard_configs[shard_name].instruments.get_pairs(market))
+        )
+
+    def send_command_to_shard(self, shard_name: str, message: dict) -> str:
+        if not self._shard_processes[shard_name].is_alive():
+            return f'shard {shard_name} is not running'
+
+        command_connection = self._command_connections[shard_name]
+
+        with self._command_lock:
+            request_id = next(self._request_ids)
+            command_connection.send((request_id, message))
+
+            while command_connection.poll(self.SHARD_RESPONSE_TIMEOUT_SECONDS):
+                response_id, response = command_connection.recv()
+                # responses to timed out requests are dropped here
+                if response_id == request_id:
+                    return response
+
+        return f'shard {shard_name} did not respond in {self.SHARD_RESPONSE_TIMEOUT_SECONDS}s'
+
+    def get_shards_status(self) -> dict[str, dict[str, int | bool | None]]:
+        return {
+            shard_name: {
+                'pid': shard_process.pid,
+                'is_alive': shard_process.is_alive(),
+                'exitcode': shard_process.exitcode
+            }
+            for shard_name, shard_process in self._shard_processes.items()
+        }
+
+    def show_status(self) -> str:
+        output_lines = []
+
+        output_lines.append("SHARDED BINANCE ARCHIVER STATUS:")
+        output_lines.append("------------------------------------------")
+        output_lines.append("Shard processes:")
+        output_lines.append("------------------------------------------")
+        output_lines.append(pprint.pformat(self.get_shards_status()))
+
+        for shard_name in self.shard_configs:
+            output_lines.append("------------------------------------------")
+            output_lines.append(f"Shard {shard_name}:")
+            output_lines.append("------------------------------------------")
+            output_lines.append(
+                self.send_command_to_shard(shard_name, {CommandsRegistry.SHOW_STATUS.value: {}})
+            )
+
+        final_output = "\n".join(output_lines)
+        self.logger.info(final_output)
+
+        return final_output
+
+    def shutdown(self):
+        self.logger.info("Shutting down sharded archiver")
+
+        self.global_shutdown_flag.set()
+
+        if self.fast_api_manager is not None:
+            self.fast_api_manager.shutdown()
+
+        for shard_name, command_connection in self._command_connections.items():
+            if self._shard_processes[shard_name].is_alive():
+                with self._command_lock:
+                    command_connection.send((next(self._request_ids), {CommandsRegistry.SHUTDOWN.value: {}}))
+
+        for shard_name, shard_process in self._shard_processes.items():
+            shard_process.join(timeout=self.SHARD_SHUTDOWN_TIMEOUT_SECONDS)
+            if shard_process.is_alive():
+                self.logger.warning(f"Shard {shard_name} did not stop in time, terminating it")
+                shard_process.terminate()
+                shard_process.join()
+            self._command_connections[shard_name].close()
+
+        self.logger.info("All data sink shards have been stopped.")
@@ -0,0 +1,40 @@
+from dataclasses import dataclass
+
+from binance_data_processor.enums.upload_backend_enum import UploadBackend
+
+
+@dataclass(slots=True)
+class ArchivePipelineSettings:
+    compression_workers: int = 1
+    upload_workers: int = 4
+    max_pending_uploads: int = 64
+    upload_retry_base_delay_seconds: int = 3
+    upload_retry_max_delay_seconds: int = 60 * 60
+    spool_poll_interval_seconds: int = 5
+    upload_backend: UploadBackend | str = UploadBackend.REQUESTS
+    max_connections_per_host: int = 16
+
+    def __post_init__(self):
+        if isinstance(self.upload_backend, str):
+            try:
+                self.upload_backend = UploadBackend(self.upload_backend.lower())
+            except ValueError:
+                raise ValueError(f"Invalid upload_backend value: {self.upload_backend}")
+
+        self.validate()
+
+    def validate(self):
+        if self.compression_workers < 0:
+            raise ValueError("compression_workers must be greater than or equal to 0")
+        if self.upload_workers <= 0:
+            raise ValueError("upload_workers must be greater than 0")
+        if self.max_pending_uploads <= 0:
+            raise ValueError("max_pending_uploads must be greater than 0")
+        if self.upload_retry_base_delay_seconds < 0:
+            raise ValueError("upload_retry_base_delay_seconds must be greater than or equal to 0")
+        if self.upload_retry_max_delay_seconds < self.upload_retry_base_delay_seconds:
+            raise ValueError("upload_retry_max_delay_seconds must be greater than or equal to upload_retry_base_delay_seconds")
+        if self.spool_poll_interval_seconds <= 0:
+            raise ValueError("spool_poll_interval_seconds must be greater than 0")
+        if self.max_connections_per_host <= 0:
+            raise ValueError("max_connections_per_host must be greater than 0")
@@ -0,0 +1,29 @@
+from enum import Enum
+
+
+class CompressionCodec(Enum):
+    ZIP = 'zip'
+    ZSTD = 'zstd'
+    LZ4 = 'lz4'
+    GZIP = 'gzip'
+    NONE = 'none'
+
+    @property
+    def file_extension(self) -> str:
+        return {
+            CompressionCodec.ZIP: 'zip',
+            CompressionCodec.ZSTD: 'json.zst',
+            CompressionCodec.LZ4: 'json.lz4',
+            CompressionCodec.GZIP: 'json.gz',
+            CompressionCodec.NONE: 'json'
+        }[self]
+
+    @property
+    def default_level(self) -> int | None:
+        return {
+            CompressionCodec.ZIP: 9,
+            CompressionCodec.ZSTD: 3,
+            CompressionCodec.LZ4: 0,
+            CompressionCodec.GZIP: 6,
+            CompressionCodec.NONE: None
+        }[self]
@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+import os
+
+from binance_data_processor.enums.compression_codec_enum import CompressionCodec
+
+
+@dataclass(slots=True)
+class CompressionSettings:
+    codec: CompressionCodec | str = CompressionCodec.ZIP
+    level: int | None = None
+    zstd_dictionary_path: str | None = None
+
+    def __post_init__(self):
+        if isinstance(self.codec, str):
+            try:
+                self.codec = CompressionCodec(self.codec.lower())
+            except ValueError:
+                raise ValueError(f"Invalid compression codec value: {self.codec}")
+
+        if self.level is None:
+            self.level = self.codec.default_level
+
+        self.validate()
+
+    def validate(self):
+        if not isinstance(self.codec, CompressionCodec):
+            raise ValueError("Invalid compression codec value.")
+
+        if self.zstd_dictionary_path is not None:
+            if self.codec is not CompressionCodec.ZSTD:
+                raise ValueError("zstd_dictionary_path can only be used with zstd codec.")
+            if not os.path.isfile(self.zstd_dictionary_path):
+                raise ValueError(f"zstd dictionary '{self.zstd_dictionary_path}' does not exist.")
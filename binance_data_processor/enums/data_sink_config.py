@@ -1,9 +1,12 @@
 from dataclasses import dataclass, field
 import os
 
+from binance_data_processor.enums.archive_pipeline_settings import ArchivePipelineSettings
+from binance_data_processor.enums.compression_settings import CompressionSettings
 from binance_data_processor.enums.data_save_target_enum import DataSaveTarget
 from binance_data_processor.enums.instruments_matrix import InstrumentsMatrix
 from binance_data_processor.enums.interval_settings import IntervalSettings
+from binance_data_processor.enums.queue_sharding_settings import QueueShardingSettings
 from binance_data_processor.enums.storage_connection_parameters import StorageConnectionParameters
 
 
@@ -28,6 +31,14 @@ class DataSinkConfig:
         default=None,
         repr=False
     )
+    compression_settings: CompressionSettings | dict[str, any] = field(default_factory=CompressionSettings)
+    archive_pipeline_settings: ArchivePipelineSettings | dict[str, int] = field(default_factory=ArchivePipelineSettings)
+    queue_sharding_settings: QueueShardingSettings | dict[str, any] = field(default_factory=QueueShardingSettings)
+    compact_queue_records: bool = False
+    bytes_messages: bool = False
+    merge_overlapping_streams: bool = False
+    combine_market_streams: bool = False
+    listener_event_loops: int = 0
     file_save_catalog: str = '../dump/'
     show_logo: bool = True
 
@@ -51,6 +62,18 @@ class DataSinkConfig:
         if not isinstance(self.time_settings, IntervalSettings):
             raise ValueError("time_settings must be an instance of IntervalSettings.")
 
+        if not isinstance(self.compression_settings, CompressionSettings):
+            raise ValueError("compression_settings must be an instance of CompressionSettings.")
+
+        if self.listener_event_loops < 0:
+            raise ValueError("listener_event_loops must be greater than or equal to 0")
+
+        if not isinstance(self.archive_pipeline_settings, ArchivePipelineSettings):
+            raise ValueError("archive_pipeline_settings must be an instance of ArchivePipelineSettings.")
+
+        if not isinstance(self.queue_sharding_settings, QueueShardingSettings):
+            raise ValueError("queue_sharding_settings must be an instance of QueueShardingSettings.")
+
     def __post_init__(self):
         if isinstance(self.instruments, dict):
             instruments_kwargs = {}
@@ -80,4 +103,13 @@ class DataSinkConfig:
                 websocket_life_time_seconds=self.time_settings.get('websocket_life_time_seconds', 0)
             )
 
+        if isinstance(self.compression_settings, dict):
+            self.compression_settings = CompressionSettings(**self.compression_settings)
+
+        if isinstance(self.archive_pipeline_settings, dict):
+            self.archive_pipeline_settings = ArchivePipelineSettings(**self.archive_pipeline_settings)
+
+        if isinstance(self.queue_sharding_settings, dict):
+            self.queue_sharding_settings = QueueShardingSettings(**self.queue_sharding_settings)
+
         self.validate()
\ No newline at end of file
@@ -0,0 +1,10 @@
+from enum import Enum
+
+
+class ExportFormat(Enum):
+    CSV = "csv"
+    PARQUET = "parquet"
+
+    @property
+    def extension(self) -> str:
+        return f'.{self.value}'
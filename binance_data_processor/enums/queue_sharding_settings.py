@@ -0,0 +1,31 @@
+from dataclasses import dataclass, field
+
+from binance_data_processor.enums.market_enum import Market
+
+
+@dataclass(slots=True)
+class QueueShardingSettings:
+    hashed_shards: int = 1
+    pair_groups: dict[str, list[list[str]]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        # shards are looked up by upper case pair, as in get_shard_index
+        self.pair_groups = {
+            market_name: [[pair.upper() for pair in pair_group] for pair_group in pair_groups]
+            for market_name, pair_groups in self.pair_groups.items()
+        }
+        self.validate()
+
+    def validate(self):
+        if self.hashed_shards <= 0:
+            raise ValueError("hashed_shards must be greater than 0")
+
+        for market_name, pair_groups in self.pair_groups.items():
+            try:
+                Market(market_name)
+            except ValueError:
+                raise ValueError(f"Invalid pair_groups market: {market_name}")
+
+            pairs = [pair for pair_group in pair_groups for pair in pair_group]
+            if len(pairs) != len(set(pairs)):
+                raise ValueError(f"Pair cannot belong to more than one pair group of market {market_name}")
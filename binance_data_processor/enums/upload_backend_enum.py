@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class UploadBackend(Enum):
+    REQUESTS = 'requests'
+    AIOHTTP = 'aiohttp'
@@ -109,6 +109,8 @@ class BinanceDataListener(Subject):
         self.logger.info("Shutting down archiver")
         self.global_shutdown_flag.set()
 
+        self.stream_service.shutdown()
+
         remaining_threads = [
             thread for thread in threading.enumerate()
             if thread is not threading.current_thread() and thread.is_alive()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+
+class ArchiveFileCache:
+    PART_SUFFIX = '.part'
+
+    __slots__ = [
+        'cache_catalog',
+        'size_limit_in_bytes',
+        '_entries',
+        '_size_in_bytes',
+        '_lock'
+    ]
+
+    def __init__(self, cache_catalog: str, size_limit_in_bytes: int) -> None:
+        self.cache_catalog = cache_catalog
+        self.size_limit_in_bytes = size_limit_in_bytes
+        self._lock = threading.Lock()
+
+        os.makedirs(cache_catalog, exist_ok=True)
+
+        # entry name -> size, least recently used first. mtime carries the order between runs
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        entries = [
+            entry for entry in os.scandir(cache_catalog)
+            if entry.is_file() and not entry.name.endswith(self.PART_SUFFIX)
+        ]
+        for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+            self._entries[entry.name] = entry.stat().st_size
+        self._size_in_bytes = sum(self._entries.values())
+
+        with self._lock:
+            self._evict()
+
+    @property
+    def size_in_bytes(self) -> int:
+        return self._size_in_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def get_entry_name(file_name: str, etag: str) -> str:
+        # a re-uploaded object gets a new etag and so a new entry, the stale one ages out
+        return hashlib.sha256(f'{file_name}\n{etag}'.encode('utf-8')).hexdigest()
+
+    def get(self, file_name: str, etag: str) -> bytes | None:
+        entry_name = self.get_entry_name(file_name, etag)
+        entry_path = os.path.join(self.cache_catalog, entry_name)
+
+        with self._lock:
+            if entry_name not in self._entries:
+                return None
+            self._entries.move_to_end(entry_name)
+
+        try:
+            with open(entry_path, 'rb') as f:
+                content = f.read()
+            os.utime(entry_path)
+        except FileNotFoundError:
+            # evicted by another process sharing the catalog
+            with self._lock:
+                self._size_in_bytes -= self._entries.pop(entry_name, 0)
+            return None
+
+        return content
+
+    def put(self, file_name: str, etag: str, content: bytes) -> None:
+        if len(content) > self.size_limit_in_bytes:
+            return
+
+        entry_name = self.get_entry_name(file_name, etag)
+        entry_path = os.path.join(self.cache_catalog, entry_name)
+
+        # readers never see a half written entry, download threads of one file do not collide
+        part_path = f'{entry_path}.{os.getpid()}.{threading.get_ident()}{self.PART_SUFFIX}'
+        with open(part_path, 'wb') as f:
+            f.write(content)
+        os.replace(part_path, entry_path)
+
+        with self._lock:
+            self._size_in_bytes += len(content) - self._entries.pop(entry_name, 0)
+            self._entries[entry_name] = len(content)
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._size_in_bytes > self.size_limit_in_bytes and self._entries:
+            entry_name, entry_size = self._entries.popitem(last=False)
+            self._size_in_bytes -= entry_size
+            try:
+                os.remove(os.path.join(self.cache_catalog, entry_name))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,611 @@
+from __future__ import annotations
+
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from binance_data_processor.enums.asset_parameters import AssetParameters
+from binance_data_processor.enums.epoch_time_unit import EpochTimeUnit
+from binance_data_processor.enums.market_enum import Market
+from binance_data_processor.enums.stream_type_enum import StreamType
+from binance_data_processor.scraper.data_quality_report import DataQualityReport
+
+
+def get_day_epoch_range(date: str, epoch_time_unit: EpochTimeUnit) -> tuple[int, int]:
+    day_start = int(pd.to_datetime(date, format='%d-%m-%Y').timestamp() * epoch_time_unit.multiplier_of_second)
+    return day_start, day_start + 86_400 * epoch_time_unit.multiplier_of_second - 1
+
+
+class _Chunk:
+    """
+    One update reduced column by column, each column array, its extremes,
+    differences and unique values are computed once and shared by every test that reads them
+    """
+
+    __slots__ = ['dataframe', 'carried_last_values', '_values', '_extremes', '_difference_extremes', '_unique_values', '_filtered_chunks']
+
+    _DECIMAL_COLUMNS = ('Price', 'Quantity')
+
+    def __init__(self, dataframe: pd.DataFrame, carried_last_values: dict):
+        self.dataframe = dataframe
+        self.carried_last_values = carried_last_values
+        self._values = {}
+        self._extremes = {}
+        self._difference_extremes = {}
+        self._unique_values = {}
+        self._filtered_chunks = {}
+
+    def __len__(self) -> int:
+        return len(self.dataframe)
+
+    def get_values(self, column: str) -> np.ndarray:
+        values = self._values.get(column)
+        if values is None:
+            series = self.dataframe[column]
+            if column in self._DECIMAL_COLUMNS:
+                # binance sends decimals as strings, a value that does not parse becomes nan and fails the type test
+                if not pd.api.types.is_numeric_dtype(series):
+                    series = pd.to_numeric(series, errors='coerce')
+                values = series.to_numpy(dtype=float, na_value=np.nan)
+            else:
+                values = series.to_numpy()
+            self._values[column] = values
+        return values
+
+    def is_integer(self, column: str) -> bool:
+        return self.get_values(column).dtype.kind in 'iu'
+
+    def is_float(self, column: str) -> bool:
+        return self.get_values(column).dtype.kind == 'f'
+
+    def get_extremes(self, column: str) -> tuple:
+        # nan propagates to both, so a comparison against them fails like series.all() would
+        extremes = self._extremes.get(column)
+        if extremes is None:
+            values = self.get_values(column)
+            extremes = values.min(), values.max()
+            self._extremes[column] = extremes
+        return extremes
+
+    def get_difference_extremes(self, column: str) -> tuple | None:
+        """
+        nan ignoring min and max of the differences between consecutive rows,
+        the first row is compared with the last one of the previous chunk
+        """
+        if column not in self._difference_extremes:
+            values = self.get_values(column)
+            carried_last_value = self.carried_last_values.get(column)
+            differences = np.diff(values)
+            if carried_last_value is not None:
+                differences = np.append(differences, values[0] - carried_last_value)
+
+            if len(differences) == 0:
+                self._difference_extremes[column] = None
+            else:
+                has_nan = differences.dtype.kind == 'f' and bool(np.isnan(differences).any())
+                self._difference_extremes[column] = np.fmin.reduce(differences), np.fmax.reduce(differences), has_nan
+        return self._difference_extremes[column]
+
+    def get_unique_values(self, column: str) -> np.ndarray:
+        unique_values = self._unique_values.get(column)
+        if unique_values is None:
+            # taken from the series, string columns would otherwise be converted to python objects row by row
+            unique_values = np.asarray(self.dataframe[column].unique(), dtype=object)
+            self._unique_values[column] = unique_values
+        return unique_values
+
+    def get_filtered_chunk(self, column: str, value) -> _Chunk:
+        filtered_chunk = self._filtered_chunks.get((column, value))
+        if filtered_chunk is None:
+            filtered_chunk = _Chunk(self.dataframe[(self.dataframe[column] == value).to_numpy(dtype=bool)], carried_last_values={})
+            self._filtered_chunks[(column, value)] = filtered_chunk
+        return filtered_chunk
+
+    def get_last_values(self) -> dict:
+        return {column: self.get_values(column)[-1] for column in self._difference_extremes}
+
+
+class _NonDecreasing:
+    __slots__ = ['column', '_min_difference']
+
+    def __init__(self, column: str):
+        self.column = column
+        self._min_difference = None
+
+    def update(self, chunk: _Chunk) -> None:
+        if len(chunk) == 0:
+            return
+        difference_extremes = chunk.get_difference_extremes(self.column)
+        if difference_extremes is not None:
+            self._min_difference = np.fmin(self._min_difference, difference_extremes[0]) if self._min_difference is not None else difference_extremes[0]
+
+    @property
+    def result(self) -> bool:
+        # a single row has no difference, the same as series.diff().min() being nan
+        return self._min_difference is not None and bool(self._min_difference >= 0)
+
+
+class _Increasing:
+    __slots__ = ['column', '_result']
+
+    def __init__(self, column: str):
+        self.column = column
+        self._result = True
+
+    def update(self, chunk: _Chunk) -> None:
+        if len(chunk) == 0:
+            return
+        difference_extremes = chunk.get_difference_extremes(self.column)
+        if difference_extremes is not None:
+            min_difference, _, _ = difference_extremes
+            # nan differences are dropped the same way diff().dropna() does
+            self._result = self._result and not bool(min_difference <= 0)
+
+    @property
+    def result(self) -> bool:
+        return self._result
+
+
+class _IncreasingByOne:
+    __slots__ = ['column', '_result']
+
+    def __init__(self, column: str):
+        self.column = column
+        self._result = True
+
+    def update(self, chunk: _Chunk) -> None:
+        if len(chunk) == 0:
+            return
+        difference_extremes = chunk.get_difference_extremes(self.column)
+        if difference_extremes is not None:
+            min_difference, max_difference, has_nan = difference_extremes
+            self._result = self._result and not has_nan and bool(min_difference == 1 and max_difference == 1)
+
+    @property
+    def result(self) -> bool:
+        return self._result
+
+
+class _RowsCheck:
+    __slots__ = ['is_chunk_valid', '_result']
+
+    def __init__(self, is_chunk_valid):
+        self.is_chunk_valid = is_chunk_valid
+        self._result = True
+
+    def update(self, chunk: _Chunk) -> None:
+        if len(chunk) == 0:
+            return
+        self._result = self._result and bool(self.is_chunk_valid(chunk))
+
+    @property
+    def result(self) -> bool:
+        return self._result
+
+
+class _FirstAndLastWithinBorders:
+    __slots__ = ['column', '_day_start', '_day_end', '_border', '_first', '_last']
+
+    def __init__(self, column: str, date: str, epoch_time_unit: EpochTimeUnit, border_seconds: int):
+        self.column = column
+        self._day_start, self._day_end = get_day_epoch_range(date, epoch_time_unit)
+        self._border = border_seconds * epoch_time_unit.multiplier_of_second
+        self._first = None
+        self._last = None
+
+    def update(self, chunk: _Chunk) -> None:
+        if len(chunk) == 0:
+            return
+        values = chunk.get_values(self.column)
+        if self._first is None:
+            self._first = values[0]
+        self._last = values[-1]
+
+    @property
+    def result(self) -> bool:
+        if self._first is None:
+            return False
+        return bool(
+            self._day_start <= self._first <= self._day_start + self._border
+            and self._day_end - self._border <= self._last <= self._day_end
+        )
+
+
+class _UniqueValues:
+    __slots__ = ['column', 'is_valid', '_unique_values']
+
+    def __init__(self, column: str, is_valid):
+        self.column = column
+        self.is_valid = is_valid
+        self._unique_values = np.empty(0, dtype=object)
+
+    def update(self, chunk: _Chunk) -> None:
+        self._unique_values = pd.unique(np.concatenate([self._unique_values, chunk.get_unique_values(self.column)]))
+
+    @property
+    def result(self) -> bool:
+        return bool(self.is_valid(self._unique_values))
+
+
+class _NoAbnormalPriceTick:
+    __slots__ = ['column', 'max_percent_change', '_last', '_result']
+
+    def __init__(self, column: str, max_percent_change: float = 2.0):
+        self.column = column
+        self.max_percent_change = max_percent_change
+        self._last = None
+        self._result = True
+
+    def update(self, chunk: _Chunk) -> None:
+        values = chunk.get_values(self.column)
+        if self._last is not None:
+            values = np.concatenate([[self._last], values])
+        if len(values) == 0:
+            return
+        self._last = values[-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percent_changes = np.abs(values[1:] / values[:-1] - 1) * 100
+        # nan changes are dropped the same way pct_change().dropna() does
+        self._result = self._result and not bool((percent_changes > self.max_percent_change).any())
+
+    @property
+    def result(self) -> bool:
+        return self._result
+
+
+class _UpdateIdContinuity:
+    __slots__ = ['update_id_column', 'expected_gap', '_last_final_update_id', '_result']
+
+    def __init__(self, update_id_column: str, expected_gap: int):
+        self.update_id_column = update_id_column
+        self.expected_gap = expected_gap
+        self._last_final_update_id = None
+        self._result = True
+
+    def update(self, chunk: _Chunk) -> None:
+        if len(chunk) == 0:
+            return
+        update_ids = chunk.get_values(self.update_id_column)
+        final_update_ids = chunk.get_values('FinalUpdateId')
+
+        # every price level of one message repeats its ids, only the first row of a message is compared
+        is_message_start = np.empty(len(chunk), dtype=bool)
+        is_message_start[1:] = final_update_ids[1:] != final_update_ids[:-1]
+        is_message_start[0] = final_update_ids[0] != self._last_final_update_id
+
+        message_update_ids = update_ids[is_message_start]
+        previous_message_final_update_ids = final_update_ids[is_message_start][:-1]
+        if self._last_final_update_id is None:
+            message_update_ids = message_update_ids[1:]
+        else:
+            previous_message_final_update_ids = np.concatenate([[self._last_final_update_id], previous_message_final_update_ids])
+
+        self._last_final_update_id = final_update_ids[-1]
+        self._result = self._result and bool(
+            (message_update_ids == previous_message_final_update_ids + self.expected_gap).all()
+        )
+
+    @property
+    def result(self) -> bool:
+        return self._result
+
+
+class _SnapshotPriceLevelAmount:
+    __slots__ = ['limit_per_side', '_price_level_counts']
+
+    _LIMITS_PER_SIDE = {
+        Market.SPOT: 5000,
+        Market.USD_M_FUTURES: 1000,
+        Market.COIN_M_FUTURES: 1000
+    }
+
+    def __init__(self, market: Market):
+        self.limit_per_side = self._LIMITS_PER_SIDE[market]
+        self._price_level_counts = Counter()
+
+    def update(self, chunk: _Chunk) -> None:
+        self._price_level_counts.update(chunk.dataframe.groupby(['LastUpdateId', 'IsAsk']).size().to_dict())
+
+    @property
+    def result(self) -> bool:
+        return all(count == self.limit_per_side for count in self._price_level_counts.values())
+
+
+class _FilteredRows:
+    __slots__ = ['check', 'column', 'value']
+
+    def __init__(self, check, column: str, value: str):
+        self.check = check
+        self.column = column
+        self.value = value
+
+    def update(self, chunk: _Chunk) -> None:
+        self.check.update(chunk.get_filtered_chunk(self.column, self.value))
+
+    @property
+    def result(self) -> bool:
+        return self.check.result
+
+
+class DataQualityAccumulator:
+    """
+    Same tests as IndividualColumnChecker in the order DataQualityChecker reports them,
+    fed chunk by chunk in row order, so the day never has to be held in memory as one dataframe
+    """
+
+    __slots__ = ['asset_parameters', '_checks', '_checks_to_update', '_last_values']
+
+    def __init__(self, asset_parameters: AssetParameters):
+        self.asset_parameters = asset_parameters
+
+        stream_type_checks = {
+            StreamType.DIFFERENCE_DEPTH_STREAM: self._get_difference_depth_checks,
+            StreamType.TRADE_STREAM: self._get_trade_checks,
+            StreamType.DEPTH_SNAPSHOT: self._get_depth_snapshot_checks
+        }
+        self._checks = stream_type_checks[asset_parameters.stream_type](asset_parameters)
+        # a check reported under two names is updated once
+        self._checks_to_update = list({id(check): check for _, _, check in self._checks}.values())
+        self._last_values = {}
+
+    def update(self, dataframe: pd.DataFrame) -> None:
+        chunk = _Chunk(dataframe, carried_last_values=self._last_values)
+        for check in self._checks_to_update:
+            check.update(chunk)
+        self._last_values = {**self._last_values, **chunk.get_last_values()}
+
+    def get_data_quality_report(self) -> DataQualityReport:
+        report = DataQualityReport(asset_parameters=self.asset_parameters)
+        for column, test_name, check in self._checks:
+            report.add_test_result(column, test_name, check.result)
+        return report
+
+    @staticmethod
+    def _epoch_valid(column: str) -> _RowsCheck:
+        return _RowsCheck(lambda chunk: chunk.is_integer(column) and chunk.get_extremes(column)[0] > 0)
+
+    @staticmethod
+    def _within_utc_z_day_range(column: str, date: str, epoch_time_unit: EpochTimeUnit) -> _RowsCheck:
+        day_start, day_end = get_day_epoch_range(date, epoch_time_unit)
+        return _RowsCheck(lambda chunk: day_start <= chunk.get_extremes(column)[0] and chunk.get_extremes(column)[1] <= day_end)
+
+    @staticmethod
+    def _receive_time_close_to_event_time(receive_column: str, event_column: str, epoch_time_unit: EpochTimeUnit) -> _RowsCheck:
+        five_seconds = 5 * epoch_time_unit.multiplier_of_second
+        one_hundred_milliseconds = 0.1 * epoch_time_unit.multiplier_of_second
+
+        def is_chunk_valid(chunk: _Chunk) -> bool:
+            delays = chunk.get_values(receive_column) - chunk.get_values(event_column)
+            return -one_hundred_milliseconds <= delays.min() and delays.max() <= five_seconds
+
+        return _RowsCheck(is_chunk_valid)
+
+    @staticmethod
+    def _transaction_time_not_after_event_time(transaction_column: str, event_column: str, epoch_time_unit: EpochTimeUnit) -> _RowsCheck:
+        one_millisecond = epoch_time_unit.multiplier_of_second * 0.001
+        return _RowsCheck(
+            lambda chunk: (chunk.get_values(transaction_column) - chunk.get_values(event_column)).max() <= one_millisecond
+        )
+
+    @staticmethod
+    def _only_one_unique_value(column: str) -> _UniqueValues:
+        return _UniqueValues(column, lambda unique_values: len(unique_values) == 1)
+
+    @staticmethod
+    def _only_one_expected_value(column: str, expected_value) -> _UniqueValues:
+        return _UniqueValues(column, lambda unique_values: len(unique_values) == 1 and unique_values[0] == expected_value)
+
+    @staticmethod
+    def _float_type(column: str) -> _RowsCheck:
+        # the same as are_values_parsed_to_specified_type, a nan minimum means a value did not parse
+        return _RowsCheck(lambda chunk: chunk.is_float(column) and not np.isnan(chunk.get_extremes(column)[0]))
+
+    @staticmethod
+    def _positive(column: str) -> _RowsCheck:
+        return _RowsCheck(lambda chunk: chunk.get_extremes(column)[0] > 0)
+
+    @staticmethod
+    def _non_negative(column: str) -> _RowsCheck:
+        return _RowsCheck(lambda chunk: chunk.get_extremes(column)[0] >= 0)
+
+    @staticmethod
+    def _within_range(column: str, min_value: float, max_value: float) -> _RowsCheck:
+        return _RowsCheck(lambda chunk: min_value <= chunk.get_extremes(column)[0] and chunk.get_extremes(column)[1] <= max_value)
+
+    @staticmethod
+    def _zero_or_one(column: str) -> _RowsCheck:
+        return _RowsCheck(
+            lambda chunk: chunk.is_integer(column) and chunk.get_extremes(column)[0] >= 0 and chunk.get_extremes(column)[1] <= 1
+        )
+
+    @staticmethod
+    def _get_timestamp_of_receive_checks(asset_parameters: AssetParameters, epoch_time_unit: EpochTimeUnit, event_column: str) -> list:
+        a = DataQualityAccumulator
+        return [
+            ("TimestampOfReceive", "is_series_non_decreasing", _NonDecreasing('TimestampOfReceive')),
+            ("TimestampOfReceive", "is_whole_series_epoch_valid", a._epoch_valid('TimestampOfReceive')),
+            ("TimestampOfReceive", "are_all_within_utc_z_day_range", a._within_utc_z_day_range('TimestampOfReceive', asset_parameters.date, epoch_time_unit)),
+            ("TimestampOfReceive", "is_receive_time_column_close_to_event_time_column_by_minus_100_ms_plus_5_s", a._receive_time_close_to_event_time('TimestampOfReceive', event_column, epoch_time_unit)),
+            ("TimestampOfReceive", "are_first_and_last_timestamps_within_60_seconds_from_the_borders", _FirstAndLastWithinBorders('TimestampOfReceive', asset_parameters.date, epoch_time_unit, 60))
+        ]
+
+    @staticmethod
+    def _get_trade_checks(asset_parameters: AssetParameters) -> list:
+        a = DataQualityAccumulator
+        pair = asset_parameters.pairs[0]
+        epoch_time_unit = EpochTimeUnit.MICROSECONDS if asset_parameters.market is Market.SPOT else EpochTimeUnit.MILLISECONDS
+        is_futures = asset_parameters.market in [Market.USD_M_FUTURES, Market.COIN_M_FUTURES]
+
+        checks = a._get_timestamp_of_receive_checks(asset_parameters, epoch_time_unit, 'EventTime') + [
+            ("Stream", "is_there_only_one_unique_value_in_series", a._only_one_unique_value('Stream')),
+            ("Stream", "is_whole_series_made_of_only_one_expected_value", a._only_one_expected_value('Stream', f"{pair}@trade")),
+            ("EventType", "is_there_only_one_unique_value_in_series", a._only_one_unique_value('EventType')),
+            ("EventType", "is_whole_series_made_of_only_one_expected_value", a._only_one_expected_value('EventType', "trade")),
+            ("EventTime", "is_series_non_decreasing", _NonDecreasing('EventTime')),
+            ("EventTime", "is_whole_series_epoch_valid", a._epoch_valid('EventTime')),
+            ("TransactionTime", "is_series_non_decreasing", _NonDecreasing('TransactionTime')),
+            ("TransactionTime", "is_whole_series_epoch_valid", a._epoch_valid('TransactionTime')),
+            ("TransactionTime", "is_transaction_time_lower_or_equal_event_time_with_one_ms_tolerance", a._transaction_time_not_after_event_time('TransactionTime', 'EventTime', epoch_time_unit)),
+            ("Symbol", "is_there_only_one_unique_value_in_series", a._only_one_unique_value('Symbol')),
+            ("Symbol", "is_whole_series_made_of_only_one_expected_value", a._only_one_expected_value('Symbol', pair.upper())),
+            ("TradeId", "are_series_values_increasing", _Increasing('TradeId')),
+            ("TradeId", "is_each_trade_id_bigger_by_one_than_previous", _IncreasingByOne('TradeId')),
+            ("Price", "are_values_with_specified_type", a._float_type('Price')),
+            ("Price", "are_values_non_negative", a._non_negative('Price')),
+            ("Price", "are_values_within_reasonable_range", a._within_range('Price', 0.0, 1e9))
+        ]
+
+        if asset_parameters.market is Market.SPOT:
+            checks += [
+                ("Price", "are_values_positive", a._positive('Price')),
+                ("Price", "is_there_no_abnormal_price_tick_higher_than_2_percent", _NoAbnormalPriceTick('Price'))
+            ]
+        if is_futures:
+            checks += [
+                ("Price", "are_values_positive_x_column_filtered_to_market", _FilteredRows(a._positive('Price'), 'XUnknownParameter', 'MARKET')),
+                ("Price", "is_there_no_abnormal_price_tick_higher_than_2_percent", _FilteredRows(_NoAbnormalPriceTick('Price'), 'XUnknownParameter', 'MARKET'))
+            ]
+
+        checks += [
+            ("Quantity", "are_values_with_specified_type", a._float_type('Quantity')),
+            ("Quantity", "are_values_non_negative", a._non_negative('Quantity')),
+            ("Quantity", "are_values_within_reasonable_range", a._within_range('Quantity', 0.0, 1e9))
+        ]
+
+        if asset_parameters.market is Market.SPOT:
+            checks.append(("Quantity", "are_values_positive", a._positive('Quantity')))
+        if is_futures:
+            checks.append(("Quantity", "are_values_positive_x_column_filtered_to_market", _FilteredRows(a._positive('Quantity'), 'XUnknownParameter', 'MARKET')))
+
+        checks.append(("IsBuyerMarketMaker", "are_values_zero_or_one", a._zero_or_one('IsBuyerMarketMaker')))
+
+        if asset_parameters.market is Market.SPOT:
+            checks.append(("MUnknownParameter", "is_whole_series_made_of_only_one_expected_value", a._only_one_expected_value('MUnknownParameter', True)))
+        if is_futures:
+            expected_values = {"MARKET", "INSURANCE_FUND", 'NA', np.nan}
+            checks.append(("XUnknownParameter", "is_whole_series_made_of_set_of_expected_values", _UniqueValues('XUnknownParameter', lambda unique_values: set(unique_values) <= expected_values)))
+
+        return checks
+
+    @staticmethod
+    def _get_difference_depth_checks(asset_parameters: AssetParameters) -> list:
+        a = DataQualityAccumulator
+        pair = asset_parameters.pairs[0]
+        epoch_time_unit = EpochTimeUnit.MICROSECONDS if asset_parameters.market is Market.SPOT else EpochTimeUnit.MILLISECONDS
+        is_futures = asset_parameters.market in [Market.USD_M_FUTURES, Market.COIN_M_FUTURES]
+        is_event_time_epoch_valid = a._epoch_valid('EventTime')
+        is_first_update_id_bigger_by_one_than_previous_final_update_id = _UpdateIdContinuity('FirstUpdateId', 1)
+
+        checks = a._get_timestamp_of_receive_checks(asset_parameters, epoch_time_unit, 'EventTime') + [
+            ("Stream", "is_there_only_one_unique_value_in_series", a._only_one_unique_value('Stream')),
+            ("Stream", "is_whole_series_made_of_only_one_expected_value", a._only_one_expected_value('Stream', f"{pair}@depth@100ms")),
+            ("EventType", "is_there_only_one_unique_value_in_series", a._only_one_unique_value('EventType')),
+            ("EventType", "is_whole_series_made_of_only_one_expected_value", a._only_one_expected_value('EventType', "depthUpdate")),
+            ("EventTime", "is_series_non_decreasing", _NonDecreasing('EventTime')),
+            ("EventTime", "is_whole_series_epoch_valid", is_event_time_epoch_valid)
+        ]
+
+        if is_futures:
+            checks += [
+                ("TransactionTime", "is_series_non_decreasing", _NonDecreasing('TransactionTime')),
+                # the checker validates EventTime under this name, kept for identical reports
+                ("TransactionTime", "is_transaction_time_column_epoch_valid", is_event_time_epoch_valid),
+                ("TransactionTime", "is_transaction_time_lower_or_equal_event_time_with_one_ms_tolerance", a._transaction_time_not_after_event_time('TransactionTime', 'EventTime', epoch_time_unit))
+            ]
+
+        checks += [
+            ("Symbol", "is_there_only_one_unique_value_in_series", a._only_one_unique_value('Symbol')),
+            ("Symbol", "is_whole_series_made_of_only_one_expected_value", a._only_one_expected_value('Symbol', pair.upper())),
+            ("FirstUpdateId", "is_series_non_decreasing", _NonDecreasing('FirstUpdateId'))
+        ]
+
+        if asset_parameters.market is Market.SPOT:
+            checks.append(("FirstUpdateId", "is_first_update_id_bigger_by_one_than_previous_entry_final_update_id", is_first_update_id_bigger_by_one_than_previous_final_update_id))
+
+        checks.append(("FinalUpdateId", "is_series_non_decreasing", _NonDecreasing('FinalUpdateId')))
+
+        if asset_parameters.market is Market.SPOT:
+            checks.append(("FinalUpdateId", "is_first_update_id_bigger_by_one_than_previous_entry_final_update_id", is_first_update_id_bigger_by_one_than_previous_final_update_id))
+
+        if is_futures:
+            checks += [
+                ("FinalUpdateIdInLastStream", "is_series_non_decreasing", _NonDecreasing('FinalUpdateIdInLastStream')),
+                ("FinalUpdateIdInLastStream", "is_final_update_id_equal_to_previous_entry_final_update", _UpdateIdContinuity('FinalUpdateIdInLastStream', 0))
+            ]
+
+        checks += [
+            ("IsAsk", "are_values_zero_or_one", a._zero_or_one('IsAsk')),
+            ("Price", "are_values_with_specified_type", a._float_type('Price')),
+            ("Price", "are_values_positive", a._positive('Price')),
+            ("Price", "are_values_within_reasonable_range", a._within_range('Price', 0.0, 1e9))
+        ]
+
+        if asset_parameters.market is Market.COIN_M_FUTURES:
+            ps_unknown_field = pair.replace('_perp', '').upper()
+            checks += [
+                ("PSUnknownField", "is_there_only_one_unique_value_in_series", a._only_one_unique_value('PSUnknownField')),
+                ("PSUnknownField", "is_whole_series_made_of_only_one_expected_value", a._only_one_expected_value('PSUnknownField', ps_unknown_field))
+            ]
+
+        checks += [
+            ("Quantity", "are_values_with_specified_type", a._float_type('Quantity')),
+            ("Quantity", "are_values_non_negative", a._non_negative('Quantity')),
+            ("Quantity", "are_values_within_reasonable_range", a._within_range('Quantity', 0.0, 1e9))
+        ]
+
+        return checks
+
+    @staticmethod
+    def _get_depth_snapshot_checks(asset_parameters: AssetParameters) -> list:
+        a = DataQualityAccumulator
+        pair = asset_parameters.pairs[0]
+        epoch_time_unit = EpochTimeUnit.MILLISECONDS
+        is_futures = asset_parameters.market in [Market.USD_M_FUTURES, Market.COIN_M_FUTURES]
+
+        checks = [
+            ("TimestampOfReceive", "is_series_non_decreasing", _NonDecreasing('TimestampOfReceive')),
+            ("TimestampOfReceive", "is_whole_series_epoch_valid", a._epoch_valid('TimestampOfReceive')),
+            ("TimestampOfReceive", "are_all_within_utc_z_day_range", a._within_utc_z_day_range('TimestampOfReceive', asset_parameters.date, epoch_time_unit)),
+            ("TimestampOfReceive", "are_first_and_last_timestamps_within_10_minutes_from_the_borders", _FirstAndLastWithinBorders('TimestampOfReceive', asset_parameters.date, epoch_time_unit, 600))
+        ]
+
+        if is_futures:
+            checks.append(("TimestampOfReceive", "is_receive_time_column_close_to_event_time_column_by_minus_100_ms_plus_5_s", a._receive_time_close_to_event_time('TimestampOfReceive', 'MessageOutputTime', epoch_time_unit)))
+
+        checks += [
+            ("TimestampOfRequest", "is_series_non_decreasing", _NonDecreasing('TimestampOfRequest')),
+            ("TimestampOfRequest", "is_whole_series_epoch_valid", a._epoch_valid('TimestampOfRequest'))
+        ]
+
+        if is_futures:
+            checks += [
+                ("MessageOutputTime", "is_series_non_decreasing", _NonDecreasing('MessageOutputTime')),
+                ("MessageOutputTime", "is_whole_series_epoch_valid", a._epoch_valid('MessageOutputTime')),
+                ("TransactionTime", "is_series_non_decreasing", _NonDecreasing('TransactionTime')),
+                ("TransactionTime", "is_whole_series_epoch_valid", a._epoch_valid('TransactionTime')),
+                ("TransactionTime", "is_transaction_time_lower_or_equal_event_time_with_one_ms_tolerance", a._transaction_time_not_after_event_time('TransactionTime', 'MessageOutputTime', epoch_time_unit))
+            ]
+
+        checks.append(("LastUpdateId", "is_series_non_decreasing", _NonDecreasing('LastUpdateId')))
+
+        if asset_parameters.market is Market.COIN_M_FUTURES:
+            checks += [
+                ("Symbol", "is_there_only_one_unique_value_in_series", a._only_one_unique_value('Symbol')),
+                ("Symbol", "is_whole_series_made_of_only_one_expected_value", a._only_one_expected_value('Symbol', pair.upper())),
+                ("Pair", "is_there_only_one_unique_value_in_series", a._only_one_unique_value('Pair')),
+                ("Pair", "is_whole_series_made_of_only_one_expected_value", a._only_one_expected_value('Pair', pair.replace('_perp', '').upper()))
+            ]
+
+        checks += [
+            ("IsAsk", "are_values_zero_or_one", a._zero_or_one('IsAsk')),
+            ("Price", "are_values_with_specified_type", a._float_type('Price')),
+            ("Price", "are_values_positive", a._positive('Price')),
+            ("Price", "are_values_within_reasonable_range", a._within_range('Price', 0.0, 1e9)),
+            ("Quantity", "are_values_with_specified_type", a._float_type('Quantity')),
+            ("Quantity", "are_values_non_negative", a._non_negative('Quantity')),
+            ("Quantity", "are_values_within_reasonable_range", a._within_range('Quantity', 0.0, 1e9)),
+            ("GENERAL", "is_price_level_amount_equal_to_market_amount_limit", _SnapshotPriceLevelAmount(asset_parameters.market))
+        ]
+
+        return checks
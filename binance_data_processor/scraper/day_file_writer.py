@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import os
+import shutil
+
+import pandas as pd
+
+from binance_data_processor.core.parquet_pair_file_sink import get_arrow_table, import_pyarrow
+from binance_data_processor.enums.export_format_enum import ExportFormat
+from binance_data_processor.scraper.data_quality_report import DataQualityReport
+
+
+class CsvDayFileWriter:
+    __slots__ = ['file_path', 'columns', '_rows_path', '_rows_file', '_is_header_written']
+
+    def __init__(self, dump_path: str, target_file_name: str, columns: list[str]) -> None:
+        self.file_path = f'{dump_path}/{target_file_name}{ExportFormat.CSV.extension}'
+        # the report heads the csv but is known only after the last row, rows wait in a side file
+        self._rows_path = f'{self.file_path}.rows.part'
+        self._rows_file = open(self._rows_path, 'w', newline='')
+        self.columns = columns
+        self._is_header_written = False
+
+    def write(self, dataframe: pd.DataFrame) -> None:
+        dataframe.to_csv(self._rows_file, index=False, header=not self._is_header_written, lineterminator='\n')
+        self._is_header_written = True
+
+    def close(self, data_quality_report: DataQualityReport) -> str:
+        if not self._is_header_written:
+            self.write(pd.DataFrame(columns=self.columns))
+        self._rows_file.close()
+
+        part_path = f'{self.file_path}.part'
+        with open(part_path, 'w', newline='') as f:
+            f.write(str(data_quality_report))
+            f.write('\n')
+            with open(self._rows_path, 'r', newline='') as rows_file:
+                shutil.copyfileobj(rows_file, f, length=16 * 1024 * 1024)
+
+        os.replace(part_path, self.file_path)
+        os.remove(self._rows_path)
+        return self.file_path
+
+    def abort(self) -> None:
+        self._rows_file.close()
+        os.remove(self._rows_path)
+
+
+class ParquetDayFileWriter:
+    REPORT_METADATA_KEY = 'data_quality_report'
+
+    __slots__ = ['file_path', 'columns', '_part_path', '_writer', '_pyarrow', '_parquet']
+
+    def __init__(self, dump_path: str, target_file_name: str, columns: list[str]) -> None:
+        self._pyarrow, self._parquet = import_pyarrow()
+        self.file_path = f'{dump_path}/{target_file_name}{ExportFormat.PARQUET.extension}'
+        self.columns = columns
+        self._part_path = f'{self.file_path}.part'
+        self._writer = None
+
+    def write(self, dataframe: pd.DataFrame) -> None:
+        table = get_arrow_table(self._pyarrow, {column: dataframe[column].to_numpy() for column in dataframe.columns})
+
+        # every downloaded file becomes one row group, the day is never one table
+        if self._writer is None:
+            self._writer = self._parquet.ParquetWriter(self._part_path, table.schema, compression='zstd')
+        self._writer.write_table(table)
+
+    def close(self, data_quality_report: DataQualityReport) -> str:
+        if self._writer is None:
+            self.write(pd.DataFrame(columns=self.columns))
+
+        self._writer.add_key_value_metadata({self.REPORT_METADATA_KEY: str(data_quality_report)})
+        self._writer.close()
+
+        os.replace(self._part_path, self.file_path)
+        return self.file_path
+
+    def abort(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            os.remove(self._part_path)
+
+
+def get_day_file_writer(
+        export_format: ExportFormat,
+        dump_path: str,
+        target_file_name: str,
+        columns: list[str]
+) -> CsvDayFileWriter | ParquetDayFileWriter:
+    writers = {
+        ExportFormat.CSV: CsvDayFileWriter,
+        ExportFormat.PARQUET: ParquetDayFileWriter
+    }
+    return writers[export_format](dump_path=dump_path, target_file_name=target_file_name, columns=columns)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 
 from binance_data_processor.enums.asset_parameters import AssetParameters
@@ -11,13 +12,16 @@ from binance_data_processor.enums.stream_type_enum import StreamType
 class IndividualColumnChecker:
     __slots__ = ()
 
+    _PYTHON_TYPE_OF_DTYPE_KIND = {'f': float, 'i': int, 'u': int, 'b': bool}
+
     @staticmethod
     def is_there_only_one_unique_value_in_series(series: pd.Series) -> bool:
         return len(series.unique()) == 1
 
     @staticmethod
     def is_whole_series_made_of_only_one_expected_value(series: pd.Series, expected_value: any) -> bool:
-        return series.unique()[0] == expected_value and len(series.unique()) == 1
+        unique_values = series.unique()
+        return unique_values[0] == expected_value and len(unique_values) == 1
 
     @staticmethod
     def is_whole_series_made_of_set_of_expected_values(series: pd.Series, expected_values: set[any]) -> bool:
@@ -29,11 +33,11 @@ class IndividualColumnChecker:
 
     @staticmethod
     def is_whole_series_epoch_valid(series: pd.Series) -> bool:
+        # an integer dtype already rules out fractions, no float and int copies to compare
         return (
-                series.notna().all()
+                pd.api.types.is_integer_dtype(series)
+                and series.notna().all()
                 and series.gt(0).all()
-                and series.astype(float).eq(series.astype(int)).all()
-                and pd.api.types.is_integer_dtype(series)
         )
 
     @staticmethod
@@ -117,7 +121,16 @@ class IndividualColumnChecker:
 
     @staticmethod
     def are_values_with_specified_type(series: pd.Series, expected_type: type) -> bool:
-        return series.map(lambda x: type(x) is expected_type).all()
+        # numpy columns hold one type, only object columns are checked element by element
+        python_type_of_dtype_kind = IndividualColumnChecker._PYTHON_TYPE_OF_DTYPE_KIND
+        if isinstance(series.dtype, np.dtype) and series.dtype.kind in python_type_of_dtype_kind:
+            return len(series) == 0 or python_type_of_dtype_kind[series.dtype.kind] is expected_type
+        return all(type(x) is expected_type for x in series.to_numpy())
+
+    @staticmethod
+    def are_values_parsed_to_specified_type(series: pd.Series, expected_type: type) -> bool:
+        # decimals are parsed with errors coerced to nan, a value that did not parse fails here instead of raising
+        return IndividualColumnChecker.are_values_with_specified_type(series, expected_type) and series.notna().all()
 
     @staticmethod
     def are_values_positive(series: pd.Series) -> bool:
@@ -138,7 +151,7 @@ class IndividualColumnChecker:
 
     @staticmethod
     def are_values_zero_or_one(series: pd.Series) -> bool:
-        return series.isin([0, 1]).all() and series.map(lambda x: type(x) is int).all()
+        return IndividualColumnChecker.are_values_with_specified_type(series, int) and series.isin([0, 1]).all()
 
     @staticmethod
     def is_each_trade_id_bigger_by_one_than_previous(series: pd.Series) -> bool:
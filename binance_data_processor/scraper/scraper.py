@@ -1,23 +1,32 @@
 from __future__ import annotations
 
 import copy
-import io
+import functools
+import multiprocessing
 import os
-import queue
-import threading
+import time
 import zipfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import timedelta, datetime
 import boto3
 import orjson
 from alive_progress import alive_bar
 import pandas as pd
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Callable, Iterator, List
 
+from binance_data_processor.core.archive_compressor import ArchiveCompressor
+from binance_data_processor.scraper.archive_file_cache import ArchiveFileCache
+from binance_data_processor.scraper.data_quality_accumulator import DataQualityAccumulator, get_day_epoch_range
 from binance_data_processor.scraper.data_quality_checker import get_dataframe_quality_report, DataQualityChecker
 from binance_data_processor.scraper.data_quality_report import DataQualityReport
+from binance_data_processor.enums.data_quality_report_status_enum import DataQualityReportStatus
+from binance_data_processor.scraper.day_file_writer import CsvDayFileWriter, ParquetDayFileWriter, get_day_file_writer
+from binance_data_processor.scraper.stream_dataframe_decoder import StreamDataFrameDecoder
 from binance_data_processor.enums.asset_parameters import AssetParameters
 from binance_data_processor.enums.epoch_time_unit import EpochTimeUnit
+from binance_data_processor.enums.export_format_enum import ExportFormat
 from binance_data_processor.enums.market_enum import Market
 from binance_data_processor.enums.stream_type_enum import StreamType
 from binance_data_processor.core.logo import binance_archiver_logo
@@ -37,10 +46,21 @@ def download_csv_data(
         markets: list[str] | None = None,
         stream_types: list[str] | None = None,
         skip_existing: bool = True,
-        amount_of_files_to_be_downloaded_at_once: int = 10
+        amount_of_files_to_be_downloaded_at_once: int = 10,
+        zstd_dictionary_path: str | None = None,
+        workers: int = 1,
+        cache_catalog: str | None = None,
+        cache_size_limit_in_gigabytes: float = 50,
+        streaming_export: bool = False,
+        export_format: str = 'csv'
         ) -> None:
 
-    data_scraper = DataScraper(storage_connection_parameters)
+    data_scraper = DataScraper(
+        storage_connection_parameters=storage_connection_parameters,
+        zstd_dictionary_path=zstd_dictionary_path,
+        cache_catalog=cache_catalog,
+        cache_size_limit_in_gigabytes=cache_size_limit_in_gigabytes
+    )
 
     data_scraper.run(
         markets=markets,
@@ -49,29 +69,145 @@ def download_csv_data(
         date_range=date_range,
         dump_path=dump_path,
         skip_existing=skip_existing,
-        amount_of_files_to_be_downloaded_at_once=amount_of_files_to_be_downloaded_at_once
+        amount_of_files_to_be_downloaded_at_once=amount_of_files_to_be_downloaded_at_once,
+        workers=workers,
+        streaming_export=streaming_export,
+        export_format=export_format
     )
 
 
+_worker_data_scraper: DataScraper | None = None
+
+
+def _initialize_worker_data_scraper(
+        storage_client_factory: Callable[[], IClientHandler],
+        zstd_dictionary: bytes | None,
+        amount_of_files_to_be_downloaded_at_once: int,
+        export_format: ExportFormat,
+        streaming_export: bool
+) -> None:
+    global _worker_data_scraper
+
+    # every worker process owns its storage client and download pool
+    _worker_data_scraper = DataScraper.__new__(DataScraper)
+    _worker_data_scraper.storage_client_factory = storage_client_factory
+    _worker_data_scraper.storage_client = storage_client_factory()
+    _worker_data_scraper.zstd_dictionary = zstd_dictionary
+    _worker_data_scraper.amount_of_files_to_be_downloaded_at_once = amount_of_files_to_be_downloaded_at_once
+    _worker_data_scraper.download_executor = None
+    _worker_data_scraper.show_file_progress = False
+    _worker_data_scraper.export_format = export_format
+    _worker_data_scraper.streaming_export = streaming_export
+
+
+def _export_asset_parameters_in_worker(asset_parameters: AssetParameters, dump_path: str) -> DataQualityReportStatus:
+    return _worker_data_scraper._export_asset_parameters(asset_parameters=asset_parameters, dump_path=dump_path)
+
+
+class FileDownloadStream:
+    __slots__ = [
+        '_download_executor',
+        '_download',
+        '_prefetch_amount',
+        '_pending_file_names',
+        '_futures',
+        'missing_file_names'
+    ]
+
+    def __init__(
+            self,
+            download_executor: ThreadPoolExecutor,
+            download: Callable[[str], list[dict] | dict | None],
+            file_names: list[str],
+            prefetch_amount: int
+    ) -> None:
+        self._download_executor = download_executor
+        self._download = download
+        self._prefetch_amount = prefetch_amount
+        self._pending_file_names = deque(file_names)
+        self._futures: deque[tuple[str, Future]] = deque()
+        # files that could not be downloaded or decoded, the day is reported incomplete instead of silently shorter
+        self.missing_file_names: list[str] = []
+        self._submit_downloads()
+
+    def __len__(self) -> int:
+        return len(self._pending_file_names) + len(self._futures)
+
+    def __iter__(self) -> Iterator[list[dict] | dict | None]:
+        # results come back in file order, a slow file only holds back consumers, not the other downloads
+        while self._futures:
+            file_name, future = self._futures.popleft()
+            self._submit_downloads()
+            json_content = future.result()
+            if json_content is None:
+                self.missing_file_names.append(file_name)
+            yield json_content
+
+    def _submit_downloads(self) -> None:
+        # at most prefetch_amount files are downloading or waiting decoded in memory
+        while self._pending_file_names and len(self._futures) < self._prefetch_amount:
+            file_name = self._pending_file_names.popleft()
+            self._futures.append((file_name, self._download_executor.submit(self._download, file_name)))
+
+
 class DataScraper:
 
     __slots__ = [
+        'storage_client_factory',
         'storage_client',
-        'amount_of_files_to_be_downloaded_at_once'
+        'amount_of_files_to_be_downloaded_at_once',
+        'zstd_dictionary',
+        'download_executor',
+        'show_file_progress',
+        'export_format',
+        'streaming_export'
     ]
 
+    DOWNLOAD_ATTEMPTS = 3
+    DOWNLOAD_RETRY_DELAY_SECONDS = 1
+
     def __init__(
             self,
-            storage_connection_parameters
+            storage_connection_parameters,
+            zstd_dictionary_path: str | None = None,
+            cache_catalog: str | None = None,
+            cache_size_limit_in_gigabytes: float = 50
     ) -> None:
 
+        # worker processes build their own client from the same picklable factory
+        self.storage_client_factory = functools.partial(
+            DataScraper.get_storage_client,
+            storage_connection_parameters,
+            cache_catalog,
+            int(cache_size_limit_in_gigabytes * 1024 ** 3)
+        )
+        self.storage_client = self.storage_client_factory()
+
+        self.amount_of_files_to_be_downloaded_at_once = ...
+
+        self.zstd_dictionary = None
+        if zstd_dictionary_path is not None:
+            with open(zstd_dictionary_path, 'rb') as f:
+                self.zstd_dictionary = f.read()
+
+        self.download_executor = None
+        self.show_file_progress = True
+        self.export_format = ExportFormat.CSV
+        self.streaming_export = False
+
+    @staticmethod
+    def get_storage_client(
+            storage_connection_parameters: StorageConnectionParameters,
+            cache_catalog: str | None = None,
+            cache_size_limit_in_bytes: int = 50 * 1024 ** 3
+    ) -> IClientHandler:
         if storage_connection_parameters.azure_blob_parameters_with_key is not None:
-            self.storage_client = AzureClient(
+            storage_client = AzureClient(
                 blob_connection_string=storage_connection_parameters.azure_blob_parameters_with_key,
                 container_name=storage_connection_parameters.azure_container_name
             )
         elif storage_connection_parameters.backblaze_access_key_id is not None:
-            self.storage_client = BackBlazeS3Client(
+            storage_client = BackBlazeS3Client(
                 access_key_id=storage_connection_parameters.backblaze_access_key_id,
                 secret_access_key=storage_connection_parameters.backblaze_secret_access_key,
                 endpoint_url=storage_connection_parameters.backblaze_endpoint_url,
@@ -80,7 +216,13 @@ class DataScraper:
         else:
             raise ValueError('No storage specified...')
 
-        self.amount_of_files_to_be_downloaded_at_once = ...
+        if cache_catalog is None:
+            return storage_client
+
+        return CachedClient(
+            storage_client=storage_client,
+            archive_file_cache=ArchiveFileCache(cache_catalog=cache_catalog, size_limit_in_bytes=cache_size_limit_in_bytes)
+        )
 
     def run(
             self,
@@ -90,10 +232,19 @@ class DataScraper:
             date_range: list[str],
             dump_path: str | None,
             skip_existing: bool = True,
-            amount_of_files_to_be_downloaded_at_once: int = 10
+            amount_of_files_to_be_downloaded_at_once: int = 10,
+            workers: int = 1,
+            streaming_export: bool = False,
+            export_format: str = 'csv'
     ) -> None:
 
+        if workers < 1:
+            raise ValueError("workers must be greater than 0")
+
         self.amount_of_files_to_be_downloaded_at_once = amount_of_files_to_be_downloaded_at_once
+        self.export_format = ExportFormat(export_format.lower())
+        # parquet is only ever written row group by row group
+        self.streaming_export = streaming_export or self.export_format is ExportFormat.PARQUET
 
         print(f'\033[35m{binance_archiver_logo}')
 
@@ -109,18 +260,29 @@ class DataScraper:
             dump_path=dump_path,
             skip_existing=skip_existing
         )
-        amount_of_files_to_be_made = len(asset_parameters_to_be_downloaded) * len(dates_to_be_downloaded)
+        amount_of_files_to_be_made = len(asset_parameters_to_be_downloaded)
 
         print(
             f'\033[36m'
             f'ought to download {amount_of_files_to_be_made} file(s)\n'
         )
 
-        self._main_download_loop(
-            asset_parameters_list=asset_parameters_to_be_downloaded,
-            dates=dates_to_be_downloaded,
-            dump_path=dump_path
-        )
+        if workers > 1:
+            self._parallel_download_loop(
+                asset_parameters_list=asset_parameters_to_be_downloaded,
+                dump_path=dump_path,
+                workers=workers
+            )
+            print(f'\nFinished: {dump_path}')
+            return
+
+        try:
+            self._main_download_loop(
+                asset_parameters_list=asset_parameters_to_be_downloaded,
+                dump_path=dump_path
+            )
+        finally:
+            self._shutdown_download_executor()
 
         print(f'\nFinished: {dump_path}')
 
@@ -133,7 +295,10 @@ class DataScraper:
         )
 
         if skip_existing is True:
-            asset_parameters_of_existing_files = self._get_existing_files_asset_parameters_list(csv_nest=dump_path)
+            asset_parameters_of_existing_files = self._get_existing_files_asset_parameters_list(
+                csv_nest=dump_path,
+                extension=self.export_format.extension
+            )
             final_asset_parameters_to_be_downloaded = [
                 asset for asset
                 in selected_asset_parameters
@@ -168,15 +333,15 @@ class DataScraper:
         return dump_path
 
     @staticmethod
-    def _get_existing_files_asset_parameters_list(csv_nest: str) -> list[AssetParameters]:
+    def _get_existing_files_asset_parameters_list(csv_nest: str, extension: str = '.csv') -> list[AssetParameters]:
         local_files = DataQualityChecker.list_files_in_local_directory(csv_nest)
-        local_csv_file_paths = [file for file in local_files if file.lower().endswith('.csv')]
-        print(f"Found {len(local_csv_file_paths)} CSV files out of {len(local_files)} total files")
+        local_csv_file_paths = [file for file in local_files if file.lower().endswith(extension)]
+        print(f"Found {len(local_csv_file_paths)} {extension} files out of {len(local_files)} total files")
 
         found_asset_parameter_list = []
 
         for csv in local_csv_file_paths:
-            asset_parameters = DataQualityChecker.decode_asset_parameters_from_csv_name(csv)
+            asset_parameters = DataQualityChecker.decode_asset_parameters_from_csv_name(csv[:-len(extension)])
             found_asset_parameter_list.append(asset_parameters)
 
         return found_asset_parameter_list
@@ -225,55 +390,223 @@ class DataScraper:
             for date in dates
         ]
 
-    def _main_download_loop(self, asset_parameters_list: list[AssetParameters], dates: list[str], dump_path: str) -> None:
-        for date in dates:
-            for asset_parameters in asset_parameters_list:
-                print(f'Downloading: {asset_parameters}')
-                dataframe = self._get_rough_dataframe_from_cloud_storage_files_cut_to_specified_date(asset_parameters)
-                dataframe_quality_report = get_dataframe_quality_report(
-                    dataframe=dataframe,
-                    asset_parameters=asset_parameters,
-                )
-                print(f'data report status: {dataframe_quality_report.get_data_report_status().value}')
+    def _main_download_loop(self, asset_parameters_list: list[AssetParameters], dump_path: str) -> None:
+        file_download_stream = self._start_asset_file_downloads(asset_parameters_list[0]) if asset_parameters_list else None
+
+        # every asset parameters already carry their date
+        for index, asset_parameters in enumerate(asset_parameters_list):
+            print(f'Downloading: {asset_parameters}')
+            save_asset = self._prepare_asset_export(
+                asset_parameters=asset_parameters,
+                dump_path=dump_path,
+                file_download_stream=file_download_stream
+            )
+
+            # next asset files download while this one is checked and saved
+            if index + 1 < len(asset_parameters_list):
+                file_download_stream = self._start_asset_file_downloads(asset_parameters_list[index + 1])
+
+            data_report_status = save_asset()
+            print(f'data report status: {data_report_status.value}')
+
+            del save_asset
+
+    def _parallel_download_loop(self, asset_parameters_list: list[AssetParameters], dump_path: str, workers: int) -> None:
+        # json decoding holds the gil, so asset days are spread over processes instead of threads
+        process_pool_executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_initialize_worker_data_scraper,
+            initargs=(
+                self.storage_client_factory,
+                self.zstd_dictionary,
+                self.amount_of_files_to_be_downloaded_at_once,
+                self.export_format,
+                self.streaming_export
+            )
+        )
+
+        try:
+            futures = {
+                process_pool_executor.submit(_export_asset_parameters_in_worker, asset_parameters, dump_path): asset_parameters
+                for asset_parameters in asset_parameters_list
+            }
+
+            with alive_bar(len(futures), force_tty=True, spinner='dots_waves', title='') as bar:
+                for future in as_completed(futures):
+                    bar.text(f'{futures[future]} data report status: {future.result().value}')
+                    bar()
+        finally:
+            process_pool_executor.shutdown(cancel_futures=True)
+
+    def _export_asset_parameters(self, asset_parameters: AssetParameters, dump_path: str) -> DataQualityReportStatus:
+        return self._prepare_asset_export(asset_parameters=asset_parameters, dump_path=dump_path)()
+
+    def _prepare_asset_export(
+            self,
+            asset_parameters: AssetParameters,
+            dump_path: str,
+            file_download_stream: FileDownloadStream | None = None
+    ) -> Callable[[], DataQualityReportStatus]:
+        # downloads the asset and returns what is left to do, the quality report and the file save
+        if file_download_stream is None:
+            file_download_stream = self._start_asset_file_downloads(asset_parameters)
+
+        if self.streaming_export:
+            day_file_writer, data_quality_accumulator = self._write_asset_parameters_to_day_file(
+                asset_parameters=asset_parameters,
+                dump_path=dump_path,
+                file_download_stream=file_download_stream
+            )
+            return functools.partial(self._close_day_file, day_file_writer, data_quality_accumulator, file_download_stream.missing_file_names)
+
+        dataframe = self._get_rough_dataframe_from_cloud_storage_files_cut_to_specified_date(
+            asset_parameters=asset_parameters,
+            file_download_stream=file_download_stream
+        )
+        return functools.partial(
+            self._save_dataframe_with_data_quality_report,
+            dataframe=dataframe,
+            asset_parameters=asset_parameters,
+            dump_path=dump_path,
+            missing_file_names=file_download_stream.missing_file_names
+        )
 
-                # minimal_dataframe = self._get_minimal_dataframe(df=rough_dataframe_for_quality_check)
+    def _write_asset_parameters_to_day_file(
+            self,
+            asset_parameters: AssetParameters,
+            dump_path: str,
+            file_download_stream: FileDownloadStream
+    ) -> tuple[CsvDayFileWriter | ParquetDayFileWriter, DataQualityAccumulator]:
+        market = asset_parameters.market
+        columns = StreamDataFrameDecoder.COLUMNS[(asset_parameters.stream_type, market)]
+        get_columns = self._get_stream_type_columns_decoder(asset_parameters.stream_type)
+        day_start, day_end = get_day_epoch_range(asset_parameters.date, self._get_epoch_time_unit(asset_parameters))
+
+        data_quality_accumulator = DataQualityAccumulator(asset_parameters=asset_parameters)
+        day_file_writer = get_day_file_writer(
+            export_format=self.export_format,
+            dump_path=dump_path,
+            target_file_name=DataScraper._get_base_of_filename(asset_parameters=asset_parameters),
+            columns=columns
+        )
 
-                target_file_name = DataScraper._get_base_of_filename(asset_parameters=asset_parameters)
+        # one downloaded file at a time is decoded, cut to the day, checked and written
+        try:
+            for json_content in self._iterate_downloaded_json_files(file_download_stream):
+                dataframe = StreamDataFrameDecoder.get_dataframe([get_columns(json_content, market)], columns)
+                timestamps_of_receive = dataframe['TimestampOfReceive'].to_numpy()
+                dataframe = dataframe[(timestamps_of_receive >= day_start) & (timestamps_of_receive <= day_end)]
+                if dataframe.empty:
+                    continue
+
+                data_quality_accumulator.update(dataframe)
+                day_file_writer.write(dataframe)
+        except BaseException:
+            day_file_writer.abort()
+            raise
 
-                self._save_df_to_csv_with_data_quality_report(
-                    dataframe=dataframe,
-                    dataframe_quality_report=dataframe_quality_report,
-                    dump_path=dump_path,
-                    target_file_name=target_file_name
-                )
+        return day_file_writer, data_quality_accumulator
+
+    @staticmethod
+    def _close_day_file(
+            day_file_writer: CsvDayFileWriter | ParquetDayFileWriter,
+            data_quality_accumulator: DataQualityAccumulator,
+            missing_file_names: list[str]
+    ) -> DataQualityReportStatus:
+        dataframe_quality_report = data_quality_accumulator.get_data_quality_report()
+        DataScraper._add_missing_files_to_data_quality_report(dataframe_quality_report, missing_file_names)
+        day_file_writer.close(dataframe_quality_report)
+        return dataframe_quality_report.get_data_report_status()
+
+    def _save_dataframe_with_data_quality_report(
+            self,
+            dataframe: pd.DataFrame,
+            asset_parameters: AssetParameters,
+            dump_path: str,
+            missing_file_names: list[str]
+    ) -> DataQualityReportStatus:
+        dataframe_quality_report = get_dataframe_quality_report(
+            dataframe=dataframe,
+            asset_parameters=asset_parameters,
+        )
+        DataScraper._add_missing_files_to_data_quality_report(dataframe_quality_report, missing_file_names)
 
-                del dataframe_quality_report
-                del dataframe
+        # minimal_dataframe = self._get_minimal_dataframe(df=rough_dataframe_for_quality_check)
 
-    def _get_rough_dataframe_from_cloud_storage_files_cut_to_specified_date(self, asset_parameters: AssetParameters) -> pd.DataFrame:
+        target_file_name = DataScraper._get_base_of_filename(asset_parameters=asset_parameters)
+
+        self._save_df_to_csv_with_data_quality_report(
+            dataframe=dataframe,
+            dataframe_quality_report=dataframe_quality_report,
+            dump_path=dump_path,
+            target_file_name=target_file_name
+        )
+
+        return dataframe_quality_report.get_data_report_status()
+
+    @staticmethod
+    def _add_missing_files_to_data_quality_report(dataframe_quality_report: DataQualityReport, missing_file_names: list[str]) -> None:
+        dataframe_quality_report.add_test_result("GENERAL", "are_all_files_downloaded", len(missing_file_names) == 0)
+        for file_name in missing_file_names:
+            dataframe_quality_report.add_informational_data_to_report('MissingFile', file_name)
+
+    def _start_asset_file_downloads(self, asset_parameters: AssetParameters) -> FileDownloadStream:
         list_of_files_with_specified_prefixes_that_should_be_downloaded = (
             self._get_prefix_of_files_that_should_be_downloaded_for_specified_single_date(asset_parameters=asset_parameters)
         )
 
         list_of_files_to_be_downloaded = self.storage_client.list_files_with_prefixes(list_of_files_with_specified_prefixes_that_should_be_downloaded)
 
-        stream_type_download_handler = self._get_stream_type_download_handler(asset_parameters.stream_type)
-        dataframe = stream_type_download_handler(list_of_files_to_be_downloaded, asset_parameters.market)
+        return self._start_file_downloads(list_of_files_to_be_downloaded)
 
-        epoch_time_unit = (
-            EpochTimeUnit.MICROSECONDS
-            if asset_parameters.market is Market.SPOT and asset_parameters.stream_type is not StreamType.DEPTH_SNAPSHOT
-            else EpochTimeUnit.MILLISECONDS
+    def _start_file_downloads(self, list_of_files_to_be_downloaded: list[str]) -> FileDownloadStream:
+        if self.download_executor is None:
+            # one pool lives through the whole run, no thread is started per file
+            self.download_executor = ThreadPoolExecutor(
+                max_workers=self.amount_of_files_to_be_downloaded_at_once,
+                thread_name_prefix='scraper_download'
+            )
+
+        return FileDownloadStream(
+            download_executor=self.download_executor,
+            download=self.download_json_file,
+            file_names=list_of_files_to_be_downloaded,
+            prefetch_amount=2 * self.amount_of_files_to_be_downloaded_at_once
         )
 
+    def _shutdown_download_executor(self) -> None:
+        if self.download_executor is not None:
+            self.download_executor.shutdown(cancel_futures=True)
+            self.download_executor = None
+
+    def _get_rough_dataframe_from_cloud_storage_files_cut_to_specified_date(
+            self,
+            asset_parameters: AssetParameters,
+            file_download_stream: FileDownloadStream | None = None
+    ) -> pd.DataFrame:
+        if file_download_stream is None:
+            file_download_stream = self._start_asset_file_downloads(asset_parameters)
+
+        stream_type_download_handler = self._get_stream_type_download_handler(asset_parameters.stream_type)
+        dataframe = stream_type_download_handler(file_download_stream, asset_parameters.market)
+
         dataframe = self._cut_dataframe_to_the_range_of_single_day(
             dataframe=dataframe,
             target_day=asset_parameters.date,
-            epoch_time_unit=epoch_time_unit
+            epoch_time_unit=self._get_epoch_time_unit(asset_parameters)
         )
 
         return dataframe
 
+    @staticmethod
+    def _get_epoch_time_unit(asset_parameters: AssetParameters) -> EpochTimeUnit:
+        return (
+            EpochTimeUnit.MICROSECONDS
+            if asset_parameters.market is Market.SPOT and asset_parameters.stream_type is not StreamType.DEPTH_SNAPSHOT
+            else EpochTimeUnit.MILLISECONDS
+        )
+
     @staticmethod
     def _save_df_to_csv_with_data_quality_report(dataframe: pd.DataFrame, dump_path: str, target_file_name: str,dataframe_quality_report: DataQualityReport) -> None:
         with open(f'{dump_path}/{target_file_name}.csv', 'w', newline='') as f:
@@ -283,12 +616,7 @@ class DataScraper:
 
     @staticmethod
     def _cut_dataframe_to_the_range_of_single_day(dataframe: pd.DataFrame, target_day: str, epoch_time_unit: EpochTimeUnit = EpochTimeUnit.MILLISECONDS) -> pd.DataFrame:
-        date_obj = datetime.strptime(target_day, '%d-%m-%Y')
-        start_time = pd.Timestamp(date_obj, tz='UTC')
-
-        start_epoch = int(start_time.timestamp() * epoch_time_unit.multiplier_of_second)
-        end_time = start_time + pd.Timedelta(days=1) - pd.Timedelta(value=1, unit=epoch_time_unit.value)
-        end_epoch = int(end_time.timestamp() * epoch_time_unit.multiplier_of_second)
+        start_epoch, end_epoch = get_day_epoch_range(target_day, epoch_time_unit)
 
         return dataframe[
             (dataframe['TimestampOfReceive'] >= start_epoch) &
@@ -333,455 +661,83 @@ class DataScraper:
         }
         return handler_lookup[stream_type]
 
-    def _difference_depth_stream_download_handler(self, list_of_file_to_be_downloaded: list[str], market: Market) -> pd.DataFrame:
-
-        len_of_files_to_be_downloaded = len(list_of_file_to_be_downloaded)
-
-        records = []
-        with alive_bar(len_of_files_to_be_downloaded, force_tty=True, spinner='dots_waves', title='') as bar:
-            for i in range(0, len_of_files_to_be_downloaded, self.amount_of_files_to_be_downloaded_at_once):
-                batch = list_of_file_to_be_downloaded[i:i + self.amount_of_files_to_be_downloaded_at_once]
-                result_queue = queue.Queue()
-                threads_list = []
-
-                for idx, file_name in enumerate(batch, start=i):
-                    thread = threading.Thread(target=self.download_file_and_put_json_into_queue, args=(file_name, result_queue, idx))
-                    threads_list.append(thread)
-                    thread.start()
-
-                for thread in threads_list:
-                    thread.join()
-
-                batch_results = [result_queue.get() for _ in range(len(batch))]
-                batch_results.sort(key=lambda x: x[0])
-
-                for index, json_dict in batch_results:
-                    for record in json_dict:
-
-                        stream = record["stream"]
-                        event_type = record["data"]["e"]
-                        event_time = record["data"]["E"]
-
-                        if market in [Market.USD_M_FUTURES, Market.COIN_M_FUTURES]:
-                            transaction_time = record["data"]["T"]
-                            final_update_id_in_last_stream = record["data"]["pu"]
-                        if market == Market.COIN_M_FUTURES:
-                            ps_unknown_field_coin_m_diff_depth_only = record["data"]["ps"]
-
-                        symbol = record["data"]["s"]
-                        first_update = record["data"]["U"]
-                        final_update = record["data"]["u"]
-                        bids = record["data"]["b"]
-                        asks = record["data"]["a"]
-                        timestamp_of_receive = record["_E"]
-
-                        if market == Market.USD_M_FUTURES:
-                            for bid in bids:
-                                records.append(
-                                    [
-                                        timestamp_of_receive,
-                                        stream,
-                                        event_type,
-                                        event_time,
-                                        transaction_time,
-                                        symbol,
-                                        first_update,
-                                        final_update,
-                                        final_update_id_in_last_stream,
-                                        0,
-                                        str(bid[0]),
-                                        str(bid[1])
-                                    ]
-                                )
-                            for ask in asks:
-                                records.append(
-                                    [
-                                        timestamp_of_receive,
-                                        stream,
-                                        event_type,
-                                        event_time,
-                                        transaction_time,
-                                        symbol,
-                                        first_update,
-                                        final_update,
-                                        final_update_id_in_last_stream,
-                                        1,
-                                        str(ask[0]),
-                                        str(ask[1]),
-                                    ]
-                                )
-                        elif market == Market.COIN_M_FUTURES:
-                            for bid in bids:
-                                records.append(
-                                    [
-                                        timestamp_of_receive,
-                                        stream,
-                                        event_type,
-                                        event_time,
-                                        transaction_time,
-                                        symbol,
-                                        first_update,
-                                        final_update,
-                                        final_update_id_in_last_stream,
-                                        0,
-                                        str(bid[0]),
-                                        str(bid[1]),
-                                        ps_unknown_field_coin_m_diff_depth_only
-                                    ]
-                                )
-                            for ask in asks:
-                                records.append(
-                                    [
-                                        timestamp_of_receive,
-                                        stream,
-                                        event_type,
-                                        event_time,
-                                        transaction_time,
-                                        symbol,
-                                        first_update,
-                                        final_update,
-                                        final_update_id_in_last_stream,
-                                        1,
-                                        str(ask[0]),
-                                        str(ask[1]),
-                                        ps_unknown_field_coin_m_diff_depth_only
-                                    ]
-                                )
-                        elif market == Market.SPOT:
-                            for bid in bids:
-                                records.append(
-                                    [
-                                        timestamp_of_receive,
-                                        stream,
-                                        event_type,
-                                        event_time,
-                                        symbol,
-                                        first_update,
-                                        final_update,
-                                        0,
-                                        str(bid[0]),
-                                        str(bid[1])
-                                    ]
-                                )
-                            for ask in asks:
-                                records.append(
-                                    [
-                                        timestamp_of_receive,
-                                        stream,
-                                        event_type,
-                                        event_time,
-                                        symbol,
-                                        first_update,
-                                        final_update,
-                                        1,
-                                        str(ask[0]),
-                                        str(ask[1]),
-                                    ]
-                                )
-                    bar()
-
-        if market == Market.SPOT:
-            columns = [
-                "TimestampOfReceive",
-                "Stream",
-                "EventType",
-                "EventTime",
-                "Symbol",
-                "FirstUpdateId",
-                "FinalUpdateId",
-                "IsAsk",
-                "Price",
-                "Quantity"
-            ]
-        elif market == Market.USD_M_FUTURES:
-            columns = [
-                "TimestampOfReceive",
-                "Stream",
-                "EventType",
-                "EventTime",
-                "TransactionTime",
-                "Symbol",
-                "FirstUpdateId",
-                "FinalUpdateId",
-                "FinalUpdateIdInLastStream",
-                "IsAsk",
-                "Price",
-                "Quantity"
-            ]
-        elif market == Market.COIN_M_FUTURES:
-            columns = [
-                "TimestampOfReceive",
-                "Stream",
-                "EventType",
-                "EventTime",
-                "TransactionTime",
-                "Symbol",
-                "FirstUpdateId",
-                "FinalUpdateId",
-                "FinalUpdateIdInLastStream",
-                "IsAsk",
-                "Price",
-                "Quantity",
-                "PSUnknownField"
-            ]
+    @staticmethod
+    def _get_stream_type_columns_decoder(stream_type: StreamType) -> Callable[[list[dict] | dict, Market], dict]:
+        decoder_lookup = {
+            StreamType.DIFFERENCE_DEPTH_STREAM: StreamDataFrameDecoder.get_difference_depth_columns,
+            StreamType.TRADE_STREAM: StreamDataFrameDecoder.get_trade_columns,
+            StreamType.DEPTH_SNAPSHOT: StreamDataFrameDecoder.get_depth_snapshot_columns
+        }
+        return decoder_lookup[stream_type]
 
-        return pd.DataFrame(data=records, columns=columns)
-
-    def _trade_stream_type_download_handler(self, list_of_file_to_be_downloaded: list[str], market: Market) -> pd.DataFrame:
-
-        len_of_files_to_be_downloaded = len(list_of_file_to_be_downloaded)
-
-        records = []
-        with alive_bar(len_of_files_to_be_downloaded, force_tty=True, spinner='dots_waves', title='') as bar:
-            for i in range(0, len_of_files_to_be_downloaded, self.amount_of_files_to_be_downloaded_at_once):
-                batch = list_of_file_to_be_downloaded[i:i + self.amount_of_files_to_be_downloaded_at_once]
-                result_queue = queue.Queue()
-                threads_list = []
-
-                for idx, file_name in enumerate(batch, start=i):
-                    thread = threading.Thread(target=self.download_file_and_put_json_into_queue,
-                                              args=(file_name, result_queue, idx))
-                    threads_list.append(thread)
-                    thread.start()
-
-                for thread in threads_list:
-                    thread.join()
-
-                batch_results = [result_queue.get() for _ in range(len(batch))]
-                batch_results.sort(key=lambda x: x[0])
-
-                for index, json_dict in batch_results:
-                    for record in json_dict:
-                        stream = record["stream"]
-                        event_type = record["data"]["e"]
-                        event_time = record["data"]["E"]
-                        transaction_time = record["data"]["T"]
-                        symbol = record["data"]["s"]
-                        trade_id = record["data"]["t"]
-                        price = str(record["data"]["p"])
-                        quantity = str(record["data"]["q"])
-                        # seller_order_id = record["data"]["a"] if "a" in record["data"] else None # what the fuck was that?
-                        # buyer_order_id = record["data"]["b"] if "b" in record["data"] else None # what the fuck was that?
-                        is_buyer_market_maker = int(record["data"]["m"])
-                        timestamp_of_receive = record["_E"]
-
-                        if market == Market.SPOT:
-                            large_m_unknown_parameter = record["data"]["M"]
-
-                        if market in [Market.USD_M_FUTURES, Market.COIN_M_FUTURES]:
-                            large_x_unknown_parameter = record["data"]["X"]
-
-                        if market == Market.SPOT:
-                            records.append(
-                                [
-                                    timestamp_of_receive,
-                                    stream,
-                                    event_type,
-                                    event_time,
-                                    transaction_time,
-                                    symbol,
-                                    trade_id,
-                                    price,
-                                    quantity,
-                                    is_buyer_market_maker,
-                                    large_m_unknown_parameter
-                                ]
-                            )
-                        elif market in [Market.USD_M_FUTURES, Market.COIN_M_FUTURES]:
-                            records.append(
-                                [
-                                    timestamp_of_receive,
-                                    stream,
-                                    event_type,
-                                    event_time,
-                                    transaction_time,
-                                    symbol,
-                                    trade_id,
-                                    price,
-                                    quantity,
-                                    is_buyer_market_maker,
-                                    large_x_unknown_parameter
-                                ]
-                            )
+    def _difference_depth_stream_download_handler(self, file_download_stream: FileDownloadStream, market: Market) -> pd.DataFrame:
+        column_chunks = [
+            StreamDataFrameDecoder.get_difference_depth_columns(records, market)
+            for records in self._iterate_downloaded_json_files(file_download_stream)
+        ]
+        return StreamDataFrameDecoder.get_dataframe(
+            column_chunks,
+            StreamDataFrameDecoder.COLUMNS[(StreamType.DIFFERENCE_DEPTH_STREAM, market)]
+        )
 
-                    bar()
+    def _trade_stream_type_download_handler(self, file_download_stream: FileDownloadStream, market: Market) -> pd.DataFrame:
+        column_chunks = [
+            StreamDataFrameDecoder.get_trade_columns(records, market)
+            for records in self._iterate_downloaded_json_files(file_download_stream)
+        ]
+        return StreamDataFrameDecoder.get_dataframe(
+            column_chunks,
+            StreamDataFrameDecoder.COLUMNS[(StreamType.TRADE_STREAM, market)]
+        )
 
-            columns = []
-
-            if market == Market.SPOT:
-                columns = [
-                    "TimestampOfReceive",
-                    "Stream",
-                    "EventType",
-                    "EventTime",
-                    "TransactionTime",
-                    "Symbol",
-                    "TradeId",
-                    "Price",
-                    "Quantity",
-                    "IsBuyerMarketMaker",
-                    "MUnknownParameter"
-                ]
-            elif market in [Market.USD_M_FUTURES, Market.COIN_M_FUTURES]:
-                columns = [
-                    "TimestampOfReceive",
-                    "Stream",
-                    "EventType",
-                    "EventTime",
-                    "TransactionTime",
-                    "Symbol",
-                    "TradeId",
-                    "Price",
-                    "Quantity",
-                    "IsBuyerMarketMaker",
-                    "XUnknownParameter"
-                ]
-
-            return pd.DataFrame(data=records, columns=columns)
-
-    def _depth_snapshot_stream_type_download_handler(self, list_of_file_to_be_downloaded: list[str], market: Market) -> pd.DataFrame:
-        len_of_files_to_be_downloaded = len(list_of_file_to_be_downloaded)
-
-        records = []
-        with alive_bar(len_of_files_to_be_downloaded, force_tty=True, spinner='dots_waves', title='') as bar:
-            for i in range(0, len_of_files_to_be_downloaded, self.amount_of_files_to_be_downloaded_at_once):
-                batch = list_of_file_to_be_downloaded[i:i + self.amount_of_files_to_be_downloaded_at_once]
-                result_queue = queue.Queue()
-                threads_list = []
-
-                for idx, file_name in enumerate(batch, start=i):
-                    thread = threading.Thread(target=self.download_file_and_put_json_into_queue,
-                                              args=(file_name, result_queue, idx))
-                    threads_list.append(thread)
-                    thread.start()
-
-                for thread in threads_list:
-                    thread.join()
-
-                batch_results = [result_queue.get() for _ in range(len(batch))]
-                batch_results.sort(key=lambda x: x[0])
-
-                for index, json_dict in batch_results:
-                    record = json_dict
-                    last_update_id = record["lastUpdateId"]
-
-                    if market in [Market.USD_M_FUTURES, Market.COIN_M_FUTURES]:
-                        message_output_time = record["E"]
-                        transaction_time = record["T"]
-                    if market is Market.COIN_M_FUTURES:
-                        symbol = record['symbol']
-                        pair = record['pair']
-
-                    snapshot_request_timestamp = record["_rq"]
-                    snapshot_receive_timestamp = record["_rc"]
-
-                    if market is Market.SPOT:
-                        for side in ['bids', 'asks']:
-                            for price_level in record[side]:
-                                is_ask = 0 if side == 'bids' else 1
-                                records.append(
-                                    [
-                                        snapshot_receive_timestamp,
-                                        snapshot_request_timestamp,
-                                        last_update_id,
-                                        is_ask,
-                                        str(price_level[0]),
-                                        str(price_level[1])
-                                    ]
-                                )
-                    if market is Market.USD_M_FUTURES:
-                        for side in ['bids', 'asks']:
-                            for price_level in record[side]:
-                                is_ask = 0 if side == 'bids' else 1
-                                records.append(
-                                    [
-                                        snapshot_receive_timestamp,
-                                        snapshot_request_timestamp,
-                                        message_output_time,
-                                        transaction_time,
-                                        last_update_id,
-                                        is_ask,
-                                        str(price_level[0]),
-                                        str(price_level[1])
-                                    ]
-                                )
-                    if market is Market.COIN_M_FUTURES:
-                        for side in ['bids', 'asks']:
-                            for price_level in record[side]:
-                                is_ask = 0 if side == 'bids' else 1
-                                records.append(
-                                    [
-                                        snapshot_receive_timestamp,
-                                        snapshot_request_timestamp,
-                                        message_output_time,
-                                        transaction_time,
-                                        last_update_id,
-                                        symbol,
-                                        pair,
-                                        is_ask,
-                                        str(price_level[0]),
-                                        str(price_level[1])
-                                    ]
-                                )
-                    bar()
+    def _depth_snapshot_stream_type_download_handler(self, file_download_stream: FileDownloadStream, market: Market) -> pd.DataFrame:
+        column_chunks = [
+            StreamDataFrameDecoder.get_depth_snapshot_columns(snapshot, market)
+            for snapshot in self._iterate_downloaded_json_files(file_download_stream)
+        ]
+        return StreamDataFrameDecoder.get_dataframe(
+            column_chunks,
+            StreamDataFrameDecoder.COLUMNS[(StreamType.DEPTH_SNAPSHOT, market)]
+        )
 
-        if market == Market.SPOT:
-            columns = [
-                "TimestampOfReceive",
-                "TimestampOfRequest",
-                "LastUpdateId",
-                "IsAsk",
-                "Price",
-                "Quantity"
-            ]
-        elif market == Market.USD_M_FUTURES:
-            columns = [
-                "TimestampOfReceive",
-                "TimestampOfRequest",
-                "MessageOutputTime",
-                "TransactionTime",
-                "LastUpdateId",
-                "IsAsk",
-                "Price",
-                "Quantity"
-            ]
-        elif market == Market.COIN_M_FUTURES:
-            columns = [
-                "TimestampOfReceive",
-                "TimestampOfRequest",
-                "MessageOutputTime",
-                "TransactionTime",
-                "LastUpdateId",
-                "Symbol",
-                "Pair",
-                "IsAsk",
-                "Price",
-                "Quantity"
-            ]
+    def _iterate_downloaded_json_files(self, file_download_stream: FileDownloadStream) -> Iterator[list[dict] | dict]:
+        # worker processes share one bar in the parent, per file bars would interleave
+        if not self.show_file_progress:
+            yield from (json_content for json_content in file_download_stream if json_content is not None)
+            return
+
+        with alive_bar(len(file_download_stream), force_tty=True, spinner='dots_waves', title='') as bar:
+            for json_content in file_download_stream:
+                # files that failed to download or decode are recorded as missing by the stream
+                if json_content is not None:
+                    yield json_content
+                bar()
+
+    def download_json_file(self, file_name: str) -> list[dict] | dict | None:
+        # runs in the download pool, decompression and parsing overlap with other downloads
+        for attempt in range(1, self.DOWNLOAD_ATTEMPTS + 1):
+            try:
+                response = self.storage_client.read_file(file_name=file_name)
+            except Exception as e:
+                print(f"Error downloading {file_name}: {e}")
+                if attempt < self.DOWNLOAD_ATTEMPTS:
+                    time.sleep(self.DOWNLOAD_RETRY_DELAY_SECONDS * attempt)
+                continue
 
-        return pd.DataFrame(data=records, columns=columns)
+            # a downloaded archive that does not decode stays corrupt, downloading it again does not help
+            json_content = self._convert_cloud_storage_response_to_json(response, self.zstd_dictionary)
+            if json_content is None:
+                print(f"Could not decode {file_name}, it is reported as missing")
+            return json_content
 
-    def download_file_and_put_json_into_queue(self, file_name: str, result_queue: queue.Queue, index: int) -> None:
-        try:
-            response = self.storage_client.read_file(file_name=file_name)
-            json_dict = self._convert_cloud_storage_response_to_json(response)
-            result_queue.put((index, json_dict))
-        except Exception as e:
-            print(f"Error downloading {file_name}: {e}")
-            result_queue.put((index, None))
+        print(f"Giving up on {file_name} after {self.DOWNLOAD_ATTEMPTS} attempts, it is reported as missing")
+        return None
 
     @staticmethod
-    def _convert_cloud_storage_response_to_json(storage_response: bytes) -> list[dict] | None:
+    def _convert_cloud_storage_response_to_json(storage_response: bytes, zstd_dictionary: bytes | None = None) -> list[dict] | None:
         try:
-            with zipfile.ZipFile(io.BytesIO(storage_response)) as z:
-                for file_name in z.namelist():
-                    if file_name.endswith('.json'):
-                        with z.open(file_name) as json_file:
-                            json_bytes = json_file.read()
-                            json_content = orjson.loads(json_bytes)
-                            return json_content
-
-            print("file .json not found in archive")
+            json_bytes = ArchiveCompressor.decompress(storage_response, zstd_dictionary=zstd_dictionary)
+            return orjson.loads(json_bytes)
         except zipfile.BadZipFile:
             print("bad zip file")
             return None
@@ -804,10 +760,14 @@ class IClientHandler(ABC):
     def read_file(self, file_name) -> bytes:
         pass
 
+    def get_file_etag(self, file_name: str) -> str | None:
+        # etag seen when the file was listed, None when the storage does not report one
+        return None
+
 
 class BackBlazeS3Client(IClientHandler):
 
-    __slots__ = ['_bucket_name', 's3_client']
+    __slots__ = ['_bucket_name', 's3_client', '_etags']
 
     def __init__(
             self,
@@ -818,6 +778,7 @@ class BackBlazeS3Client(IClientHandler):
     ) -> None:
 
         self._bucket_name = bucket_name
+        self._etags: dict[str, str] = {}
 
         self.s3_client = boto3.client(
             service_name='s3',
@@ -842,6 +803,7 @@ class BackBlazeS3Client(IClientHandler):
                     if 'Contents' in page:
                         for obj in page['Contents']:
                             files.append(obj['Key'])
+                            self._etags[obj['Key']] = obj['ETag']
 
                 if files:
                     # print(f"Found {len(files)} files with '{prefix}' prefix in '{self._bucket_name}' bucket")
@@ -859,6 +821,9 @@ class BackBlazeS3Client(IClientHandler):
         response = self.s3_client.get_object(Bucket=self._bucket_name, Key=file_name)
         return response['Body'].read()
 
+    def get_file_etag(self, file_name: str) -> str | None:
+        return self._etags.get(file_name)
+
 
 class AzureClient(IClientHandler):
     __slots__ = ()
@@ -875,3 +840,30 @@ class AzureClient(IClientHandler):
 
     def read_file(self, file_name) -> None:
         ...
+
+
+class CachedClient(IClientHandler):
+    __slots__ = ['storage_client', 'archive_file_cache']
+
+    def __init__(self, storage_client: IClientHandler, archive_file_cache: ArchiveFileCache) -> None:
+        self.storage_client = storage_client
+        self.archive_file_cache = archive_file_cache
+
+    def list_files_with_prefixes(self, prefixes: str | list[str]) -> list[str]:
+        # listing is cheap and brings fresh etags, so it always goes to the storage
+        return self.storage_client.list_files_with_prefixes(prefixes)
+
+    def read_file(self, file_name) -> bytes:
+        etag = self.storage_client.get_file_etag(file_name)
+        if etag is None:
+            return self.storage_client.read_file(file_name)
+
+        content = self.archive_file_cache.get(file_name, etag)
+        if content is None:
+            content = self.storage_client.read_file(file_name)
+            self.archive_file_cache.put(file_name, etag, content)
+
+        return content
+
+    def get_file_etag(self, file_name: str) -> str | None:
+        return self.storage_client.get_file_etag(file_name)
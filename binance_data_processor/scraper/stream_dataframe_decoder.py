@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+from binance_data_processor.enums.market_enum import Market
+from binance_data_processor.enums.stream_type_enum import StreamType
+
+
+class StreamDataFrameDecoder:
+    __slots__ = ()
+
+    COLUMNS = {
+        (StreamType.DIFFERENCE_DEPTH_STREAM, Market.SPOT): [
+            "TimestampOfReceive",
+            "Stream",
+            "EventType",
+            "EventTime",
+            "Symbol",
+            "FirstUpdateId",
+            "FinalUpdateId",
+            "IsAsk",
+            "Price",
+            "Quantity"
+        ],
+        (StreamType.DIFFERENCE_DEPTH_STREAM, Market.USD_M_FUTURES): [
+            "TimestampOfReceive",
+            "Stream",
+            "EventType",
+            "EventTime",
+            "TransactionTime",
+            "Symbol",
+            "FirstUpdateId",
+            "FinalUpdateId",
+            "FinalUpdateIdInLastStream",
+            "IsAsk",
+            "Price",
+            "Quantity"
+        ],
+        (StreamType.DIFFERENCE_DEPTH_STREAM, Market.COIN_M_FUTURES): [
+            "TimestampOfReceive",
+            "Stream",
+            "EventType",
+            "EventTime",
+            "TransactionTime",
+            "Symbol",
+            "FirstUpdateId",
+            "FinalUpdateId",
+            "FinalUpdateIdInLastStream",
+            "IsAsk",
+            "Price",
+            "Quantity",
+            "PSUnknownField"
+        ],
+        (StreamType.TRADE_STREAM, Market.SPOT): [
+            "TimestampOfReceive",
+            "Stream",
+            "EventType",
+            "EventTime",
+            "TransactionTime",
+            "Symbol",
+            "TradeId",
+            "Price",
+            "Quantity",
+            "IsBuyerMarketMaker",
+            "MUnknownParameter"
+        ],
+        (StreamType.TRADE_STREAM, Market.USD_M_FUTURES): [
+            "TimestampOfReceive",
+            "Stream",
+            "EventType",
+            "EventTime",
+            "TransactionTime",
+            "Symbol",
+            "TradeId",
+            "Price",
+            "Quantity",
+            "IsBuyerMarketMaker",
+            "XUnknownParameter"
+        ],
+        (StreamType.TRADE_STREAM, Market.COIN_M_FUTURES): [
+            "TimestampOfReceive",
+            "Stream",
+            "EventType",
+            "EventTime",
+            "TransactionTime",
+            "Symbol",
+            "TradeId",
+            "Price",
+            "Quantity",
+            "IsBuyerMarketMaker",
+            "XUnknownParameter"
+        ],
+        (StreamType.DEPTH_SNAPSHOT, Market.SPOT): [
+            "TimestampOfReceive",
+            "TimestampOfRequest",
+            "LastUpdateId",
+            "IsAsk",
+            "Price",
+            "Quantity"
+        ],
+        (StreamType.DEPTH_SNAPSHOT, Market.USD_M_FUTURES): [
+            "TimestampOfReceive",
+            "TimestampOfRequest",
+            "MessageOutputTime",
+            "TransactionTime",
+            "LastUpdateId",
+            "IsAsk",
+            "Price",
+            "Quantity"
+        ],
+        (StreamType.DEPTH_SNAPSHOT, Market.COIN_M_FUTURES): [
+            "TimestampOfReceive",
+            "TimestampOfRequest",
+            "MessageOutputTime",
+            "TransactionTime",
+            "LastUpdateId",
+            "Symbol",
+            "Pair",
+            "IsAsk",
+            "Price",
+            "Quantity"
+        ]
+    }
+
+    # (column, json field) of per message values, repeated for every price level of the message
+    _DIFFERENCE_DEPTH_FIELDS = {
+        Market.SPOT: [
+            ("EventTime", "E"),
+            ("FirstUpdateId", "U"),
+            ("FinalUpdateId", "u")
+        ],
+        Market.USD_M_FUTURES: [
+            ("EventTime", "E"),
+            ("TransactionTime", "T"),
+            ("FirstUpdateId", "U"),
+            ("FinalUpdateId", "u"),
+            ("FinalUpdateIdInLastStream", "pu")
+        ]
+    }
+    _DIFFERENCE_DEPTH_FIELDS[Market.COIN_M_FUTURES] = _DIFFERENCE_DEPTH_FIELDS[Market.USD_M_FUTURES]
+
+    _DIFFERENCE_DEPTH_TEXT_FIELDS = {
+        Market.SPOT: [
+            ("EventType", "e"),
+            ("Symbol", "s")
+        ],
+        Market.USD_M_FUTURES: [
+            ("EventType", "e"),
+            ("Symbol", "s")
+        ],
+        Market.COIN_M_FUTURES: [
+            ("EventType", "e"),
+            ("Symbol", "s"),
+            ("PSUnknownField", "ps")
+        ]
+    }
+
+    @staticmethod
+    def get_dataframe(column_chunks: list[dict[str, np.ndarray]], columns: list[str]) -> pd.DataFrame:
+        if not column_chunks:
+            return pd.DataFrame(columns=columns)
+
+        return pd.DataFrame(
+            {column: np.concatenate([chunk[column] for chunk in column_chunks]) for column in columns},
+            columns=columns
+        )
+
+    @staticmethod
+    def get_difference_depth_columns(records: list[dict], market: Market) -> dict[str, np.ndarray]:
+        data = [record["data"] for record in records]
+        rows_per_record, is_ask, price, quantity = StreamDataFrameDecoder._flatten_price_levels(
+            bids=[d["b"] for d in data],
+            asks=[d["a"] for d in data]
+        )
+
+        columns = {
+            "TimestampOfReceive": np.repeat(StreamDataFrameDecoder._get_int_array(records, "_E"), rows_per_record),
+            "Stream": np.repeat(StreamDataFrameDecoder._get_object_array(records, "stream"), rows_per_record),
+            "IsAsk": is_ask,
+            "Price": price,
+            "Quantity": quantity
+        }
+        for column, field in StreamDataFrameDecoder._DIFFERENCE_DEPTH_FIELDS[market]:
+            columns[column] = np.repeat(StreamDataFrameDecoder._get_int_array(data, field), rows_per_record)
+        for column, field in StreamDataFrameDecoder._DIFFERENCE_DEPTH_TEXT_FIELDS[market]:
+            columns[column] = np.repeat(StreamDataFrameDecoder._get_object_array(data, field), rows_per_record)
+
+        return columns
+
+    @staticmethod
+    def get_trade_columns(records: list[dict], market: Market) -> dict[str, np.ndarray]:
+        data = [record["data"] for record in records]
+
+        columns = {
+            "TimestampOfReceive": StreamDataFrameDecoder._get_int_array(records, "_E"),
+            "Stream": StreamDataFrameDecoder._get_object_array(records, "stream"),
+            "EventType": StreamDataFrameDecoder._get_object_array(data, "e"),
+            "EventTime": StreamDataFrameDecoder._get_int_array(data, "E"),
+            "TransactionTime": StreamDataFrameDecoder._get_int_array(data, "T"),
+            "Symbol": StreamDataFrameDecoder._get_object_array(data, "s"),
+            "TradeId": StreamDataFrameDecoder._get_int_array(data, "t"),
+            "Price": StreamDataFrameDecoder._get_object_array(data, "p"),
+            "Quantity": StreamDataFrameDecoder._get_object_array(data, "q"),
+            "IsBuyerMarketMaker": StreamDataFrameDecoder._get_int_array(data, "m")
+        }
+        if market is Market.SPOT:
+            columns["MUnknownParameter"] = np.fromiter((d["M"] for d in data), dtype=bool, count=len(data))
+        else:
+            columns["XUnknownParameter"] = StreamDataFrameDecoder._get_object_array(data, "X")
+
+        return columns
+
+    @staticmethod
+    def get_depth_snapshot_columns(snapshot: dict, market: Market) -> dict[str, np.ndarray]:
+        rows_per_record, is_ask, price, quantity = StreamDataFrameDecoder._flatten_price_levels(
+            bids=[snapshot["bids"]],
+            asks=[snapshot["asks"]]
+        )
+        rows_amount = int(rows_per_record.sum())
+
+        columns = {
+            "TimestampOfReceive": np.full(rows_amount, snapshot["_rc"], dtype=np.int64),
+            "TimestampOfRequest": np.full(rows_amount, snapshot["_rq"], dtype=np.int64),
+            "LastUpdateId": np.full(rows_amount, snapshot["lastUpdateId"], dtype=np.int64),
+            "IsAsk": is_ask,
+            "Price": price,
+            "Quantity": quantity
+        }
+        if market in [Market.USD_M_FUTURES, Market.COIN_M_FUTURES]:
+            columns["MessageOutputTime"] = np.full(rows_amount, snapshot["E"], dtype=np.int64)
+            columns["TransactionTime"] = np.full(rows_amount, snapshot["T"], dtype=np.int64)
+        if market is Market.COIN_M_FUTURES:
+            columns["Symbol"] = np.full(rows_amount, snapshot["symbol"], dtype=object)
+            columns["Pair"] = np.full(rows_amount, snapshot["pair"], dtype=object)
+
+        return columns
+
+    @staticmethod
+    def _flatten_price_levels(
+            bids: list[list[list[str]]],
+            asks: list[list[list[str]]]
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        records_amount = len(bids)
+
+        # bids and asks of every record alternate, so one repeat lays out the IsAsk column
+        side_level_counts = np.empty(2 * records_amount, dtype=np.int64)
+        side_level_counts[0::2] = np.fromiter(map(len, bids), dtype=np.int64, count=records_amount)
+        side_level_counts[1::2] = np.fromiter(map(len, asks), dtype=np.int64, count=records_amount)
+
+        rows_per_record = side_level_counts[0::2] + side_level_counts[1::2]
+        is_ask = np.repeat(np.tile(np.array([0, 1], dtype=np.int64), records_amount), side_level_counts)
+
+        # numpy copies the [price, quantity] pairs in C, no python row is built per level
+        levels = np.array(list(chain.from_iterable(map(chain, bids, asks))), dtype=object).reshape(-1, 2)
+
+        return rows_per_record, is_ask, levels[:, 0], levels[:, 1]
+
+    @staticmethod
+    def _get_int_array(items: list[dict], field: str) -> np.ndarray:
+        return np.fromiter((item[field] for item in items), dtype=np.int64, count=len(items))
+
+    @staticmethod
+    def _get_object_array(items: list[dict], field: str) -> np.ndarray:
+        array = np.empty(len(items), dtype=object)
+        array[:] = [item[field] for item in items]
+        return array
@@ -0,0 +1,110 @@
+import io
+import os
+import zipfile
+
+import orjson
+import pytest
+
+from binance_data_processor.core.archive_compressor import ArchiveCompressor
+from binance_data_processor.core.pair_file_sink import PairFileSink
+from binance_data_processor.enums.compression_codec_enum import CompressionCodec
+from binance_data_processor.enums.compression_settings import CompressionSettings
+from binance_data_processor.scraper.scraper import DataScraper
+
+
+SAMPLE_JSON_CONTENT = (
+    '[{"stream":"btcusdt@trade","data":{"e":"trade","E":1741748001573,"s":"BTCUSDT","t":1,"p":"83000.01","q":"0.002"},"_E":1741748001578},'
+    '{"stream":"btcusdt@trade","data":{"e":"trade","E":1741748001574,"s":"BTCUSDT","t":2,"p":"83000.02","q":"0.001"},"_E":1741748001579}]'
+)
+
+FILE_NAME = 'binance_trade_stream_spot_btcusdt_01-01-2022T00-00-00Z'
+
+
+def get_archive_compressor(codec: CompressionCodec, **kwargs) -> ArchiveCompressor:
+    if codec is CompressionCodec.ZSTD:
+        pytest.importorskip('zstandard')
+    if codec is CompressionCodec.LZ4:
+        pytest.importorskip('lz4')
+    return ArchiveCompressor(CompressionSettings(codec=codec, **kwargs))
+
+
+class TestArchiveCompressor:
+
+    def test_given_compression_settings_from_string_when_initializing_then_codec_and_default_level_are_set(self):
+        compression_settings = CompressionSettings(codec='GZIP')
+
+        assert compression_settings.codec is CompressionCodec.GZIP
+        assert compression_settings.level == 6
+
+    def test_given_invalid_codec_when_initializing_compression_settings_then_exception_is_thrown(self):
+        with pytest.raises(ValueError) as excinfo:
+            CompressionSettings(codec='brotli')
+
+        assert str(excinfo.value) == "Invalid compression codec value: brotli"
+
+    def test_given_default_compression_settings_when_compressing_then_archive_is_legacy_level_9_zip(self):
+        archive_compressor = ArchiveCompressor()
+
+        payload = archive_compressor.compress(SAMPLE_JSON_CONTENT, FILE_NAME)
+
+        assert archive_compressor.file_extension == 'zip'
+        with zipfile.ZipFile(io.BytesIO(payload)) as zipf:
+            assert zipf.namelist() == [f'{FILE_NAME}.json']
+            assert zipf.read(f'{FILE_NAME}.json').decode('utf-8') == SAMPLE_JSON_CONTENT
+
+    @pytest.mark.parametrize('codec', list(CompressionCodec))
+    def test_given_each_codec_when_compressing_in_memory_then_decompress_detects_codec_and_restores_content(self, codec):
+        archive_compressor = get_archive_compressor(codec)
+
+        payload = archive_compressor.compress(SAMPLE_JSON_CONTENT, FILE_NAME)
+
+        assert ArchiveCompressor.detect_codec(payload) is codec
+        assert ArchiveCompressor.decompress(payload).decode('utf-8') == SAMPLE_JSON_CONTENT
+
+    @pytest.mark.parametrize('codec', list(CompressionCodec))
+    def test_given_each_codec_when_streaming_through_pair_file_sink_then_scraper_reads_archive_transparently(self, codec, tmpdir):
+        archive_compressor = get_archive_compressor(codec)
+        messages = orjson.loads(SAMPLE_JSON_CONTENT)
+
+        pair_file_sink = PairFileSink(
+            file_save_catalog=str(tmpdir),
+            file_name=FILE_NAME,
+            archive_compressor=archive_compressor
+        )
+        for message in messages:
+            pair_file_sink.write(orjson.dumps(message).decode('utf-8'))
+        archive_path = pair_file_sink.close()
+
+        assert archive_path.endswith(f'.{codec.file_extension}')
+        assert os.listdir(str(tmpdir)) == [os.path.basename(archive_path)]
+
+        with open(archive_path, 'rb') as f:
+            assert DataScraper._convert_cloud_storage_response_to_json(f.read()) == messages
+
+    def test_given_zstd_dictionary_when_compressing_then_archive_is_readable_only_with_the_same_dictionary(self, tmpdir):
+        pytest.importorskip('zstandard')
+
+        samples = [
+            SAMPLE_JSON_CONTENT.replace('83000.01', f'{83000 + i}.{i:02d}').encode('utf-8')
+            for i in range(1000)
+        ]
+        dictionary = ArchiveCompressor.train_zstd_dictionary(samples, dictionary_size_bytes=4096)
+        dictionary_path = os.path.join(str(tmpdir), 'trade.dict')
+        with open(dictionary_path, 'wb') as f:
+            f.write(dictionary)
+
+        archive_compressor = get_archive_compressor(CompressionCodec.ZSTD, zstd_dictionary_path=dictionary_path)
+        payload = archive_compressor.compress(SAMPLE_JSON_CONTENT, FILE_NAME)
+
+        assert ArchiveCompressor.decompress(payload, zstd_dictionary=dictionary).decode('utf-8') == SAMPLE_JSON_CONTENT
+        assert DataScraper._convert_cloud_storage_response_to_json(payload) is None
+
+    def test_given_zstd_dictionary_with_other_codec_when_initializing_compression_settings_then_exception_is_thrown(self, tmpdir):
+        dictionary_path = os.path.join(str(tmpdir), 'trade.dict')
+        with open(dictionary_path, 'wb') as f:
+            f.write(b'dictionary')
+
+        with pytest.raises(ValueError) as excinfo:
+            CompressionSettings(codec='gzip', zstd_dictionary_path=dictionary_path)
+
+        assert str(excinfo.value) == "zstd_dictionary_path can only be used with zstd codec."
@@ -0,0 +1,133 @@
+import hashlib
+import os
+
+from binance_data_processor.enums.asset_parameters import AssetParameters
+from binance_data_processor.enums.market_enum import Market
+from binance_data_processor.enums.stream_type_enum import StreamType
+from binance_data_processor.scraper.archive_file_cache import ArchiveFileCache
+from binance_data_processor.scraper.scraper import CachedClient, DataScraper, IClientHandler
+
+
+class CountingInMemoryClient(IClientHandler):
+    __slots__ = ['files', 'read_counts', 'report_etags']
+
+    def __init__(self, files: dict[str, bytes], report_etags: bool = True):
+        self.files = files
+        self.read_counts = {}
+        self.report_etags = report_etags
+
+    def list_files_with_prefixes(self, prefixes: list[str]) -> list[str]:
+        return [file_name for file_name in self.files if any(file_name.startswith(p) for p in prefixes)]
+
+    def read_file(self, file_name) -> bytes:
+        self.read_counts[file_name] = self.read_counts.get(file_name, 0) + 1
+        return self.files[file_name]
+
+    def get_file_etag(self, file_name: str) -> str | None:
+        if not self.report_etags:
+            return None
+        return hashlib.md5(self.files[file_name]).hexdigest()
+
+
+def get_day_files(asset_parameters_list: list[AssetParameters], file_size: int) -> dict[str, bytes]:
+    files = {}
+    for asset_parameters in asset_parameters_list:
+        base_of_filename = DataScraper._get_base_of_filename(asset_parameters)
+        for hour in range(24):
+            files[f'{base_of_filename}T{hour:02d}-00-00Z'] = os.urandom(file_size)
+    return files
+
+
+def read_asset_days_through(storage_client: IClientHandler, asset_parameters_list: list[AssetParameters]) -> None:
+    for asset_parameters in asset_parameters_list:
+        prefixes = DataScraper._get_prefix_of_files_that_should_be_downloaded_for_specified_single_date(asset_parameters)
+        for file_name in storage_client.list_files_with_prefixes(prefixes):
+            storage_client.read_file(file_name)
+
+
+class TestArchiveFileCache:
+
+    def test_given_put_entry_when_getting_then_content_is_returned_and_survives_new_cache_instance(self, tmpdir):
+        archive_file_cache = ArchiveFileCache(cache_catalog=str(tmpdir), size_limit_in_bytes=1024)
+
+        archive_file_cache.put('binance_trade_stream_spot_btcusdt_12-03-2025T12-00-00Z', '"etag"', b'content')
+
+        assert archive_file_cache.get('binance_trade_stream_spot_btcusdt_12-03-2025T12-00-00Z', '"etag"') == b'content'
+        assert archive_file_cache.get('binance_trade_stream_spot_btcusdt_12-03-2025T13-00-00Z', '"etag"') is None
+
+        reopened_archive_file_cache = ArchiveFileCache(cache_catalog=str(tmpdir), size_limit_in_bytes=1024)
+        assert len(reopened_archive_file_cache) == 1
+        assert reopened_archive_file_cache.size_in_bytes == len(b'content')
+        assert reopened_archive_file_cache.get('binance_trade_stream_spot_btcusdt_12-03-2025T12-00-00Z', '"etag"') == b'content'
+        assert not any(name.endswith(ArchiveFileCache.PART_SUFFIX) for name in os.listdir(str(tmpdir)))
+
+    def test_given_changed_etag_when_getting_then_cache_misses(self, tmpdir):
+        archive_file_cache = ArchiveFileCache(cache_catalog=str(tmpdir), size_limit_in_bytes=1024)
+
+        archive_file_cache.put('file', '"old"', b'old content')
+
+        assert archive_file_cache.get('file', '"new"') is None
+        assert archive_file_cache.get('file', '"old"') == b'old content'
+
+    def test_given_size_limit_exceeded_when_putting_then_least_recently_used_entry_is_evicted(self, tmpdir):
+        archive_file_cache = ArchiveFileCache(cache_catalog=str(tmpdir), size_limit_in_bytes=10)
+
+        archive_file_cache.put('a', 'etag', b'aaaa')
+        archive_file_cache.put('b', 'etag', b'bbbb')
+        assert archive_file_cache.get('a', 'etag') == b'aaaa'
+        archive_file_cache.put('c', 'etag', b'cccc')
+        archive_file_cache.put('too_big', 'etag', b'x' * 11)
+
+        assert archive_file_cache.get('b', 'etag') is None
+        assert archive_file_cache.get('a', 'etag') == b'aaaa'
+        assert archive_file_cache.get('c', 'etag') == b'cccc'
+        assert archive_file_cache.get('too_big', 'etag') is None
+        assert archive_file_cache.size_in_bytes == 8
+        assert len(os.listdir(str(tmpdir))) == 2
+
+    def test_given_smaller_limit_when_reopening_then_oldest_entries_are_evicted(self, tmpdir):
+        archive_file_cache = ArchiveFileCache(cache_catalog=str(tmpdir), size_limit_in_bytes=1024)
+        for i, name in enumerate(['a', 'b', 'c']):
+            archive_file_cache.put(name, 'etag', b'1234')
+            entry_path = os.path.join(str(tmpdir), ArchiveFileCache.get_entry_name(name, 'etag'))
+            os.utime(entry_path, (1_700_000_000 + i, 1_700_000_000 + i))
+
+        reopened_archive_file_cache = ArchiveFileCache(cache_catalog=str(tmpdir), size_limit_in_bytes=8)
+
+        assert reopened_archive_file_cache.get('a', 'etag') is None
+        assert reopened_archive_file_cache.get('b', 'etag') == b'1234'
+        assert reopened_archive_file_cache.get('c', 'etag') == b'1234'
+
+
+class TestCachedClient:
+
+    def test_given_overlapping_exports_when_reading_then_every_object_is_downloaded_once(self, tmpdir):
+        asset_parameters_list = [
+            AssetParameters(market=Market.SPOT, stream_type=StreamType.TRADE_STREAM, pairs=['btcusdt'], date=date)
+            for date in ['11-03-2025', '12-03-2025', '13-03-2025']
+        ]
+        storage_client = CountingInMemoryClient(get_day_files(asset_parameters_list, file_size=64))
+        cached_client = CachedClient(
+            storage_client=storage_client,
+            archive_file_cache=ArchiveFileCache(cache_catalog=str(tmpdir), size_limit_in_bytes=1024 ** 2)
+        )
+
+        # consecutive days share the next day T00-0 boundary files, the second export repeats a day
+        read_asset_days_through(cached_client, asset_parameters_list[:2])
+        read_asset_days_through(cached_client, asset_parameters_list[1:])
+
+        assert set(storage_client.read_counts) == set(storage_client.files)
+        assert set(storage_client.read_counts.values()) == {1}
+
+    def test_given_storage_without_etags_when_reading_then_cache_is_bypassed(self, tmpdir):
+        storage_client = CountingInMemoryClient({'file': b'content'}, report_etags=False)
+        cached_client = CachedClient(
+            storage_client=storage_client,
+            archive_file_cache=ArchiveFileCache(cache_catalog=str(tmpdir), size_limit_in_bytes=1024)
+        )
+
+        assert cached_client.read_file('file') == b'content'
+        assert cached_client.read_file('file') == b'content'
+
+        assert storage_client.read_counts == {'file': 2}
+        assert os.listdir(str(tmpdir)) == []
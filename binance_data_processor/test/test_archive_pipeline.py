@@ -0,0 +1,314 @@
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import Future
+
+import orjson
+import pytest
+
+from binance_data_processor.core.archive_compressor import ArchiveCompressor
+from binance_data_processor.core.archive_pipeline import ArchivePipeline, compress_json_content, compress_staged_file
+from binance_data_processor.core.pair_file_sink import PairFileSink
+from binance_data_processor.core.upload_spool import UploadSpool
+from binance_data_processor.enums.archive_pipeline_settings import ArchivePipelineSettings
+from binance_data_processor.enums.compression_codec_enum import CompressionCodec
+from binance_data_processor.enums.compression_settings import CompressionSettings
+from binance_data_processor.enums.data_sink_config import DataSinkConfig
+from binance_data_processor.scraper.scraper import DataScraper
+
+
+FILE_NAME = 'binance_trade_stream_spot_btcusdt_01-01-2022T00-00-00Z'
+
+MESSAGES = [
+    '{"stream":"btcusdt@trade","data":{"t":1},"_E":1}',
+    '{"stream":"btcusdt@trade","data":{"t":2},"_E":2}'
+]
+
+
+def write_staged_file(file_save_catalog: str) -> str:
+    pair_file_sink = PairFileSink(
+        file_save_catalog=file_save_catalog,
+        file_name=FILE_NAME,
+        archive_compressor=None,
+        staged=True
+    )
+    for message in MESSAGES:
+        pair_file_sink.write(message)
+    return pair_file_sink.close()
+
+
+def wait_until(condition, timeout_seconds: float = 30) -> None:
+    deadline = time.monotonic() + timeout_seconds
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("condition was not met in time")
+        time.sleep(0.05)
+
+
+class TestArchivePipeline:
+
+    def test_given_archive_pipeline_settings_from_dict_when_initializing_data_sink_config_then_settings_are_parsed(self):
+        data_sink_config = DataSinkConfig(archive_pipeline_settings={'compression_workers': 0, 'upload_workers': 2})
+
+        assert data_sink_config.archive_pipeline_settings == ArchivePipelineSettings(compression_workers=0, upload_workers=2)
+
+    def test_given_invalid_upload_workers_when_initializing_settings_then_exception_is_thrown(self):
+        with pytest.raises(ValueError) as excinfo:
+            ArchivePipelineSettings(upload_workers=0)
+
+        assert str(excinfo.value) == "upload_workers must be greater than 0"
+
+    def test_given_staged_file_when_compressing_then_archive_replaces_staged_file(self, tmpdir):
+        staged_path = write_staged_file(str(tmpdir))
+        assert staged_path.endswith(f'{FILE_NAME}.json.staged')
+
+        archive_path = compress_staged_file(
+            staged_path=staged_path,
+            archive_path=f'{tmpdir}/{FILE_NAME}.zip',
+            file_name=FILE_NAME,
+            compression_settings=CompressionSettings(codec=CompressionCodec.ZIP)
+        )
+
+        assert os.listdir(str(tmpdir)) == [f'{FILE_NAME}.zip']
+        with zipfile.ZipFile(archive_path) as zipf:
+            assert zipf.namelist() == [f'{FILE_NAME}.json']
+        with open(archive_path, 'rb') as f:
+            assert DataScraper._convert_cloud_storage_response_to_json(f.read()) == [orjson.loads(m) for m in MESSAGES]
+
+    def test_given_compact_records_when_writing_to_sink_then_output_equals_rewritten_message_strings(self, tmpdir):
+        raw_messages = [message.replace(f',"_E":{i + 1}', '') for i, message in enumerate(MESSAGES)]
+        record_sink = PairFileSink(file_save_catalog=str(tmpdir), file_name='records', archive_compressor=None)
+        for timestamp_of_receive, raw_message in enumerate(raw_messages, start=1):
+            record_sink.write_record(raw_message, timestamp_of_receive)
+        string_sink = PairFileSink(file_save_catalog=str(tmpdir), file_name='strings', archive_compressor=None)
+        for message in MESSAGES:
+            string_sink.write(message)
+
+        with open(record_sink.close(), 'rb') as records_file, open(string_sink.close(), 'rb') as strings_file:
+            assert records_file.read() == strings_file.read()
+
+    def test_given_staged_file_when_submitted_then_it_is_compressed_in_worker_process_and_uploaded(self, tmpdir):
+        uploaded_paths = []
+        archive_pipeline = ArchivePipeline(
+            archive_pipeline_settings=ArchivePipelineSettings(compression_workers=1, upload_workers=1),
+            compression_settings=CompressionSettings(codec=CompressionCodec.GZIP),
+            upload_callback=uploaded_paths.append
+        )
+
+        archive_pipeline.submit_staged_file(staged_path=write_staged_file(str(tmpdir)), file_name=FILE_NAME)
+        archive_pipeline.shutdown()
+
+        assert uploaded_paths == [f'{tmpdir}/{FILE_NAME}.json.gz']
+        assert os.listdir(str(tmpdir)) == []
+        status = archive_pipeline.get_status()
+        assert status['compressed_archives'] == 1
+        assert status['uploaded_archives'] == 1
+        assert status['pending_compressions'] == 0
+        assert status['pending_uploads'] == 0
+
+    def test_given_compression_workers_when_compressing_json_content_in_pipeline_pool_then_payload_matches_inline_compression(self):
+        compression_settings = CompressionSettings(codec=CompressionCodec.GZIP)
+        archive_pipeline = ArchivePipeline(
+            archive_pipeline_settings=ArchivePipelineSettings(compression_workers=1),
+            compression_settings=compression_settings
+        )
+        inline_archive_pipeline = ArchivePipeline(
+            archive_pipeline_settings=ArchivePipelineSettings(compression_workers=0),
+            compression_settings=compression_settings
+        )
+
+        compression_executor = archive_pipeline.get_compression_executor()
+        try:
+            payload = compression_executor.submit(compress_json_content, '[{"u":1}]', FILE_NAME, compression_settings).result()
+        finally:
+            archive_pipeline.shutdown()
+
+        assert archive_pipeline.get_compression_executor() is compression_executor
+        assert inline_archive_pipeline.get_compression_executor() is None
+        assert ArchiveCompressor.decompress(payload) == b'[{"u":1}]'
+
+    def test_given_slow_bucket_when_submitting_upload_then_caller_is_not_blocked_and_overflow_is_deferred(self, tmpdir):
+        bucket_released = threading.Event()
+        archive_pipeline = ArchivePipeline(
+            archive_pipeline_settings=ArchivePipelineSettings(upload_workers=1, max_pending_uploads=1),
+            compression_settings=CompressionSettings(),
+            upload_callback=lambda archive_path: bucket_released.wait()
+        )
+        archive_paths = []
+        for i in range(2):
+            archive_path = f'{tmpdir}/{FILE_NAME}_{i}.zip'
+            with open(archive_path, 'wb') as f:
+                f.write(b'PK')
+            archive_paths.append(archive_path)
+
+        started_at = time.monotonic()
+        assert archive_pipeline.submit_upload(archive_paths[0]) is True
+        assert archive_pipeline.submit_upload(archive_paths[1]) is False
+        assert time.monotonic() - started_at < 1
+
+        assert archive_pipeline.is_in_flight(archive_paths[0])
+        assert archive_pipeline.get_status()['deferred_uploads'] == 1
+
+        bucket_released.set()
+        archive_pipeline.shutdown()
+
+        assert os.listdir(str(tmpdir)) == [f'{FILE_NAME}_1.zip']
+
+    def test_given_failing_bucket_when_uploading_then_archive_is_left_locally_and_rescheduled_in_spool(self, tmpdir):
+        attempts = []
+
+        def failing_upload(archive_path: str) -> None:
+            attempts.append(archive_path)
+            raise ConnectionError('bucket unavailable')
+
+        upload_spool = UploadSpool(spool_path=f'{tmpdir}/spool.sqlite3', retry_base_delay_seconds=60)
+        archive_pipeline = ArchivePipeline(
+            archive_pipeline_settings=ArchivePipelineSettings(),
+            compression_settings=CompressionSettings(),
+            upload_callback=failing_upload,
+            upload_spool=upload_spool
+        )
+        archive_path = f'{tmpdir}/{FILE_NAME}.zip'
+        with open(archive_path, 'wb') as f:
+            f.write(b'PK')
+
+        archive_pipeline.submit_upload(archive_path)
+        wait_until(lambda: archive_pipeline.get_status()['failed_uploads'] == 1)
+        archive_pipeline.shutdown()
+
+        assert attempts == [archive_path]
+        assert os.path.exists(archive_path)
+        assert not archive_pipeline.is_in_flight(archive_path)
+        assert upload_spool.get_attempts(archive_path) == 1
+        assert upload_spool.get_due_uploads(limit=10) == []
+        assert upload_spool.get_due_uploads(limit=10, now=time.time() + 61) == [archive_path]
+
+    def test_given_successful_upload_when_uploading_then_archive_is_removed_from_disk_and_spool(self, tmpdir):
+        upload_spool = UploadSpool(spool_path=f'{tmpdir}/spool.sqlite3')
+        archive_pipeline = ArchivePipeline(
+            archive_pipeline_settings=ArchivePipelineSettings(),
+            compression_settings=CompressionSettings(),
+            upload_callback=lambda archive_path: None,
+            upload_spool=upload_spool
+        )
+        archive_path = f'{tmpdir}/{FILE_NAME}.zip'
+        with open(archive_path, 'wb') as f:
+            f.write(b'PK')
+
+        archive_pipeline.submit_upload(archive_path)
+        archive_pipeline.shutdown()
+
+        assert not os.path.exists(archive_path)
+        assert upload_spool.pending_count() == 0
+
+    def test_given_upload_submitter_when_future_completes_then_archive_is_removed_and_shutdown_waits_for_it(self, tmpdir):
+        futures = {}
+
+        def submit_upload(archive_path: str) -> Future:
+            futures[archive_path] = Future()
+            return futures[archive_path]
+
+        upload_spool = UploadSpool(spool_path=f'{tmpdir}/spool.sqlite3')
+        archive_pipeline = ArchivePipeline(
+            archive_pipeline_settings=ArchivePipelineSettings(upload_workers=1),
+            compression_settings=CompressionSettings(),
+            upload_spool=upload_spool,
+            upload_submitter=submit_upload
+        )
+        archive_paths = [f'{tmpdir}/{FILE_NAME}_{i}.zip' for i in range(3)]
+        for archive_path in archive_paths:
+            with open(archive_path, 'wb') as f:
+                f.write(b'PK')
+            assert archive_pipeline.submit_upload(archive_path) is True
+
+        # uploads are not capped by upload_workers, none of them holds a pipeline thread
+        assert archive_pipeline.get_status()['pending_uploads'] == 3
+
+        shutdown_thread = threading.Thread(target=archive_pipeline.shutdown)
+        shutdown_thread.start()
+        for archive_path in archive_paths:
+            futures[archive_path].set_result(None)
+        shutdown_thread.join(timeout=30)
+
+        assert not shutdown_thread.is_alive()
+        assert archive_pipeline.get_status()['uploaded_archives'] == 3
+        assert not any(os.path.exists(archive_path) for archive_path in archive_paths)
+        assert upload_spool.pending_count() == 0
+
+    def test_given_upload_submitter_when_future_fails_then_archive_is_left_locally_and_rescheduled_in_spool(self, tmpdir):
+        future = Future()
+        upload_spool = UploadSpool(spool_path=f'{tmpdir}/spool.sqlite3', retry_base_delay_seconds=60)
+        archive_pipeline = ArchivePipeline(
+            archive_pipeline_settings=ArchivePipelineSettings(),
+            compression_settings=CompressionSettings(),
+            upload_spool=upload_spool,
+            upload_submitter=lambda archive_path: future
+        )
+        archive_path = f'{tmpdir}/{FILE_NAME}.zip'
+        with open(archive_path, 'wb') as f:
+            f.write(b'PK')
+
+        archive_pipeline.submit_upload(archive_path)
+        future.set_exception(ConnectionError('bucket unavailable'))
+        archive_pipeline.shutdown()
+
+        assert os.path.exists(archive_path)
+        assert not archive_pipeline.is_in_flight(archive_path)
+        assert archive_pipeline.get_status()['failed_uploads'] == 1
+        assert upload_spool.get_attempts(archive_path) == 1
+
+    def test_given_no_upload_callback_when_submitting_upload_then_archive_stays_on_disk(self, tmpdir):
+        archive_pipeline = ArchivePipeline(
+            archive_pipeline_settings=ArchivePipelineSettings(),
+            compression_settings=CompressionSettings()
+        )
+
+        assert archive_pipeline.submit_upload(f'{tmpdir}/{FILE_NAME}.zip') is False
+        assert archive_pipeline.get_status()['deferred_uploads'] == 0
+
+    def test_given_uploads_submitted_while_shutting_down_when_shutdown_completes_then_late_submits_are_refused_without_errors(self, tmpdir):
+        archive_pipeline = ArchivePipeline(
+            archive_pipeline_settings=ArchivePipelineSettings(upload_workers=2, max_pending_uploads=1_000_000),
+            compression_settings=CompressionSettings(),
+            upload_callback=lambda archive_path: None
+        )
+        submit_errors = []
+        is_submitting = threading.Event()
+
+        def submit_uploads() -> None:
+            i = 0
+            while True:
+                try:
+                    is_accepted = archive_pipeline.submit_upload(f'{tmpdir}/{FILE_NAME}_{i}.zip')
+                except Exception as e:
+                    submit_errors.append(e)
+                    return
+                is_submitting.set()
+                if not is_accepted:
+                    return
+                i += 1
+
+        submitting_thread = threading.Thread(target=submit_uploads)
+        submitting_thread.start()
+        is_submitting.wait()
+        archive_pipeline.shutdown()
+        submitting_thread.join()
+
+        assert submit_errors == []
+        assert archive_pipeline.get_status()['pending_uploads'] == 0
+        assert archive_pipeline.submit_upload(f'{tmpdir}/{FILE_NAME}.zip') is False
+
+    def test_given_shut_down_pipeline_when_submitting_staged_file_then_it_is_left_on_disk_and_not_tracked(self, tmpdir):
+        archive_pipeline = ArchivePipeline(
+            archive_pipeline_settings=ArchivePipelineSettings(compression_workers=1),
+            compression_settings=CompressionSettings()
+        )
+        archive_pipeline.shutdown()
+        staged_path = write_staged_file(str(tmpdir))
+
+        archive_pipeline.submit_staged_file(staged_path=staged_path, file_name=FILE_NAME)
+
+        assert not archive_pipeline.is_in_flight(staged_path)
+        assert archive_pipeline.get_status()['pending_compressions'] == 0
+        assert os.path.exists(staged_path)
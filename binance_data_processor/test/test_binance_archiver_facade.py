@@ -1,5 +1,8 @@
+import json
+import os
 import re
 import threading
+import zipfile
 import time
 from datetime import datetime, timezone
 from queue import Queue
@@ -8,9 +11,6 @@ import pytest
 
 from binance_data_processor.core.abstract_base_classes import Observer
 from binance_data_processor.enums.asset_parameters import AssetParameters
-from binance_data_processor.core.exceptions import (
-    ClassInstancesAmountLimitException,
-)
 
 from binance_data_processor.listener.listener_facade import (
     launch_data_listener,
@@ -23,7 +23,10 @@ from binance_data_processor.core.snapshot_manager import DepthSnapshotStrategy,
 from binance_data_processor.core.listener_observer_updater import ListenerObserverUpdater
 from binance_data_processor.enums.storage_connection_parameters import StorageConnectionParameters
 from binance_data_processor.core.stream_data_saver_and_sender import StreamDataSaverAndSender
+from binance_data_processor.core.pair_file_sink import PairFileSink
+from binance_data_processor.core.archive_compressor import ArchiveCompressor
 from binance_data_processor.core.queue_pool import ListenerQueuePool, DataSinkQueuePool
+from binance_data_processor.enums.queue_sharding_settings import QueueShardingSettings
 from binance_data_processor.core.stream_service import StreamService
 from binance_data_processor.core.command_line_interface import CommandLineInterface
 from binance_data_processor.core.timestamps_generator import TimestampsGenerator
@@ -32,6 +35,7 @@ from binance_data_processor.core.fastapi_manager import FastAPIManager
 from binance_data_processor.core.setup_logger import setup_logger
 from binance_data_processor.core.difference_depth_queue import DifferenceDepthQueue
 from binance_data_processor.core.stream_listener_id import StreamListenerId
+from binance_data_processor.enums.data_save_target_enum import DataSaveTarget
 from binance_data_processor.core.trade_queue import TradeQueue
 from binance_data_processor.enums.market_enum import Market
 from binance_data_processor.enums.stream_type_enum import StreamType
@@ -73,9 +77,6 @@ class TestArchiverFacade:
 
             del archiver_facade
 
-            TradeQueue.clear_instances()
-            DifferenceDepthQueue.clear_instances()
-
         def test_given_archiver_facade_when_init_then_queues_are_set_properly(self):
 
             queue_pool = DataSinkQueuePool()
@@ -101,11 +102,7 @@ class TestArchiverFacade:
             coinm_trade_queue = queue_pool.get_queue(Market.COIN_M_FUTURES, StreamType.TRADE_STREAM)
             assert isinstance(coinm_trade_queue, TradeQueue), "COIN-M trade_stream powinien być TradeQueue"
 
-            assert len(DifferenceDepthQueue._instances) == 3, "Powinno być 3 instancje DifferenceDepthQueue"
-            assert len(TradeQueue._instances) == 3, "Powinno być 3 instancje TradeQueue"
-
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
+            assert len(queue_pool.queue_lookup) == 6, "Powinno być 6 kolejek"
 
         def test_given_archiver_facade_run_call_when_threads_invoked_then_correct_threads_are_started(self):
 
@@ -166,9 +163,6 @@ class TestArchiverFacade:
 
             data_sink_facade.shutdown()
 
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
-
         def test_archiver_facade_initialization_in_data_sink_mode(self):
             config_from_json = {
                 "instruments": {
@@ -204,8 +198,6 @@ class TestArchiverFacade:
             assert isinstance(data_sink_facade.depth_snapshot_service, DepthSnapshotService)
 
             data_sink_facade.shutdown()
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
 
         @pytest.mark.skip
         def test_given_archiver_facade_when_shutdown_called_then_no_threads_are_left(self):
@@ -258,9 +250,6 @@ class TestArchiverFacade:
                     break
                 time.sleep(1)
 
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
-
             assert len(
                 active_threads) == 0, f"Still active threads after shutdown: {[thread.name for thread in active_threads]}"
 
@@ -318,9 +307,6 @@ class TestArchiverFacade:
 
             for _ in active_threads: print(_)
 
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
-
             assert len(active_threads) == 0, (f"Still active threads after run {execution_number + 1}"
                                               f": {[thread.name for thread in active_threads]}")
 
@@ -357,9 +343,6 @@ class TestArchiverFacade:
 
             del listener_facade
 
-            TradeQueue.clear_instances()
-            DifferenceDepthQueue.clear_instances()
-
         def test_given_archiver_facade_when_init_then_queues_are_set_properly(self):
             queue_pool = ListenerQueuePool()
 
@@ -384,11 +367,7 @@ class TestArchiverFacade:
             coinm_trade_queue = queue_pool.get_queue(Market.COIN_M_FUTURES, StreamType.TRADE_STREAM)
             assert isinstance(coinm_trade_queue, TradeQueue), "COIN-M trade_stream powinien być TradeQueue"
 
-            assert len(DifferenceDepthQueue._instances) == 3, "Powinno być 3 instancje DifferenceDepthQueue"
-            assert len(TradeQueue._instances) == 3, "Powinno być 3 instancje TradeQueue"
-
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
+            assert len(queue_pool.queue_lookup) == 6, "Powinno być 6 kolejek"
 
         def test_given_archiver_facade_run_call_when_threads_invoked_then_correct_threads_are_started(self):
 
@@ -448,9 +427,6 @@ class TestArchiverFacade:
 
             data_listener.shutdown()
 
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
-
         def test_archiver_facade_initialization_in_listener_mode(self):
             config_from_json = {
                 "instruments": {
@@ -489,8 +465,6 @@ class TestArchiverFacade:
             assert listener_facade.listener_observer_updater.observers == observers
 
             listener_facade.shutdown()
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
 
         def test_attach_and_detach_observers(self):
             config_from_json = {
@@ -532,8 +506,6 @@ class TestArchiverFacade:
             assert listener_facade._observers == [observer2], "Observer1 should be detached"
 
             listener_facade.shutdown()
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
 
         @pytest.mark.skip
         def test_given_archiver_facade_when_shutdown_called_then_no_threads_are_left(self):
@@ -568,9 +540,6 @@ class TestArchiverFacade:
                     break
                 time.sleep(1)
 
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
-
             assert len(
                 active_threads) == 0, f"Still active threads after shutdown: {[thread.name for thread in active_threads]}"
 
@@ -630,9 +599,6 @@ class TestArchiverFacade:
 
             for _ in active_threads: print(_)
 
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
-
             assert len(active_threads) == 0, (f"Still active threads after run {execution_number + 1}"
                                               f": {[thread.name for thread in active_threads]}")
 
@@ -689,9 +655,6 @@ class TestArchiverFacade:
 
             assert observer.messages == [test_message], "Observer should have received the test message"
 
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
-
     class TestWhistleblower:
 
         def test_whistleblower_processes_messages_and_notifies_observers(self):
@@ -743,12 +706,12 @@ class TestArchiverFacade:
             queue_pool = DataSinkQueuePool()
 
             expected_keys = {
-                (Market.SPOT, StreamType.DIFFERENCE_DEPTH_STREAM),
-                (Market.SPOT, StreamType.TRADE_STREAM),
-                (Market.USD_M_FUTURES, StreamType.DIFFERENCE_DEPTH_STREAM),
-                (Market.USD_M_FUTURES, StreamType.TRADE_STREAM),
-                (Market.COIN_M_FUTURES, StreamType.DIFFERENCE_DEPTH_STREAM),
-                (Market.COIN_M_FUTURES, StreamType.TRADE_STREAM)
+                (Market.SPOT, StreamType.DIFFERENCE_DEPTH_STREAM, 0),
+                (Market.SPOT, StreamType.TRADE_STREAM, 0),
+                (Market.USD_M_FUTURES, StreamType.DIFFERENCE_DEPTH_STREAM, 0),
+                (Market.USD_M_FUTURES, StreamType.TRADE_STREAM, 0),
+                (Market.COIN_M_FUTURES, StreamType.DIFFERENCE_DEPTH_STREAM, 0),
+                (Market.COIN_M_FUTURES, StreamType.TRADE_STREAM, 0)
             }
 
             assert set(queue_pool.queue_lookup.keys()) == expected_keys, "queue_lookup keys do not match expected keys"
@@ -764,11 +727,7 @@ class TestArchiverFacade:
             assert isinstance(queue_pool.get_queue(Market.USD_M_FUTURES, StreamType.TRADE_STREAM), TradeQueue)
             assert isinstance(queue_pool.get_queue(Market.COIN_M_FUTURES, StreamType.TRADE_STREAM), TradeQueue)
 
-            assert len(TradeQueue._instances) == 3, "There should be 3 instances of TradeQueue"
-            assert len(DifferenceDepthQueue._instances) == 3, "There should be 3 instances of DifferenceDepthQueue"
-
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
+            assert len(queue_pool.queue_lookup) == 6, "There should be 6 queues"
 
         def test_given_queue_pool_when_get_queue_called_then_returns_correct_queue(self):
             queue_pool = DataSinkQueuePool()
@@ -788,31 +747,6 @@ class TestArchiverFacade:
                     f"Queue for {market}, {stream_type} should be {expected_queue_type}")
                 assert queue.market == market, f"Queue market should be {market}"
 
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
-
-        def test_given_queue_pool_when_more_than_allowed_trade_queues_created_then_exception_is_thrown(self):
-            queue_pool = DataSinkQueuePool()
-
-            with pytest.raises(ClassInstancesAmountLimitException) as excinfo:
-                queue_pool.fourth_trade_queue = TradeQueue(market=Market.SPOT)
-
-            assert str(excinfo.value) == "Cannot create more than 3 instances of TradeQueue"
-
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
-
-        def test_given_queue_pool_when_more_than_allowed_difference_depth_queues_created_then_exception_is_thrown(self):
-            queue_pool = DataSinkQueuePool()
-
-            with pytest.raises(ClassInstancesAmountLimitException) as excinfo:
-                queue_pool.fourth_difference_depth_queue = DifferenceDepthQueue(market=Market.SPOT)
-
-            assert str(excinfo.value) == "Cannot create more than 3 instances of DifferenceDepthQueue"
-
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
-
         def test_queue_pool_initialization_in_listener_mode(self):
             queue_pool = ListenerQueuePool()
 
@@ -828,8 +762,91 @@ class TestArchiverFacade:
                                         StreamType.DIFFERENCE_DEPTH_STREAM).queue == queue_pool.global_queue
             assert queue_pool.get_queue(Market.COIN_M_FUTURES, StreamType.TRADE_STREAM).queue == queue_pool.global_queue
 
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
+        def test_given_queue_sharding_settings_when_initialized_then_pairs_are_routed_to_shards_by_groups_and_hash(self):
+            queue_pool = DataSinkQueuePool(
+                queue_sharding_settings=QueueShardingSettings(
+                    hashed_shards=2,
+                    pair_groups={'spot': [['BTCUSDT'], ['ETHUSDT']]}
+                )
+            )
+            pairs = ['BTCUSDT', 'ETHUSDT', 'BNBUSDT', 'XRPUSDT', 'DOGEUSDT', 'ADAUSDT']
+
+            assert queue_pool.get_shards_amount(Market.SPOT) == 4
+            assert queue_pool.get_shards_amount(Market.USD_M_FUTURES) == 2
+            assert len(queue_pool.queue_lookup) == 2 * (4 + 2 + 2)
+            assert len(set(map(id, queue_pool.get_queues(Market.SPOT, StreamType.TRADE_STREAM)))) == 4
+
+            assert queue_pool.get_shard_index(Market.SPOT, 'BTCUSDT') == 0
+            assert queue_pool.get_shard_index(Market.SPOT, 'ethusdt') == 1
+            assert queue_pool.get_shard_index(Market.USD_M_FUTURES, 'BTCUSDT') in {0, 1}
+
+            pairs_by_shard = queue_pool.get_pairs_by_shard(Market.SPOT, pairs)
+            assert pairs_by_shard[:2] == [['BTCUSDT'], ['ETHUSDT']]
+            assert sorted(pairs_by_shard[2] + pairs_by_shard[3]) == sorted(pairs[2:])
+            for shard_index, shard_pairs in enumerate(pairs_by_shard):
+                assert all(queue_pool.get_shard_index(Market.SPOT, pair) == shard_index for pair in shard_pairs)
+
+            assert DataSinkQueuePool().get_pairs_by_shard(Market.SPOT, pairs)[0] is pairs
+
+        def test_given_lower_case_pair_groups_when_initialized_then_pairs_are_normalized_and_duplicates_rejected(self):
+            queue_sharding_settings = QueueShardingSettings(pair_groups={'spot': [['btcusdt'], ['EthUsdt']]})
+            queue_pool = DataSinkQueuePool(queue_sharding_settings=queue_sharding_settings)
+
+            assert queue_sharding_settings.pair_groups == {'spot': [['BTCUSDT'], ['ETHUSDT']]}
+            assert queue_pool.get_shard_index(Market.SPOT, 'BTCUSDT') == 0
+            assert queue_pool.get_shard_index(Market.SPOT, 'ethusdt') == 1
+
+            with pytest.raises(ValueError):
+                QueueShardingSettings(pair_groups={'spot': [['btcusdt'], ['BTCUSDT']]})
+
+        def test_given_sharded_stream_service_when_subscribing_then_only_listener_of_pair_shard_is_changed(self):
+            data_sink_config = DataSinkConfig(
+                instruments={'spot': ['BTCUSDT', 'ETHUSDT']},
+                queue_sharding_settings={'hashed_shards': 1, 'pair_groups': {'spot': [['BTCUSDT'], ['SOLUSDT']]}}
+            )
+            stream_service = StreamService(
+                queue_pool=DataSinkQueuePool(queue_sharding_settings=data_sink_config.queue_sharding_settings),
+                global_shutdown_flag=threading.Event(),
+                data_sink_config=data_sink_config
+            )
+            subscription_changes = []
+
+            class SubscriptionRecorder:
+                def __init__(self, shard_index: int):
+                    self.shard_index = shard_index
+
+                def change_subscription(self, pair: str, action: str):
+                    subscription_changes.append((self.shard_index, pair, action))
+
+            with patch.object(StreamService, 'start_stream_service') as start_stream_service:
+                stream_service.run()
+
+                started_shards = {call.kwargs['shard_index'] for call in start_stream_service.call_args_list}
+                assert started_shards == {0, 2}
+                assert stream_service.shard_pairs[(Market.SPOT, 1)] == []
+
+                for shard_index in [0, 2]:
+                    stream_service._register_stream_listener(
+                        Market.SPOT,
+                        {StreamType.DIFFERENCE_DEPTH_STREAM: None},
+                        'old',
+                        SubscriptionRecorder(shard_index),
+                        shard_index
+                    )
+
+                data_sink_config.instruments.add_pair(market=Market.SPOT, pair='XRPUSDT')
+                stream_service.update_subscriptions(market=Market.SPOT, asset_upper='XRPUSDT', action='subscribe')
+
+                assert subscription_changes == [(2, 'XRPUSDT', 'subscribe')]
+                assert stream_service.shard_pairs[(Market.SPOT, 2)] == ['ETHUSDT', 'XRPUSDT']
+
+                data_sink_config.instruments.add_pair(market=Market.SPOT, pair='SOLUSDT')
+                stream_service.update_subscriptions(market=Market.SPOT, asset_upper='SOLUSDT', action='subscribe')
+
+                assert stream_service.shard_pairs[(Market.SPOT, 1)] == ['SOLUSDT']
+                assert start_stream_service.call_args.kwargs['shard_index'] == 1
+                assert start_stream_service.call_args.kwargs['asset_parameters'].pairs == ['SOLUSDT']
+                assert len(subscription_changes) == 1
 
     class TestQueuePoolListener:
 
@@ -837,12 +854,12 @@ class TestArchiverFacade:
             queue_pool = ListenerQueuePool()
 
             expected_keys = [
-                (Market.SPOT, StreamType.DIFFERENCE_DEPTH_STREAM),
-                (Market.SPOT, StreamType.TRADE_STREAM),
-                (Market.USD_M_FUTURES, StreamType.DIFFERENCE_DEPTH_STREAM),
-                (Market.USD_M_FUTURES, StreamType.TRADE_STREAM),
-                (Market.COIN_M_FUTURES, StreamType.DIFFERENCE_DEPTH_STREAM),
-                (Market.COIN_M_FUTURES, StreamType.TRADE_STREAM)
+                (Market.SPOT, StreamType.DIFFERENCE_DEPTH_STREAM, 0),
+                (Market.SPOT, StreamType.TRADE_STREAM, 0),
+                (Market.USD_M_FUTURES, StreamType.DIFFERENCE_DEPTH_STREAM, 0),
+                (Market.USD_M_FUTURES, StreamType.TRADE_STREAM, 0),
+                (Market.COIN_M_FUTURES, StreamType.DIFFERENCE_DEPTH_STREAM, 0),
+                (Market.COIN_M_FUTURES, StreamType.TRADE_STREAM, 0)
             ]
 
             assert set(queue_pool.queue_lookup.keys()) == set(
@@ -859,11 +876,7 @@ class TestArchiverFacade:
             assert isinstance(queue_pool.get_queue(Market.USD_M_FUTURES, StreamType.TRADE_STREAM), TradeQueue)
             assert isinstance(queue_pool.get_queue(Market.COIN_M_FUTURES, StreamType.TRADE_STREAM), TradeQueue)
 
-            assert len(TradeQueue._instances) == 3, "There should be 3 instances of TradeQueue"
-            assert len(DifferenceDepthQueue._instances) == 3, "There should be 3 instances of DifferenceDepthQueue"
-
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
+            assert len(queue_pool.queue_lookup) == 6, "There should be 6 queues"
 
         def test_given_queue_pool_when_get_queue_called_then_returns_correct_queue(self):
             queue_pool = ListenerQueuePool()
@@ -884,31 +897,6 @@ class TestArchiverFacade:
                 )
                 assert queue.market == market, f"Queue market should be {market}"
 
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
-
-        def test_given_queue_pool_when_more_than_allowed_trade_queues_created_then_exception_is_thrown(self):
-            queue_pool = ListenerQueuePool()
-
-            with pytest.raises(ClassInstancesAmountLimitException) as excinfo:
-                queue_pool.fourth_trade_queue = TradeQueue(market=Market.SPOT)
-
-            assert str(excinfo.value) == "Cannot create more than 3 instances of TradeQueue"
-
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
-
-        def test_given_queue_pool_when_more_than_allowed_difference_depth_queues_created_then_exception_is_thrown(self):
-            queue_pool = ListenerQueuePool()
-
-            with pytest.raises(ClassInstancesAmountLimitException) as excinfo:
-                queue_pool.fourth_difference_depth_queue = DifferenceDepthQueue(market=Market.SPOT)
-
-            assert str(excinfo.value) == "Cannot create more than 3 instances of DifferenceDepthQueue"
-
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
-
         def test_queue_pool_initialization_in_listener_mode(self):
             queue_pool = ListenerQueuePool()
 
@@ -924,9 +912,6 @@ class TestArchiverFacade:
                                         StreamType.DIFFERENCE_DEPTH_STREAM).queue == queue_pool.global_queue
             assert queue_pool.get_queue(Market.COIN_M_FUTURES, StreamType.TRADE_STREAM).queue == queue_pool.global_queue
 
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
-
     class TestStreamService:
 
         def test_stream_service_initialization_with_global_queue(self):
@@ -968,9 +953,6 @@ class TestArchiverFacade:
 
             assert stream_service.queue_pool.global_queue is not None, "Global queue should be initialized in LISTENER mode"
 
-            TradeQueue.clear_instances()
-            DifferenceDepthQueue.clear_instances()
-
         def test_stream_service_runs_streams_in_listener_mode(self):
             setup_logger()
             global_shutdown_flag = threading.Event()
@@ -1010,9 +992,6 @@ class TestArchiverFacade:
                 stream_service.run()
                 assert mock_start_stream_service.call_count == 6, "Should start two stream services in LISTENER mode"
 
-            TradeQueue.clear_instances()
-            DifferenceDepthQueue.clear_instances()
-
     class TestSnapshotManager:
 
         def test_init(self):
@@ -1371,9 +1350,6 @@ class TestArchiverFacade:
 
             assert 'BNBUSDT' in data_sink_config.instruments.get_pairs(market=Market.SPOT), "Asset not added to instruments"
 
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
-
         def test_given_modify_subscription_when_removing_asset_then_asset_is_removed_from_instruments(self):
             config_from_json = {
                 'instruments': {
@@ -1411,8 +1387,35 @@ class TestArchiverFacade:
 
             assert 'BNBUSDT' not in data_sink_config.instruments.get_pairs(market=Market.SPOT), "Asset not added to instruments"
 
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
+        def test_given_bytes_records_in_queue_when_showing_jsoned_status_then_last_message_is_decoded(self):
+            data_sink_config = DataSinkConfig(
+                instruments={'spot': ['BTCUSDT']},
+                bytes_messages=True
+            )
+            queue_pool = DataSinkQueuePool(compact_records=True)
+            stream_service = StreamService(
+                queue_pool=queue_pool,
+                global_shutdown_flag=threading.Event(),
+                data_sink_config=data_sink_config
+            )
+            cli = CommandLineInterface(
+                stream_service=stream_service,
+                data_sink_config=data_sink_config,
+                shutdown_callback=lambda: None
+            )
+            message = b'{"stream":"btcusdt@depth@100ms","data":{"E":1,"U":1,"u":2,"b":[],"a":[]}}'
+            difference_depth_queue = queue_pool.get_queue(Market.SPOT, StreamType.DIFFERENCE_DEPTH_STREAM)
+            stream_listener_id = StreamListenerId(pairs=['BTCUSDT'])
+            difference_depth_queue.currently_accepted_stream_id_keys = stream_listener_id.id_keys
+            difference_depth_queue.put_difference_depth_message(stream_listener_id, message, 1741748001578)
+
+            status = json.loads(cli.show_jsoned_status())
+
+            spot_depth_status = next(
+                queue_status for queue_status in status['queue_status']
+                if queue_status['queue_size'] == 1
+            )
+            assert spot_depth_status['last_message'] == [1741748001578, message.decode('utf-8')]
 
         def test_handle_command_with_invalid_command_logs_warning(self):
             config_from_json = {
@@ -1459,9 +1462,6 @@ class TestArchiverFacade:
                 cli.handle_command(message)
             assert str(excinfo.value) == "'invalid_command' is not a valid CommandsRegistry"
 
-            TradeQueue.clear_instances()
-            DifferenceDepthQueue.clear_instances()
-
     class TestDataSaverSender:
 
         def setup_method(self):
@@ -1526,9 +1526,6 @@ class TestArchiverFacade:
                 assert mock_start_stream_writer.call_count == len(
                     queue_pool.queue_lookup), "start_stream_writer should be called for each queue"
 
-            DifferenceDepthQueue.clear_instances()
-            TradeQueue.clear_instances()
-
         def test_given_start_stream_writer_when_called_then_thread_is_started(self):
             queue_pool = DataSinkQueuePool()
 
@@ -1553,22 +1550,11 @@ class TestArchiverFacade:
                 assert kwargs['target'] == data_saver._write_stream_to_target, "Thread target should be _stream_writer"
                 mock_thread.return_value.start.assert_called_once()
 
-            TradeQueue.clear_instances()
-            DifferenceDepthQueue.clear_instances()
-
         def test_given_stream_writer_when_shutdown_flag_set_then_exits_loop(self):
 
             queue_pool = DataSinkQueuePool()
-            stream_listener_id = StreamListenerId(pairs=['BTCUSDT'])
-
             queue = queue_pool.get_queue(market=Market.SPOT, stream_type=StreamType.DIFFERENCE_DEPTH_STREAM)
 
-            queue._put_difference_depth_message_changing_websockets_mode(
-                message='{"stream": "btcusdt@depth", "data": {}}',
-                stream_listener_id=stream_listener_id,
-                timestamp_of_receive=1234567890
-            )
-
             asset_parameters = AssetParameters(
                 market=Market.SPOT,
                 stream_type=StreamType.DIFFERENCE_DEPTH_STREAM,
@@ -1581,24 +1567,20 @@ class TestArchiverFacade:
                 global_shutdown_flag=self.global_shutdown_flag
             )
 
-            with patch.object(StreamDataSaverAndSender, '_process_queue_data') as mock_process_queue_data, \
-                    patch.object(StreamDataSaverAndSender, '_sleep_with_flag_check') as mock_sleep_with_flag_check:
-                def side_effect(duration):
+            with patch.object(StreamDataSaverAndSender, '_process_queue_data') as mock_process_queue_data:
+                def side_effect(*args, **kwargs):
                     self.global_shutdown_flag.set()
 
-                mock_sleep_with_flag_check.side_effect = side_effect
+                mock_process_queue_data.side_effect = side_effect
 
                 data_saver._write_stream_to_target(queue=queue, asset_parameters=asset_parameters)
 
-                assert mock_process_queue_data.call_count == 2, "Should process data during and after loop"
-                mock_sleep_with_flag_check.assert_called_once_with(
-                    self.data_sink_config.time_settings.file_duration_seconds)
+                assert mock_process_queue_data.call_count == 1, "Should stop rotating once shutdown flag is set"
 
-            TradeQueue.clear_instances()
-            DifferenceDepthQueue.clear_instances()
+        def test_given_process_queue_data_when_queue_is_empty_then_no_action_is_taken(self, tmpdir):
 
-        def test_given_process_queue_data_when_queue_is_empty_then_no_action_is_taken(self):
             queue_pool = DataSinkQueuePool()
+            self.data_sink_config.file_save_catalog = str(tmpdir)
 
             data_saver = StreamDataSaverAndSender(
                 queue_pool=queue_pool,
@@ -1613,16 +1595,15 @@ class TestArchiverFacade:
                 pairs=['BTCUSDT']
             )
 
-            with patch.object(StreamDataSaverAndSender, 'write_data_to_json_file') as mock_write_json:
-                data_saver._process_queue_data(queue=queue, asset_parameters=asset_parameters)
-                mock_write_json.assert_not_called(), "Should not call write_data_to_json_file when queue is empty"
+            self.global_shutdown_flag.set()
+            data_saver._process_queue_data(queue=queue, asset_parameters=asset_parameters)
 
-            TradeQueue.clear_instances()
-            DifferenceDepthQueue.clear_instances()
+            assert os.listdir(str(tmpdir)) == [], "No file should be created when queue is empty"
 
-        def test_given_process_queue_data_when_queue_has_data_then_data_is_processed(self, tmpdir):
+        def test_given_process_queue_data_when_queue_has_data_then_data_is_streamed_to_pair_files(self, tmpdir):
 
             queue_pool = DataSinkQueuePool()
+            self.data_sink_config.file_save_catalog = str(tmpdir)
 
             data_saver = StreamDataSaverAndSender(
                 queue_pool=queue_pool,
@@ -1630,15 +1611,63 @@ class TestArchiverFacade:
                 global_shutdown_flag=self.global_shutdown_flag
             )
 
-            stream_listener_id = StreamListenerId(pairs=['BTCUSDT'])
+            stream_listener_id = StreamListenerId(pairs=['BTCUSDT', 'ETHUSDT'])
             queue = queue_pool.get_queue(market=Market.SPOT, stream_type=StreamType.DIFFERENCE_DEPTH_STREAM)
-            message = '{"stream":"btcusdt@depth","data":{}}'
             queue.currently_accepted_stream_id_keys = stream_listener_id.id_keys
 
-            queue._put_difference_depth_message_changing_websockets_mode(
-                message=message,
+            messages = [
+                '{"stream":"btcusdt@depth@100ms","data":{"u":1}}',
+                '{"stream":"ethusdt@depth@100ms","data":{"u":2}}',
+                '{"stream":"btcusdt@depth@100ms","data":{"u":3}}'
+            ]
+            for timestamp_of_receive, message in enumerate(messages):
+                queue.put_difference_depth_message(
+                    stream_listener_id=stream_listener_id,
+                    message=message,
+                    timestamp_of_receive=timestamp_of_receive
+                )
+
+            asset_parameters = AssetParameters(
+                market=Market.SPOT,
+                stream_type=StreamType.DIFFERENCE_DEPTH_STREAM,
+                pairs=['BTCUSDT', 'ETHUSDT']
+            )
+
+            self.global_shutdown_flag.set()
+            data_saver._process_queue_data(queue=queue, asset_parameters=asset_parameters)
+
+            saved_files = sorted(os.listdir(str(tmpdir)))
+            assert len(saved_files) == 2
+            assert saved_files[0].startswith('binance_difference_depth_stream_spot_btcusdt_')
+            assert saved_files[1].startswith('binance_difference_depth_stream_spot_ethusdt_')
+            assert all(file.endswith('.json') for file in saved_files)
+
+            with open(os.path.join(str(tmpdir), saved_files[0])) as f:
+                btcusdt_content = json.load(f)
+            assert btcusdt_content == [
+                {"stream": "btcusdt@depth@100ms", "data": {"u": 1}, "_E": 0},
+                {"stream": "btcusdt@depth@100ms", "data": {"u": 3}, "_E": 2}
+            ]
+
+        def test_given_zip_target_when_rotating_then_staged_files_are_compressed_by_archive_pipeline(self, tmpdir):
+
+            queue_pool = DataSinkQueuePool()
+            self.data_sink_config.file_save_catalog = str(tmpdir)
+            self.data_sink_config.data_save_target = DataSaveTarget.ZIP
+
+            data_saver = StreamDataSaverAndSender(
+                queue_pool=queue_pool,
+                data_sink_config=self.data_sink_config,
+                global_shutdown_flag=self.global_shutdown_flag
+            )
+
+            stream_listener_id = StreamListenerId(pairs=['BTCUSDT'])
+            queue = queue_pool.get_queue(market=Market.SPOT, stream_type=StreamType.DIFFERENCE_DEPTH_STREAM)
+            queue.currently_accepted_stream_id_keys = stream_listener_id.id_keys
+            queue.put_difference_depth_message(
                 stream_listener_id=stream_listener_id,
-                timestamp_of_receive=1234567890
+                message='{"stream":"btcusdt@depth@100ms","data":{"u":1}}',
+                timestamp_of_receive=7
             )
 
             asset_parameters = AssetParameters(
@@ -1647,22 +1676,38 @@ class TestArchiverFacade:
                 pairs=['BTCUSDT']
             )
 
-            dump_dir = tmpdir.mkdir("dump")
+            self.global_shutdown_flag.set()
+            data_saver._process_queue_data(queue=queue, asset_parameters=asset_parameters)
+            data_saver.shutdown()
+
+            saved_files = os.listdir(str(tmpdir))
+            assert len(saved_files) == 1
+            assert saved_files[0].endswith('.zip')
+            with zipfile.ZipFile(os.path.join(str(tmpdir), saved_files[0])) as zipf:
+                content = json.loads(zipf.read(zipf.namelist()[0]))
+            assert content == [{"stream": "btcusdt@depth@100ms", "data": {"u": 1}, "_E": 7}]
+            assert data_saver.archive_pipeline.get_status()['compressed_archives'] == 1
+
+        def test_given_pair_file_sink_when_zipping_then_archive_is_finalized_only_on_close(self, tmpdir):
+            pair_file_sink = PairFileSink(
+                file_save_catalog=str(tmpdir),
+                file_name='binance_trade_stream_spot_btcusdt_01-01-2022T00-00-00Z',
+                archive_compressor=ArchiveCompressor()
+            )
+            pair_file_sink.write('{"stream":"btcusdt@trade","data":{"t":1}}')
+            pair_file_sink.write('{"stream":"btcusdt@trade","data":{"t":2}}')
 
-            with patch.object(StreamDataSaverAndSender, 'write_data_to_json_file') as mock_write_json, \
-                    patch.object(StreamDataSaverAndSender, 'write_data_to_zip_file') as mock_write_zip, \
-                    patch.object(StreamDataSaverAndSender, 'send_zipped_json_to_azure_container') as mock_send_azure, \
-                    patch.object(StreamDataSaverAndSender,
-                                 'send_zipped_json_to_backblaze_bucket') as mock_send_backblaze:
-                data_saver._process_queue_data(queue=queue, asset_parameters=asset_parameters)
+            assert os.listdir(str(tmpdir)) == ['binance_trade_stream_spot_btcusdt_01-01-2022T00-00-00Z.zip.part']
 
-                # Zakładamy, że konfiguracja wskazuje na docelowy zapis do pliku JSON
-                assert mock_write_json.called, "write_data_to_json_file should be called"
-                assert not mock_write_zip.called, "write_data_to_zip_file should not be called"
-                assert not mock_send_azure.called, "send_zipped_json_to_azure_container should not be called"
-                assert not mock_send_backblaze.called, "send_zipped_json_to_backblaze_bucket should not be called"
+            archive_path = pair_file_sink.close()
 
-            DifferenceDepthQueue.clear_instances()
+            assert os.listdir(str(tmpdir)) == ['binance_trade_stream_spot_btcusdt_01-01-2022T00-00-00Z.zip']
+            with zipfile.ZipFile(archive_path) as zipf:
+                content = json.loads(zipf.read('binance_trade_stream_spot_btcusdt_01-01-2022T00-00-00Z.json'))
+            assert content == [
+                {"stream": "btcusdt@trade", "data": {"t": 1}},
+                {"stream": "btcusdt@trade", "data": {"t": 2}}
+            ]
 
         def test_given_get_file_name_when_called_then_correct_format_is_returned(self):
             asset_parameters = AssetParameters(
@@ -1677,8 +1722,6 @@ class TestArchiverFacade:
                 expected_file_name = "binance_difference_depth_stream_spot_btcusdt_01-01-2022T00-00-00Z"
                 assert file_name == expected_file_name, "File name should be correctly formatted"
 
-            DifferenceDepthQueue.clear_instances()
-
     class TestTimestampsGenerator:
 
         def test_given_time_utils_when_getting_utc_formatted_timestamp_then_format_is_correct(self):
@@ -1,74 +1,112 @@
-import pytest
+import threading
 import time
 from unittest.mock import MagicMock
 
-from binance_data_processor.enums.asset_parameters import AssetParameters
-from binance_data_processor.enums.market_enum import Market
-from binance_data_processor.enums.stream_type_enum import StreamType
-from binance_data_processor.core.blackout_supervisor import BlackoutSupervisor
+import pytest
+
+from binance_data_processor.core.blackout_supervisor import BlackoutSupervisor, BlackoutWatchdog
+
+
+@pytest.fixture
+def blackout_watchdog_fixture():
+    return BlackoutWatchdog(check_interval_seconds=0.1)
 
 
 @pytest.fixture
-def supervisor_fixture():
+def supervisor_fixture(blackout_watchdog_fixture):
     return BlackoutSupervisor(
-        asset_parameters=AssetParameters(market=Market.SPOT, stream_type=StreamType.DIFFERENCE_DEPTH_STREAM, pairs=[]),
-        max_interval_without_messages_in_seconds=2,
+        max_interval_without_messages_in_seconds=1,
+        name='SPOT DIFFERENCE_DEPTH_STREAM',
+        blackout_watchdog=blackout_watchdog_fixture
     )
 
+
+def wait_until(condition, timeout_seconds: float = 10) -> None:
+    deadline = time.monotonic() + timeout_seconds
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("condition was not met in time")
+        time.sleep(0.05)
+
+
 class TestBlackoutSupervisor:
 
     def test_given_blackout_supervisor_when_initialized_then_has_correct_parameters(self):
-        stream_type = StreamType.DIFFERENCE_DEPTH_STREAM
-        market = Market.USD_M_FUTURES
-        max_interval = 10
-
-        supervisor = BlackoutSupervisor(
-            asset_parameters=AssetParameters(
-                market=market,
-                stream_type=stream_type,
-                pairs=[]
-            ),
-            max_interval_without_messages_in_seconds=max_interval,
-        )
-
-        assert supervisor.asset_parameters.stream_type == stream_type
-        assert supervisor.asset_parameters.market == market
-        assert supervisor.max_interval_without_messages_in_seconds == max_interval
-
-    def test_given_blackout_supervisor_when_notify_then_updates_last_message_time(self, supervisor_fixture):
-        initial_time = supervisor_fixture._last_message_time_epoch_seconds_utc
-        time.sleep(1)
+        supervisor = BlackoutSupervisor(max_interval_without_messages_in_seconds=10, name='USD_M_FUTURES TRADE_STREAM')
 
+        assert supervisor.max_interval_without_messages_in_seconds == 10
+        assert supervisor.name == 'USD_M_FUTURES TRADE_STREAM'
+        assert supervisor.blackout_watchdog is BlackoutWatchdog.get_default_watchdog()
+
+    def test_given_blackout_supervisor_when_notify_then_message_counter_is_increased(self, supervisor_fixture):
+        supervisor_fixture.notify()
         supervisor_fixture.notify()
 
-        assert supervisor_fixture._last_message_time_epoch_seconds_utc > initial_time
+        assert supervisor_fixture.messages_received == 2
 
-    def test_given_blackout_supervisor_when_no_messages_for_max_interval_then_logger_warns(self, supervisor_fixture):
+    def test_given_blackout_supervisor_when_no_messages_for_max_interval_then_callback_is_invoked_once(self, supervisor_fixture, blackout_watchdog_fixture):
         mock_on_error_callback = MagicMock()
         supervisor_fixture.on_error_callback = mock_on_error_callback
         supervisor_fixture.run()
 
-        time.sleep(6)
+        wait_until(lambda: mock_on_error_callback.call_count == 1)
+        time.sleep(0.3)
 
         mock_on_error_callback.assert_called_once()
+        assert not supervisor_fixture._running
+        assert blackout_watchdog_fixture.get_statistics() == {}
 
-        supervisor_fixture.shutdown_supervisor()
-
-    def test_given_blackout_supervisor_when_running_then_notifies_correctly(self, supervisor_fixture):
+    def test_given_notified_blackout_supervisor_when_messages_keep_coming_then_callback_is_not_invoked(self, supervisor_fixture):
+        mock_on_error_callback = MagicMock()
+        supervisor_fixture.on_error_callback = mock_on_error_callback
         supervisor_fixture.run()
 
-        time.sleep(1)
+        for _ in range(30):
+            supervisor_fixture.notify()
+            time.sleep(0.05)
 
+        mock_on_error_callback.assert_not_called()
         assert supervisor_fixture._running
 
         supervisor_fixture.shutdown_supervisor()
 
-    def test_given_blackout_supervisor_when_shutdown_then_stops_running(self, supervisor_fixture):
+    def test_given_blackout_supervisor_when_shutdown_then_stops_running_and_watchdog_thread_ends(self, supervisor_fixture, blackout_watchdog_fixture):
         supervisor_fixture.run()
+        watchdog_thread = blackout_watchdog_fixture.thread
 
         supervisor_fixture.shutdown_supervisor()
 
         assert not supervisor_fixture._running
+        watchdog_thread.join(timeout=5)
+        assert not watchdog_thread.is_alive()
+
+    def test_given_many_supervisors_when_running_then_one_watchdog_thread_checks_them_all(self, blackout_watchdog_fixture):
+        supervisors = [
+            BlackoutSupervisor(max_interval_without_messages_in_seconds=30, name=f'listener {i}', blackout_watchdog=blackout_watchdog_fixture)
+            for i in range(12)
+        ]
+        for supervisor in supervisors:
+            supervisor.run()
+
+        assert [t.name for t in threading.enumerate()].count('blackout_watchdog') == 1
 
-    def test_given_blackout_supervisor_when_no_error_callback_then_raises_exception(self, supervisor_fixture):
-        ...
+        for supervisor in supervisors:
+            supervisor.shutdown_supervisor()
+
+    def test_given_message_counts_when_checking_then_message_rate_statistics_are_reported(self, supervisor_fixture):
+        supervisor_fixture.run()
+        started_at = supervisor_fixture._last_seen_at
+
+        for _ in range(50):
+            supervisor_fixture.notify()
+        assert supervisor_fixture.check(started_at + 2) is False
+        assert supervisor_fixture.check(started_at + 4) is True
+
+        assert supervisor_fixture.get_statistics(now=started_at + 4) == {
+            'messages_received': 50,
+            'messages_per_second': 0.0,
+            'average_messages_per_second': 20.0,
+            'seconds_since_last_message': 2.0
+        }
+
+        supervisor_fixture.shutdown_supervisor()
@@ -0,0 +1,91 @@
+import threading
+
+from binance_data_processor.core.difference_depth_queue import DifferenceDepthQueue
+from binance_data_processor.core.queue_pool import DataSinkQueuePool
+from binance_data_processor.core.stream_listener import CombinedStreamListener, StreamListener
+from binance_data_processor.core.stream_service import StreamService
+from binance_data_processor.core.trade_queue import TradeQueue
+from binance_data_processor.core.url_factory import URLFactory
+from binance_data_processor.enums.asset_parameters import AssetParameters
+from binance_data_processor.enums.data_sink_config import DataSinkConfig
+from binance_data_processor.enums.market_enum import Market
+from binance_data_processor.enums.stream_type_enum import StreamType
+
+
+class TestCombinedStreamListener:
+
+    def test_given_both_stream_types_when_getting_stream_url_then_one_combined_url_carries_depth_and_trade_streams(self):
+        asset_parameters = AssetParameters(
+            market=Market.USD_M_FUTURES,
+            stream_type=StreamType.DIFFERENCE_DEPTH_STREAM,
+            pairs=['BTCUSDT', 'ETHUSDT']
+        )
+
+        assert URLFactory.get_stream_url(
+            asset_parameters,
+            stream_types=[StreamType.DIFFERENCE_DEPTH_STREAM, StreamType.TRADE_STREAM]
+        ) == (
+            'wss://fstream.binance.com/stream?streams='
+            'btcusdt@depth@100ms/ethusdt@depth@100ms/btcusdt@trade/ethusdt@trade'
+        )
+        assert URLFactory.get_stream_url(asset_parameters) == (
+            'wss://fstream.binance.com/stream?streams=btcusdt@depth@100ms/ethusdt@depth@100ms'
+        )
+
+    def test_given_combined_stream_messages_when_handling_then_messages_are_demultiplexed_into_queues(self):
+        difference_depth_queue = DifferenceDepthQueue(market=Market.SPOT)
+        trade_queue = TradeQueue(market=Market.SPOT)
+        combined_stream_listener = CombinedStreamListener(
+            difference_depth_queue=difference_depth_queue,
+            trade_queue=trade_queue,
+            asset_parameters=AssetParameters(
+                market=Market.SPOT,
+                stream_type=StreamType.DIFFERENCE_DEPTH_STREAM,
+                pairs=['BTCUSDT']
+            )
+        )
+        difference_depth_queue.currently_accepted_stream_id_keys = combined_stream_listener.id.id_keys
+        trade_queue.currently_accepted_stream_id_keys = combined_stream_listener.id.id_keys
+
+        depth_message = '{"stream":"btcusdt@depth@100ms","data":{"e":"depthUpdate","E":1,"U":1,"u":2,"b":[],"a":[]}}'
+        trade_message = '{"stream":"btcusdt@trade","data":{"e":"trade","E":1,"s":"BTCUSDT","t":1}}'
+        combined_stream_listener._handle_incoming_message(depth_message, 10)
+        combined_stream_listener._handle_incoming_message(trade_message, 11)
+        combined_stream_listener._handle_incoming_message('{"result":null,"id":1}', 12)
+
+        assert combined_stream_listener._url == (
+            'wss://stream.binance.com:443/stream?streams=btcusdt@depth@100ms/btcusdt@trade&timeUnit=microsecond'
+        )
+        assert difference_depth_queue.drain_all() == [depth_message[:-1] + ',"_E":10}']
+        assert trade_queue.drain_all() == [trade_message[:-1] + ',"_E":11}']
+
+    def test_given_combined_stream_listener_registered_twice_when_updating_subscriptions_then_it_is_changed_once(self):
+        stream_service = StreamService(
+            queue_pool=DataSinkQueuePool(),
+            global_shutdown_flag=threading.Event(),
+            data_sink_config=DataSinkConfig(combine_market_streams=True)
+        )
+        subscription_changes = []
+
+        class SubscriptionRecorder:
+            def change_subscription(self, pair: str, action: str):
+                subscription_changes.append((pair, action))
+
+        stream_listener = SubscriptionRecorder()
+        stream_service._register_stream_listener(
+            Market.SPOT,
+            {StreamType.DIFFERENCE_DEPTH_STREAM: None, StreamType.TRADE_STREAM: None},
+            'old',
+            stream_listener
+        )
+        stream_service.update_subscriptions(market=Market.SPOT, asset_upper='ETHUSDT', action='subscribe')
+
+        assert stream_service.stream_listeners[(Market.SPOT, StreamType.TRADE_STREAM, 0, 'old')] is stream_listener
+        assert subscription_changes == [('ETHUSDT', 'subscribe')]
+        assert isinstance(
+            stream_service._create_stream_listener(
+                {StreamType.TRADE_STREAM: stream_service.queue_pool.get_queue(Market.SPOT, StreamType.TRADE_STREAM)},
+                AssetParameters(market=Market.SPOT, stream_type=StreamType.TRADE_STREAM, pairs=['BTCUSDT'])
+            ),
+            StreamListener
+        )
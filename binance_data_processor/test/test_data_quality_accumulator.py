@@ -0,0 +1,257 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from binance_data_processor.enums.asset_parameters import AssetParameters
+from binance_data_processor.enums.market_enum import Market
+from binance_data_processor.enums.stream_type_enum import StreamType
+from binance_data_processor.enums.epoch_time_unit import EpochTimeUnit
+from binance_data_processor.scraper.data_quality_accumulator import (
+    DataQualityAccumulator,
+    _Chunk,
+    _FirstAndLastWithinBorders,
+    _Increasing,
+    _IncreasingByOne,
+    _NoAbnormalPriceTick,
+    _NonDecreasing,
+    _UpdateIdContinuity
+)
+from binance_data_processor.scraper.data_quality_checker import DataQualityChecker
+from binance_data_processor.scraper.individual_column_checker import IndividualColumnChecker
+from binance_data_processor.scraper.stream_dataframe_decoder import StreamDataFrameDecoder
+
+TEST_CSVS_DIRECTORY = os.path.join(os.path.dirname(__file__), 'test_csvs')
+
+# depth snapshot test csvs carry only LastUpdateId and IsAsk, the checker cannot run on them
+STREAM_TEST_CSV_NAMES = sorted(
+    csv_name for csv_name in os.listdir(TEST_CSVS_DIRECTORY)
+    if 'depth_snapshot' not in csv_name
+)
+
+
+def get_tests_results(tests_results_register: dict) -> list[tuple[str, str, bool]]:
+    return [
+        (column, test_name, bool(result))
+        for column, tests in tests_results_register.items()
+        for test_name, result in tests.items()
+    ]
+
+
+def get_accumulated_tests_results(dataframe: pd.DataFrame, asset_parameters: AssetParameters, chunks_amount: int) -> list[tuple[str, str, bool]]:
+    data_quality_accumulator = DataQualityAccumulator(asset_parameters=asset_parameters)
+    for rows in np.array_split(np.arange(len(dataframe)), chunks_amount):
+        data_quality_accumulator.update(dataframe.iloc[rows])
+    return get_tests_results(data_quality_accumulator.get_data_quality_report().tests_results_register)
+
+
+def get_depth_snapshot_dataframe(market: Market, levels_per_side: list[int]) -> pd.DataFrame:
+    column_chunks = []
+    for i, levels_amount in enumerate(levels_per_side):
+        snapshot = {
+            "lastUpdateId": 1_000 + i,
+            "E": 1741737600000 + i * 60_000,
+            "T": 1741737600000 + i * 60_000,
+            "symbol": "BTCUSD_PERP",
+            "pair": "BTCUSD",
+            "bids": [[f"{83000 - level}.1", "1.5"] for level in range(levels_amount)],
+            "asks": [[f"{83001 + level}.1", "0.5"] for level in range(levels_amount)],
+            "_rq": 1741737600000 + i * 60_000,
+            "_rc": 1741737600001 + i * 60_000
+        }
+        column_chunks.append(StreamDataFrameDecoder.get_depth_snapshot_columns(snapshot, market))
+    return StreamDataFrameDecoder.get_dataframe(column_chunks, StreamDataFrameDecoder.COLUMNS[(StreamType.DEPTH_SNAPSHOT, market)])
+
+
+DAY_START_MS = 1741737600000
+
+# fused chunk combiner, the checker predicate it mirrors, the columns fed to the predicate and the frames to compare them on
+FUSED_CHECK_CASES = [
+    (
+        lambda: _NonDecreasing('TradeId'), IndividualColumnChecker.is_series_non_decreasing, ['TradeId'], {},
+        [{'TradeId': [1, 2, 2, 3]}, {'TradeId': [1, 2, 1, 3]}, {'TradeId': [3, 2]}, {'TradeId': [5]}]
+    ),
+    (
+        lambda: _Increasing('TradeId'), IndividualColumnChecker.are_series_values_increasing, ['TradeId'], {},
+        [{'TradeId': [1, 2, 5, 6]}, {'TradeId': [1, 2, 2, 3]}, {'TradeId': [1, 3, 2, 4]}]
+    ),
+    (
+        lambda: _IncreasingByOne('TradeId'), IndividualColumnChecker.is_each_trade_id_bigger_by_one_than_previous, ['TradeId'], {},
+        [{'TradeId': [1, 2, 3, 4]}, {'TradeId': [1, 2, 4, 5]}, {'TradeId': [1, 2, 2, 3]}]
+    ),
+    (
+        lambda: _NoAbnormalPriceTick('Price'), IndividualColumnChecker.is_there_no_abnormal_price_tick_higher_than_2_percent, ['Price'], {},
+        [{'Price': [100.0, 101.0, 102.0, 101.5]}, {'Price': [100.0, 101.0, 104.0, 104.5]}, {'Price': [100.0, 100.5, 97.0]}]
+    ),
+    (
+        lambda: _UpdateIdContinuity('FirstUpdateId', 1),
+        IndividualColumnChecker.is_first_update_id_bigger_by_one_than_previous_entry_final_update_id, ['FirstUpdateId', 'FinalUpdateId'], {},
+        [
+            {'FirstUpdateId': [1, 1, 4, 4, 7], 'FinalUpdateId': [3, 3, 6, 6, 9]},
+            {'FirstUpdateId': [1, 1, 5, 5, 7], 'FinalUpdateId': [3, 3, 6, 6, 9]},
+            {'FirstUpdateId': [1, 1, 4, 4, 8], 'FinalUpdateId': [3, 3, 6, 6, 9]}
+        ]
+    ),
+    (
+        lambda: _UpdateIdContinuity('FinalUpdateIdInLastStream', 0),
+        IndividualColumnChecker.is_final_update_id_equal_to_previous_entry_final_update, ['FinalUpdateId', 'FinalUpdateIdInLastStream'], {},
+        [
+            {'FinalUpdateId': [3, 3, 6, 6, 9], 'FinalUpdateIdInLastStream': [1, 1, 3, 3, 6]},
+            {'FinalUpdateId': [3, 3, 6, 6, 9], 'FinalUpdateIdInLastStream': [1, 1, 3, 3, 5]},
+            {'FinalUpdateId': [3, 3, 6, 6, 9], 'FinalUpdateIdInLastStream': [1, 1, 2, 2, 6]}
+        ]
+    ),
+    (
+        lambda: _FirstAndLastWithinBorders('TimestampOfReceive', '12-03-2025', EpochTimeUnit.MILLISECONDS, 60),
+        IndividualColumnChecker.are_first_and_last_timestamps_within_60_seconds_from_the_borders, ['TimestampOfReceive'],
+        {'date': '12-03-2025', 'epoch_time_unit': EpochTimeUnit.MILLISECONDS},
+        [
+            {'TimestampOfReceive': [DAY_START_MS + 1_000, DAY_START_MS + 43_200_000, DAY_START_MS + 86_399_000]},
+            {'TimestampOfReceive': [DAY_START_MS + 61_000, DAY_START_MS + 43_200_000, DAY_START_MS + 86_399_000]},
+            {'TimestampOfReceive': [DAY_START_MS + 1_000, DAY_START_MS + 43_200_000, DAY_START_MS + 86_300_000]}
+        ]
+    ),
+    (
+        lambda: DataQualityAccumulator._only_one_expected_value('Symbol', 'BTCUSDT'),
+        IndividualColumnChecker.is_whole_series_made_of_only_one_expected_value, ['Symbol'], {'expected_value': 'BTCUSDT'},
+        [{'Symbol': ['BTCUSDT', 'BTCUSDT', 'BTCUSDT']}, {'Symbol': ['BTCUSDT', 'BTCUSDT', 'ETHUSDT']}, {'Symbol': ['ETHUSDT', 'ETHUSDT']}]
+    ),
+    (
+        lambda: DataQualityAccumulator._float_type('Price'),
+        IndividualColumnChecker.are_values_parsed_to_specified_type, ['Price'], {'expected_type': float},
+        [{'Price': [100.0, 101.0, 102.0]}, {'Price': [100.0, 101.0, np.nan]}]
+    )
+]
+
+
+def get_fused_checks_results(make_checks: list, dataframe: pd.DataFrame, chunks_borders: list[int]) -> list[bool]:
+    # chunks are handed over the way DataQualityAccumulator.update does it
+    checks = [make_check() for make_check in make_checks]
+    last_values = {}
+    for chunk_start, chunk_end in zip([0] + chunks_borders, chunks_borders + [len(dataframe)]):
+        chunk = _Chunk(dataframe.iloc[chunk_start:chunk_end], carried_last_values=last_values)
+        for check in checks:
+            check.update(chunk)
+        last_values = {**last_values, **chunk.get_last_values()}
+    return [bool(check.result) for check in checks]
+
+
+class TestDataQualityAccumulator:
+
+    @pytest.mark.parametrize('make_check, predicate, columns, arguments, frames', FUSED_CHECK_CASES)
+    def test_given_frame_split_at_every_row_when_fused_check_is_updated_then_verdict_equals_column_checker_predicate(self, make_check, predicate, columns, arguments, frames):
+        for frame in frames:
+            dataframe = pd.DataFrame(frame)
+            expected_result = bool(predicate(*(dataframe[column] for column in columns), **arguments))
+
+            # each first row of a chunk is compared with the last row of the previous chunk
+            chunks_borders_cases = [[]] + [[border] for border in range(1, len(dataframe))] + [list(range(1, len(dataframe)))]
+            for chunks_borders in chunks_borders_cases:
+                assert get_fused_checks_results([make_check], dataframe, chunks_borders) == [expected_result], (frame, chunks_borders)
+
+    def test_given_violation_on_chunk_border_when_accumulating_trades_then_it_is_reported(self):
+        csv_name = next(csv_name for csv_name in STREAM_TEST_CSV_NAMES if 'positive' in csv_name and 'trade' in csv_name)
+        asset_parameters = DataQualityChecker.decode_asset_parameters_from_csv_name(csv_name)
+        dataframe = pd.read_csv(os.path.join(TEST_CSVS_DIRECTORY, csv_name), comment='#')
+        border = len(dataframe) // 2
+        dataframe.loc[border:, 'TradeId'] += 1
+
+        data_quality_accumulator = DataQualityAccumulator(asset_parameters=asset_parameters)
+        data_quality_accumulator.update(dataframe.iloc[:border])
+        data_quality_accumulator.update(dataframe.iloc[border:])
+        tests_results = get_tests_results(data_quality_accumulator.get_data_quality_report().tests_results_register)
+
+        assert ('TradeId', 'are_series_values_increasing', True) in tests_results
+        assert ('TradeId', 'is_each_trade_id_bigger_by_one_than_previous', False) in tests_results
+        assert bool(IndividualColumnChecker.is_each_trade_id_bigger_by_one_than_previous(dataframe['TradeId'])) is False
+
+    @pytest.mark.parametrize('csv_name', STREAM_TEST_CSV_NAMES)
+    @pytest.mark.parametrize('chunks_amount', [1, 7, 101])
+    def test_given_test_csv_split_into_chunks_when_accumulating_then_report_equals_whole_dataframe_report(self, csv_name, chunks_amount):
+        asset_parameters = DataQualityChecker.decode_asset_parameters_from_csv_name(csv_name)
+        dataframe = pd.read_csv(os.path.join(TEST_CSVS_DIRECTORY, csv_name), comment='#')
+
+        expected_tests_results = get_tests_results(
+            DataQualityChecker().get_dataframe_quality_report(dataframe, asset_parameters).tests_results_register
+        )
+
+        assert get_accumulated_tests_results(dataframe, asset_parameters, chunks_amount) == expected_tests_results
+
+    @pytest.mark.parametrize('levels_per_side', [[1000, 1000, 1000], [1000, 999, 1000]])
+    def test_given_snapshots_split_inside_a_snapshot_when_accumulating_then_report_equals_whole_dataframe_report(self, levels_per_side):
+        asset_parameters = AssetParameters(
+            market=Market.COIN_M_FUTURES,
+            stream_type=StreamType.DEPTH_SNAPSHOT,
+            pairs=['btcusd_perp'],
+            date='12-03-2025'
+        )
+        dataframe = get_depth_snapshot_dataframe(Market.COIN_M_FUTURES, levels_per_side)
+
+        expected_tests_results = get_tests_results(
+            DataQualityChecker().get_dataframe_quality_report(dataframe, asset_parameters).tests_results_register
+        )
+
+        assert get_accumulated_tests_results(dataframe, asset_parameters, chunks_amount=4) == expected_tests_results
+        assert ('GENERAL', 'is_price_level_amount_equal_to_market_amount_limit', levels_per_side == [1000] * 3) in expected_tests_results
+
+    def test_given_no_rows_when_getting_report_then_report_is_negative_instead_of_failing(self):
+        asset_parameters = AssetParameters(
+            market=Market.USD_M_FUTURES,
+            stream_type=StreamType.TRADE_STREAM,
+            pairs=['btcusdt'],
+            date='12-03-2025'
+        )
+
+        data_quality_report = DataQualityAccumulator(asset_parameters=asset_parameters).get_data_quality_report()
+
+        assert not data_quality_report.is_data_quality_report_positive()
+        assert data_quality_report.tests_results_register['TimestampOfReceive']['is_series_non_decreasing'] is False
+
+    def test_given_decimal_strings_when_accumulating_then_they_are_parsed_and_type_test_passes(self):
+        asset_parameters = DataQualityChecker.decode_asset_parameters_from_csv_name(STREAM_TEST_CSV_NAMES[0])
+        dataframe = pd.read_csv(os.path.join(TEST_CSVS_DIRECTORY, STREAM_TEST_CSV_NAMES[0]), comment='#')
+        expected_tests_results = get_tests_results(DataQualityChecker().get_dataframe_quality_report(dataframe, asset_parameters).tests_results_register)
+
+        dataframe = dataframe.astype({'Price': str, 'Quantity': str})
+
+        assert get_accumulated_tests_results(dataframe, asset_parameters, chunks_amount=3) == expected_tests_results
+
+    def test_given_price_which_is_not_a_number_when_accumulating_then_type_test_fails_instead_of_raising(self):
+        csv_name = next(csv_name for csv_name in STREAM_TEST_CSV_NAMES if 'trade' in csv_name)
+        asset_parameters = DataQualityChecker.decode_asset_parameters_from_csv_name(csv_name)
+        dataframe = pd.read_csv(os.path.join(TEST_CSVS_DIRECTORY, csv_name), comment='#').astype({'Price': object})
+        dataframe.loc[len(dataframe) // 2, 'Price'] = 'not a price'
+
+        tests_results = get_accumulated_tests_results(dataframe, asset_parameters, chunks_amount=3)
+
+        assert ('Price', 'are_values_with_specified_type', False) in tests_results
+        assert ('Quantity', 'are_values_with_specified_type', True) in tests_results
+
+    @pytest.mark.skip
+    def test_column_checker_predicates_vs_fused_checks_benchmark(self):
+        dataframes = [
+            pd.read_csv(os.path.join(TEST_CSVS_DIRECTORY, csv_name), comment='#')
+            for csv_name in STREAM_TEST_CSV_NAMES
+        ]
+
+        # the test csvs as they are, then each one repeated to a day sized frame
+        for repeats in [1, 50]:
+            repeated_dataframes = [pd.concat([dataframe] * repeats, ignore_index=True) for dataframe in dataframes]
+            rows_amount = sum(len(dataframe) for dataframe in repeated_dataframes)
+            cases_per_dataframe = [
+                [case for case in FUSED_CHECK_CASES if set(case[2]) <= set(dataframe.columns)]
+                for dataframe in repeated_dataframes
+            ]
+
+            started_at = time.perf_counter()
+            for dataframe, cases in zip(repeated_dataframes, cases_per_dataframe):
+                for _, predicate, columns, arguments, _ in cases:
+                    predicate(*(dataframe[column] for column in columns), **arguments)
+            print(f'\n{rows_amount} rows, column checker predicates: {time.perf_counter() - started_at:.3f}s')
+
+            started_at = time.perf_counter()
+            for dataframe, cases in zip(repeated_dataframes, cases_per_dataframe):
+                get_fused_checks_results([make_check for make_check, *_ in cases], dataframe, chunks_borders=[])
+            print(f'{rows_amount} rows, fused checks: {time.perf_counter() - started_at:.3f}s')
@@ -465,6 +465,13 @@ class TestIndividualColumnChecker:
         series = pd.Series(["BTCUSDT", "BTCUSDT", "BTCUSDT", False, None])
         assert IndividualColumnChecker.are_values_with_specified_type(series, str) == False
 
+    def test_are_values_with_specified_type_numpy_dtypes(self):
+        assert IndividualColumnChecker.are_values_with_specified_type(pd.Series([1, 2], dtype='uint8'), int) == True
+        assert IndividualColumnChecker.are_values_with_specified_type(pd.Series([True, False]), int) == False
+        assert IndividualColumnChecker.are_values_with_specified_type(pd.Series([True, False]), bool) == True
+        assert IndividualColumnChecker.are_values_with_specified_type(pd.Series([1.0, None]), float) == True
+        assert IndividualColumnChecker.are_values_with_specified_type(pd.Series([], dtype=float), int) == True
+
     #### are_values_with_specified_type
 
     def test_are_values_positive_positive(self):
@@ -1,12 +1,12 @@
 import queue
+import threading
 import time
 from collections import deque
 import json
 from queue import Queue
 import pytest
 
-from binance_data_processor.core.difference_depth_queue import DifferenceDepthQueue, \
-    ClassInstancesAmountLimitException
+from binance_data_processor.core.difference_depth_queue import DifferenceDepthQueue
 from binance_data_processor.enums.market_enum import Market
 from binance_data_processor.core.stream_listener_id import StreamListenerId
 
@@ -84,36 +84,15 @@ class TestDifferenceDepthQueue:
 
         assert add_field_to_string_json_message(binance_format_message, "_E", mocked_timestamp) == '{"stream":"trxusdt@depth@100ms","data":{"e":"depthUpdate","E":1720337869317,"s":"TRXUSDT","U":4609985365,"u":4609985365,"b":[["0.12984000","123840.00000000"]],"a":[]},"_E":2115}'
 
-    # DifferenceDepthQueue singleton init test
+    # init test
     #
-    def test_given_too_many_difference_depth_queue_instances_exists_when_creating_new_then_exception_is_thrown(self):
-        for _ in range(3):
-            DifferenceDepthQueue(Market.SPOT)
+    def test_given_many_difference_depth_queues_when_creating_them_then_every_queue_is_independent(self):
+        queues = [DifferenceDepthQueue(Market.SPOT) for _ in range(8)]
 
-        with pytest.raises(ClassInstancesAmountLimitException):
-            DifferenceDepthQueue(Market.SPOT)
+        queues[0].queue.put('message')
 
-        DifferenceDepthQueue.clear_instances()
-
-    def test_given_checking_amount_of_instances_when_get_instance_count_invocation_then_amount_is_correct(self):
-        instance_count = DifferenceDepthQueue.get_instance_count()
-        assert instance_count == 0
-
-        for _ in range(3):
-            DifferenceDepthQueue(Market.SPOT)
-
-        assert DifferenceDepthQueue.get_instance_count() == 3
-
-        DifferenceDepthQueue.clear_instances()
-
-    def test_given_instances_amount_counter_reset_when_clear_instances_method_invocation_then_amount_is_zero(self):
-        for _ in range(3):
-            DifferenceDepthQueue(Market.SPOT)
-
-        DifferenceDepthQueue.clear_instances()
-
-        assert DifferenceDepthQueue.get_instance_count() == 0
-        DifferenceDepthQueue.clear_instances()
+        assert queues[0].qsize() == 1
+        assert all(queue.qsize() == 0 for queue in queues[1:])
 
     # put_queue_message test
     #
@@ -186,8 +165,6 @@ class TestDifferenceDepthQueue:
                 in difference_depth_queue_content_list)
         assert len(difference_depth_queue_content_list) == 1
 
-        DifferenceDepthQueue.clear_instances()
-
     def test_given_putting_message_from_no_longer_accepted_stream_listener_id_when_try_to_put_then_message_is_not_added_to_the_queue(self):
 
         config = {
@@ -573,8 +550,6 @@ class TestDifferenceDepthQueue:
         assert add_field_to_string_json_message(_new_listener_message_3, "_E", mocked_timestamp_of_receive) not in difference_depth_queue_content_list
         assert add_field_to_string_json_message(_old_listener_message_4, "_E", mocked_timestamp_of_receive) not in difference_depth_queue_content_list
 
-        DifferenceDepthQueue.clear_instances()
-
     def test_given_putting_stream_message_and_two_last_throws_are_not_equal_when_two_listeners_messages_are_being_compared_then_currently_accepted_stream_id_is_not_changed_and_only_old_stream_listener_messages_are_put_in(self):
         """
         difference lays in a _old_listener_message_1 / _new_listener_message_1, new stream listener is + 1 ms
@@ -881,8 +856,6 @@ class TestDifferenceDepthQueue:
         assert add_field_to_string_json_message(_new_listener_message_2, "_E", mocked_timestamp_of_receive) not in difference_depth_queue_content_list
         assert add_field_to_string_json_message(_new_listener_message_3, "_E", mocked_timestamp_of_receive) not in difference_depth_queue_content_list
 
-        DifferenceDepthQueue.clear_instances()
-
     def test_given_putting_stream_message_and_two_last_throws_are_equal_when_two_listeners_messages_are_being_compared_then_currently_accepted_stream_id_is_changed_and_only_old_stream_listener_messages_are_put_in(self):
 
         config = {
@@ -1184,15 +1157,12 @@ class TestDifferenceDepthQueue:
 
         assert difference_depth_queue_content_list == expected_list
 
-        DifferenceDepthQueue.clear_instances()
-
     # run_mode tests
     #
     def test_given_data_listener_mode_and_global_queue_when_initializing_difference_depth_queue_then_queue_is_set_to_global_queue(self):
         global_queue = Queue()
         difference_depth_queue = DifferenceDepthQueue(market=Market.SPOT, global_queue=global_queue)
         assert difference_depth_queue.queue is global_queue
-        DifferenceDepthQueue.clear_instances()
 
     def test_given_difference_depth_message_in_data_listener_mode_when_putting_message_then_message_is_added_to_global_queue(self):
         global_queue = Queue()
@@ -1219,7 +1189,20 @@ class TestDifferenceDepthQueue:
         assert not global_queue.empty()
         queued_message = global_queue.get_nowait()
         assert queued_message == add_field_to_string_json_message(formatted_message, "_E", timestamp_of_receive)
-        DifferenceDepthQueue.clear_instances()
+
+    def test_given_compact_records_when_putting_message_then_raw_message_and_timestamp_of_receive_are_queued_as_record(self):
+        difference_depth_queue = DifferenceDepthQueue(market=Market.SPOT, compact_records=True)
+        stream_listener_id = StreamListenerId(pairs=['BTCUSDT'])
+        difference_depth_queue.currently_accepted_stream_id_keys = stream_listener_id.id_keys
+        message = '{"stream":"btcusdt@depth@100ms","data":{"E":123456789,"b":[["50000.00","1.0"]],"a":[]}}'
+
+        difference_depth_queue.put_difference_depth_message(stream_listener_id, message, 1234567890)
+        difference_depth_queue.set_switching_websockets_mode()
+        difference_depth_queue.put_difference_depth_message(stream_listener_id, message, 1234567891)
+
+        queued_records = difference_depth_queue.drain_all()
+        assert queued_records == [(1234567890, message), (1234567891, message)]
+        assert queued_records[0][1] is message
 
     def test_given_messages_in_data_listener_mode_when_using_queue_operations_then_operations_reflect_global_queue_state(self):
         global_queue = Queue()
@@ -1248,7 +1231,6 @@ class TestDifferenceDepthQueue:
         queued_message = difference_depth_queue.get_nowait()
         assert queued_message == add_field_to_string_json_message(formatted_message, "_E", timestamp_of_receive)
         assert difference_depth_queue.empty()
-        DifferenceDepthQueue.clear_instances()
 
     def test_given_empty_global_queue_in_data_listener_mode_when_checking_queue_then_empty_and_get_nowait_raises_exception(self):
         global_queue = Queue()
@@ -1256,7 +1238,6 @@ class TestDifferenceDepthQueue:
         assert difference_depth_queue.empty()
         with pytest.raises(queue.Empty):
             difference_depth_queue.get_nowait()
-        DifferenceDepthQueue.clear_instances()
 
 
     # _append_message_to_compare_structure
@@ -1524,13 +1505,13 @@ class TestDifferenceDepthQueue:
 
         expected_comparison_structure = {
             old_stream_listener_id.id_keys: deque([
-                DifferenceDepthQueue._remove_event_timestamp(_old_listener_message_1),
-                DifferenceDepthQueue._remove_event_timestamp(_old_listener_message_2),
-                DifferenceDepthQueue._remove_event_timestamp(_old_listener_message_3)
+                DifferenceDepthQueue.get_message_fingerprint(_old_listener_message_1),
+                DifferenceDepthQueue.get_message_fingerprint(_old_listener_message_2),
+                DifferenceDepthQueue.get_message_fingerprint(_old_listener_message_3)
             ]),
             new_stream_listener_id.id_keys: deque([
-                DifferenceDepthQueue._remove_event_timestamp(_new_listener_message_1),
-                DifferenceDepthQueue._remove_event_timestamp(_new_listener_message_2)
+                DifferenceDepthQueue.get_message_fingerprint(_new_listener_message_1),
+                DifferenceDepthQueue.get_message_fingerprint(_new_listener_message_2)
             ])
         }
 
@@ -1540,8 +1521,6 @@ class TestDifferenceDepthQueue:
         assert len(difference_depth_queue.two_last_throws[old_stream_listener_id.id_keys]) == 3
         assert len(difference_depth_queue.two_last_throws[new_stream_listener_id.id_keys]) == 2
 
-        DifferenceDepthQueue.clear_instances()
-
     def test_given_putting_message_when_adding_messages_to_the_full_queues_then_is_last_message_being_removed(self):
         """difference lays in a _old_listener_message_1 / _new_listener_message_1, new stream listener is + 1 ms"""
 
@@ -1907,14 +1886,14 @@ class TestDifferenceDepthQueue:
 
         expected_comparison_structure = {
             old_stream_listener_id.id_keys: deque([
-                DifferenceDepthQueue._remove_event_timestamp(_old_listener_message_2),
-                DifferenceDepthQueue._remove_event_timestamp(_old_listener_message_3),
-                DifferenceDepthQueue._remove_event_timestamp(_old_listener_message_4)
+                DifferenceDepthQueue.get_message_fingerprint(_old_listener_message_2),
+                DifferenceDepthQueue.get_message_fingerprint(_old_listener_message_3),
+                DifferenceDepthQueue.get_message_fingerprint(_old_listener_message_4)
             ], maxlen=old_stream_listener_id.pairs_amount),
             new_stream_listener_id.id_keys: deque([
-                DifferenceDepthQueue._remove_event_timestamp(_new_listener_message_2),
-                DifferenceDepthQueue._remove_event_timestamp(_new_listener_message_3),
-                DifferenceDepthQueue._remove_event_timestamp(_new_listener_message_4)
+                DifferenceDepthQueue.get_message_fingerprint(_new_listener_message_2),
+                DifferenceDepthQueue.get_message_fingerprint(_new_listener_message_3),
+                DifferenceDepthQueue.get_message_fingerprint(_new_listener_message_4)
             ], maxlen=new_stream_listener_id.pairs_amount)
         }
 
@@ -1924,8 +1903,6 @@ class TestDifferenceDepthQueue:
         assert len(difference_depth_queue.two_last_throws[old_stream_listener_id.id_keys]) == 3
         assert len(difference_depth_queue.two_last_throws[new_stream_listener_id.id_keys]) == 3
 
-        DifferenceDepthQueue.clear_instances()
-
     #_remove_event_timestamp
     #
     def test_given_processing_message_to_compare_structure_when_removing_event_timestamp_then_output_is_ok(self):
@@ -2335,17 +2312,17 @@ class TestDifferenceDepthQueue:
             old_stream_listener_id.id_keys:
                 deque(
                     [
-                        DifferenceDepthQueue._remove_event_timestamp(_old_listener_message_1),
-                        DifferenceDepthQueue._remove_event_timestamp(_old_listener_message_2),
-                        DifferenceDepthQueue._remove_event_timestamp(_old_listener_message_3),
+                        DifferenceDepthQueue.get_message_fingerprint(_old_listener_message_1),
+                        DifferenceDepthQueue.get_message_fingerprint(_old_listener_message_2),
+                        DifferenceDepthQueue.get_message_fingerprint(_old_listener_message_3),
                     ],
                 maxlen=old_stream_listener_id.pairs_amount),
             new_stream_listener_id.id_keys:
                 deque(
                     [
-                        DifferenceDepthQueue._remove_event_timestamp(_new_listener_message_1),
-                        DifferenceDepthQueue._remove_event_timestamp(_new_listener_message_2),
-                        DifferenceDepthQueue._remove_event_timestamp(_new_listener_message_3),
+                        DifferenceDepthQueue.get_message_fingerprint(_new_listener_message_1),
+                        DifferenceDepthQueue.get_message_fingerprint(_new_listener_message_2),
+                        DifferenceDepthQueue.get_message_fingerprint(_new_listener_message_3),
                     ],
                     maxlen=new_stream_listener_id.pairs_amount)
         }
@@ -2356,7 +2333,6 @@ class TestDifferenceDepthQueue:
         assert do_they_match is True
         do_they_match = DifferenceDepthQueue.do_last_two_throws_match(new_stream_listener_id.pairs_amount, two_last_throws_comparison_structure)
         assert do_they_match is True
-        DifferenceDepthQueue.clear_instances()
 
     def test_given_comparing_two_throws_when_throws_are_not_equal_then_method_returns_false(self):
         """difference lays in a _old_listener_message_1 / _new_listener_message_1"""
@@ -2497,7 +2473,7 @@ class TestDifferenceDepthQueue:
                     "E": 1720337869217,
                     "s": "DOTUSDT",
                     "U": 7871863945,
-                    "u": 7871863947,
+                    "u": 7871863948,
                     "b": [
                         [
                             "6.19800000",
@@ -2612,17 +2588,17 @@ class TestDifferenceDepthQueue:
             old_stream_listener_id.id_keys:
                 deque(
                     [
-                        DifferenceDepthQueue._remove_event_timestamp(_old_listener_message_1),
-                        DifferenceDepthQueue._remove_event_timestamp(_old_listener_message_2),
-                        DifferenceDepthQueue._remove_event_timestamp(_old_listener_message_3),
+                        DifferenceDepthQueue.get_message_fingerprint(_old_listener_message_1),
+                        DifferenceDepthQueue.get_message_fingerprint(_old_listener_message_2),
+                        DifferenceDepthQueue.get_message_fingerprint(_old_listener_message_3),
                     ],
                     maxlen=old_stream_listener_id.pairs_amount),
             new_stream_listener_id.id_keys:
                 deque(
                     [
-                        DifferenceDepthQueue._remove_event_timestamp(_new_listener_message_1),
-                        DifferenceDepthQueue._remove_event_timestamp(_new_listener_message_2),
-                        DifferenceDepthQueue._remove_event_timestamp(_new_listener_message_3),
+                        DifferenceDepthQueue.get_message_fingerprint(_new_listener_message_1),
+                        DifferenceDepthQueue.get_message_fingerprint(_new_listener_message_2),
+                        DifferenceDepthQueue.get_message_fingerprint(_new_listener_message_3),
                     ],
                     maxlen=new_stream_listener_id.pairs_amount)
         }
@@ -2635,7 +2611,6 @@ class TestDifferenceDepthQueue:
         do_they_match = DifferenceDepthQueue.do_last_two_throws_match(new_stream_listener_id.pairs_amount,
                                                                       two_last_throws_comparison_structure)
         assert do_they_match is False
-        DifferenceDepthQueue.clear_instances()
 
     def test_given_comparing_two_throws_when_throws_are_not_equal_because_one_asset_is_duplicated_then_method_returns_false(self):
         """difference lays in a _old_listener_message_1 / _new_listener_message_1"""
@@ -2889,17 +2864,17 @@ class TestDifferenceDepthQueue:
             old_stream_listener_id.id_keys:
                 deque(
                     [
-                        DifferenceDepthQueue._remove_event_timestamp(_old_listener_message_1),
-                        DifferenceDepthQueue._remove_event_timestamp(_old_listener_message_2),
-                        DifferenceDepthQueue._remove_event_timestamp(_old_listener_message_3),
+                        DifferenceDepthQueue.get_message_fingerprint(_old_listener_message_1),
+                        DifferenceDepthQueue.get_message_fingerprint(_old_listener_message_2),
+                        DifferenceDepthQueue.get_message_fingerprint(_old_listener_message_3),
                     ],
                     maxlen=old_stream_listener_id.pairs_amount),
             new_stream_listener_id.id_keys:
                 deque(
                     [
-                        DifferenceDepthQueue._remove_event_timestamp(_new_listener_message_1),
-                        DifferenceDepthQueue._remove_event_timestamp(_new_listener_message_2),
-                        DifferenceDepthQueue._remove_event_timestamp(_new_listener_message_3),
+                        DifferenceDepthQueue.get_message_fingerprint(_new_listener_message_1),
+                        DifferenceDepthQueue.get_message_fingerprint(_new_listener_message_2),
+                        DifferenceDepthQueue.get_message_fingerprint(_new_listener_message_3),
                     ],
                     maxlen=new_stream_listener_id.pairs_amount)
         }
@@ -2912,7 +2887,6 @@ class TestDifferenceDepthQueue:
         do_they_match = DifferenceDepthQueue.do_last_two_throws_match(new_stream_listener_id.pairs_amount,
                                                                       two_last_throws_comparison_structure)
         assert do_they_match is False
-        DifferenceDepthQueue.clear_instances()
 
     def test_given_comparing_two_throws_when_throws_are_equal_but_one_asset_is_duplicated_then_method_returns_false(self):
 
@@ -3166,17 +3140,17 @@ class TestDifferenceDepthQueue:
             old_stream_listener_id.id_keys:
                 deque(
                     [
-                        DifferenceDepthQueue._remove_event_timestamp(_old_listener_message_1),
-                        DifferenceDepthQueue._remove_event_timestamp(_old_listener_message_2),
-                        DifferenceDepthQueue._remove_event_timestamp(_old_listener_message_3),
+                        DifferenceDepthQueue.get_message_fingerprint(_old_listener_message_1),
+                        DifferenceDepthQueue.get_message_fingerprint(_old_listener_message_2),
+                        DifferenceDepthQueue.get_message_fingerprint(_old_listener_message_3),
                     ],
                 maxlen=old_stream_listener_id.pairs_amount),
             new_stream_listener_id.id_keys:
                 deque(
                     [
-                        DifferenceDepthQueue._remove_event_timestamp(_new_listener_message_1),
-                        DifferenceDepthQueue._remove_event_timestamp(_new_listener_message_2),
-                        DifferenceDepthQueue._remove_event_timestamp(_new_listener_message_3),
+                        DifferenceDepthQueue.get_message_fingerprint(_new_listener_message_1),
+                        DifferenceDepthQueue.get_message_fingerprint(_new_listener_message_2),
+                        DifferenceDepthQueue.get_message_fingerprint(_new_listener_message_3),
                     ],
                     maxlen=new_stream_listener_id.pairs_amount)
         }
@@ -3187,7 +3161,6 @@ class TestDifferenceDepthQueue:
         assert do_they_match is False
         do_they_match = DifferenceDepthQueue.do_last_two_throws_match(new_stream_listener_id.pairs_amount, two_last_throws_comparison_structure)
         assert do_they_match is False
-        DifferenceDepthQueue.clear_instances()
 
 
     # set_new_stream_id_as_currently_accepted
@@ -3774,8 +3747,6 @@ class TestDifferenceDepthQueue:
 
         assert difference_depth_queue_content_list == expected_list
 
-        DifferenceDepthQueue.clear_instances()
-
     def test_getting_from_queue_when_method_invocation_then_last_element_is_returned(self):
         """throws are set to be equal to cause change each after other"""
 
@@ -4351,7 +4322,6 @@ class TestDifferenceDepthQueue:
             difference_depth_queue_content_list.append(difference_depth_queue.get())
 
         assert difference_depth_queue_content_list[0] == add_field_to_string_json_message(_first_listener_message_1, "_E", mocked_timestamp_of_receive)
-        DifferenceDepthQueue.clear_instances()
 
     def test_getting_with_no_wait_from_queue_when_method_invocation_then_last_element_is_returned(self):
 
@@ -4927,7 +4897,6 @@ class TestDifferenceDepthQueue:
             difference_depth_queue_content_list.append(difference_depth_queue.get_nowait())
 
         assert difference_depth_queue_content_list[0] == add_field_to_string_json_message(_first_listener_message_1, "_E", mocked_timestamp_of_receive)
-        DifferenceDepthQueue.clear_instances()
 
     def test_given_clearing_difference_depth_queue_when_invocation_then_qsize_equals_zero(self):
 
@@ -5496,7 +5465,6 @@ class TestDifferenceDepthQueue:
         difference_depth_queue.clear()
 
         assert difference_depth_queue.qsize() == 0
-        DifferenceDepthQueue.clear_instances()
 
     def test_given_checking_empty_when_method_invocation_then_result_is_ok(self):
 
@@ -6074,8 +6042,6 @@ class TestDifferenceDepthQueue:
         assert difference_depth_queue.qsize() == 0
         assert difference_depth_queue.empty() is True
 
-        DifferenceDepthQueue.clear_instances()
-
     def test_checking_size_when_method_invocation_then_result_is_ok(self):
         config = {
             "instruments": {
@@ -6640,7 +6606,6 @@ class TestDifferenceDepthQueue:
         )
 
         assert difference_depth_queue.qsize() == 6
-        difference_depth_queue.clear_instances()
 
     # benchmark
     #
@@ -6946,8 +6911,6 @@ class TestDifferenceDepthQueue:
             while not difference_depth_queue.empty():
                 difference_depth_queue.get_nowait()
 
-            DifferenceDepthQueue.clear_instances()
-
             del difference_depth_queue
             del old_stream_listener_id
             del new_stream_listener_id
@@ -6956,3 +6919,257 @@ class TestDifferenceDepthQueue:
 
         print(f"mean of {number_of_runs} runs: {average_execution_time} seconds")
         print("mean of {} runs: {:.8f} seconds".format(number_of_runs, average_execution_time))
+
+    def test_given_depth_message_when_getting_fingerprint_then_stream_and_update_ids_are_returned(self):
+        message = '{"stream":"btcusdt@depth@100ms","data":{"e":"depthUpdate","E":1,"s":"BTCUSDT","U":157,"u":160,"b":[["1.0","2.0"]],"a":[]}}'
+        same_update_later = message.replace('"E":1,', '"E":2,')
+        futures_message = '{"stream":"btcusdt@depth@100ms","data":{"e":"depthUpdate","E":1,"T":1,"s":"BTCUSDT","U":157,"u":160,"pu":156,"b":[],"a":[]}}'
+
+        assert DifferenceDepthQueue.get_message_fingerprint(message) == ('btcusdt@depth@100ms', '157', '160')
+        assert DifferenceDepthQueue.get_message_fingerprint(same_update_later) == DifferenceDepthQueue.get_message_fingerprint(message)
+        assert DifferenceDepthQueue.get_message_fingerprint(futures_message) == ('btcusdt@depth@100ms', '157', '160')
+        assert DifferenceDepthQueue.get_message_fingerprint('{"stream":"x","data":{"E":1,"b":[]}}') == '{"stream":"x","data":{"b":[]}}'
+
+    def test_given_hundred_pairs_overlap_when_new_listener_catches_up_then_switch_happens_on_fingerprints(self):
+        pairs = [f'PAIR{i}USDT' for i in range(100)]
+        difference_depth_queue = DifferenceDepthQueue(market=Market.SPOT)
+        old_stream_listener_id = StreamListenerId(pairs=pairs)
+        time.sleep(0.01)
+        new_stream_listener_id = StreamListenerId(pairs=pairs)
+        difference_depth_queue.currently_accepted_stream_id_keys = old_stream_listener_id.id_keys
+        difference_depth_queue.set_switching_websockets_mode()
+
+        def get_update(throw: int, pair: str, event_time: int) -> str:
+            return (
+                f'{{"stream":"{pair.lower()}@depth@100ms","data":{{"e":"depthUpdate","E":{event_time},'
+                f'"s":"{pair}","U":{throw * 10},"u":{throw * 10 + 5},"b":[["1.0","2.0"]],"a":[]}}}}'
+            )
+
+        for pair in pairs:
+            difference_depth_queue.put_difference_depth_message(old_stream_listener_id, get_update(0, pair, 1), 1)
+        for pair in pairs:
+            difference_depth_queue.put_difference_depth_message(old_stream_listener_id, get_update(1, pair, 2), 2)
+            assert not difference_depth_queue.did_websockets_switch_successfully
+            difference_depth_queue.put_difference_depth_message(new_stream_listener_id, get_update(1, pair, 3), 3)
+
+        assert difference_depth_queue.did_websockets_switch_successfully
+        assert difference_depth_queue.currently_accepted_stream_id_keys == new_stream_listener_id.id_keys
+        assert difference_depth_queue.no_longer_accepted_stream_id_keys == old_stream_listener_id.id_keys
+        assert difference_depth_queue.qsize() == 200
+
+    def test_given_merge_mode_when_listeners_overlap_then_every_update_is_queued_once_and_switch_happens_after_catching_up(self):
+        difference_depth_queue = DifferenceDepthQueue(market=Market.SPOT, merge_overlapping_streams=True)
+        old_stream_listener_id = StreamListenerId(pairs=['BTCUSDT', 'ETHUSDT'])
+        time.sleep(0.01)
+        new_stream_listener_id = StreamListenerId(pairs=['BTCUSDT', 'ETHUSDT'])
+        difference_depth_queue.currently_accepted_stream_id_keys = old_stream_listener_id.id_keys
+
+        def get_update(pair: str, first_update_id: int, last_update_id: int) -> str:
+            return (
+                f'{{"stream":"{pair.lower()}@depth@100ms","data":{{"e":"depthUpdate","E":1,"s":"{pair}",'
+                f'"U":{first_update_id},"u":{last_update_id},"b":[],"a":[]}}}}'
+            )
+
+        difference_depth_queue.put_difference_depth_message(old_stream_listener_id, get_update('BTCUSDT', 1, 5), 1)
+        difference_depth_queue.put_difference_depth_message(old_stream_listener_id, get_update('ETHUSDT', 1, 5), 1)
+        difference_depth_queue.put_difference_depth_message(new_stream_listener_id, get_update('BTCUSDT', 6, 10), 1)
+
+        difference_depth_queue.set_switching_websockets_mode()
+
+        difference_depth_queue.put_difference_depth_message(old_stream_listener_id, get_update('BTCUSDT', 6, 10), 2)
+        difference_depth_queue.put_difference_depth_message(old_stream_listener_id, get_update('ETHUSDT', 6, 10), 2)
+        difference_depth_queue.put_difference_depth_message(new_stream_listener_id, get_update('BTCUSDT', 6, 10), 3)
+        difference_depth_queue.put_difference_depth_message(new_stream_listener_id, get_update('BTCUSDT', 11, 15), 3)
+        difference_depth_queue.put_difference_depth_message(old_stream_listener_id, get_update('BTCUSDT', 11, 15), 4)
+        assert not difference_depth_queue.did_websockets_switch_successfully
+
+        difference_depth_queue.put_difference_depth_message(new_stream_listener_id, get_update('ETHUSDT', 6, 10), 5)
+        assert difference_depth_queue.did_websockets_switch_successfully
+        assert difference_depth_queue.currently_accepted_stream_id_keys == new_stream_listener_id.id_keys
+        assert difference_depth_queue.no_longer_accepted_stream_id_keys == old_stream_listener_id.id_keys
+
+        difference_depth_queue.put_difference_depth_message(old_stream_listener_id, get_update('ETHUSDT', 11, 15), 6)
+        difference_depth_queue.put_difference_depth_message(new_stream_listener_id, get_update('ETHUSDT', 11, 15), 7)
+
+        queued_update_ids = [
+            DifferenceDepthQueue.get_message_update_ids(message) for message in difference_depth_queue.drain_all()
+        ]
+        assert queued_update_ids == [
+            ('btcusdt@depth@100ms', 1, 5),
+            ('ethusdt@depth@100ms', 1, 5),
+            ('btcusdt@depth@100ms', 6, 10),
+            ('ethusdt@depth@100ms', 6, 10),
+            ('btcusdt@depth@100ms', 11, 15),
+            ('ethusdt@depth@100ms', 11, 15)
+        ]
+
+    def test_given_merge_mode_when_old_listener_put_interleaves_with_switch_then_update_is_queued_once(self):
+        difference_depth_queue = DifferenceDepthQueue(market=Market.SPOT, merge_overlapping_streams=True)
+        old_stream_listener_id = StreamListenerId(pairs=['BTCUSDT'])
+        time.sleep(0.01)
+        new_stream_listener_id = StreamListenerId(pairs=['BTCUSDT'])
+        difference_depth_queue.currently_accepted_stream_id_keys = old_stream_listener_id.id_keys
+        old_put_reads_watermark = threading.Event()
+        old_put_released = threading.Event()
+
+        class WatermarksPausingOldListener(dict):
+            # the old listener put stops right after reading the watermark of its update
+            def get(self, key, default=None):
+                value = super().get(key, default)
+                if threading.current_thread().name == 'old_listener':
+                    old_put_reads_watermark.set()
+                    old_put_released.wait(5)
+                return value
+
+        def get_update(first_update_id: int, last_update_id: int) -> str:
+            return (
+                f'{{"stream":"btcusdt@depth@100ms","data":{{"e":"depthUpdate","E":1,"s":"BTCUSDT",'
+                f'"U":{first_update_id},"u":{last_update_id},"b":[],"a":[]}}}}'
+            )
+
+        difference_depth_queue.put_difference_depth_message(old_stream_listener_id, get_update(1, 5), 1)
+        difference_depth_queue.update_id_watermarks = WatermarksPausingOldListener(difference_depth_queue.update_id_watermarks)
+
+        def switch_to_new_listener():
+            difference_depth_queue.set_switching_websockets_mode()
+            difference_depth_queue.put_difference_depth_message(new_stream_listener_id, get_update(6, 10), 3)
+
+        old_listener = threading.Thread(
+            target=difference_depth_queue.put_difference_depth_message,
+            args=(old_stream_listener_id, get_update(6, 10), 2),
+            name='old_listener'
+        )
+        new_listener = threading.Thread(target=switch_to_new_listener, name='new_listener')
+        old_listener.start()
+        assert old_put_reads_watermark.wait(5)
+        new_listener.start()
+        new_listener.join(0.2)
+        old_put_released.set()
+        old_listener.join(5)
+        new_listener.join(5)
+
+        assert difference_depth_queue.did_websockets_switch_successfully
+        assert difference_depth_queue.currently_accepted_stream_id_keys == new_stream_listener_id.id_keys
+        assert [
+            DifferenceDepthQueue.get_message_update_ids(message)[1:] for message in difference_depth_queue.drain_all()
+        ] == [(1, 5), (6, 10)]
+
+    def test_given_merge_mode_when_new_listener_starts_after_a_gap_then_gap_is_filled_by_old_listener(self):
+        difference_depth_queue = DifferenceDepthQueue(market=Market.SPOT, merge_overlapping_streams=True)
+        old_stream_listener_id = StreamListenerId(pairs=['BTCUSDT'])
+        time.sleep(0.01)
+        new_stream_listener_id = StreamListenerId(pairs=['BTCUSDT'])
+        difference_depth_queue.currently_accepted_stream_id_keys = old_stream_listener_id.id_keys
+
+        def get_update(first_update_id: int, last_update_id: int) -> str:
+            return (
+                f'{{"stream":"btcusdt@depth@100ms","data":{{"e":"depthUpdate","E":1,"s":"BTCUSDT",'
+                f'"U":{first_update_id},"u":{last_update_id},"b":[],"a":[]}}}}'
+            )
+
+        difference_depth_queue.put_difference_depth_message(old_stream_listener_id, get_update(1, 5), 1)
+        difference_depth_queue.set_switching_websockets_mode()
+
+        difference_depth_queue.put_difference_depth_message(new_stream_listener_id, get_update(11, 15), 2)
+        assert not difference_depth_queue.did_websockets_switch_successfully
+
+        difference_depth_queue.put_difference_depth_message(old_stream_listener_id, get_update(6, 10), 3)
+        difference_depth_queue.put_difference_depth_message(old_stream_listener_id, get_update(11, 15), 3)
+        difference_depth_queue.put_difference_depth_message(new_stream_listener_id, get_update(16, 20), 4)
+
+        assert difference_depth_queue.did_websockets_switch_successfully
+        assert [
+            DifferenceDepthQueue.get_message_update_ids(message)[1:] for message in difference_depth_queue.drain_all()
+        ] == [(1, 5), (6, 10), (11, 15), (16, 20)]
+
+    @pytest.mark.parametrize('market', [Market.USD_M_FUTURES, Market.COIN_M_FUTURES])
+    def test_given_futures_merge_mode_when_new_listener_delivers_every_update_first_then_switch_happens_on_first_chained_update(self, market):
+        difference_depth_queue = DifferenceDepthQueue(market=market, merge_overlapping_streams=True)
+        old_stream_listener_id = StreamListenerId(pairs=['BTCUSDT'])
+        time.sleep(0.01)
+        new_stream_listener_id = StreamListenerId(pairs=['BTCUSDT'])
+        difference_depth_queue.currently_accepted_stream_id_keys = old_stream_listener_id.id_keys
+
+        # futures "U" is not contiguous with the previous "u", updates chain on "pu"
+        def get_update(first_update_id: int, last_update_id: int, previous_last_update_id: int) -> str:
+            return (
+                f'{{"stream":"btcusdt@depth@100ms","data":{{"e":"depthUpdate","E":1,"T":1,"s":"BTCUSDT",'
+                f'"U":{first_update_id},"u":{last_update_id},"pu":{previous_last_update_id},"b":[],"a":[]}}}}'
+            )
+
+        difference_depth_queue.put_difference_depth_message(old_stream_listener_id, get_update(100, 105, 90), 1)
+        difference_depth_queue.set_switching_websockets_mode()
+
+        difference_depth_queue.put_difference_depth_message(new_stream_listener_id, get_update(108, 120, 105), 2)
+        assert difference_depth_queue.did_websockets_switch_successfully
+        assert difference_depth_queue.currently_accepted_stream_id_keys == new_stream_listener_id.id_keys
+
+        difference_depth_queue.put_difference_depth_message(old_stream_listener_id, get_update(108, 120, 105), 3)
+        difference_depth_queue.put_difference_depth_message(new_stream_listener_id, get_update(124, 130, 120), 4)
+
+        assert [
+            DifferenceDepthQueue.get_message_update_ids(message)[1:] for message in difference_depth_queue.drain_all()
+        ] == [(100, 105), (108, 120), (124, 130)]
+
+    @pytest.mark.parametrize('market', [Market.USD_M_FUTURES, Market.COIN_M_FUTURES])
+    def test_given_futures_merge_mode_when_new_listener_starts_after_a_gap_then_gap_is_filled_by_old_listener(self, market):
+        difference_depth_queue = DifferenceDepthQueue(market=market, merge_overlapping_streams=True, compact_records=True)
+        old_stream_listener_id = StreamListenerId(pairs=['BTCUSDT'])
+        time.sleep(0.01)
+        new_stream_listener_id = StreamListenerId(pairs=['BTCUSDT'])
+        difference_depth_queue.currently_accepted_stream_id_keys = old_stream_listener_id.id_keys
+
+        def get_update(first_update_id: int, last_update_id: int, previous_last_update_id: int) -> bytes:
+            return (
+                f'{{"stream":"btcusdt@depth@100ms","data":{{"e":"depthUpdate","E":1,"T":1,"s":"BTCUSDT",'
+                f'"U":{first_update_id},"u":{last_update_id},"pu":{previous_last_update_id},"b":[],"a":[]}}}}'
+            ).encode('utf-8')
+
+        difference_depth_queue.put_difference_depth_message(old_stream_listener_id, get_update(100, 105, 90), 1)
+        difference_depth_queue.set_switching_websockets_mode()
+
+        difference_depth_queue.put_difference_depth_message(new_stream_listener_id, get_update(124, 130, 120), 2)
+        assert not difference_depth_queue.did_websockets_switch_successfully
+
+        difference_depth_queue.put_difference_depth_message(old_stream_listener_id, get_update(108, 120, 105), 3)
+        difference_depth_queue.put_difference_depth_message(old_stream_listener_id, get_update(124, 130, 120), 3)
+        difference_depth_queue.put_difference_depth_message(new_stream_listener_id, get_update(131, 140, 130), 4)
+
+        assert difference_depth_queue.did_websockets_switch_successfully
+        assert [
+            DifferenceDepthQueue.get_message_update_ids(message)[1:] for _, message in difference_depth_queue.drain_all()
+        ] == [(100, 105), (108, 120), (124, 130), (131, 140)]
+        assert DifferenceDepthQueue.get_message_previous_update_id(get_update(131, 140, 130)) == 130
+
+    def test_given_bytes_compact_records_when_switching_and_merging_then_raw_frames_are_queued_and_grouped_by_pair(self):
+        old_stream_listener_id = StreamListenerId(pairs=['BTCUSDT'])
+        time.sleep(0.01)
+        new_stream_listener_id = StreamListenerId(pairs=['BTCUSDT'])
+
+        def get_update(first_update_id: int, last_update_id: int) -> bytes:
+            return (
+                f'{{"stream":"btcusdt@depth@100ms","data":{{"e":"depthUpdate","E":1,"s":"BTCUSDT",'
+                f'"U":{first_update_id},"u":{last_update_id},"b":[],"a":[]}}}}'
+            ).encode('utf-8')
+
+        for merge_overlapping_streams in [False, True]:
+            difference_depth_queue = DifferenceDepthQueue(
+                market=Market.SPOT,
+                compact_records=True,
+                merge_overlapping_streams=merge_overlapping_streams,
+                group_messages_by_pair=True
+            )
+            difference_depth_queue.currently_accepted_stream_id_keys = old_stream_listener_id.id_keys
+            difference_depth_queue.set_switching_websockets_mode()
+
+            difference_depth_queue.put_difference_depth_message(old_stream_listener_id, get_update(1, 5), 1)
+            difference_depth_queue.put_difference_depth_message(new_stream_listener_id, get_update(1, 5), 2)
+            difference_depth_queue.put_difference_depth_message(new_stream_listener_id, get_update(6, 10), 3)
+
+            assert difference_depth_queue.did_websockets_switch_successfully
+            assert difference_depth_queue.drain_grouped() == {
+                b'btcusdt': [(1, get_update(1, 5)), (3, get_update(6, 10))]
+            }
+
+        assert DifferenceDepthQueue.get_message_update_ids(get_update(6, 10)) == ('btcusdt@depth@100ms', 6, 10)
+        assert DifferenceDepthQueue.get_message_fingerprint(get_update(6, 10)) == ('btcusdt@depth@100ms', '6', '10')
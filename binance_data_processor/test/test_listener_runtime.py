@@ -0,0 +1,165 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from websockets.asyncio.server import serve
+
+from binance_data_processor.core.blackout_supervisor import BlackoutWatchdog
+from binance_data_processor.core.listener_runtime import ListenerRuntime
+from binance_data_processor.core.stream_listener import StreamListener
+from binance_data_processor.core.trade_queue import TradeQueue
+from binance_data_processor.enums.asset_parameters import AssetParameters
+from binance_data_processor.enums.market_enum import Market
+from binance_data_processor.enums.stream_type_enum import StreamType
+
+
+TRADE_MESSAGE = '{"stream":"btcusdt@trade","data":{"e":"trade","E":1,"s":"BTCUSDT","t":1}}'
+
+
+@pytest.fixture
+def local_stream_server():
+    ready = threading.Event()
+    stop = threading.Event()
+    server_port = []
+
+    async def send_trades(websocket, *args):
+        while not stop.is_set():
+            await websocket.send(TRADE_MESSAGE)
+            await asyncio.sleep(0.01)
+
+    async def run_server():
+        async with serve(send_trades, '127.0.0.1', 0) as server:
+            server_port.append(server.sockets[0].getsockname()[1])
+            ready.set()
+            while not stop.is_set():
+                await asyncio.sleep(0.05)
+
+    server_thread = threading.Thread(target=asyncio.run, args=(run_server(),), daemon=True)
+    server_thread.start()
+    ready.wait(timeout=10)
+    yield f'ws://127.0.0.1:{server_port[0]}'
+    stop.set()
+    server_thread.join(timeout=10)
+
+
+def wait_until(condition, timeout_seconds: float = 10) -> None:
+    deadline = time.monotonic() + timeout_seconds
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("condition was not met in time")
+        time.sleep(0.05)
+
+
+class TestListenerRuntime:
+
+    def test_given_runtime_with_two_loops_when_getting_loops_then_they_are_assigned_round_robin(self):
+        listener_runtime = ListenerRuntime(event_loops_amount=2)
+
+        loops = [listener_runtime.get_loop() for _ in range(4)]
+
+        assert loops[0] is loops[2] and loops[1] is loops[3] and loops[0] is not loops[1]
+        wait_until(lambda: all(loop.is_running() for loop in loops))
+        assert sorted(t.name for t in threading.enumerate() if t.name.startswith('listener_runtime')) == [
+            'listener_runtime_0', 'listener_runtime_1'
+        ]
+
+        listener_runtime.shutdown()
+
+        assert all(loop.is_closed() for loop in loops)
+        assert not any(t.name.startswith('listener_runtime') for t in threading.enumerate())
+
+    def test_given_invalid_event_loops_amount_when_initializing_then_exception_is_thrown(self):
+        with pytest.raises(ValueError) as excinfo:
+            ListenerRuntime(event_loops_amount=0)
+
+        assert str(excinfo.value) == "event_loops_amount must be greater than 0"
+
+    def test_given_listeners_on_shared_runtime_when_receiving_then_one_thread_drives_all_websockets_and_one_watchdog_checks_them(self, local_stream_server):
+        listener_runtime = ListenerRuntime(event_loops_amount=1)
+        blackout_watchdog = BlackoutWatchdog()
+        threads_before = set(threading.enumerate())
+        trade_queues = [TradeQueue(market=market) for market in Market]
+        stream_listeners = []
+
+        for trade_queue in trade_queues:
+            stream_listener = StreamListener(
+                queue=trade_queue,
+                asset_parameters=AssetParameters(market=Market.USD_M_FUTURES, stream_type=StreamType.TRADE_STREAM, pairs=['BTCUSDT']),
+                listener_runtime=listener_runtime,
+                blackout_watchdog=blackout_watchdog
+            )
+            stream_listener._url = local_stream_server
+            trade_queue.currently_accepted_stream_id_keys = stream_listener.id.id_keys
+            stream_listener.start_websocket_app()
+            stream_listeners.append(stream_listener)
+
+        wait_until(lambda: all(trade_queue.qsize() > 0 for trade_queue in trade_queues))
+
+        assert sorted(t.name for t in set(threading.enumerate()) - threads_before) == ['blackout_watchdog', 'listener_runtime_0']
+        assert trade_queues[0].get_nowait().startswith(TRADE_MESSAGE[:-1] + ',"_E":')
+
+        for stream_listener in stream_listeners:
+            stream_listener.close_websocket_app()
+        wait_until(lambda: listener_runtime.get_tasks_amount() == 0)
+
+        listener_runtime.shutdown()
+
+    def test_given_bytes_listener_when_receiving_then_raw_frames_are_queued_as_bytes_records(self, local_stream_server):
+        listener_runtime = ListenerRuntime(event_loops_amount=1)
+        trade_queue = TradeQueue(market=Market.SPOT, compact_records=True)
+        stream_listener = StreamListener(
+            queue=trade_queue,
+            asset_parameters=AssetParameters(market=Market.SPOT, stream_type=StreamType.TRADE_STREAM, pairs=['BTCUSDT']),
+            listener_runtime=listener_runtime,
+            blackout_watchdog=BlackoutWatchdog(),
+            receive_bytes=True
+        )
+        stream_listener._url = local_stream_server
+        trade_queue.currently_accepted_stream_id_keys = stream_listener.id.id_keys
+        stream_listener.start_websocket_app()
+
+        wait_until(lambda: trade_queue.qsize() > 0)
+        timestamp_of_receive, message = trade_queue.get_nowait()
+
+        assert message == TRADE_MESSAGE.encode('utf-8')
+        assert isinstance(timestamp_of_receive, int)
+
+        stream_listener.close_websocket_app()
+        wait_until(lambda: listener_runtime.get_tasks_amount() == 0)
+        listener_runtime.shutdown()
+
+    @pytest.mark.skip
+    def test_str_vs_bytes_frames_pipeline_benchmark(self):
+        pairs_amount = 400
+        messages_per_pair_per_second = 10
+        messages_amount = 200_000
+        bids = ','.join(f'["{50_000 + i}.10","0.{i:03d}"]' for i in range(20))
+        frame = (
+            '{"stream":"btcusdt@depth@100ms","data":{"e":"depthUpdate","E":1,"s":"BTCUSDT","U":1,"u":2,'
+            f'"b":[{bids}],"a":[{bids}]}}}}'
+        ).encode('utf-8')
+        stream_header_str, stream_header_bytes = '{"stream":"', b'{"stream":"'
+
+        # websockets decodes text frames to str, the sink encodes them back before compressing
+        started_at = time.perf_counter()
+        for _ in range(messages_amount):
+            message = frame.decode('utf-8')
+            if message.startswith(stream_header_str):
+                memoryview(message.encode('utf-8'))[:-1]
+        str_seconds = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        for _ in range(messages_amount):
+            if frame.startswith(stream_header_bytes):
+                memoryview(frame)[:-1]
+        bytes_seconds = time.perf_counter() - started_at
+
+        saved_microseconds = (str_seconds - bytes_seconds) / messages_amount * 1_000_000
+        messages_per_second = pairs_amount * messages_per_pair_per_second
+        print(f'\nstr frames:   {str_seconds / messages_amount * 1_000_000:.3f} us/message')
+        print(f'bytes frames: {bytes_seconds / messages_amount * 1_000_000:.3f} us/message')
+        print(
+            f'saved {saved_microseconds:.3f} us/message, at 100ms depth cadence for {pairs_amount} pairs '
+            f'({messages_per_second} msg/s) that is {saved_microseconds * messages_per_second / 10_000:.3f}% of one core'
+        )
@@ -0,0 +1,222 @@
+import threading
+import time
+from queue import Empty, Queue
+
+import pytest
+
+from binance_data_processor.core.message_channel import MessageChannel, PairMessageChannel, get_message_stream_pair
+
+
+class LockedQueueChannel:
+    __slots__ = ['lock', 'queue', 'contended_acquires']
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queue = Queue()
+        self.contended_acquires = 0
+
+    def put(self, message: str) -> None:
+        if not self.lock.acquire(blocking=False):
+            self.contended_acquires += 1
+            self.lock.acquire()
+        try:
+            self.queue.put(message)
+        finally:
+            self.lock.release()
+
+    def drain_all(self, timeout: float | None = None) -> list[str]:
+        messages = []
+        try:
+            messages.append(self.queue.get(timeout=timeout))
+            while not self.queue.empty():
+                messages.append(self.queue.get_nowait())
+        except Empty:
+            pass
+        return messages
+
+
+def run_channels_benchmark(channel_factory, messages_per_producer: int) -> tuple[float, list]:
+    channels = [channel_factory() for _ in range(3 * 2)]
+    consumed = [0] * len(channels)
+    producers_done = threading.Event()
+
+    def produce(channel):
+        message = '{"stream":"btcusdt@depth@100ms","data":{"E":1,"U":1,"u":2,"b":[],"a":[]}}'
+        for _ in range(messages_per_producer):
+            channel.put(message)
+
+    def consume(index, channel):
+        while not producers_done.is_set() or consumed[index] < messages_per_producer:
+            consumed[index] += len(channel.drain_all(timeout=0.05))
+
+    producers = [threading.Thread(target=produce, args=(channel,)) for channel in channels]
+    consumers = [threading.Thread(target=consume, args=(i, channel)) for i, channel in enumerate(channels)]
+
+    started_at = time.perf_counter()
+    for thread in producers + consumers:
+        thread.start()
+    for thread in producers:
+        thread.join()
+    producers_done.set()
+    for thread in consumers:
+        thread.join()
+    elapsed_seconds = time.perf_counter() - started_at
+
+    assert consumed == [messages_per_producer] * len(channels)
+    return len(channels) * messages_per_producer / elapsed_seconds, channels
+
+
+class TestMessageChannel:
+
+    def test_given_put_messages_when_draining_then_all_are_returned_in_order_and_channel_is_empty(self):
+        message_channel = MessageChannel()
+
+        message_channel.put('a')
+        message_channel.put_many(['b', 'c'])
+
+        assert message_channel.qsize() == 3
+        assert message_channel.queue[-1] == 'c'
+        assert message_channel.drain_all() == ['a', 'b', 'c']
+        assert message_channel.empty()
+
+    def test_given_empty_channel_when_draining_with_timeout_then_empty_list_is_returned_after_timeout(self):
+        message_channel = MessageChannel()
+
+        started_at = time.monotonic()
+        assert message_channel.drain_all(timeout=0.1) == []
+        assert time.monotonic() - started_at >= 0.1
+
+    def test_given_empty_channel_when_getting_then_queue_empty_is_raised(self):
+        message_channel = MessageChannel()
+
+        with pytest.raises(Empty):
+            message_channel.get_nowait()
+        with pytest.raises(Empty):
+            message_channel.get(timeout=0.05)
+
+    def test_given_waiting_consumer_when_message_is_put_then_drain_returns_it(self):
+        message_channel = MessageChannel()
+        threading.Timer(0.05, message_channel.put, args=['late']).start()
+
+        assert message_channel.drain_all(timeout=5) == ['late']
+
+    def test_given_concurrent_producers_when_draining_then_no_message_is_lost_or_duplicated(self):
+        message_channel = MessageChannel()
+        producers_done = threading.Event()
+        drained = []
+
+        def produce(producer_id):
+            for i in range(20_000):
+                message_channel.put(f'{producer_id}:{i}')
+
+        def consume():
+            while not producers_done.is_set() or not message_channel.empty():
+                drained.extend(message_channel.drain_all(timeout=0.01))
+
+        producers = [threading.Thread(target=produce, args=(producer_id,)) for producer_id in range(4)]
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        for thread in producers:
+            thread.start()
+        for thread in producers:
+            thread.join()
+        producers_done.set()
+        consumer.join()
+
+        assert len(drained) == 80_000
+        assert len(set(drained)) == 80_000
+        for producer_id in range(4):
+            assert [int(m.split(':')[1]) for m in drained if m.startswith(f'{producer_id}:')] == list(range(20_000))
+
+    @pytest.mark.skip
+    def test_message_channel_benchmark(self):
+        messages_per_producer = 200_000
+
+        locked_rate, locked_channels = run_channels_benchmark(LockedQueueChannel, messages_per_producer)
+        channel_rate, _ = run_channels_benchmark(MessageChannel, messages_per_producer)
+
+        contended_acquires = sum(channel.contended_acquires for channel in locked_channels)
+        print(f'\nlock + queue.Queue: {locked_rate:,.0f} msg/s, contended lock acquires: {contended_acquires}')
+        print(f'MessageChannel:     {channel_rate:,.0f} msg/s, contended lock acquires: 0')
+
+
+class TestPairMessageChannel:
+
+    def test_given_messages_of_many_pairs_when_draining_grouped_then_messages_are_bucketed_by_pair_in_order(self):
+        pair_message_channel = PairMessageChannel()
+        messages = [
+            '{"stream":"btcusdt@depth@100ms","data":{"u":1}}',
+            '{"stream":"ethusdt@depth@100ms","data":{"u":2}}',
+            '{"stream":"btcusdt@depth@100ms","data":{"u":3}}'
+        ]
+
+        pair_message_channel.put_many(messages)
+
+        assert pair_message_channel.qsize() == 3
+        assert pair_message_channel.peek_newest() == messages[2]
+        assert pair_message_channel.drain_grouped() == {
+            'btcusdt': [messages[0], messages[2]],
+            'ethusdt': [messages[1]]
+        }
+        assert pair_message_channel.empty()
+        assert pair_message_channel.peek_newest() is None
+
+    def test_given_compact_records_when_draining_grouped_then_records_are_bucketed_by_pair_of_raw_message(self):
+        pair_message_channel = PairMessageChannel()
+
+        pair_message_channel.put((7, '{"stream":"btcusdt@trade","data":{"t":1}}'))
+        pair_message_channel.put((8, '{"stream":"ethusdt@trade","data":{"t":2}}'))
+
+        assert pair_message_channel.drain_grouped() == {
+            'btcusdt': [(7, '{"stream":"btcusdt@trade","data":{"t":1}}')],
+            'ethusdt': [(8, '{"stream":"ethusdt@trade","data":{"t":2}}')]
+        }
+
+    def test_given_plain_channel_when_draining_grouped_then_result_matches_pair_channel(self):
+        message_channel = MessageChannel()
+        pair_message_channel = PairMessageChannel()
+        messages = [f'{{"stream":"pair{i % 5}usdt@trade","data":{{"t":{i}}}}}' for i in range(50)]
+
+        message_channel.put_many(messages)
+        pair_message_channel.put_many(messages)
+
+        assert message_channel.drain_grouped() == pair_message_channel.drain_grouped()
+        assert get_message_stream_pair(messages[3]) == 'pair3usdt'
+
+    def test_given_empty_channel_when_getting_then_queue_empty_is_raised_and_wait_respects_timeout(self):
+        pair_message_channel = PairMessageChannel()
+
+        with pytest.raises(Empty):
+            pair_message_channel.get_nowait()
+
+        started_at = time.monotonic()
+        assert pair_message_channel.drain_grouped(timeout=0.1) == {}
+        assert time.monotonic() - started_at >= 0.1
+
+    def test_given_concurrent_producers_of_new_pairs_when_draining_then_no_message_is_lost_or_duplicated(self):
+        pair_message_channel = PairMessageChannel()
+        producers_done = threading.Event()
+        drained = {}
+
+        def produce(producer_id):
+            for i in range(10_000):
+                pair_message_channel.put(f'{{"stream":"pair{i % 50}x{producer_id}@trade","data":{{"t":{i}}}}}')
+
+        def consume():
+            while not producers_done.is_set() or not pair_message_channel.empty():
+                for pair, messages in pair_message_channel.drain_grouped(timeout=0.01).items():
+                    drained.setdefault(pair, []).extend(messages)
+
+        producers = [threading.Thread(target=produce, args=(producer_id,)) for producer_id in range(4)]
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        for thread in producers:
+            thread.start()
+        for thread in producers:
+            thread.join()
+        producers_done.set()
+        consumer.join()
+
+        assert len(drained) == 200
+        assert sum(len(messages) for messages in drained.values()) == 40_000
+        assert all(len(messages) == 200 for messages in drained.values())
@@ -0,0 +1,186 @@
+import os
+
+import pytest
+
+from binance_data_processor.core.parquet_pair_file_sink import ParquetPairFileSink, get_depth_snapshot_market
+from binance_data_processor.core.queue_pool import DataSinkQueuePool
+from binance_data_processor.core.stream_data_saver_and_sender import StreamDataSaverAndSender
+from binance_data_processor.enums.asset_parameters import AssetParameters
+from binance_data_processor.enums.data_save_target_enum import DataSaveTarget
+from binance_data_processor.enums.data_sink_config import DataSinkConfig
+from binance_data_processor.enums.market_enum import Market
+from binance_data_processor.enums.stream_type_enum import StreamType
+
+pyarrow = pytest.importorskip('pyarrow')
+parquet = pytest.importorskip('pyarrow.parquet')
+
+
+def get_depth_message(first_update_id: int, last_update_id: int) -> str:
+    return (
+        '{"stream":"btcusdt@depth@100ms","data":{"e":"depthUpdate","E":1741748001573,"s":"BTCUSDT",'
+        f'"U":{first_update_id},"u":{last_update_id},"b":[["83000.01","0.00200000"],["82999.99","1.5"]],'
+        '"a":[["83000.02","0.1"]]}}'
+    )
+
+
+def get_trade_message(trade_id: int) -> str:
+    return (
+        '{"stream":"btcusdt@trade","data":{"e":"trade","E":1741748001573,"T":1741748001570,"s":"BTCUSDT",'
+        f'"t":{trade_id},"p":"83000.01","q":"0.002","X":"MARKET","m":true}},"_E":1741748001578}}'
+    )
+
+
+class TestParquetPairFileSink:
+
+    def test_given_depth_records_when_closing_then_typed_columns_are_written_in_one_row_group(self, tmpdir):
+        parquet_pair_file_sink = ParquetPairFileSink(
+            file_save_catalog=str(tmpdir),
+            file_name='binance_difference_depth_stream_spot_btcusdt',
+            stream_type=StreamType.DIFFERENCE_DEPTH_STREAM,
+            market=Market.SPOT
+        )
+
+        parquet_pair_file_sink.write_record(get_depth_message(1, 5), 1741748001578)
+        parquet_pair_file_sink.write_record(get_depth_message(6, 10).encode('utf-8'), 1741748001678)
+        archive_path = parquet_pair_file_sink.close()
+
+        assert archive_path == f'{tmpdir}/binance_difference_depth_stream_spot_btcusdt.parquet'
+        assert os.listdir(str(tmpdir)) == ['binance_difference_depth_stream_spot_btcusdt.parquet']
+        assert parquet_pair_file_sink.messages_written == 2
+
+        parquet_file = parquet.ParquetFile(archive_path)
+        assert parquet_file.metadata.num_row_groups == 1
+
+        table = parquet_file.read()
+        assert table.column_names == [
+            'TimestampOfReceive', 'Stream', 'EventType', 'EventTime', 'Symbol',
+            'FirstUpdateId', 'FinalUpdateId', 'IsAsk', 'Price', 'Quantity'
+        ]
+        assert table.schema.field('Symbol').type == pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+        assert table.schema.field('FinalUpdateId').type == pyarrow.int64()
+        assert table.schema.field('Price').type == pyarrow.float64()
+        assert table.to_pydict() == {
+            'TimestampOfReceive': [1741748001578] * 3 + [1741748001678] * 3,
+            'Stream': ['btcusdt@depth@100ms'] * 6,
+            'EventType': ['depthUpdate'] * 6,
+            'EventTime': [1741748001573] * 6,
+            'Symbol': ['BTCUSDT'] * 6,
+            'FirstUpdateId': [1, 1, 1, 6, 6, 6],
+            'FinalUpdateId': [5, 5, 5, 10, 10, 10],
+            'IsAsk': [0, 0, 1, 0, 0, 1],
+            'Price': [83000.01, 82999.99, 83000.02] * 2,
+            'Quantity': [0.002, 1.5, 0.1] * 2
+        }
+
+    def test_given_more_rows_than_row_group_size_when_writing_then_full_row_groups_are_flushed_before_close(self, tmpdir):
+        parquet_pair_file_sink = ParquetPairFileSink(
+            file_save_catalog=str(tmpdir),
+            file_name='binance_difference_depth_stream_spot_btcusdt',
+            stream_type=StreamType.DIFFERENCE_DEPTH_STREAM,
+            market=Market.SPOT,
+            row_group_rows=6
+        )
+
+        for i in range(5):
+            parquet_pair_file_sink.write_record(get_depth_message(i * 5 + 1, i * 5 + 5), 1741748001578 + i)
+        assert os.listdir(str(tmpdir)) == ['binance_difference_depth_stream_spot_btcusdt.parquet.part']
+        archive_path = parquet_pair_file_sink.close()
+
+        parquet_file = parquet.ParquetFile(archive_path)
+        assert [parquet_file.metadata.row_group(i).num_rows for i in range(parquet_file.metadata.num_row_groups)] == [6, 6, 3]
+        assert parquet_file.read().column('FirstUpdateId').to_pylist() == [1] * 3 + [6] * 3 + [11] * 3 + [16] * 3 + [21] * 3
+
+    def test_given_no_messages_when_closing_then_empty_file_with_schema_is_written(self, tmpdir):
+        parquet_pair_file_sink = ParquetPairFileSink(
+            file_save_catalog=str(tmpdir),
+            file_name='binance_trade_stream_spot_btcusdt',
+            stream_type=StreamType.TRADE_STREAM,
+            market=Market.SPOT
+        )
+
+        table = parquet.read_table(parquet_pair_file_sink.close())
+
+        assert table.num_rows == 0
+        assert table.column_names == parquet_pair_file_sink.column_names
+
+    def test_given_finished_trade_messages_when_closing_then_timestamp_of_receive_is_read_from_message(self, tmpdir):
+        parquet_pair_file_sink = ParquetPairFileSink(
+            file_save_catalog=str(tmpdir),
+            file_name='binance_trade_stream_usd_m_futures_btcusdt',
+            stream_type=StreamType.TRADE_STREAM,
+            market=Market.USD_M_FUTURES
+        )
+
+        parquet_pair_file_sink.write(get_trade_message(1))
+        parquet_pair_file_sink.write(get_trade_message(2))
+        table = parquet.read_table(parquet_pair_file_sink.close())
+
+        assert table.to_pydict() == {
+            'TimestampOfReceive': [1741748001578] * 2,
+            'Stream': ['btcusdt@trade'] * 2,
+            'EventType': ['trade'] * 2,
+            'EventTime': [1741748001573] * 2,
+            'TransactionTime': [1741748001570] * 2,
+            'Symbol': ['BTCUSDT'] * 2,
+            'TradeId': [1, 2],
+            'Price': [83000.01] * 2,
+            'Quantity': [0.002] * 2,
+            'IsBuyerMarketMaker': [True] * 2,
+            'XUnknownParameter': ['MARKET'] * 2
+        }
+
+    def test_given_parquet_target_when_writing_stream_and_snapshot_then_parquet_files_are_saved(self, tmpdir):
+        data_sink_config = DataSinkConfig(
+            data_save_target=DataSaveTarget.PARQUET,
+            file_save_catalog=str(tmpdir)
+        )
+        stream_data_saver_and_sender = StreamDataSaverAndSender(
+            queue_pool=DataSinkQueuePool(),
+            data_sink_config=data_sink_config
+        )
+        pair_sinks = {}
+        snapshot = (
+            '{"lastUpdateId":10,"E":1741748001573,"T":1741748001570,"symbol":"BTCUSD_PERP","pair":"BTCUSD",'
+            '"bids":[["83000.1","3"]],"asks":[["83000.2","4"]],"_rq":1741748001500,"_rc":1741748001600}'
+        )
+
+        stream_data_saver_and_sender._write_messages_to_pair_sink(
+            b'btcusdt',
+            [(1741748001578, get_depth_message(1, 5).encode('utf-8'))],
+            pair_sinks,
+            AssetParameters(market=Market.SPOT, stream_type=StreamType.DIFFERENCE_DEPTH_STREAM, pairs=[])
+        )
+        stream_data_saver_and_sender._finalize_pair_sinks(pair_sinks)
+        stream_data_saver_and_sender.save_data(
+            json_content=snapshot,
+            file_save_catalog=str(tmpdir),
+            file_name='binance_depth_snapshot_coin_m_futures_btcusd_perp'
+        )
+        stream_data_saver_and_sender.shutdown()
+
+        saved_files = sorted(os.listdir(str(tmpdir)))
+        assert len(saved_files) == 2
+        assert saved_files[0] == 'binance_depth_snapshot_coin_m_futures_btcusd_perp.parquet'
+        assert saved_files[1].startswith('binance_difference_depth_stream_spot_btcusdt_')
+        assert saved_files[1].endswith('.parquet')
+
+        assert parquet.read_table(f'{tmpdir}/{saved_files[1]}').num_rows == 3
+        assert parquet.read_table(f'{tmpdir}/{saved_files[0]}').to_pydict() == {
+            'TimestampOfReceive': [1741748001600] * 2,
+            'TimestampOfRequest': [1741748001500] * 2,
+            'MessageOutputTime': [1741748001573] * 2,
+            'TransactionTime': [1741748001570] * 2,
+            'LastUpdateId': [10] * 2,
+            'Symbol': ['BTCUSD_PERP'] * 2,
+            'Pair': ['BTCUSD'] * 2,
+            'IsAsk': [0, 1],
+            'Price': [83000.1, 83000.2],
+            'Quantity': [3.0, 4.0]
+        }
+
+    def test_given_snapshots_of_every_market_when_getting_market_then_it_is_recognized_by_fields(self):
+        assert get_depth_snapshot_market({'lastUpdateId': 1, 'bids': [], 'asks': []}) is Market.SPOT
+        assert get_depth_snapshot_market({'lastUpdateId': 1, 'E': 1, 'T': 1, 'bids': [], 'asks': []}) is Market.USD_M_FUTURES
+        assert get_depth_snapshot_market(
+            {'lastUpdateId': 1, 'E': 1, 'T': 1, 'symbol': 'BTCUSD_PERP', 'pair': 'BTCUSD', 'bids': [], 'asks': []}
+        ) is Market.COIN_M_FUTURES
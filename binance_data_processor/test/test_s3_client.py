@@ -0,0 +1,412 @@
+import hashlib
+import hmac
+import os
+import threading
+import time
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+from unittest.mock import patch
+
+from binance_data_processor.cloud_storage_clients.async_s3_client import AsyncS3Client
+from binance_data_processor.cloud_storage_clients.s3_client import S3Client
+from binance_data_processor.enums.compression_codec_enum import CompressionCodec
+from binance_data_processor.enums.compression_settings import CompressionSettings
+from binance_data_processor.core.archive_compressor import ArchiveCompressor
+from binance_data_processor.enums.archive_pipeline_settings import ArchivePipelineSettings
+from binance_data_processor.enums.storage_connection_parameters import StorageConnectionParameters
+from binance_data_processor.enums.upload_backend_enum import UploadBackend
+
+
+class LocalS3StandIn:
+    def __init__(self):
+        self.objects = {}
+        self.parts = {}
+        self.requests = []
+        self.failing_parts = {}
+        self.complete_error_body = None
+        self.active_uploads = 0
+        self.max_active_uploads = 0
+        self.lock = threading.Lock()
+
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, body: bytes = b'', headers: dict | None = None):
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _read_body(self) -> bytes:
+                return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+            def do_PUT(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                body = self._read_body()
+                stand_in.requests.append(('PUT', url.path, url.query, dict(self.headers)))
+
+                with stand_in.lock:
+                    stand_in.active_uploads += 1
+                    stand_in.max_active_uploads = max(stand_in.max_active_uploads, stand_in.active_uploads)
+                time.sleep(0.05)
+                with stand_in.lock:
+                    stand_in.active_uploads -= 1
+
+                if 'partNumber' in query:
+                    part_number = int(query['partNumber'][0])
+                    with stand_in.lock:
+                        should_fail = stand_in.failing_parts.get(part_number, 0) > 0
+                        if should_fail:
+                            stand_in.failing_parts[part_number] -= 1
+                    if should_fail:
+                        return self._reply(500)
+                    stand_in.parts.setdefault(query['uploadId'][0], {})[part_number] = body
+                    return self._reply(200, headers={'ETag': f'"etag-{part_number}"'})
+
+                stand_in.objects[url.path] = body
+                self._reply(200)
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query, keep_blank_values=True)
+                body = self._read_body()
+                stand_in.requests.append(('POST', url.path, url.query, dict(self.headers)))
+
+                if 'uploads' in query:
+                    return self._reply(
+                        200,
+                        b'<?xml version="1.0" encoding="UTF-8"?>'
+                        b'<InitiateMultipartUploadResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+                        b'<UploadId>upload-1</UploadId></InitiateMultipartUploadResult>'
+                    )
+
+                upload_id = query['uploadId'][0]
+                if stand_in.complete_error_body is not None:
+                    return self._reply(200, stand_in.complete_error_body)
+                parts = stand_in.parts.pop(upload_id)
+                assert body.count(b'<Part>') == len(parts)
+                stand_in.objects[url.path] = b''.join(parts[number] for number in sorted(parts))
+                self._reply(200, b'<CompleteMultipartUploadResult></CompleteMultipartUploadResult>')
+
+            def do_DELETE(self):
+                url = urlparse(self.path)
+                stand_in.requests.append(('DELETE', url.path, url.query, dict(self.headers)))
+                self._reply(204)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.endpoint_url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def shutdown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def local_s3():
+    stand_in = LocalS3StandIn()
+    yield stand_in
+    stand_in.shutdown()
+
+
+def get_s3_client(endpoint_url: str, s3_client_class: type[S3Client] = S3Client, **kwargs) -> S3Client:
+    storage_connection_parameters = StorageConnectionParameters(
+        backblaze_access_key_id='test_access_key_id',
+        backblaze_secret_access_key='test_secret_access_key',
+        backblaze_endpoint_url='https://s3.eu-central-003.backblazeb2.com',
+        backblaze_bucket_name='test_bucket'
+    )
+    s3_client = s3_client_class(storage_connection_parameters=storage_connection_parameters, **kwargs)
+    storage_connection_parameters.backblaze_endpoint_url = endpoint_url
+    return s3_client
+
+
+def parse_part_number(query: str) -> int:
+    return int(parse_qs(query)['partNumber'][0])
+
+
+class TestS3Client:
+
+    def test_given_small_file_when_uploading_then_single_put_with_unsigned_payload_is_sent(self, local_s3, tmpdir):
+        file_path = os.path.join(str(tmpdir), 'small.zip')
+        with open(file_path, 'wb') as f:
+            f.write(b'small archive')
+
+        s3_client = get_s3_client(local_s3.endpoint_url)
+        s3_client.upload_existing_file(file_path)
+
+        assert local_s3.objects == {'/test_bucket/small.zip': b'small archive'}
+        assert len(local_s3.requests) == 1
+        method, path, query, headers = local_s3.requests[0]
+        assert method == 'PUT'
+        assert headers['x-amz-content-sha256'] == 'UNSIGNED-PAYLOAD'
+        assert 'SignedHeaders=host;x-amz-content-sha256;x-amz-date' in headers['Authorization']
+
+    def test_given_large_file_when_uploading_then_parts_are_sent_in_parallel_and_assembled(self, local_s3, tmpdir):
+        file_path = os.path.join(str(tmpdir), 'large.zip')
+        content = os.urandom(10 * 1024 + 123)
+        with open(file_path, 'wb') as f:
+            f.write(content)
+
+        s3_client = get_s3_client(
+            local_s3.endpoint_url,
+            multipart_threshold_bytes=4 * 1024,
+            multipart_part_size_bytes=1024,
+            max_parallel_parts=4
+        )
+        s3_client.upload_existing_file(file_path)
+
+        assert local_s3.objects == {'/test_bucket/large.zip': content}
+        part_requests = [request for request in local_s3.requests if 'partNumber=' in request[2]]
+        assert len(part_requests) == 11
+        assert all(request[3]['x-amz-content-sha256'] == 'UNSIGNED-PAYLOAD' for request in part_requests)
+        assert local_s3.max_active_uploads > 1
+
+    def test_given_failing_part_when_uploading_then_only_that_part_is_retried(self, local_s3, tmpdir):
+        file_path = os.path.join(str(tmpdir), 'large.zip')
+        content = os.urandom(4 * 1024)
+        with open(file_path, 'wb') as f:
+            f.write(content)
+        local_s3.failing_parts[2] = 2
+
+        s3_client = get_s3_client(
+            local_s3.endpoint_url,
+            multipart_threshold_bytes=1024,
+            multipart_part_size_bytes=1024,
+            part_retry_delay_seconds=0
+        )
+        s3_client.upload_existing_file(file_path)
+
+        assert local_s3.objects == {'/test_bucket/large.zip': content}
+        part_numbers = [parse_part_number(request[2]) for request in local_s3.requests if 'partNumber=' in request[2]]
+        assert sorted(part_numbers) == [1, 2, 2, 2, 3, 4]
+
+    def test_given_part_failing_beyond_retries_when_uploading_then_upload_is_aborted_and_error_raised(self, local_s3, tmpdir):
+        file_path = os.path.join(str(tmpdir), 'large.zip')
+        with open(file_path, 'wb') as f:
+            f.write(os.urandom(2 * 1024))
+        local_s3.failing_parts[1] = 10
+
+        s3_client = get_s3_client(
+            local_s3.endpoint_url,
+            multipart_threshold_bytes=1024,
+            multipart_part_size_bytes=1024,
+            part_max_retries=2,
+            part_retry_delay_seconds=0
+        )
+
+        with pytest.raises(requests.HTTPError):
+            s3_client.upload_existing_file(file_path)
+
+        assert local_s3.objects == {}
+        assert ('DELETE', '/test_bucket/large.zip', 'uploadId=upload-1') in [request[:3] for request in local_s3.requests]
+
+    def test_given_large_compressed_string_when_uploading_then_multipart_upload_is_used(self, local_s3):
+        archive_compressor = ArchiveCompressor(CompressionSettings(codec=CompressionCodec.NONE))
+        data = '[' + ','.join(f'{{"u":{i}}}' for i in range(1000)) + ']'
+
+        s3_client = get_s3_client(
+            local_s3.endpoint_url,
+            archive_compressor=archive_compressor,
+            multipart_threshold_bytes=2048,
+            multipart_part_size_bytes=2048
+        )
+        s3_client.upload_zipped_jsoned_string(data=data, file_name='snapshot')
+
+        assert local_s3.objects == {'/test_bucket/snapshot.json': data.encode('utf-8')}
+        assert local_s3.requests[0][2] == 'uploads='
+
+    def test_given_fixed_date_when_signing_then_headers_match_reference_sigv4_computation(self):
+        s3_client = get_s3_client('https://s3.eu-central-003.backblazeb2.com')
+        amz_date = '20250101T120000Z'
+
+        headers = s3_client._get_signed_headers('PUT', '/test_bucket/a.zip', 'partNumber=1&uploadId=x', amz_date=amz_date)
+
+        canonical_request = (
+            'PUT\n/test_bucket/a.zip\npartNumber=1&uploadId=x\n'
+            'host:s3.eu-central-003.backblazeb2.com\n'
+            'x-amz-content-sha256:UNSIGNED-PAYLOAD\n'
+            f'x-amz-date:{amz_date}\n'
+            '\nhost;x-amz-content-sha256;x-amz-date\nUNSIGNED-PAYLOAD'
+        )
+        string_to_sign = (
+            f'AWS4-HMAC-SHA256\n{amz_date}\n20250101/eu-central-003/s3/aws4_request\n'
+            f'{hashlib.sha256(canonical_request.encode("utf-8")).hexdigest()}'
+        )
+        signing_key = b'AWS4test_secret_access_key'
+        for message in ['20250101', 'eu-central-003', 's3', 'aws4_request']:
+            signing_key = hmac.new(signing_key, message.encode('utf-8'), hashlib.sha256).digest()
+        signature = hmac.new(signing_key, string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
+
+        assert headers == {
+            'x-amz-content-sha256': 'UNSIGNED-PAYLOAD',
+            'x-amz-date': amz_date,
+            'Authorization': (
+                'AWS4-HMAC-SHA256 Credential=test_access_key_id/20250101/eu-central-003/s3/aws4_request, '
+                f'SignedHeaders=host;x-amz-content-sha256;x-amz-date, Signature={signature}'
+            )
+        }
+
+    def test_given_many_requests_on_same_day_when_signing_then_signing_key_is_derived_once_per_date_stamp(self):
+        s3_client = get_s3_client('https://s3.eu-central-003.backblazeb2.com')
+
+        with patch.object(S3Client, 'get_signature_key', wraps=s3_client.get_signature_key) as mock_get_signature_key:
+            for second in range(10):
+                s3_client._get_signed_headers('PUT', '/test_bucket/a.zip', '', amz_date=f'20250101T1200{second:02d}Z')
+            s3_client._get_signed_headers('PUT', '/test_bucket/a.zip', '', amz_date='20250102T000000Z')
+
+        assert [call.args[1] for call in mock_get_signature_key.call_args_list] == ['20250101', '20250102']
+
+    @pytest.mark.skip
+    def test_signing_benchmark(self):
+        s3_client = get_s3_client('https://s3.eu-central-003.backblazeb2.com')
+        number = 100_000
+
+        cached_seconds = timeit.timeit(
+            lambda: s3_client._get_signed_headers('PUT', '/test_bucket/binance_trade_stream_spot_btcusdt.zip', ''),
+            number=number
+        )
+
+        def sign_without_cache():
+            s3_client._signing_key_cache = None
+            s3_client._get_signed_headers('PUT', '/test_bucket/binance_trade_stream_spot_btcusdt.zip', '')
+
+        uncached_seconds = timeit.timeit(sign_without_cache, number=number)
+
+        print(f'\nsigning with cached key: {cached_seconds / number * 1e6:.2f} us per request')
+        print(f'signing with derived key: {uncached_seconds / number * 1e6:.2f} us per request')
+
+
+class TestAsyncS3Client:
+
+    def test_given_upload_backend_string_when_initializing_settings_then_enum_is_set(self):
+        assert ArchivePipelineSettings(upload_backend='AIOHTTP').upload_backend is UploadBackend.AIOHTTP
+
+        with pytest.raises(ValueError) as excinfo:
+            ArchivePipelineSettings(upload_backend='curl')
+        assert str(excinfo.value) == "Invalid upload_backend value: curl"
+
+    def test_given_small_file_when_uploading_then_single_put_with_unsigned_payload_is_sent(self, local_s3, tmpdir):
+        file_path = os.path.join(str(tmpdir), 'small.zip')
+        with open(file_path, 'wb') as f:
+            f.write(b'small archive')
+
+        s3_client = get_s3_client(local_s3.endpoint_url, s3_client_class=AsyncS3Client)
+        try:
+            s3_client.upload_existing_file(file_path)
+        finally:
+            s3_client.shutdown()
+
+        assert local_s3.objects == {'/test_bucket/small.zip': b'small archive'}
+        method, path, query, headers = local_s3.requests[0]
+        assert method == 'PUT'
+        assert headers['x-amz-content-sha256'] == 'UNSIGNED-PAYLOAD'
+
+    def test_given_many_files_when_submitting_then_uploads_run_concurrently_over_pooled_connections(self, local_s3, tmpdir):
+        contents = {}
+        for i in range(20):
+            file_path = os.path.join(str(tmpdir), f'pair_{i}.zip')
+            contents[f'/test_bucket/pair_{i}.zip'] = os.urandom(256)
+            with open(file_path, 'wb') as f:
+                f.write(contents[f'/test_bucket/pair_{i}.zip'])
+
+        s3_client = get_s3_client(local_s3.endpoint_url, s3_client_class=AsyncS3Client, max_connections_per_host=8)
+        try:
+            futures = [
+                s3_client.submit_existing_file(os.path.join(str(tmpdir), f'pair_{i}.zip'))
+                for i in range(20)
+            ]
+            for future in futures:
+                future.result(timeout=30)
+        finally:
+            s3_client.shutdown()
+
+        assert local_s3.objects == contents
+        assert 1 < local_s3.max_active_uploads <= 8
+
+    def test_given_large_file_when_uploading_then_multipart_upload_is_assembled(self, local_s3, tmpdir):
+        file_path = os.path.join(str(tmpdir), 'large.zip')
+        content = os.urandom(5 * 1024 + 7)
+        with open(file_path, 'wb') as f:
+            f.write(content)
+        local_s3.failing_parts[3] = 1
+
+        s3_client = get_s3_client(
+            local_s3.endpoint_url,
+            s3_client_class=AsyncS3Client,
+            multipart_threshold_bytes=1024,
+            multipart_part_size_bytes=1024,
+            part_retry_delay_seconds=0
+        )
+        try:
+            s3_client.upload_existing_file(file_path)
+        finally:
+            s3_client.shutdown()
+
+        assert local_s3.objects == {'/test_bucket/large.zip': content}
+        assert local_s3.max_active_uploads > 1
+
+    @pytest.mark.parametrize('is_executor_shut_down', [False, True])
+    def test_given_compression_executor_when_uploading_string_then_payload_is_compressed_outside_the_event_loop(self, local_s3, is_executor_shut_down):
+        compression_settings = CompressionSettings(codec=CompressionCodec.GZIP)
+        data = '[' + ','.join(f'{{"u":{i}}}' for i in range(1000)) + ']'
+        submitted_functions = []
+
+        class RecordingExecutor(ThreadPoolExecutor):
+            def submit(self, fn, /, *args, **kwargs):
+                future = super().submit(fn, *args, **kwargs)
+                submitted_functions.append(fn.__name__)
+                return future
+
+        compression_executor = RecordingExecutor(max_workers=1)
+        if is_executor_shut_down:
+            compression_executor.shutdown()
+
+        s3_client = get_s3_client(
+            local_s3.endpoint_url,
+            s3_client_class=AsyncS3Client,
+            archive_compressor=ArchiveCompressor(compression_settings),
+            compression_settings=compression_settings,
+            compression_executor=compression_executor
+        )
+        try:
+            s3_client.upload_zipped_jsoned_string(data=data, file_name='snapshot')
+        finally:
+            s3_client.shutdown()
+            compression_executor.shutdown()
+
+        assert ArchiveCompressor.decompress(local_s3.objects['/test_bucket/snapshot.json.gz']) == data.encode('utf-8')
+        assert submitted_functions == ([] if is_executor_shut_down else ['compress_json_content'])
+
+    def test_given_complete_multipart_upload_answering_with_error_body_when_uploading_then_upload_is_aborted_and_error_raised(self, local_s3, tmpdir):
+        file_path = os.path.join(str(tmpdir), 'large.zip')
+        with open(file_path, 'wb') as f:
+            f.write(os.urandom(3 * 1024))
+        local_s3.complete_error_body = b'<?xml version="1.0" encoding="UTF-8"?><Error><Code>InternalError</Code></Error>'
+
+        s3_client = get_s3_client(
+            local_s3.endpoint_url,
+            s3_client_class=AsyncS3Client,
+            multipart_threshold_bytes=1024,
+            multipart_part_size_bytes=1024
+        )
+        try:
+            with pytest.raises(Exception, match='CompleteMultipartUpload failed'):
+                s3_client.upload_existing_file(file_path)
+        finally:
+            s3_client.shutdown()
+
+        assert local_s3.objects == {}
+        assert [method for method, *_ in local_s3.requests if method == 'DELETE'] == ['DELETE']
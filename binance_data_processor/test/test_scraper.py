@@ -0,0 +1,525 @@
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
+import pandas as pd
+import pytest
+
+from binance_data_processor.core.archive_compressor import ArchiveCompressor
+from binance_data_processor.enums.market_enum import Market
+from binance_data_processor.enums.stream_type_enum import StreamType
+from binance_data_processor.enums.asset_parameters import AssetParameters
+from binance_data_processor.enums.data_quality_report_status_enum import DataQualityReportStatus
+from binance_data_processor.enums.export_format_enum import ExportFormat
+from binance_data_processor.scraper.data_quality_report import DataQualityReport
+from binance_data_processor.scraper.scraper import DataScraper, FileDownloadStream, IClientHandler
+from binance_data_processor.scraper.stream_dataframe_decoder import StreamDataFrameDecoder
+
+
+class InMemoryClient(IClientHandler):
+    __slots__ = ['files']
+
+    def __init__(self, files: dict[str, bytes]):
+        self.files = files
+
+    def list_files_with_prefixes(self, prefixes: list[str]) -> list[str]:
+        return [file_name for file_name in self.files if any(file_name.startswith(p) for p in prefixes)]
+
+    def read_file(self, file_name) -> bytes:
+        return self.files[file_name]
+
+
+class RecordingInMemoryClient(InMemoryClient):
+    __slots__ = ['listed_files']
+
+    def __init__(self, files: dict[str, bytes]):
+        super().__init__(files)
+        self.listed_files = []
+
+    def list_files_with_prefixes(self, prefixes: list[str]) -> list[str]:
+        listed_files = super().list_files_with_prefixes(prefixes)
+        self.listed_files.extend(listed_files)
+        return listed_files
+
+
+class FlakyInMemoryClient(InMemoryClient):
+    __slots__ = ['flaky_file_names', 'unreachable_file_names', 'read_attempts']
+
+    def __init__(self, files: dict[str, bytes], flaky_file_names: set[str], unreachable_file_names: set[str] = frozenset()):
+        super().__init__(files)
+        self.flaky_file_names = flaky_file_names
+        self.unreachable_file_names = unreachable_file_names
+        self.read_attempts = []
+
+    def read_file(self, file_name) -> bytes:
+        self.read_attempts.append(file_name)
+        # a flaky file fails its first read only, an unreachable one every read
+        if file_name in self.unreachable_file_names:
+            raise TimeoutError('read timed out')
+        if file_name in self.flaky_file_names and self.read_attempts.count(file_name) == 1:
+            raise ConnectionError('connection reset')
+        return super().read_file(file_name)
+
+
+def get_data_scraper(files: dict[str, list[dict] | dict]) -> DataScraper:
+    archive_compressor = ArchiveCompressor()
+    data_scraper = object.__new__(DataScraper)
+    data_scraper.storage_client_factory = functools.partial(
+        InMemoryClient,
+        {
+            file_name: archive_compressor.compress(orjson.dumps(content).decode('utf-8'), file_name)
+            for file_name, content in files.items()
+        }
+    )
+    data_scraper.storage_client = data_scraper.storage_client_factory()
+    data_scraper.amount_of_files_to_be_downloaded_at_once = 2
+    data_scraper.zstd_dictionary = None
+    data_scraper.download_executor = None
+    data_scraper.show_file_progress = True
+    data_scraper.export_format = ExportFormat.CSV
+    data_scraper.streaming_export = False
+    return data_scraper
+
+
+def get_difference_depth_record(market: Market, update_id: int, levels_amount: int) -> dict:
+    data = {
+        "e": "depthUpdate",
+        "E": 1741748001573 + update_id,
+        "s": "BTCUSDT",
+        "U": update_id,
+        "u": update_id + 1,
+        "b": [[f"{83000 - i}.01", f"0.{i:03d}"] for i in range(levels_amount)],
+        "a": [[f"{83001 + i}.01", f"1.{i:03d}"] for i in range(update_id % 3)]
+    }
+    if market in [Market.USD_M_FUTURES, Market.COIN_M_FUTURES]:
+        data["T"] = 1741748001570 + update_id
+        data["pu"] = update_id - 1
+    if market is Market.COIN_M_FUTURES:
+        data["ps"] = "BTCUSD"
+    return {"stream": "btcusdt@depth@100ms", "data": data, "_E": 1741748001578 + update_id}
+
+
+def get_trade_record(market: Market, trade_id: int) -> dict:
+    data = {
+        "e": "trade",
+        "E": 1741748001573 + trade_id,
+        "T": 1741748001570 + trade_id,
+        "s": "BTCUSDT",
+        "t": trade_id,
+        "p": "83000.01",
+        "q": "0.00200000",
+        "m": trade_id % 2 == 0
+    }
+    if market is Market.SPOT:
+        data["M"] = True
+    else:
+        data["X"] = "MARKET"
+    return {"stream": "btcusdt@trade", "data": data, "_E": 1741748001578 + trade_id}
+
+
+def get_depth_snapshot(market: Market, last_update_id: int) -> dict:
+    snapshot = {
+        "lastUpdateId": last_update_id,
+        "bids": [["83000.01", "1.5"], ["82999.99", "0.1"]],
+        "asks": [["83000.02", "2"]],
+        "_rq": 1741748001500,
+        "_rc": 1741748001600
+    }
+    if market in [Market.USD_M_FUTURES, Market.COIN_M_FUTURES]:
+        snapshot["E"] = 1741748001573
+        snapshot["T"] = 1741748001570
+    if market is Market.COIN_M_FUTURES:
+        snapshot["symbol"] = "BTCUSD_PERP"
+        snapshot["pair"] = "BTCUSD"
+    return snapshot
+
+
+def get_trade_files_of_days(asset_parameters_list: list[AssetParameters], trades_per_day: int) -> dict[str, list[dict]]:
+    files = {}
+    for day, asset_parameters in enumerate(asset_parameters_list):
+        records = [get_trade_record(asset_parameters.market, trade_id=i) for i in range(trades_per_day)]
+        # shift every record into its own utc day
+        for record in records:
+            record["data"]["E"] += day * 86_400_000
+            record["data"]["T"] += day * 86_400_000
+            record["_E"] += day * 86_400_000
+        files[f'{DataScraper._get_base_of_filename(asset_parameters)}T12-00-00Z'] = records
+    return files
+
+
+def get_difference_depth_files_of_day(asset_parameters: AssetParameters, files_amount: int, records_per_file: int, levels_amount: int) -> dict[str, list[dict]]:
+    base_of_filename = DataScraper._get_base_of_filename(asset_parameters)
+    next_day_asset_parameters = AssetParameters(
+        market=asset_parameters.market,
+        stream_type=asset_parameters.stream_type,
+        pairs=asset_parameters.pairs,
+        date=(pd.to_datetime(asset_parameters.date, format='%d-%m-%Y') + pd.Timedelta(days=1)).strftime('%d-%m-%Y')
+    )
+
+    files = {}
+    for file_index in range(files_amount + 1):
+        # update ids step by two so every message continues the previous one
+        records = [
+            get_difference_depth_record(asset_parameters.market, update_id=2 * (file_index * records_per_file + i) + 1, levels_amount=levels_amount)
+            for i in range(records_per_file)
+        ]
+        if file_index < files_amount:
+            files[f'{base_of_filename}T{file_index:02d}-00-00Z'] = records
+        else:
+            # the boundary file of the next day is listed too and has to be cut away
+            for record in records:
+                record["_E"] += 86_400_000
+            files[f'{DataScraper._get_base_of_filename(next_day_asset_parameters)}T00-00-00Z'] = records
+    return files
+
+
+def read_csv_without_generation_time(csv_path: str) -> list[str]:
+    with open(csv_path) as f:
+        return [line for line in f if not line.startswith('# Generated on:')]
+
+
+def get_difference_depth_dataframe_row_by_row(files_content: list[list[dict]], market: Market) -> pd.DataFrame:
+    # per level python rows, the way download handlers used to build dataframes
+    records = []
+    for json_dict in files_content:
+        for record in json_dict:
+            data = record["data"]
+            for is_ask, levels in ((0, data["b"]), (1, data["a"])):
+                for level in levels:
+                    if market is Market.SPOT:
+                        records.append([
+                            record["_E"], record["stream"], data["e"], data["E"], data["s"], data["U"], data["u"],
+                            is_ask, str(level[0]), str(level[1])
+                        ])
+                    else:
+                        row = [
+                            record["_E"], record["stream"], data["e"], data["E"], data["T"], data["s"], data["U"],
+                            data["u"], data["pu"], is_ask, str(level[0]), str(level[1])
+                        ]
+                        if market is Market.COIN_M_FUTURES:
+                            row.append(data["ps"])
+                        records.append(row)
+
+    return pd.DataFrame(
+        data=records,
+        columns=StreamDataFrameDecoder.COLUMNS[(StreamType.DIFFERENCE_DEPTH_STREAM, market)]
+    )
+
+
+def get_trade_dataframe_row_by_row(files_content: list[list[dict]], market: Market) -> pd.DataFrame:
+    records = []
+    for json_dict in files_content:
+        for record in json_dict:
+            data = record["data"]
+            records.append([
+                record["_E"], record["stream"], data["e"], data["E"], data["T"], data["s"], data["t"],
+                str(data["p"]), str(data["q"]), int(data["m"]), data["M"] if market is Market.SPOT else data["X"]
+            ])
+
+    return pd.DataFrame(data=records, columns=StreamDataFrameDecoder.COLUMNS[(StreamType.TRADE_STREAM, market)])
+
+
+class TestStreamDataFrameDecoder:
+
+    @pytest.mark.parametrize('market', [Market.SPOT, Market.USD_M_FUTURES, Market.COIN_M_FUTURES])
+    def test_given_difference_depth_files_when_downloading_then_dataframe_matches_row_by_row_decoding(self, market):
+        files = {
+            f'binance_difference_depth_stream_{market.name.lower()}_btcusdt_{i}': [
+                get_difference_depth_record(market, update_id=10 * i + j, levels_amount=j) for j in range(4)
+            ]
+            for i in range(5)
+        }
+        data_scraper = get_data_scraper(files)
+        file_download_stream = data_scraper._start_file_downloads(list(files))
+
+        dataframe = data_scraper._difference_depth_stream_download_handler(file_download_stream, market)
+
+        pd.testing.assert_frame_equal(dataframe, get_difference_depth_dataframe_row_by_row(list(files.values()), market))
+        assert dataframe['IsAsk'].tolist()[:4] == [0, 1, 0, 0]
+
+    @pytest.mark.parametrize('market', [Market.SPOT, Market.USD_M_FUTURES, Market.COIN_M_FUTURES])
+    def test_given_trade_files_when_downloading_then_dataframe_matches_row_by_row_decoding(self, market):
+        files = {
+            f'binance_trade_stream_{market.name.lower()}_btcusdt_{i}': [
+                get_trade_record(market, trade_id=10 * i + j) for j in range(3)
+            ]
+            for i in range(3)
+        }
+        data_scraper = get_data_scraper(files)
+        file_download_stream = data_scraper._start_file_downloads(list(files))
+
+        dataframe = data_scraper._trade_stream_type_download_handler(file_download_stream, market)
+
+        pd.testing.assert_frame_equal(dataframe, get_trade_dataframe_row_by_row(list(files.values()), market))
+
+    @pytest.mark.parametrize('market', [Market.SPOT, Market.USD_M_FUTURES, Market.COIN_M_FUTURES])
+    def test_given_depth_snapshot_files_when_downloading_then_every_price_level_is_a_row(self, market):
+        files = {
+            f'binance_depth_snapshot_{market.name.lower()}_btcusdt_{i}': get_depth_snapshot(market, last_update_id=i)
+            for i in range(2)
+        }
+        data_scraper = get_data_scraper(files)
+        file_download_stream = data_scraper._start_file_downloads(list(files))
+
+        dataframe = data_scraper._depth_snapshot_stream_type_download_handler(file_download_stream, market)
+
+        assert dataframe.columns.tolist() == StreamDataFrameDecoder.COLUMNS[(StreamType.DEPTH_SNAPSHOT, market)]
+        assert dataframe['LastUpdateId'].tolist() == [0, 0, 0, 1, 1, 1]
+        assert dataframe['IsAsk'].tolist() == [0, 0, 1, 0, 0, 1]
+        assert dataframe['Price'].tolist() == ['83000.01', '82999.99', '83000.02'] * 2
+        assert dataframe['TimestampOfReceive'].dtype == 'int64'
+        if market is Market.COIN_M_FUTURES:
+            assert dataframe['Pair'].tolist() == ['BTCUSD'] * 6
+
+    def test_given_no_files_or_failed_download_when_downloading_then_empty_dataframe_with_columns_is_returned(self, monkeypatch):
+        monkeypatch.setattr(DataScraper, 'DOWNLOAD_RETRY_DELAY_SECONDS', 0)
+        data_scraper = get_data_scraper({})
+        data_scraper.storage_client.files['broken_file'] = b'not an archive'
+        file_download_stream = data_scraper._start_file_downloads(['broken_file'])
+
+        dataframe = data_scraper._difference_depth_stream_download_handler(file_download_stream, Market.SPOT)
+
+        assert file_download_stream.missing_file_names == ['broken_file']
+        assert dataframe.empty
+        assert dataframe.columns.tolist() == StreamDataFrameDecoder.COLUMNS[(StreamType.DIFFERENCE_DEPTH_STREAM, Market.SPOT)]
+
+    @pytest.mark.skip
+    def test_row_by_row_vs_vectorized_decoding_of_one_day_depth_benchmark(self):
+        # one day of btcusdt depth at 100ms is 864_000 messages, files are rotated every 5 minutes
+        messages_per_day = 864_000
+        files_content = [
+            [get_difference_depth_record(Market.SPOT, update_id=i, levels_amount=5) for i in range(start, start + 3_000)]
+            for start in range(0, messages_per_day, 3_000)
+        ]
+
+        started_at = time.perf_counter()
+        row_by_row_dataframe = get_difference_depth_dataframe_row_by_row(files_content, Market.SPOT)
+        row_by_row_seconds = time.perf_counter() - started_at
+        row_by_row_megabytes = row_by_row_dataframe.memory_usage(deep=True).sum() / 1e6
+        del row_by_row_dataframe
+
+        started_at = time.perf_counter()
+        vectorized_dataframe = StreamDataFrameDecoder.get_dataframe(
+            [StreamDataFrameDecoder.get_difference_depth_columns(records, Market.SPOT) for records in files_content],
+            StreamDataFrameDecoder.COLUMNS[(StreamType.DIFFERENCE_DEPTH_STREAM, Market.SPOT)]
+        )
+        vectorized_seconds = time.perf_counter() - started_at
+
+        print(f'\nrows: {len(vectorized_dataframe):,}')
+        print(f'row by row: {row_by_row_seconds:.2f}s, dataframe {row_by_row_megabytes:.0f} MB')
+        print(
+            f'vectorized: {vectorized_seconds:.2f}s, '
+            f'dataframe {vectorized_dataframe.memory_usage(deep=True).sum() / 1e6:.0f} MB'
+        )
+
+
+class TestFileDownloadStream:
+
+    def test_given_slow_first_file_when_iterating_then_other_downloads_continue_and_results_keep_file_order(self):
+        file_names = [f'file_{i}' for i in range(6)]
+        first_file_released = threading.Event()
+        read_log = []
+
+        def download(file_name: str) -> str:
+            read_log.append(file_name)
+            if file_name == 'file_0':
+                first_file_released.wait(timeout=10)
+            return file_name.upper()
+
+        with ThreadPoolExecutor(max_workers=3) as download_executor:
+            file_download_stream = FileDownloadStream(
+                download_executor=download_executor,
+                download=download,
+                file_names=file_names,
+                prefetch_amount=4
+            )
+
+            deadline = time.monotonic() + 10
+            while len(read_log) < 4 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            # the window is full while file_0 is stuck, nothing beyond it is downloaded yet
+            assert sorted(read_log) == ['file_0', 'file_1', 'file_2', 'file_3']
+            assert len(file_download_stream) == 6
+
+            first_file_released.set()
+            assert list(file_download_stream) == [file_name.upper() for file_name in file_names]
+            assert len(file_download_stream) == 0
+
+    def test_given_many_assets_when_running_main_loop_then_next_asset_downloads_start_before_current_is_saved(self, monkeypatch):
+        asset_parameters_list = [
+            AssetParameters(market=Market.SPOT, stream_type=StreamType.TRADE_STREAM, pairs=['btcusdt'], date=date)
+            for date in ['11-03-2025', '12-03-2025']
+        ]
+        files = {
+            f'{DataScraper._get_base_of_filename(asset_parameters)}T12-00-00Z': [
+                get_trade_record(Market.SPOT, trade_id=i) for i in range(3)
+            ]
+            for i, asset_parameters in enumerate(asset_parameters_list)
+        }
+        data_scraper = get_data_scraper(files)
+        data_scraper.storage_client = RecordingInMemoryClient(data_scraper.storage_client.files)
+        files_listed_when_saved = []
+
+        monkeypatch.setattr(
+            DataScraper,
+            '_save_df_to_csv_with_data_quality_report',
+            staticmethod(lambda **kwargs: files_listed_when_saved.append(list(data_scraper.storage_client.listed_files)))
+        )
+        monkeypatch.setattr(
+            'binance_data_processor.scraper.scraper.get_dataframe_quality_report',
+            lambda dataframe, asset_parameters: DataQualityReport(asset_parameters=asset_parameters)
+        )
+
+        data_scraper._main_download_loop(asset_parameters_list=asset_parameters_list, dump_path='unused')
+        data_scraper._shutdown_download_executor()
+
+        assert files_listed_when_saved == [list(files), list(files)]
+        assert data_scraper.download_executor is None
+
+
+class TestParallelDownloadLoop:
+
+    def test_given_many_asset_days_when_running_parallel_loop_then_every_csv_matches_serial_export(self, tmpdir):
+        asset_parameters_list = [
+            AssetParameters(market=Market.USD_M_FUTURES, stream_type=StreamType.TRADE_STREAM, pairs=['btcusdt'], date=date)
+            for date in ['12-03-2025', '13-03-2025', '14-03-2025']
+        ]
+        data_scraper = get_data_scraper(get_trade_files_of_days(asset_parameters_list, trades_per_day=50))
+        serial_dump_path = tmpdir.mkdir('serial')
+        parallel_dump_path = tmpdir.mkdir('parallel')
+
+        for asset_parameters in asset_parameters_list:
+            data_scraper._export_asset_parameters(asset_parameters=asset_parameters, dump_path=str(serial_dump_path))
+        data_scraper._shutdown_download_executor()
+
+        data_scraper._parallel_download_loop(
+            asset_parameters_list=asset_parameters_list,
+            dump_path=str(parallel_dump_path),
+            workers=2
+        )
+
+        csv_names = sorted(os.listdir(str(serial_dump_path)))
+        assert len(csv_names) == 3
+        assert sorted(os.listdir(str(parallel_dump_path))) == csv_names
+        for csv_name in csv_names:
+            assert (
+                read_csv_without_generation_time(f'{parallel_dump_path}/{csv_name}')
+                == read_csv_without_generation_time(f'{serial_dump_path}/{csv_name}')
+            )
+
+    def test_given_zero_workers_when_downloading_then_value_error_is_raised(self):
+        data_scraper = get_data_scraper({})
+
+        with pytest.raises(ValueError):
+            data_scraper.run(
+                markets=['usd_m_futures'],
+                stream_types=['trade_stream'],
+                pairs=['btcusdt'],
+                date_range=['12-03-2025', '12-03-2025'],
+                dump_path=None,
+                workers=0
+            )
+
+
+class TestStreamingExport:
+
+    @pytest.mark.parametrize('stream_type', [StreamType.DIFFERENCE_DEPTH_STREAM, StreamType.TRADE_STREAM])
+    def test_given_day_files_when_exporting_with_streaming_then_csv_matches_whole_day_export(self, tmpdir, stream_type):
+        asset_parameters = AssetParameters(market=Market.USD_M_FUTURES, stream_type=stream_type, pairs=['btcusdt'], date='12-03-2025')
+        if stream_type is StreamType.DIFFERENCE_DEPTH_STREAM:
+            files = get_difference_depth_files_of_day(asset_parameters, files_amount=3, records_per_file=40, levels_amount=3)
+        else:
+            files = get_trade_files_of_days([asset_parameters], trades_per_day=100)
+        data_scraper = get_data_scraper(files)
+        whole_day_dump_path = tmpdir.mkdir('whole_day')
+        streaming_dump_path = tmpdir.mkdir('streaming')
+
+        whole_day_status = data_scraper._export_asset_parameters(asset_parameters=asset_parameters, dump_path=str(whole_day_dump_path))
+        data_scraper.streaming_export = True
+        streaming_status = data_scraper._export_asset_parameters(asset_parameters=asset_parameters, dump_path=str(streaming_dump_path))
+        data_scraper._shutdown_download_executor()
+
+        csv_name = f'{DataScraper._get_base_of_filename(asset_parameters)}.csv'
+        assert os.listdir(str(streaming_dump_path)) == [csv_name]
+        assert streaming_status == whole_day_status
+        assert (
+            read_csv_without_generation_time(f'{streaming_dump_path}/{csv_name}')
+            == read_csv_without_generation_time(f'{whole_day_dump_path}/{csv_name}')
+        )
+
+    def test_given_parquet_export_format_when_exporting_then_parquet_file_holds_day_rows_and_report(self, tmpdir):
+        parquet = pytest.importorskip('pyarrow.parquet')
+        asset_parameters = AssetParameters(
+            market=Market.USD_M_FUTURES,
+            stream_type=StreamType.DIFFERENCE_DEPTH_STREAM,
+            pairs=['btcusdt'],
+            date='12-03-2025'
+        )
+        data_scraper = get_data_scraper(get_difference_depth_files_of_day(asset_parameters, files_amount=3, records_per_file=40, levels_amount=3))
+        whole_day_dataframe = data_scraper._get_rough_dataframe_from_cloud_storage_files_cut_to_specified_date(asset_parameters=asset_parameters)
+        data_scraper.export_format = ExportFormat.PARQUET
+        data_scraper.streaming_export = True
+
+        data_report_status = data_scraper._export_asset_parameters(asset_parameters=asset_parameters, dump_path=str(tmpdir))
+        data_scraper._shutdown_download_executor()
+
+        parquet_path = f'{tmpdir}/{DataScraper._get_base_of_filename(asset_parameters)}.parquet'
+        assert os.listdir(str(tmpdir)) == [os.path.basename(parquet_path)]
+        parquet_metadata = parquet.ParquetFile(parquet_path).metadata
+        assert parquet_metadata.num_row_groups == 3
+        data_quality_report = parquet_metadata.metadata[b'data_quality_report'].decode('utf-8')
+        assert f'# Data Quality Report Status: {data_report_status.name}' in data_quality_report
+
+        table = parquet.read_table(parquet_path)
+        assert table.column_names == list(whole_day_dataframe.columns)
+        assert table.column('FinalUpdateId').to_pylist() == whole_day_dataframe['FinalUpdateId'].tolist()
+        assert table.column('Price').to_pylist() == whole_day_dataframe['Price'].astype(float).tolist()
+
+        assert data_scraper._get_existing_files_asset_parameters_list(csv_nest=str(tmpdir), extension='.parquet') == [asset_parameters]
+
+    def test_given_failing_download_when_streaming_then_no_partial_file_is_left(self, tmpdir, monkeypatch):
+        asset_parameters = AssetParameters(market=Market.USD_M_FUTURES, stream_type=StreamType.TRADE_STREAM, pairs=['btcusdt'], date='12-03-2025')
+        data_scraper = get_data_scraper(get_trade_files_of_days([asset_parameters], trades_per_day=10))
+        data_scraper.streaming_export = True
+
+        def failing_decoder(records, market):
+            raise RuntimeError('decoding failed')
+
+        monkeypatch.setattr(StreamDataFrameDecoder, 'get_trade_columns', staticmethod(failing_decoder))
+
+        with pytest.raises(RuntimeError):
+            data_scraper._export_asset_parameters(asset_parameters=asset_parameters, dump_path=str(tmpdir))
+        data_scraper._shutdown_download_executor()
+
+        assert os.listdir(str(tmpdir)) == []
+
+    @pytest.mark.parametrize('streaming_export', [False, True])
+    def test_given_unreachable_and_corrupt_files_when_exporting_then_they_are_reported_missing_and_only_transport_errors_are_retried(self, tmpdir, monkeypatch, streaming_export):
+        monkeypatch.setattr(DataScraper, 'DOWNLOAD_RETRY_DELAY_SECONDS', 0)
+        asset_parameters = AssetParameters(market=Market.USD_M_FUTURES, stream_type=StreamType.DIFFERENCE_DEPTH_STREAM, pairs=['btcusdt'], date='12-03-2025')
+        data_scraper = get_data_scraper(get_difference_depth_files_of_day(asset_parameters, files_amount=4, records_per_file=40, levels_amount=3))
+        data_scraper.streaming_export = streaming_export
+        broken_file_name, flaky_file_name, unreachable_file_name = sorted(data_scraper.storage_client.files)[1:4]
+        data_scraper.storage_client.files[broken_file_name] = b'not an archive'
+        data_scraper.storage_client = FlakyInMemoryClient(
+            data_scraper.storage_client.files,
+            flaky_file_names={flaky_file_name},
+            unreachable_file_names={unreachable_file_name}
+        )
+        read_attempts = data_scraper.storage_client.read_attempts
+
+        data_report_status = data_scraper._export_asset_parameters(asset_parameters=asset_parameters, dump_path=str(tmpdir))
+        data_scraper._shutdown_download_executor()
+
+        csv_lines = read_csv_without_generation_time(f'{tmpdir}/{DataScraper._get_base_of_filename(asset_parameters)}.csv')
+        assert data_report_status is DataQualityReportStatus.NEGATIVE
+        assert read_attempts.count(broken_file_name) == 1
+        assert read_attempts.count(flaky_file_name) == 2
+        assert read_attempts.count(unreachable_file_name) == DataScraper.DOWNLOAD_ATTEMPTS
+        assert f'# MissingFile: {broken_file_name}\n' in csv_lines
+        assert f'# MissingFile: {unreachable_file_name}\n' in csv_lines
+        assert any('are_all_files_downloaded' in line and 'NEGATIVE' in line for line in csv_lines)
@@ -0,0 +1,114 @@
+import threading
+from multiprocessing import Pipe
+
+import pytest
+
+from binance_data_processor.data_sink.sharded_data_sink_facade import ShardedBinanceDataSink, \
+    get_data_sink_shard_configs
+from binance_data_processor.enums.data_sink_config import DataSinkConfig
+from binance_data_processor.enums.market_enum import Market
+
+
+def get_data_sink_config(file_save_catalog: str) -> DataSinkConfig:
+    return DataSinkConfig(
+        instruments={
+            'spot': ['BTCUSDT', 'ETHUSDT', 'BNBUSDT'],
+            'usd_m_futures': ['BTCUSDT'],
+            'coin_m_futures': ['BTCUSD_PERP']
+        },
+        file_save_catalog=file_save_catalog
+    )
+
+
+def attach_shard_stand_in(sharded_data_sink: ShardedBinanceDataSink, shard_name: str, respond) -> threading.Thread:
+    supervisor_connection, shard_connection = Pipe()
+
+    def serve():
+        while True:
+            try:
+                request_id, message = shard_connection.recv()
+            except EOFError:
+                return
+            for response in respond(request_id, message):
+                shard_connection.send(response)
+
+    shard_stand_in = threading.Thread(target=serve, daemon=True)
+    shard_stand_in.start()
+    sharded_data_sink._shard_processes[shard_name] = shard_stand_in
+    sharded_data_sink._command_connections[shard_name] = supervisor_connection
+    return shard_stand_in
+
+
+class TestShardedBinanceDataSink:
+
+    def test_given_data_sink_config_when_sharding_per_market_then_every_market_gets_own_config_and_catalog(self, tmpdir):
+        shard_configs = get_data_sink_shard_configs(get_data_sink_config(str(tmpdir)))
+
+        assert list(shard_configs) == ['spot', 'usd_m_futures', 'coin_m_futures']
+        assert shard_configs['spot'].instruments.dict == {Market.SPOT: ['BTCUSDT', 'ETHUSDT', 'BNBUSDT']}
+        assert shard_configs['coin_m_futures'].instruments.dict == {Market.COIN_M_FUTURES: ['BTCUSD_PERP']}
+        assert shard_configs['usd_m_futures'].file_save_catalog == f'{tmpdir}/usd_m_futures'
+        assert shard_configs['spot'].time_settings == get_data_sink_config(str(tmpdir)).time_settings
+
+    def test_given_pairs_per_shard_when_sharding_then_market_pairs_are_split_into_groups(self, tmpdir):
+        shard_configs = get_data_sink_shard_configs(get_data_sink_config(str(tmpdir)), pairs_per_shard=2)
+
+        assert list(shard_configs) == ['spot_0', 'spot_1', 'usd_m_futures', 'coin_m_futures']
+        assert shard_configs['spot_0'].instruments.get_pairs(Market.SPOT) == ['BTCUSDT', 'ETHUSDT']
+        assert shard_configs['spot_1'].instruments.get_pairs(Market.SPOT) == ['BNBUSDT']
+
+    def test_given_invalid_pairs_per_shard_when_sharding_then_exception_is_thrown(self, tmpdir):
+        with pytest.raises(ValueError) as excinfo:
+            get_data_sink_shard_configs(get_data_sink_config(str(tmpdir)), pairs_per_shard=0)
+
+        assert str(excinfo.value) == "pairs_per_shard must be greater than 0"
+
+    def test_given_split_market_when_routing_subscription_then_smallest_shard_subscribes_and_owner_unsubscribes(self, tmpdir):
+        sharded_data_sink = ShardedBinanceDataSink(
+            data_sink_config=get_data_sink_config(str(tmpdir)),
+            pairs_per_shard=2,
+            serve_fast_api=False
+        )
+
+        assert sharded_data_sink.get_shard_name_for_subscription('subscribe', Market.SPOT, 'XRPUSDT') == 'spot_1'
+        assert sharded_data_sink.get_shard_name_for_subscription('unsubscribe', Market.SPOT, 'ETHUSDT') == 'spot_0'
+        with pytest.raises(Exception) as excinfo:
+            sharded_data_sink.get_shard_name_for_subscription('unsubscribe', Market.SPOT, 'XRPUSDT')
+        assert str(excinfo.value) == 'There is no instrument XRPUSDT subscribed in market Market.SPOT'
+
+    def test_given_shard_when_modifying_subscription_then_command_is_routed_and_supervisor_instruments_are_updated(self, tmpdir):
+        sharded_data_sink = ShardedBinanceDataSink(
+            data_sink_config=get_data_sink_config(str(tmpdir)),
+            pairs_per_shard=2,
+            serve_fast_api=False
+        )
+        received_messages = []
+
+        def respond(request_id, message):
+            received_messages.append(message)
+            yield request_id, 'subscribed'
+
+        attach_shard_stand_in(sharded_data_sink, 'spot_1', respond)
+
+        response = sharded_data_sink.handle_command(
+            {'modify_subscription': {'type': 'subscribe', 'market': 'SPOT', 'asset': 'xrpusdt'}}
+        )
+
+        assert response == '{"spot_1": "subscribed"}'
+        assert received_messages == [{'modify_subscription': {'type': 'subscribe', 'market': 'spot', 'asset': 'XRPUSDT'}}]
+        assert sharded_data_sink.shard_configs['spot_1'].instruments.get_pairs(Market.SPOT) == ['BNBUSDT', 'XRPUSDT']
+        assert sharded_data_sink.data_sink_config.instruments.is_pair(Market.SPOT, 'XRPUSDT')
+
+    def test_given_late_response_of_previous_request_when_sending_command_then_only_matching_response_is_returned(self, tmpdir):
+        sharded_data_sink = ShardedBinanceDataSink(
+            data_sink_config=get_data_sink_config(str(tmpdir)),
+            serve_fast_api=False
+        )
+
+        def respond(request_id, message):
+            yield request_id - 1, 'stale status'
+            yield request_id, 'fresh status'
+
+        attach_shard_stand_in(sharded_data_sink, 'spot', respond)
+
+        assert sharded_data_sink.send_command_to_shard('spot', {'show_status': {}}) == 'fresh status'
@@ -97,9 +97,6 @@ class TestStreamListener:
             trade_stream_listener.close_websocket_app()
             difference_depth_stream_listener.close_websocket_app()
 
-        DifferenceDepthQueue.clear_instances()
-        TradeQueue.clear_instances()
-
     def test_given_stream_listener_when_init_with_pairs_argument_as_str_then_exception_is_thrown(self):
         config_from_json = {
             "instruments": {
@@ -144,9 +141,6 @@ class TestStreamListener:
 
         assert str(excinfo.value) == "pairs argument is not a list"
 
-        DifferenceDepthQueue.clear_instances()
-        TradeQueue.clear_instances()
-
     def test_given_stream_listener_when_init_with_pairs_amount_of_zero_then_exception_is_thrown(self):
         config_from_json = {
             "instruments": {
@@ -194,9 +188,6 @@ class TestStreamListener:
 
         assert str(excinfo.value) == "pairs len is zero"
 
-        DifferenceDepthQueue.clear_instances()
-        TradeQueue.clear_instances()
-
     def test_given_trade_stream_listener_when_on_open_then_message_is_being_logged(self, caplog):
         pairs = ['BTCUSDT']
         queue = TradeQueue(market=Market.SPOT)
@@ -215,7 +206,6 @@ class TestStreamListener:
         assert "Starting streamListener" in caplog.text
 
         stream_listener.close_websocket_app()
-        TradeQueue.clear_instances()
 
     def test_given_trade_stream_listener_when_on_close_then_close_message_is_being_logged(self, caplog):
         pairs = ['BTCUSDT']
@@ -237,8 +227,6 @@ class TestStreamListener:
         stream_listener.close_websocket_app()
         stream_listener._blackout_supervisor.shutdown_supervisor()
 
-        TradeQueue.clear_instances()
-
     def test_given_trade_stream_listener_when_connected_then_error_is_being_logged(self, caplog):
         ...
 
@@ -300,9 +288,6 @@ class TestStreamListener:
         assert re.search(r'"e"\s*:\s*"trade"', sample_message_str_from_queue), "Event type should be 'trade'."
         assert re.search(r'"s"\s*:\s*"BTCUSDT"', sample_message_str_from_queue), "Symbol should be 'BTCUSDT'."
 
-        DifferenceDepthQueue.clear_instances()
-        TradeQueue.clear_instances()
-
     def test_given_difference_depth_stream_listener_when_connected_then_message_is_correctly_passed_to_diff_queue(self):
         setup_logger()
 
@@ -360,9 +345,6 @@ class TestStreamListener:
         assert re.search(r'"e"\s*:\s*"depthUpdate"', sample_message), "Typ zdarzenia powinien być 'depthUpdate'."
         assert re.search(r'"s"\s*:\s*"(BTCUSDT|ETHUSDT)"', sample_message), "Symbol powinien być 'BTCUSDT' lub 'ETHUSDT'."
 
-        DifferenceDepthQueue.clear_instances()
-        TradeQueue.clear_instances()
-
     def test_given_trade_stream_listener_when_init_then_supervisor_starts_correctly_and_is_being_notified(self):
         logger = setup_logger()
 
@@ -434,7 +416,6 @@ class TestStreamListener:
         assert presumed_thread_name in active_threads
         assert len(active_threads) == 3
         trade_stream_listener.close_websocket_app()
-        TradeQueue.clear_instances()
 
     def test_given_difference_depth_stream_listener_when_init_then_supervisor_starts_correctly_and_is_being_notified(self):
 
@@ -501,8 +482,6 @@ class TestStreamListener:
 
         difference_depth_queue_listener.close_websocket_app()
 
-        DifferenceDepthQueue.clear_instances()
-
     @pytest.mark.skip
     def test_given_trade_stream_listener_when_message_income_stops_then_supervisors_sets_flag_to_stop(self):
         ...
@@ -6,7 +6,7 @@ import pytest
 
 from binance_data_processor.enums.market_enum import Market
 from binance_data_processor.core.stream_listener_id import StreamListenerId
-from binance_data_processor.core.trade_queue import TradeQueue, ClassInstancesAmountLimitException
+from binance_data_processor.core.trade_queue import TradeQueue
 
 
 def format_message_string_that_is_pretty_to_binance_string_format(message: str) -> str:
@@ -80,36 +80,15 @@ class TestTradeQueue:
 
         assert add_field_to_string_json_message(binance_format_message, "_E", mocked_timestamp) == '{"stream":"trxusdt@depth@100ms","data":{"e":"depthUpdate","E":1720337869317,"s":"TRXUSDT","U":4609985365,"u":4609985365,"b":[["0.12984000","123840.00000000"]],"a":[]},"_E":2115}'
 
-    # TradeQueue singleton init test
+    # init test
     #
-    def test_given_too_many_difference_depth_queue_instances_exists_when_creating_new_then_exception_is_thrown(self):
-        for _ in range(3):
-            TradeQueue(Market.SPOT)
+    def test_given_many_trade_queues_when_creating_them_then_every_queue_is_independent(self):
+        queues = [TradeQueue(Market.SPOT) for _ in range(8)]
 
-        with pytest.raises(ClassInstancesAmountLimitException):
-            TradeQueue(Market.SPOT)
+        queues[0].queue.put('message')
 
-        TradeQueue.clear_instances()
-
-    def test_given_checking_amount_of_instances_when_get_instance_count_invocation_then_amount_is_correct(self):
-        instance_count = TradeQueue.get_instance_count()
-        assert instance_count == 0
-
-        for _ in range(3):
-            TradeQueue(Market.SPOT)
-
-        assert TradeQueue.get_instance_count() == 3
-
-        TradeQueue.clear_instances()
-
-    def test_given_instances_amount_counter_reset_when_clear_instances_method_invocation_then_amount_is_zero(self):
-        for _ in range(3):
-            TradeQueue(Market.SPOT)
-
-        TradeQueue.clear_instances()
-
-        assert TradeQueue.get_instance_count() == 0
-        TradeQueue.clear_instances()
+        assert queues[0].qsize() == 1
+        assert all(queue.qsize() == 0 for queue in queues[1:])
 
     # run_mode tests
     #
@@ -117,7 +96,6 @@ class TestTradeQueue:
         global_queue = Queue()
         trade_queue = TradeQueue(market=Market.SPOT, global_queue=global_queue)
         assert trade_queue.queue is global_queue
-        TradeQueue.clear_instances()
 
     def test_given_trade_message_in_data_listener_mode_when_putting_message_then_message_is_added_to_global_queue(self):
         global_queue = Queue()
@@ -149,7 +127,16 @@ class TestTradeQueue:
         assert not global_queue.empty()
         queued_message = global_queue.get_nowait()
         assert queued_message == add_field_to_string_json_message(message, "_E", mocked_timestamp_of_receive)
-        TradeQueue.clear_instances()
+
+    def test_given_compact_records_when_putting_message_then_raw_message_and_timestamp_of_receive_are_queued_as_record(self):
+        trade_queue = TradeQueue(market=Market.SPOT, compact_records=True)
+        stream_listener_id = StreamListenerId(pairs=['BTCUSDT'])
+        trade_queue.currently_accepted_stream_id_keys = stream_listener_id.id_keys
+        message = '{"stream":"btcusdt@trade","data":{"e":"trade","E":123456789,"s":"BTCUSDT","t":12345}}'
+
+        trade_queue.put_trade_message(stream_listener_id, message, 1234567890)
+
+        assert trade_queue.drain_all() == [(1234567890, message)]
 
     def test_given_trade_messages_in_data_listener_mode_when_using_queue_operations_then_operations_reflect_global_queue_state(self):
         global_queue = Queue()
@@ -178,7 +165,6 @@ class TestTradeQueue:
         queued_message = trade_queue.get_nowait()
         assert queued_message == add_field_to_string_json_message(message, "_E", timestamp_of_receive)
         assert trade_queue.empty()
-        TradeQueue.clear_instances()
 
     def test_given_empty_global_queue_in_data_listener_mode_when_checking_queue_then_empty_and_get_nowait_raises_exception(self):
         global_queue = Queue()
@@ -186,7 +172,6 @@ class TestTradeQueue:
         assert tq.empty()
         with pytest.raises(queue.Empty):
             tq.get_nowait()
-        TradeQueue.clear_instances()
 
     # _put_with_no_repetitions test
     #
@@ -247,8 +232,6 @@ class TestTradeQueue:
                 in trade_queue_content_list)
         assert len(trade_queue_content_list) == 1
 
-        TradeQueue.clear_instances()
-
     def test_given_putting_message_from_no_longer_accepted_stream_listener_id_when_try_to_put_then_message_is_not_added_to_the_queue(self):
 
         config = {
@@ -480,8 +463,6 @@ class TestTradeQueue:
 
         assert trade_queue_content_list == expected_trade_queue_content_list
 
-        TradeQueue.clear_instances()
-
     #get_message_signs
     #
     def test_given_getting_message_signs_whilst_putting_message_when_get_message_signs_then_signs_are_returned_correctly(self):
@@ -503,7 +484,6 @@ class TestTradeQueue:
         ''')
 
         assert TradeQueue.get_message_signs(message) == '"s":"ADAUSDT","t":506142454'
-        TradeQueue.clear_instances()
 
     # get, get_nowait, clear, empty, qsize
     #
@@ -740,8 +720,6 @@ class TestTradeQueue:
 
         assert trade_queue_content_list == expected_trade_queue_content_list
 
-        TradeQueue.clear_instances()
-
     def test_given_getting_from_queue_when_get_nowait_then_last_element_is_returned(self):
 
         config = {
@@ -962,8 +940,6 @@ class TestTradeQueue:
 
         assert presumed_first_transaction == add_field_to_string_json_message(_old_listener_message_1, "_E", mocked_timestamp_of_receive)
 
-        TradeQueue.clear_instances()
-
     def test_getting_with_no_wait_from_queue_when_method_invocation_then_last_element_is_returned(self):
 
         config = {
@@ -1184,8 +1160,6 @@ class TestTradeQueue:
 
         assert presumed_first_transaction == add_field_to_string_json_message(_old_listener_message_1, "_E", mocked_timestamp_of_receive)
 
-        TradeQueue.clear_instances()
-
     def test_given_clearing_difference_depth_queue_when_invocation_then_qsize_equals_zero(self):
 
         config = {
@@ -1406,8 +1380,6 @@ class TestTradeQueue:
 
         assert trade_queue.qsize() == 0
 
-        TradeQueue.clear_instances()
-
     def test_given_checking_empty_when_method_invocation_then_result_is_ok(self):
 
         config = {
@@ -1630,8 +1602,6 @@ class TestTradeQueue:
         assert trade_queue.qsize() == 0
         assert trade_queue.empty() == True
 
-        TradeQueue.clear_instances()
-
     def test_checking_size_when_method_invocation_then_result_is_ok(self):
         """change on _new_listener_message_3"""
         config = {
@@ -1852,4 +1822,42 @@ class TestTradeQueue:
 
         assert trade_queue.qsize() == 0
 
-        TradeQueue.clear_instances()
+    def test_given_merge_mode_when_listeners_overlap_then_every_trade_is_queued_once_and_switch_happens_after_catching_up(self):
+        trade_queue = TradeQueue(market=Market.SPOT, compact_records=True, merge_overlapping_streams=True)
+        old_stream_listener_id = StreamListenerId(pairs=['BTCUSDT', 'ETHUSDT'])
+        time.sleep(0.01)
+        new_stream_listener_id = StreamListenerId(pairs=['BTCUSDT', 'ETHUSDT'])
+        trade_queue.currently_accepted_stream_id_keys = old_stream_listener_id.id_keys
+
+        def get_trade(pair: str, trade_id: int) -> str:
+            return f'{{"stream":"{pair.lower()}@trade","data":{{"e":"trade","E":1,"s":"{pair}","t":{trade_id},"p":"1.0"}}}}'
+
+        trade_queue.put_trade_message(old_stream_listener_id, get_trade('BTCUSDT', 100), 1)
+        trade_queue.put_trade_message(old_stream_listener_id, get_trade('ETHUSDT', 200), 1)
+        trade_queue.set_switching_websockets_mode()
+
+        trade_queue.put_trade_message(new_stream_listener_id, get_trade('BTCUSDT', 102), 2)
+        trade_queue.put_trade_message(old_stream_listener_id, get_trade('BTCUSDT', 101), 2)
+        trade_queue.put_trade_message(old_stream_listener_id, get_trade('BTCUSDT', 102), 2)
+        trade_queue.put_trade_message(old_stream_listener_id, get_trade('ETHUSDT', 201), 2)
+        trade_queue.put_trade_message(new_stream_listener_id, get_trade('BTCUSDT', 102), 3)
+        trade_queue.put_trade_message(new_stream_listener_id, get_trade('BTCUSDT', 103), 3)
+        assert not trade_queue.did_websockets_switch_successfully
+
+        trade_queue.put_trade_message(new_stream_listener_id, get_trade('ETHUSDT', 201), 3)
+        assert trade_queue.did_websockets_switch_successfully
+        assert trade_queue.currently_accepted_stream_id_keys == new_stream_listener_id.id_keys
+        assert trade_queue.no_longer_accepted_stream_id_keys == old_stream_listener_id.id_keys
+
+        trade_queue.put_trade_message(old_stream_listener_id, get_trade('ETHUSDT', 202), 4)
+        trade_queue.put_trade_message(new_stream_listener_id, get_trade('ETHUSDT', 202), 4)
+
+        assert [TradeQueue.get_message_trade_id(message) for _, message in trade_queue.drain_all()] == [
+            ('BTCUSDT', 100),
+            ('ETHUSDT', 200),
+            ('BTCUSDT', 101),
+            ('BTCUSDT', 102),
+            ('ETHUSDT', 201),
+            ('BTCUSDT', 103),
+            ('ETHUSDT', 202)
+        ]
@@ -0,0 +1,92 @@
+import os
+import time
+
+import pytest
+
+from binance_data_processor.core.stream_data_saver_and_sender import StreamDataSaverAndSender
+from binance_data_processor.core.upload_spool import UploadSpool
+from binance_data_processor.enums.compression_codec_enum import CompressionCodec
+
+ARCHIVE_FILE_NAME = 'binance_difference_depth_stream_coin_m_futures_btcusd_perp_12-03-2025T10-15-00Z'
+
+
+class TestUploadSpool:
+
+    def test_given_enqueued_files_when_getting_due_uploads_then_files_are_returned_oldest_first(self, tmpdir):
+        upload_spool = UploadSpool(spool_path=f'{tmpdir}/spool.sqlite3')
+
+        upload_spool.enqueue('a.zip')
+        upload_spool.enqueue('b.zip')
+        upload_spool.enqueue('a.zip')
+
+        assert upload_spool.pending_count() == 2
+        assert upload_spool.get_due_uploads(limit=10) == ['a.zip', 'b.zip']
+        assert upload_spool.get_due_uploads(limit=1) == ['a.zip']
+
+    def test_given_repeated_failures_when_marking_failed_then_retry_delay_grows_exponentially_up_to_limit(self, tmpdir):
+        upload_spool = UploadSpool(spool_path=f'{tmpdir}/spool.sqlite3', retry_base_delay_seconds=3, retry_max_delay_seconds=20)
+        upload_spool.enqueue('a.zip')
+
+        delays = []
+        for _ in range(5):
+            now = time.time()
+            delays.append(round(upload_spool.mark_failed('a.zip', 'timeout') - now))
+
+        assert delays == [3, 6, 12, 20, 20]
+        assert upload_spool.get_attempts('a.zip') == 5
+        assert upload_spool.get_due_uploads(limit=10) == []
+        assert upload_spool.get_due_uploads(limit=10, now=time.time() + 21) == ['a.zip']
+
+    def test_given_uploaded_file_when_marking_uploaded_then_it_leaves_the_spool(self, tmpdir):
+        upload_spool = UploadSpool(spool_path=f'{tmpdir}/spool.sqlite3')
+        upload_spool.enqueue('a.zip')
+
+        upload_spool.mark_uploaded('a.zip')
+
+        assert upload_spool.pending_count() == 0
+        assert upload_spool.get_attempts('a.zip') is None
+
+    def test_given_spool_when_reopened_then_pending_uploads_and_attempts_survive_restart(self, tmpdir):
+        upload_spool = UploadSpool(spool_path=f'{tmpdir}/spool.sqlite3')
+        upload_spool.enqueue('a.zip')
+        upload_spool.mark_failed('a.zip', 'timeout')
+        upload_spool.close()
+
+        reopened_upload_spool = UploadSpool(spool_path=f'{tmpdir}/spool.sqlite3')
+
+        assert reopened_upload_spool.pending_count() == 1
+        assert reopened_upload_spool.get_attempts('a.zip') == 1
+
+    def test_given_due_uploads_in_flight_when_getting_due_uploads_then_they_do_not_take_the_limit(self, tmpdir):
+        upload_spool = UploadSpool(spool_path=f'{tmpdir}/spool.sqlite3')
+        for file_path in ['a.zip', 'b.zip', 'c.zip']:
+            upload_spool.enqueue(file_path)
+
+        assert upload_spool.get_due_uploads(limit=2, excluded_file_paths={'a.zip', 'b.zip'}) == ['c.zip']
+        assert upload_spool.get_due_uploads(limit=2, excluded_file_paths=set()) == ['a.zip', 'b.zip']
+
+    @pytest.mark.parametrize('codec, expected_file_names', [
+        (CompressionCodec.ZIP, [f'{ARCHIVE_FILE_NAME}.json.zst', f'{ARCHIVE_FILE_NAME}.zip']),
+        (CompressionCodec.NONE, [f'{ARCHIVE_FILE_NAME}.json', f'{ARCHIVE_FILE_NAME}.json.zst', f'{ARCHIVE_FILE_NAME}.zip'])
+    ])
+    def test_given_catalog_with_leftover_files_when_enqueueing_existing_files_then_only_produced_archives_are_spooled(self, tmpdir, codec, expected_file_names):
+        for file_name in [
+            f'{ARCHIVE_FILE_NAME}.zip',
+            f'{ARCHIVE_FILE_NAME}.json.zst',
+            f'{ARCHIVE_FILE_NAME}.json',
+            f'{ARCHIVE_FILE_NAME}.json.staged',
+            f'{ARCHIVE_FILE_NAME}.zip.part',
+            'settings.json',
+            'backup.zip'
+        ]:
+            with open(os.path.join(str(tmpdir), file_name), 'wb') as f:
+                f.write(b'')
+        upload_spool = UploadSpool(spool_path=f'{tmpdir}/.spool.sqlite3')
+
+        enqueued = upload_spool.enqueue_existing_files(
+            str(tmpdir),
+            StreamDataSaverAndSender.get_produced_archive_file_name_pattern(codec)
+        )
+
+        assert enqueued == len(expected_file_names)
+        assert sorted(upload_spool.get_due_uploads(limit=10)) == [f'{tmpdir}/{file_name}' for file_name in expected_file_names]
@@ -9,7 +9,7 @@ setup(
         'python-dotenv',
         'fastapi',
         'uvicorn',
-        'websockets',
+        'websockets>=13',
         'orjson',
         'requests',
         'numpy',
@@ -26,6 +26,18 @@ setup(
         'azure': [
             'azure-identity',
             'azure-storage-blob'
+        ],
+        'zstd': [
+            'zstandard'
+        ],
+        'lz4': [
+            'lz4'
+        ],
+        'async': [
+            'aiohttp'
+        ],
+        'parquet': [
+            'pyarrow'
         ]
     },
     long_description=open("README.md").read(),